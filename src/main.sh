@@ -1,8 +1,6 @@
 #!/bin/bash
 
 BASE_DIR="$(dirname "$(realpath "$0")")"
-MODULES_DIR="$BASE_DIR/modules"
-TESTS_DIR="$BASE_DIR/tests"
 RESOURCES_DIR="$BASE_DIR/resources"
 UTILS_DIR="$BASE_DIR/utils"
 WHICH_PYTHON_SCRIPT="$UTILS_DIR/which_python.sh"
@@ -13,6 +11,8 @@ if [ -f "$LOGGER_SCRIPT" ]; then
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$UTILS_DIR/env_facts.sh"
 
 CATEGORY_NAMES=(
     "ML & Vision stack"
@@ -56,6 +56,8 @@ function show_help() {
     echo "Jetsonizer - The Ultimate NVIDIA Jetson Setup Tool"
     echo ""
     echo "Usage: jetsonizer [options]"
+    echo "       jetsonizer bundle export [components] -o PATH   Collect this board's installs for offline use"
+    echo "       jetsonizer bundle import|verify PATH            Check a bundle without installing anything"
     echo ""
     echo "Description:"
     echo "  Jetsonizer automates the installation of complex components like OpenCV (CUDA),"
@@ -63,14 +65,52 @@ function show_help() {
     echo ""
     echo "Options:"
     echo "  -h, --help    Show this help message and exit"
+    echo "  --dry-run     Run stub modules instead of the installers to preview the schedule"
+    echo "  --force       Reinstall components even if the install manifest says they are current"
+    echo "  --plan        Print what would be installed, upgraded or skipped, then exit"
+    echo "  --bundle PATH Install strictly from an offline bundle (directory or tarball)"
     echo ""
 }
 
-if [[ "$1" == "-h" || "$1" == "--help" ]]; then
-    show_help
-    exit 0
+if [ "${1:-}" = "bundle" ]; then
+    shift
+    BUNDLE_PYTHON="$("$WHICH_PYTHON_SCRIPT" 2>/dev/null || command -v python3)"
+    exec "$BUNDLE_PYTHON" "$UTILS_DIR/bundle.py" "$@"
 fi
 
+DRY_RUN=0
+PLAN_ONLY=0
+BUNDLE_SOURCE=""
+while [ "$#" -gt 0 ]; do
+    case "$1" in
+        -h|--help)
+            show_help
+            exit 0
+            ;;
+        --dry-run)
+            DRY_RUN=1
+            ;;
+        --force)
+            export JETSONIZER_FORCE_REINSTALL=1
+            ;;
+        --plan)
+            PLAN_ONLY=1
+            ;;
+        --bundle)
+            if [ -z "${2:-}" ]; then
+                echo "--bundle requires a bundle directory or tarball." >&2
+                exit 1
+            fi
+            BUNDLE_SOURCE="$2"
+            shift
+            ;;
+        --bundle=*)
+            BUNDLE_SOURCE="${1#--bundle=}"
+            ;;
+    esac
+    shift
+done
+
 if ! command -v gum &> /dev/null; then
     echo "Gum not found. Installing dependencies (requires sudo)..."
     sudo bash "$UTILS_DIR/gum_installation.sh"
@@ -108,17 +148,37 @@ if [ -z "$JETSON_PYTHON_VERSION" ]; then
     fi
 fi
 
+# Warm the facts cache for this user (the menu, the install plan and the non-sudo items read it).
+# Snapshots are kept per effective uid; the one for sudo modules is warmed after sudo -v below.
+jetsonizer_facts_load "$JETSONIZER_ACTIVE_PYTHON_BIN" || true
+
 RUN_PYTHON_BIN="$JETSONIZER_ACTIVE_PYTHON_BIN"
 if [ -z "$RUN_PYTHON_BIN" ] && command -v python3 &> /dev/null; then
     RUN_PYTHON_BIN=$(command -v python3)
 fi
 
+if [ -n "$BUNDLE_SOURCE" ]; then
+    if [ -z "$RUN_PYTHON_BIN" ]; then
+        gum style --foreground 196 --bold "❌ python3 is required to import an offline bundle."
+        exit 1
+    fi
+    gum style --foreground 82 --bold "Verifying offline bundle $BUNDLE_SOURCE..."
+    if ! JETSONIZER_BUNDLE_DIR="$("$RUN_PYTHON_BIN" "$UTILS_DIR/bundle.py" import "$BUNDLE_SOURCE" --python "$RUN_PYTHON_BIN")"; then
+        gum style --foreground 196 --bold "❌ Offline bundle $BUNDLE_SOURCE could not be imported."
+        exit 1
+    fi
+    export JETSONIZER_BUNDLE_DIR
+fi
+
 gum style --foreground 82 --bold "Architecture: $SYSTEM_ARCH"
 if [ -n "$JETSONIZER_ACTIVE_PYTHON_BIN" ]; then
     gum style --foreground 82 --bold "Python: $JETSON_PYTHON_VERSION ($JETSONIZER_ACTIVE_PYTHON_BIN)"
 else
     gum style --foreground 214 --bold "Python: $JETSON_PYTHON_VERSION"
 fi
+if [ -n "${JETSONIZER_BUNDLE_DIR:-}" ]; then
+    gum style --foreground 82 --bold "Offline bundle: $JETSONIZER_BUNDLE_DIR"
+fi
 
 function render_header_block() {
     gum style \
@@ -288,52 +348,60 @@ if [[ ${#SELECTION_ORDER[@]} -eq 0 ]]; then
     exit 0
 fi
 
-gum style --foreground 82 --bold "Installing: ${SELECTION_ORDER[*]}"
-
+MANIFEST_COMPONENTS=()
 for ITEM in "${SELECTION_ORDER[@]}"; do
     case "$ITEM" in
-        "OpenCV with CUDA enabled")
-            sudo env "JETSONIZER_ACTIVE_PYTHON_BIN=${JETSONIZER_ACTIVE_PYTHON_BIN:-}" bash "$MODULES_DIR/router_opencv.sh"
-            ;;
-        "MiniConda")
-            bash "$MODULES_DIR/install_miniconda.sh"
-            ;;
-        "PyTorch with CUDA acceleration")
-            sudo env "JETSONIZER_ACTIVE_PYTHON_BIN=${JETSONIZER_ACTIVE_PYTHON_BIN:-}" bash "$MODULES_DIR/router_torch.sh"
-            ;;
-        "VS Code")
-            sudo bash "$MODULES_DIR/install_vscode.sh"
-            ;;
-        "uv")
-            sudo bash "$MODULES_DIR/install_uv.sh"
-            ;;
-        "TensorRT")
-            sudo env "JETSONIZER_ACTIVE_PYTHON_BIN=${JETSONIZER_ACTIVE_PYTHON_BIN:-}" bash "$MODULES_DIR/link_tensorrt.sh"
-            ;;
-        "jtop")
-            sudo bash "$MODULES_DIR/router_jtop.sh"
-            ;;
-        "Brave Browser")
-            if [ -f "$MODULES_DIR/install_brave_browser.sh" ]; then
-                sudo bash "$MODULES_DIR/install_brave_browser.sh"
-            fi
-            ;;
-        "Run OpenCV CUDA test")
-            bash "$TESTS_DIR/test_opencv_cuda.sh"
-            ;;
-        "Run PyTorch CUDA test")
-            if [ -n "$RUN_PYTHON_BIN" ]; then
-                env "JETSONIZER_ACTIVE_PYTHON_BIN=${JETSONIZER_ACTIVE_PYTHON_BIN:-}" "$RUN_PYTHON_BIN" "$TESTS_DIR/test_torch_cuda.py"
-            else
-                gum style --foreground 214 "Skipping PyTorch CUDA test: no Python interpreter detected."
-            fi
-            ;;
-        "Run TensorRT test")
-            if [ -n "$RUN_PYTHON_BIN" ]; then
-                env "JETSONIZER_ACTIVE_PYTHON_BIN=${JETSONIZER_ACTIVE_PYTHON_BIN:-}" "$RUN_PYTHON_BIN" "$TESTS_DIR/test_tensorrt.py"
-            else
-                gum style --foreground 214 "Skipping TensorRT test: no Python interpreter detected."
-            fi
-            ;;
+        "OpenCV with CUDA enabled") MANIFEST_COMPONENTS+=(opencv) ;;
+        "PyTorch with CUDA acceleration") MANIFEST_COMPONENTS+=(torch) ;;
+        "TensorRT") MANIFEST_COMPONENTS+=(tensorrt) ;;
     esac
 done
+if [ "${#MANIFEST_COMPONENTS[@]}" -gt 0 ] && [ -n "$RUN_PYTHON_BIN" ]; then
+    "$RUN_PYTHON_BIN" "$UTILS_DIR/install_manifest.py" plan "${MANIFEST_COMPONENTS[@]}" || true
+fi
+if [ "$PLAN_ONLY" -eq 1 ]; then
+    exit 0
+fi
+
+gum style --foreground 82 --bold "Installing: ${SELECTION_ORDER[*]}"
+
+SCHEDULER_SCRIPT="$UTILS_DIR/install_scheduler.py"
+SCHEDULER_PYTHON="$(command -v python3 || true)"
+if [ -z "$SCHEDULER_PYTHON" ]; then
+    SCHEDULER_PYTHON="$RUN_PYTHON_BIN"
+fi
+if [ -z "$SCHEDULER_PYTHON" ]; then
+    gum style --foreground 196 --bold "❌ python3 is required to schedule the selected installs."
+    exit 1
+fi
+
+# Independent installs run concurrently; the scheduler serializes apt/dpkg and pip on the
+# same interpreter, orders dependent items and prints a timeline with per-job log files.
+SCHEDULER_ARGS=(--python "${JETSONIZER_ACTIVE_PYTHON_BIN:-}" --run-python "${RUN_PYTHON_BIN:-$SCHEDULER_PYTHON}")
+if [ "$DRY_RUN" -eq 1 ]; then
+    SCHEDULER_ARGS+=(--dry-run)
+else
+    NEEDS_SUDO=0
+    for ITEM in "${SELECTION_ORDER[@]}"; do
+        case "$ITEM" in
+            "MiniConda"|"Run "*) ;;
+            *) NEEDS_SUDO=1 ;;
+        esac
+    done
+    # Ask for the password once up front; background jobs cannot prompt for it.
+    if [ "$NEEDS_SUDO" -eq 1 ] && ! sudo -v; then
+        gum style --foreground 196 --bold "❌ sudo authentication failed."
+        exit 1
+    fi
+    if [ "$NEEDS_SUDO" -eq 1 ] && [ -n "${JETSONIZER_ACTIVE_PYTHON_BIN:-}" ]; then
+        # Write root's facts snapshot once, before the sudo modules start in parallel and each probe.
+        sudo bash -c 'source "$1" && jetsonizer_facts_load "$2"' _ "$UTILS_DIR/env_facts.sh" \
+            "$JETSONIZER_ACTIVE_PYTHON_BIN" || true
+    fi
+fi
+
+if "$SCHEDULER_PYTHON" "$SCHEDULER_SCRIPT" "${SCHEDULER_ARGS[@]}" "${SELECTION_ORDER[@]}"; then
+    gum style --foreground 82 --bold "✅ All selected items completed."
+else
+    gum style --foreground 196 --bold "❌ One or more items failed or were skipped. See the timeline above for per-job logs."
+fi
@@ -13,12 +13,15 @@ WHICH_PYTHON_SCRIPT="$SRC_ROOT/utils/which_python.sh"
 
 EXPECTED_PYTHON_MM="${EXPECTED_PYTHON_MM:-3.10}"
 
+ENV_FACTS_SCRIPT="$SRC_ROOT/utils/env_facts.sh"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
   # shellcheck source=/dev/null
   source "$LOGGER_SCRIPT"
   jetsonizer_log_init
 fi
+# shellcheck source=/dev/null
+source "$ENV_FACTS_SCRIPT"
 
 LOG_DIR="${JETSONIZER_LOG_DIR:-/home/${SUDO_USER:-${USER:-$(id -un 2>/dev/null || echo root)}}/.cache/Jetsonizer}"
 BUILD_LOG="$LOG_DIR/opencv_build_wheel.log"
@@ -28,6 +31,14 @@ PIP_LOG="$LOG_DIR/opencv_pip_install.log"
 OPENCV_PYTHON_DIR="${OPENCV_PYTHON_DIR:-$LOG_DIR/opencv-python}"
 WHEEL_OUT_DIR="${WHEEL_OUT_DIR:-$LOG_DIR/wheels}"
 
+# Finished wheels keyed by source ref + build configuration; a hit skips the build entirely.
+BUILD_CACHE_DIR="${OPENCV_BUILD_CACHE_DIR:-$LOG_DIR/opencv-build-cache}"
+# Persistent compiler cache so rebuilds after a config change only recompile what changed.
+export CCACHE_DIR="${CCACHE_DIR:-$LOG_DIR/ccache}"
+export CCACHE_MAXSIZE="${CCACHE_MAXSIZE:-10G}"
+# Peak RSS budget per compile job; CUDA translation units in dnn/cudev need well over 1 GB.
+BUILD_MB_PER_JOB="${OPENCV_BUILD_MB_PER_JOB:-2048}"
+
 # Build flavor
 # ENABLE_CONTRIB=1 -> opencv-contrib-python
 #   ENABLE_HEADLESS=1 -> headless (no GUI)
@@ -37,7 +48,70 @@ export ENABLE_HEADLESS="${ENABLE_HEADLESS:-0}"
 # Require CUDA validation to pass (0/1)
 REQUIRE_CUDA="${REQUIRE_CUDA:-1}"
 
-mkdir -p "$LOG_DIR" "$WHEEL_OUT_DIR"
+mkdir -p "$LOG_DIR" "$WHEEL_OUT_DIR" "$BUILD_CACHE_DIR"
+
+# Phase timings for the build summary appended to $BUILD_LOG.
+PHASE_NAMES=()
+PHASE_SECONDS=()
+PHASE_STARTED_AT=0
+phase_begin() {
+  PHASE_STARTED_AT=$SECONDS
+}
+phase_end() {
+  PHASE_NAMES+=("$1")
+  PHASE_SECONDS+=("$((SECONDS - PHASE_STARTED_AT))")
+}
+
+# Job count from RAM, not cores: on Orin Nano nproc jobs of nvcc exhaust 8 GB and OOM.
+compute_build_jobs() {
+  local avail_kb swap_kb cpus budget_mb jobs
+  avail_kb="$(awk '/^MemAvailable:/ {print $2}' /proc/meminfo 2>/dev/null || echo 0)"
+  swap_kb="$(awk '/^SwapFree:/ {print $2}' /proc/meminfo 2>/dev/null || echo 0)"
+  cpus="$(nproc 2>/dev/null || echo 1)"
+  # Swap counts at half weight: it keeps a job alive, but a build leaning on it crawls.
+  budget_mb=$(( (${avail_kb:-0} + ${swap_kb:-0} / 2) / 1024 ))
+  jobs=$(( budget_mb / BUILD_MB_PER_JOB ))
+  if [ "$jobs" -gt "$cpus" ]; then
+    jobs="$cpus"
+  fi
+  if [ "$jobs" -lt 1 ]; then
+    jobs=1
+  fi
+  echo "$jobs"
+}
+
+compiler_version() {
+  local cxx nvcc_bin
+  cxx="$("${CXX:-c++}" --version 2>/dev/null | head -n 1 || true)"
+  nvcc_bin="$(command -v nvcc || echo /usr/local/cuda/bin/nvcc)"
+  echo "$cxx; $("$nvcc_bin" --version 2>/dev/null | tail -n 1 || true)"
+}
+
+# Prints the most recently modified OpenCV wheel in $1, or nothing when there is none.
+newest_wheel() {
+  find "$1" -maxdepth 1 -name 'opencv*_python-*.whl' -printf '%T@ %p\n' 2>/dev/null | sort -nr | head -n 1 | cut -d ' ' -f 2- || true
+}
+
+# ccache --print-stats (ccache >= 4.4) is key<TAB>value; older versions only get the raw report.
+ccache_summary() {
+  if ! command -v ccache >/dev/null 2>&1; then
+    echo "ccache: not installed"
+    return
+  fi
+  local stats
+  if stats="$(ccache --print-stats 2>/dev/null)"; then
+    echo "$stats" | awk -F '\t' '
+      $1 == "direct_cache_hit" || $1 == "preprocessed_cache_hit" { hits += $2 }
+      $1 == "cache_miss" { misses += $2 }
+      END {
+        total = hits + misses
+        ratio = total > 0 ? 100 * hits / total : 0
+        printf "ccache: %d hits / %d misses (%.1f%% hit ratio)\n", hits, misses, ratio
+      }'
+  else
+    ccache -s 2>/dev/null || true
+  fi
+}
 
 handle_err() {
   local exit_code=$?
@@ -105,7 +179,7 @@ if python_looks_like_env "$PYTHON_BIN"; then
   PIP_INSTALL_FLAGS=()
 else
   SUPPORTS_BREAK_FLAG=0
-  if "$PYTHON_BIN" -m pip install --help 2>/dev/null | grep -q -- '--break-system-packages'; then
+  if jetsonizer_pip_supports_break_flag "$PYTHON_BIN"; then
     SUPPORTS_BREAK_FLAG=1
   fi
   if [ "$SUPPORTS_BREAK_FLAG" -eq 1 ]; then
@@ -134,18 +208,20 @@ if gum confirm "Install/ensure build dependencies via apt (build-essential/cmake
   --selected.foreground="82" \
   --unselected.foreground="82" \
   --selected.background="82"; then
+  phase_begin
   gum spin --spinner dot --title "Installing build dependencies..." --spinner.foreground="82" -- \
     sudo apt-get update -y >/dev/null
 
   gum spin --spinner dot --title "Installing packages..." --spinner.foreground="82" -- \
     sudo apt-get install -y \
-      build-essential cmake git pkg-config ninja-build \
+      build-essential cmake git pkg-config ninja-build ccache \
       python3-dev \
       libjpeg-dev libpng-dev libtiff-dev \
       libavcodec-dev libavformat-dev libswscale-dev \
       libgstreamer1.0-dev libgstreamer-plugins-base1.0-dev \
       libgtk-3-dev \
       >/dev/null
+  phase_end "build dependencies"
 else
   gum style --foreground 214 --bold "⚠️  Skipping apt dependency install (assuming already present)."
 fi
@@ -167,6 +243,7 @@ gum style --foreground 82 --bold "Removing any existing OpenCV pip packages to a
   >/dev/null 2>&1 || true
 
 # Clone/update opencv-python repo
+phase_begin
 if [ -d "$OPENCV_PYTHON_DIR/.git" ]; then
   gum style --foreground 82 --bold "Updating existing repo at $OPENCV_PYTHON_DIR..."
   gum spin --spinner dot --title "git fetch..." --spinner.foreground="82" -- \
@@ -186,10 +263,16 @@ fi
 
 gum spin --spinner dot --title "Updating submodules..." --spinner.foreground="82" -- \
   git -C "$OPENCV_PYTHON_DIR" submodule update --init --recursive >/dev/null
+phase_end "source checkout"
 
 # Detect Jetson arch (override with JETSON_CUDA_ARCH_BIN if needed)
 detect_cuda_arch_bin() {
   local model
+  # The facts map the SoC from the device tree to its compute capability.
+  if jetsonizer_facts_load "$PYTHON_BIN" && [ -n "${JETSONIZER_FACT_CUDA_ARCH:-}" ]; then
+    echo "$JETSONIZER_FACT_CUDA_ARCH"
+    return
+  fi
   model="$(tr -d '\0' </proc/device-tree/model 2>/dev/null || true)"
   case "$model" in
     *Orin*) echo "8.7" ;;
@@ -222,32 +305,81 @@ if [ -z "${CMAKE_ARGS:-}" ]; then
   export CMAKE_ARGS="$DEFAULT_CMAKE_ARGS"
 fi
 
+# Everything that changes the produced wheel goes into the cache key; the compiler launcher
+# and job count below do not, so they are applied after the key is taken.
+CACHE_KEY="$(
+  {
+    echo "ref=$(git -C "$OPENCV_PYTHON_DIR" rev-parse HEAD)"
+    git -C "$OPENCV_PYTHON_DIR" submodule status --recursive
+    echo "cuda_arch_bin=$CUDA_ARCH_BIN"
+    echo "cmake_args=$CMAKE_ARGS"
+    echo "contrib=$ENABLE_CONTRIB headless=$ENABLE_HEADLESS"
+    echo "compiler=$(compiler_version)"
+    echo "python=$PYTHON_VERSION"
+  } | sha256sum | awk '{print $1}'
+)"
+CACHED_WHEEL_DIR="$BUILD_CACHE_DIR/$CACHE_KEY"
+
+BUILD_JOBS="${OPENCV_BUILD_JOBS:-$(compute_build_jobs)}"
+export CMAKE_BUILD_PARALLEL_LEVEL="$BUILD_JOBS"
+export MAKEFLAGS="-j$BUILD_JOBS"
+if command -v ninja >/dev/null 2>&1; then
+  export CMAKE_GENERATOR=Ninja
+fi
+BUILD_CMAKE_ARGS="$CMAKE_ARGS"
+if command -v ccache >/dev/null 2>&1; then
+  mkdir -p "$CCACHE_DIR"
+  # Hash paths relative to the checkout so a moved or re-cloned tree still hits.
+  export CCACHE_BASEDIR="$OPENCV_PYTHON_DIR"
+  BUILD_CMAKE_ARGS="$BUILD_CMAKE_ARGS -D CMAKE_C_COMPILER_LAUNCHER=ccache -D CMAKE_CXX_COMPILER_LAUNCHER=ccache -D CMAKE_CUDA_COMPILER_LAUNCHER=ccache"
+fi
+
 gum style --foreground 82 --bold "Build configuration:"
 gum style --foreground 82 --bold "  ENABLE_CONTRIB=$ENABLE_CONTRIB"
 gum style --foreground 82 --bold "  ENABLE_HEADLESS=$ENABLE_HEADLESS"
 gum style --foreground 82 --bold "  CUDA_ARCH_BIN=$CUDA_ARCH_BIN"
 gum style --foreground 82 --bold "  CMAKE_ARGS=$CMAKE_ARGS"
+gum style --foreground 82 --bold "  Jobs: $BUILD_JOBS (${BUILD_MB_PER_JOB} MB per job; override with OPENCV_BUILD_JOBS)"
+gum style --foreground 82 --bold "  Generator: ${CMAKE_GENERATOR:-default}, ccache: $(command -v ccache >/dev/null 2>&1 && echo "$CCACHE_DIR" || echo "not installed")"
+gum style --foreground 82 --bold "  Wheel cache key: $CACHE_KEY"
+
+BUILT_WHEEL="$(newest_wheel "$CACHED_WHEEL_DIR")"
+if [ -n "$BUILT_WHEEL" ] && [ -z "${OPENCV_FORCE_BUILD:-}" ]; then
+  gum style --foreground 82 --bold "✅ Found a cached wheel for this configuration; skipping the build (set OPENCV_FORCE_BUILD=1 to rebuild)."
+  echo "Wheel cache hit ($CACHE_KEY): $BUILT_WHEEL" > "$BUILD_LOG"
+else
+  # Build wheel
+  gum style --foreground 82 --bold "Building wheel with pip wheel . --verbose (logs: $BUILD_LOG)..."
+  if command -v ccache >/dev/null 2>&1; then
+    ccache -z >/dev/null 2>&1 || true
+  fi
+  phase_begin
+  (
+    cd "$OPENCV_PYTHON_DIR"
+    CMAKE_ARGS="$BUILD_CMAKE_ARGS" "$PYTHON_BIN" -m pip wheel . --verbose --wheel-dir "$WHEEL_OUT_DIR" 2>&1 | tee "$BUILD_LOG"
+  )
+  phase_end "wheel build"
+
+  # Locate built wheel
+  BUILT_WHEEL="$(newest_wheel "$WHEEL_OUT_DIR")"
+  if [ -z "$BUILT_WHEEL" ]; then
+    gum style --foreground 196 --bold "❌ Could not find built wheel in $WHEEL_OUT_DIR"
+    exit 1
+  fi
 
-# Build wheel
-gum style --foreground 82 --bold "Building wheel with pip wheel . --verbose (logs: $BUILD_LOG)..."
-(
-  cd "$OPENCV_PYTHON_DIR"
-  "$PYTHON_BIN" -m pip wheel . --verbose --wheel-dir "$WHEEL_OUT_DIR" 2>&1 | tee "$BUILD_LOG"
-)
-
-# Locate built wheel
-BUILT_WHEEL="$(ls -1t "$WHEEL_OUT_DIR"/opencv*_python-*.whl 2>/dev/null | head -n 1 || true)"
-if [ -z "$BUILT_WHEEL" ]; then
-  gum style --foreground 196 --bold "❌ Could not find built wheel in $WHEEL_OUT_DIR"
-  exit 1
+  mkdir -p "$CACHED_WHEEL_DIR"
+  cp -f "$BUILT_WHEEL" "$CACHED_WHEEL_DIR/"
+  BUILT_WHEEL="$CACHED_WHEEL_DIR/$(basename "$BUILT_WHEEL")"
 fi
 
 gum style --foreground 82 --bold "✅ Built wheel: $BUILT_WHEEL"
 
 # Install wheel
+phase_begin
 gum style --foreground 82 --bold "Installing built wheel (logs: $PIP_LOG)..."
 "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" --force-reinstall --no-deps "$BUILT_WHEEL" 2>&1 | tee "$PIP_LOG"
 "$PYTHON_BIN" -m pip install "numpy<2" --force-reinstall
+phase_end "install"
 # "$PYTHON_BIN" -m pip install numpy
 
 # Sanity checks
@@ -283,4 +415,16 @@ PY
   fi
 fi
 
+{
+  echo ""
+  echo "===== Jetsonizer build summary ====="
+  echo "Wheel: $BUILT_WHEEL"
+  echo "Cache key: $CACHE_KEY"
+  echo "Jobs: $BUILD_JOBS, generator: ${CMAKE_GENERATOR:-default}"
+  for i in "${!PHASE_NAMES[@]}"; do
+    printf '%-20s %6ss\n' "${PHASE_NAMES[$i]}" "${PHASE_SECONDS[$i]}"
+  done
+  ccache_summary
+} | tee -a "$BUILD_LOG"
+
 gum style --foreground 82 --bold "✅ OpenCV wheel build + install complete."
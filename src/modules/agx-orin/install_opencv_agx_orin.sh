@@ -9,18 +9,28 @@ CHECK_PIP_SCRIPT="$SRC_ROOT/utils/check_pip.sh"
 CUDA_NPP_SCRIPT="$SRC_ROOT/utils/ensure_cuda_npp_agx_orin.sh"
 OPENCV_CUDA_TEST_SCRIPT="$SRC_ROOT/tests/test_opencv_cuda.sh"
 WHICH_PYTHON_SCRIPT="$SRC_ROOT/utils/which_python.sh"
+DOWNLOAD_HELPER="$SRC_ROOT/utils/download_cache.py"
 
 WHEEL_URL="https://github.com/alibustami/Jetsonizer/releases/download/opencv-jp6-orin-4.13.0/opencv_contrib_python-4.13.0+a31042f-cp310-cp310-linux_aarch64.whl"
 WHEEL_SHA256="5d4397c5611e4b17142f8812e6f56eeb86bcb9e39f7d19c9931b38c0bca7eaf3"
 WHEEL_FILENAME="opencv_contrib_python-4.13.0+a31042f-cp310-cp310-linux_aarch64.whl"
 EXPECTED_PYTHON_MM="3.10"
 
+ENV_FACTS_SCRIPT="$SRC_ROOT/utils/env_facts.sh"
+MANIFEST_SCRIPT="$SRC_ROOT/utils/install_manifest.sh"
+BUNDLE_SCRIPT="$SRC_ROOT/utils/bundle.sh"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
     source "$LOGGER_SCRIPT"
     jetsonizer_log_init
 fi
+# shellcheck source=/dev/null
+source "$ENV_FACTS_SCRIPT"
+# shellcheck source=/dev/null
+source "$MANIFEST_SCRIPT"
+# shellcheck source=/dev/null
+source "$BUNDLE_SCRIPT"
 
 LOG_DIR="${JETSONIZER_LOG_DIR:-/home/${SUDO_USER:-${USER:-$(id -un 2>/dev/null || echo root)}}/.cache/Jetsonizer}"
 WHEEL_CACHE_DIR="$LOG_DIR/wheels"
@@ -95,6 +105,12 @@ if [ "$PYTHON_VERSION" != "$EXPECTED_PYTHON_MM" ]; then
     fi
 fi
 
+if jetsonizer_manifest_should_skip "$PYTHON_BIN" opencv --dists opencv-contrib-python,numpy --wheel-sha256 "$WHEEL_SHA256"; then
+    gum style --foreground 82 --bold "✅ OpenCV already installed and validated for $PYTHON_BIN: $JETSONIZER_MANIFEST_REASON"
+    gum style --foreground 82 --bold "Skipping reinstall (pass --force to Jetsonizer or set JETSONIZER_FORCE_REINSTALL=1 to reinstall)."
+    exit 0
+fi
+
 if [ ! -x "$CHECK_PIP_SCRIPT" ]; then
     gum style --foreground 196 --bold "❌ Unable to locate pip helper at $CHECK_PIP_SCRIPT."
     exit 1
@@ -122,7 +138,7 @@ if python_looks_like_env "$PYTHON_BIN"; then
     PIP_INSTALL_FLAGS=()
 else
     SUPPORTS_BREAK_FLAG=0
-    if "$PYTHON_BIN" -m pip install --help 2>/dev/null | grep -q -- '--break-system-packages'; then
+    if jetsonizer_pip_supports_break_flag "$PYTHON_BIN"; then
         SUPPORTS_BREAK_FLAG=1
     fi
 
@@ -137,7 +153,7 @@ else
 fi
 
 gum spin --spinner dot --title "Upgrading pip for $PYTHON_BIN..." --spinner.foreground="82" -- \
-    "$PYTHON_BIN" -m pip install --upgrade "${PIP_INSTALL_FLAGS[@]}" pip 2>/dev/null || {
+    "$PYTHON_BIN" -m pip install --upgrade "${PIP_INSTALL_FLAGS[@]}" "${JETSONIZER_BUNDLE_PIP_ARGS[@]}" pip 2>/dev/null || {
     gum style --foreground 214 --bold "⚠️  Skipping pip self-upgrade (system-managed pip)."
     gum style --foreground 82 --bold "Using existing pip: $("$PYTHON_BIN" -m pip --version)"
 }
@@ -176,51 +192,71 @@ verify_wheel_checksum() {
     return 0
 }
 
-DOWNLOADER=$(ensure_downloader) || {
-    gum style --foreground 196 --bold "❌ Neither wget nor curl was found. Please install one to continue."
-    exit 1
-}
-
-WHEEL_PATH="$WHEEL_CACHE_DIR/$WHEEL_FILENAME"
-gum style --foreground 82 --bold "Using wheel cache: $WHEEL_CACHE_DIR"
-
-if [ -f "$WHEEL_PATH" ]; then
-    gum style --foreground 82 --bold "Found cached OpenCV wheel at $WHEEL_PATH."
-    if ! verify_wheel_checksum "$WHEEL_PATH" "cached wheel"; then
-        gum style --foreground 214 --bold "⚠️  Cached wheel checksum mismatch. Re-downloading..."
-        rm -f "$WHEEL_PATH"
+if jetsonizer_bundle_active; then
+    WHEEL_PATH="$(jetsonizer_bundle_file wheels "$WHEEL_FILENAME")" || exit 1
+    gum style --foreground 82 --bold "Using OpenCV wheel from offline bundle: $WHEEL_PATH"
+    if ! verify_wheel_checksum "$WHEEL_PATH" "bundled wheel"; then
+        exit 1
     fi
-fi
-
-if [ ! -f "$WHEEL_PATH" ]; then
-    gum style --foreground 82 --bold "Downloading OpenCV wheel to cache..."
-    if [ "$DOWNLOADER" = "wget" ]; then
-        gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
-            wget -q "$WHEEL_URL" -O "$WHEEL_PATH"
-    else
-        gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
-            curl -Ls "$WHEEL_URL" -o "$WHEEL_PATH"
+else
+    WHEEL_PATH="$WHEEL_CACHE_DIR/$WHEEL_FILENAME"
+    gum style --foreground 82 --bold "Using wheel cache: $WHEEL_CACHE_DIR"
+
+    if [ -f "$WHEEL_PATH" ]; then
+        gum style --foreground 82 --bold "Found cached OpenCV wheel at $WHEEL_PATH."
+        if ! verify_wheel_checksum "$WHEEL_PATH" "cached wheel"; then
+            gum style --foreground 214 --bold "⚠️  Cached wheel checksum mismatch. Re-downloading..."
+            rm -f "$WHEEL_PATH"
+        fi
     fi
 
     if [ ! -f "$WHEEL_PATH" ]; then
-        gum style --foreground 196 --bold "❌ Download failed. Wheel file not found."
-        exit 1
-    fi
-
-    if ! verify_wheel_checksum "$WHEEL_PATH" "downloaded wheel"; then
-        exit 1
+        gum style --foreground 82 --bold "Downloading OpenCV wheel to cache..."
+        DOWNLOADER=""
+        if [ -f "$DOWNLOAD_HELPER" ]; then
+            # Resumable, parallel fetch through the shared content-addressed download cache.
+            if gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
+                "$PYTHON_BIN" "$DOWNLOAD_HELPER" "$WHEEL_URL" --sha256 "$WHEEL_SHA256" -o "$WHEEL_PATH"; then
+                DOWNLOADER="python"
+            else
+                gum style --foreground 214 --bold "⚠️  Download helper failed. Retrying with wget/curl..."
+                rm -f "$WHEEL_PATH"
+            fi
+        fi
+        if [ -z "$DOWNLOADER" ]; then
+            DOWNLOADER=$(ensure_downloader) || {
+                gum style --foreground 196 --bold "❌ Neither wget nor curl was found. Please install one to continue."
+                exit 1
+            }
+            if [ "$DOWNLOADER" = "wget" ]; then
+                gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
+                    wget -q "$WHEEL_URL" -O "$WHEEL_PATH"
+            else
+                gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
+                    curl -Ls "$WHEEL_URL" -o "$WHEEL_PATH"
+            fi
+        fi
+
+        if [ ! -f "$WHEEL_PATH" ]; then
+            gum style --foreground 196 --bold "❌ Download failed. Wheel file not found."
+            exit 1
+        fi
+
+        if ! verify_wheel_checksum "$WHEEL_PATH" "downloaded wheel"; then
+            exit 1
+        fi
     fi
 fi
 
 PIP_WHEEL_FLAGS=(--ignore-installed)
 
 gum style --foreground 82 --bold "Installing OpenCV wheel from cache (logging to $PIP_LOG)..."
-if ! "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" "${PIP_WHEEL_FLAGS[@]}" --force-reinstall "$WHEEL_PATH" 2>&1 | tee "$PIP_LOG"; then
+if ! "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" "${PIP_WHEEL_FLAGS[@]}" "${JETSONIZER_BUNDLE_PIP_ARGS[@]}" --force-reinstall "$WHEEL_PATH" 2>&1 | tee "$PIP_LOG"; then
     gum style --foreground 196 --bold "❌ pip install failed. See $PIP_LOG for details."
     exit 1
 fi
 gum style --foreground 82 --bold "✅ pip install completed."
-"$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" "${PIP_WHEEL_FLAGS[@]}" --force-reinstall "numpy<2"
+"$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" "${PIP_WHEEL_FLAGS[@]}" "${JETSONIZER_BUNDLE_PIP_ARGS[@]}" --force-reinstall "numpy<2"
 
 if INSTALLED_VERSION=$("$PYTHON_BIN" - <<'PY'
 import cv2
@@ -235,7 +271,9 @@ fi
 
 if bash "$OPENCV_CUDA_TEST_SCRIPT" "$PYTHON_BIN"; then
     gum style --foreground 82 --bold "✅ OpenCV CUDA validation completed."
+    jetsonizer_manifest_record "$PYTHON_BIN" opencv ok --dists opencv-contrib-python,numpy --wheel-sha256 "$WHEEL_SHA256"
 else
     gum style --foreground 196 --bold "❌ OpenCV CUDA validation failed."
+    jetsonizer_manifest_record "$PYTHON_BIN" opencv failed --dists opencv-contrib-python,numpy --wheel-sha256 "$WHEEL_SHA256"
     exit 1
 fi
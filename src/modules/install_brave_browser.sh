@@ -5,28 +5,33 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 SRC_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
+ANSWERS_SCRIPT="$SRC_ROOT/utils/answers.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
     source "$LOGGER_SCRIPT"
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$ANSWERS_SCRIPT"
 
 gum style --foreground 82 --bold "Installing Brave Browser..."
 
 if command -v brave-browser &> /dev/null; then
     gum style --foreground 214 --bold "⚠️  Brave Browser is already installed."
-    if ! gum confirm "Reinstall Brave Browser?" \
+    if ! jetsonizer_ask_confirm reinstall_brave "Reinstall Brave Browser?" \
         --affirmative="Yes" \
         --negative="No" \
         --prompt.foreground="82" \
         --selected.foreground="82" \
         --unselected.foreground="82" \
         --selected.background="82"; then
+        jetsonizer_ask_done
         gum style --foreground 82 --bold "Skipping Brave Browser installation."
         exit 0
     fi
 fi
+jetsonizer_ask_done
 
 ensure_sudo_session() {
     if [ "$(id -u)" -eq 0 ]; then
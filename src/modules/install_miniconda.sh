@@ -5,6 +5,9 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 SRC_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 CONDA_VARIANTS_FILE="$SRC_ROOT/resources/conda_variants.txt"
+DOWNLOAD_HELPER="$SRC_ROOT/utils/download_cache.py"
+BUNDLE_SCRIPT="$SRC_ROOT/utils/bundle.sh"
+ANSWERS_SCRIPT="$SRC_ROOT/utils/answers.sh"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
@@ -12,6 +15,10 @@ if [ -f "$LOGGER_SCRIPT" ]; then
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$BUNDLE_SCRIPT"
+# shellcheck source=/dev/null
+source "$ANSWERS_SCRIPT"
 
 if [ "${EUID:-$(id -u)}" -eq 0 ] && [ -n "${SUDO_USER:-}" ]; then
     gum style --foreground 196 --bold "❌ Run Miniconda installation without sudo so it installs to your user home."
@@ -52,11 +59,12 @@ for version in "${REQUIRED_VERSIONS[@]}"; do
 done
 
 gum style --foreground 82 --bold "Select the Miniconda version to install:"
-if ! SELECTED_VERSION=$(gum choose \
+if ! SELECTED_VERSION=$(jetsonizer_ask_choose miniconda_version \
     "latest" "3.13" "3.12" "3.11" "3.10" "3.9" "3.8" "3.7" \
     --header "Available Miniconda variants:" \
     --cursor.foreground="82" \
     --selected.foreground="82"); then
+    jetsonizer_ask_done
     gum style --foreground 214 --bold "⚠️  Miniconda installation cancelled by user."
     exit 0
 fi
@@ -72,27 +80,52 @@ gum style --foreground 82 --bold "Installer: $INSTALLER_FILENAME"
 CONDA_BIN="$INSTALL_DIR/bin/conda"
 if [ -x "$CONDA_BIN" ]; then
     gum style --foreground 214 --bold "⚠️  Miniconda already exists at $INSTALL_DIR."
-    if ! gum confirm "Reinstall (this will update the existing installation)?" \
+    if ! jetsonizer_ask_confirm reinstall_miniconda "Reinstall (this will update the existing installation)?" \
         --affirmative="Yes" \
         --negative="No" \
         --prompt.foreground="82" \
         --selected.foreground="82" \
         --unselected.foreground="82" \
         --selected.background="82"; then
+        jetsonizer_ask_done
         gum style --foreground 82 --bold "Skipping Miniconda installation."
         exit 0
     fi
 fi
-
-if ! command -v wget &> /dev/null; then
+jetsonizer_ask_done
+
+USE_DOWNLOAD_HELPER=0
+if jetsonizer_bundle_active; then
+    BUNDLED_INSTALLER="$(jetsonizer_bundle_file installers "$INSTALLER_FILENAME")" || exit 1
+elif [ -f "$DOWNLOAD_HELPER" ] && command -v python3 &> /dev/null; then
+    USE_DOWNLOAD_HELPER=1
+elif ! command -v wget &> /dev/null; then
     gum style --foreground 196 --bold "❌ wget is required to download Miniconda. Please install wget and retry."
     exit 1
 fi
 
 mkdir -p "$INSTALL_DIR"
 
-gum spin --spinner dot --title "Downloading Miniconda ($SELECTED_VERSION)..." --spinner.foreground="82" -- \
-    wget -q "$DOWNLOAD_URL" -O "$INSTALLER_PATH"
+if jetsonizer_bundle_active; then
+    gum style --foreground 82 --bold "Using Miniconda installer from offline bundle: $BUNDLED_INSTALLER"
+    cp "$BUNDLED_INSTALLER" "$INSTALLER_PATH"
+else
+    # Installers are kept in the shared download cache, so re-provisioning reuses them.
+    if [ "$USE_DOWNLOAD_HELPER" -eq 1 ] && ! gum spin --spinner dot --title "Downloading Miniconda ($SELECTED_VERSION)..." \
+        --spinner.foreground="82" -- python3 "$DOWNLOAD_HELPER" "$DOWNLOAD_URL" -o "$INSTALLER_PATH"; then
+        gum style --foreground 214 --bold "⚠️  Download helper failed. Retrying with wget..."
+        rm -f "$INSTALLER_PATH"
+        USE_DOWNLOAD_HELPER=0
+        if ! command -v wget &> /dev/null; then
+            gum style --foreground 196 --bold "❌ wget is required to download Miniconda. Please install wget and retry."
+            exit 1
+        fi
+    fi
+    if [ "$USE_DOWNLOAD_HELPER" -eq 0 ]; then
+        gum spin --spinner dot --title "Downloading Miniconda ($SELECTED_VERSION)..." --spinner.foreground="82" -- \
+            wget -q "$DOWNLOAD_URL" -O "$INSTALLER_PATH"
+    fi
+fi
 
 gum spin --spinner dot --title "Installing Miniconda to $INSTALL_DIR..." --spinner.foreground="82" -- \
     bash "$INSTALLER_PATH" -b -u -p "$INSTALL_DIR"
@@ -5,12 +5,15 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 SRC_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
+ANSWERS_SCRIPT="$SRC_ROOT/utils/answers.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
     source "$LOGGER_SCRIPT"
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$ANSWERS_SCRIPT"
 
 TARGET_USER="${SUDO_USER:-$(id -un)}"
 TARGET_HOME="$(getent passwd "$TARGET_USER" | cut -d: -f6 || true)"
@@ -140,21 +143,23 @@ run_uv_install() {
 gum spin --spinner dot --title "Preparing uv installation..." --spinner.foreground="82" -- sleep 2
 
 EXISTING_UV_BIN=""
+REINSTALL="yes"
 if EXISTING_UV_BIN=$(detect_uv_binary); then
     gum style --foreground 214 --bold "⚠️  uv is already installed."
-    REINSTALL=$(gum confirm "Would you like to reinstall uv?" \
+    REINSTALL=$(jetsonizer_ask_confirm reinstall_uv "Would you like to reinstall uv?" \
         --affirmative="Yes" \
         --negative="No" \
         --prompt.foreground="82" \
         --selected.foreground="82" \
         --unselected.foreground="82" \
         --selected.background="82" && echo "yes" || echo "no")
+fi
+jetsonizer_ask_done
 
-    if [ "$REINSTALL" = "no" ]; then
-        gum style --foreground 82 --bold "Skipping uv installation."
-        ensure_uv_on_path "$EXISTING_UV_BIN"
-        exit 0
-    fi
+if [ "$REINSTALL" = "no" ]; then
+    gum style --foreground 82 --bold "Skipping uv installation."
+    ensure_uv_on_path "$EXISTING_UV_BIN"
+    exit 0
 fi
 
 gum style --foreground 82 --bold "Installing uv..."
@@ -3,17 +3,25 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 SRC_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
+ANSWERS_SCRIPT="$SRC_ROOT/utils/answers.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
     source "$LOGGER_SCRIPT"
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$ANSWERS_SCRIPT"
 
+VSCODE_INSTALLED=0
 if command -v code &> /dev/null; then
+    VSCODE_INSTALLED=1
     gum style --foreground 214 --bold "⚠️  VS Code is already installed."
-    REINSTALL=$(gum confirm "Would you like to reinstall VS Code?" --affirmative="Yes" --negative="No" --prompt.foreground="82" --selected.foreground="82" --unselected.foreground="82" --selected.background="82" && echo "yes" || echo "no")
-    
+    REINSTALL=$(jetsonizer_ask_confirm reinstall_vscode "Would you like to reinstall VS Code?" --affirmative="Yes" --negative="No" --prompt.foreground="82" --selected.foreground="82" --unselected.foreground="82" --selected.background="82" && echo "yes" || echo "no")
+fi
+jetsonizer_ask_done
+
+if [ "$VSCODE_INSTALLED" -eq 1 ]; then
     if [ "$REINSTALL" = "no" ]; then
         gum style --foreground 82 --bold "Skipping VS Code installation."
     else
@@ -19,6 +19,9 @@ TENSORRT_PIP_OPTIONS=(tensorrt tensorrt_dispatch tensorrt_lean)
 VALID_PACKAGE_DIRS=()
 PACKAGE_DIR=""
 USE_TARBALL=1
+ENV_FACTS_SCRIPT="$SRC_ROOT/utils/env_facts.sh"
+MANIFEST_SCRIPT="$SRC_ROOT/utils/install_manifest.sh"
+BUNDLE_SCRIPT="$SRC_ROOT/utils/bundle.sh"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
@@ -26,6 +29,12 @@ if [ -f "$LOGGER_SCRIPT" ]; then
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$ENV_FACTS_SCRIPT"
+# shellcheck source=/dev/null
+source "$MANIFEST_SCRIPT"
+# shellcheck source=/dev/null
+source "$BUNDLE_SCRIPT"
 
 gum style --foreground 82 --bold "TensorRT Tarball Linking Assistant"
 gum style --foreground 82 --bold "We'll link the TensorRT libraries and install the matching Python packages."
@@ -53,10 +62,7 @@ canonicalize_path() {
 
 python_cp_tag() {
     local bin="$1"
-    "$bin" - <<'PY' 2>/dev/null
-import sys
-print(f"cp{sys.version_info[0]}{sys.version_info[1]}")
-PY
+    jetsonizer_python_cp_tag "$bin"
 }
 
 find_wheel_for_package() {
@@ -536,6 +542,20 @@ for pkg in "${PACKAGE_CHOICES[@]}"; do
     fi
 done
 
+MANIFEST_ARGS=(--dists "$(IFS=,; echo "${PACKAGE_CHOICES[*]}")")
+for target in "${INSTALL_TARGETS[@]}"; do
+    if [ -f "$target" ]; then
+        MANIFEST_ARGS+=(--wheel "$target")
+    fi
+done
+
+if jetsonizer_manifest_should_skip "$PYTHON_BIN" tensorrt "${MANIFEST_ARGS[@]}"; then
+    gum style --foreground 82 --bold "✅ TensorRT Python packages already installed and validated for $PYTHON_BIN: $JETSONIZER_MANIFEST_REASON"
+    gum style --foreground 82 --bold "Skipping pip installation (pass --force to Jetsonizer or set JETSONIZER_FORCE_REINSTALL=1 to reinstall)."
+    gum style --foreground 82 --bold "TensorRT environment configuration complete."
+    exit 0
+fi
+
 LOG_DIR="${JETSONIZER_LOG_DIR:-/home/${SUDO_USER:-${USER:-$(id -un 2>/dev/null || echo root)}}/.cache/Jetsonizer}"
 mkdir -p "$LOG_DIR"
 INSTALL_LOG="$(mktemp -p "$LOG_DIR" tensorrt-pip-XXXXXX.log 2>/dev/null || mktemp -t tensorrt-pip-XXXXXX.log)"
@@ -552,7 +572,7 @@ if python_looks_like_env "$PYTHON_BIN"; then
     :
 else
     SUPPORTS_BREAK_FLAG=0
-    if "$PYTHON_BIN" -m pip install --help 2>/dev/null | grep -q -- '--break-system-packages'; then
+    if jetsonizer_pip_supports_break_flag "$PYTHON_BIN"; then
         SUPPORTS_BREAK_FLAG=1
     fi
 
@@ -567,7 +587,7 @@ fi
 
 set +e
 gum spin --spinner dot --title "pip install: ${INSTALL_TARGETS[*]}" --spinner.foreground="82" -- \
-    "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" "${INSTALL_TARGETS[@]}" >"$INSTALL_LOG" 2>&1
+    "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" "${JETSONIZER_BUNDLE_PIP_ARGS[@]}" "${INSTALL_TARGETS[@]}" >"$INSTALL_LOG" 2>&1
 PIP_STATUS=$?
 set -e
 
@@ -584,12 +604,15 @@ if [ -f "$TENSORRT_TEST_SCRIPT" ]; then
     if TENSORRT_TEST_OUTPUT=$("$PYTHON_BIN" "$TENSORRT_TEST_SCRIPT" "${PACKAGE_CHOICES[@]}" 2>&1); then
         gum style --foreground 82 --bold "✅ TensorRT Python modules imported successfully for $PYTHON_BIN"
         gum style --foreground 82 "$TENSORRT_TEST_OUTPUT"
+        jetsonizer_manifest_record "$PYTHON_BIN" tensorrt ok "${MANIFEST_ARGS[@]}"
     else
         gum style --foreground 214 --bold "⚠️  TensorRT validation script failed for $PYTHON_BIN. Output:"
         gum style --foreground 214 "$TENSORRT_TEST_OUTPUT"
+        jetsonizer_manifest_record "$PYTHON_BIN" tensorrt failed "${MANIFEST_ARGS[@]}"
     fi
 else
     gum style --foreground 214 --bold "⚠️  TensorRT validation script missing at $TENSORRT_TEST_SCRIPT."
+    jetsonizer_manifest_record "$PYTHON_BIN" tensorrt skipped "${MANIFEST_ARGS[@]}"
 fi
 
 gum style --foreground 82 --bold "✅ Installed TensorRT Python packages into $PYTHON_BIN: ${PACKAGE_CHOICES[*]}"
@@ -5,6 +5,7 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 SRC_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 REPO_ROOT="$(cd "$SRC_ROOT/.." && pwd)"
+ENV_FACTS_SCRIPT="$SRC_ROOT/utils/env_facts.sh"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
@@ -12,6 +13,8 @@ if [ -f "$LOGGER_SCRIPT" ]; then
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$ENV_FACTS_SCRIPT"
 
 AGX_ORIN_SCRIPT="$SCRIPT_DIR/agx-orin/install_opencv_agx_orin.sh"
 THOR_SCRIPT="$SCRIPT_DIR/thor/install_opencv_thor.sh"
@@ -31,9 +34,7 @@ if [ ! -f "$THOR_SCRIPT" ]; then
 fi
 
 MODEL_VALUE=""
-if [ -f "$MODEL_FILE" ]; then
-    MODEL_VALUE="$(tr -d '\0' < "$MODEL_FILE")"
-else
+if ! MODEL_VALUE="$(jetsonizer_jetson_model)"; then
     gum style --foreground 214 --bold "⚠️  $MODEL_FILE not found. Defaulting to Thor OpenCV installer."
 fi
 
@@ -14,12 +14,22 @@ WHEEL_URL="https://pypi.jetson-ai-lab.io/sbsa/cu130/+f/6e7/7b9ad7aeba994/opencv_
 WHEEL_SHA256="6e77b9ad7aeba994db0b443c047a4729c379a21617f64497c0d22f992d9b7be2"
 WHEEL_FILENAME="opencv_contrib_python_rolling-4.13.0-cp312-cp312-linux_aarch64.whl"
 EXPECTED_PYTHON_MM="3.12"
+ENV_FACTS_SCRIPT="$SRC_ROOT/utils/env_facts.sh"
+MANIFEST_SCRIPT="$SRC_ROOT/utils/install_manifest.sh"
+BUNDLE_SCRIPT="$SRC_ROOT/utils/bundle.sh"
+DOWNLOAD_HELPER="$SRC_ROOT/utils/download_cache.py"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
     source "$LOGGER_SCRIPT"
     jetsonizer_log_init
 fi
+# shellcheck source=/dev/null
+source "$ENV_FACTS_SCRIPT"
+# shellcheck source=/dev/null
+source "$MANIFEST_SCRIPT"
+# shellcheck source=/dev/null
+source "$BUNDLE_SCRIPT"
 
 LOG_DIR="${JETSONIZER_LOG_DIR:-/home/${SUDO_USER:-${USER:-$(id -un 2>/dev/null || echo root)}}/.cache/Jetsonizer}"
 PIP_LOG="$LOG_DIR/opencv_pip_install.log"
@@ -93,6 +103,12 @@ if [ "$PYTHON_VERSION" != "$EXPECTED_PYTHON_MM" ]; then
     fi
 fi
 
+if jetsonizer_manifest_should_skip "$PYTHON_BIN" opencv --dists opencv-contrib-python-rolling --wheel-sha256 "$WHEEL_SHA256"; then
+    gum style --foreground 82 --bold "✅ OpenCV already installed and validated for $PYTHON_BIN: $JETSONIZER_MANIFEST_REASON"
+    gum style --foreground 82 --bold "Skipping reinstall (pass --force to Jetsonizer or set JETSONIZER_FORCE_REINSTALL=1 to reinstall)."
+    exit 0
+fi
+
 if [ ! -x "$CHECK_PIP_SCRIPT" ]; then
     gum style --foreground 196 --bold "❌ Unable to locate pip helper at $CHECK_PIP_SCRIPT."
     exit 1
@@ -120,7 +136,7 @@ if python_looks_like_env "$PYTHON_BIN"; then
     PIP_INSTALL_FLAGS=()
 else
     SUPPORTS_BREAK_FLAG=0
-    if "$PYTHON_BIN" -m pip install --help 2>/dev/null | grep -q -- '--break-system-packages'; then
+    if jetsonizer_pip_supports_break_flag "$PYTHON_BIN"; then
         SUPPORTS_BREAK_FLAG=1
     fi
 
@@ -135,7 +151,7 @@ else
 fi
 
 gum spin --spinner dot --title "Upgrading pip for $PYTHON_BIN..." --spinner.foreground="82" -- \
-    "$PYTHON_BIN" -m pip install --upgrade "${PIP_INSTALL_FLAGS[@]}" pip 2>/dev/null || {
+    "$PYTHON_BIN" -m pip install --upgrade "${PIP_INSTALL_FLAGS[@]}" "${JETSONIZER_BUNDLE_PIP_ARGS[@]}" pip 2>/dev/null || {
     gum style --foreground 214 --bold "⚠️  Skipping pip self-upgrade (system-managed pip)."
     gum style --foreground 82 --bold "Using existing pip: $("$PYTHON_BIN" -m pip --version)"
 }
@@ -155,49 +171,70 @@ ensure_downloader() {
     return 1
 }
 
-DOWNLOADER=$(ensure_downloader) || {
-    gum style --foreground 196 --bold "❌ Neither wget nor curl was found. Please install one to continue."
-    exit 1
-}
-
-DOWNLOAD_DIR="$(mktemp -d 2>/dev/null || mktemp -d -t opencv-wheel)"
-if command -v jetsonizer_append_trap >/dev/null 2>&1; then
-    jetsonizer_append_trap EXIT "rm -rf \"$DOWNLOAD_DIR\""
-else
-    trap 'rm -rf "$DOWNLOAD_DIR"' EXIT
-fi
-WHEEL_PATH="$DOWNLOAD_DIR/$WHEEL_FILENAME"
-
-gum style --foreground 82 --bold "Downloading OpenCV wheel from Jetson AI Lab..."
-if [ "$DOWNLOADER" = "wget" ]; then
-    gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
-        wget -q --user-agent="Mozilla/5.0 (Jetsonizer)" "$WHEEL_URL" -O "$WHEEL_PATH"
+if jetsonizer_bundle_active; then
+    WHEEL_PATH="$(jetsonizer_bundle_file wheels "$WHEEL_FILENAME")" || exit 1
+    gum style --foreground 82 --bold "Using OpenCV wheel from offline bundle: $WHEEL_PATH"
+    if command -v sha256sum &> /dev/null && [ "$(sha256sum "$WHEEL_PATH" | awk '{print $1}')" != "$WHEEL_SHA256" ]; then
+        gum style --foreground 196 --bold "❌ Checksum mismatch for bundled wheel $WHEEL_PATH."
+        exit 1
+    fi
 else
-    gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
-        curl -Ls "$WHEEL_URL" -o "$WHEEL_PATH"
-fi
-
-if [ ! -f "$WHEEL_PATH" ]; then
-    gum style --foreground 196 --bold "❌ Download failed. Wheel file not found."
-    exit 1
-fi
+    DOWNLOAD_DIR="$(mktemp -d 2>/dev/null || mktemp -d -t opencv-wheel)"
+    if command -v jetsonizer_append_trap >/dev/null 2>&1; then
+        jetsonizer_append_trap EXIT "rm -rf \"$DOWNLOAD_DIR\""
+    else
+        trap 'rm -rf "$DOWNLOAD_DIR"' EXIT
+    fi
+    WHEEL_PATH="$DOWNLOAD_DIR/$WHEEL_FILENAME"
+
+    gum style --foreground 82 --bold "Downloading OpenCV wheel from Jetson AI Lab..."
+    DOWNLOADER=""
+    if [ -f "$DOWNLOAD_HELPER" ]; then
+        # Resumable, parallel fetch through the shared content-addressed download cache.
+        if gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
+            "$PYTHON_BIN" "$DOWNLOAD_HELPER" "$WHEEL_URL" --sha256 "$WHEEL_SHA256" -o "$WHEEL_PATH"; then
+            DOWNLOADER="python"
+        else
+            gum style --foreground 214 --bold "⚠️  Download helper failed. Retrying with wget/curl..."
+            rm -f "$WHEEL_PATH"
+        fi
+    fi
+    if [ -z "$DOWNLOADER" ]; then
+        DOWNLOADER=$(ensure_downloader) || {
+            gum style --foreground 196 --bold "❌ Neither wget nor curl was found. Please install one to continue."
+            exit 1
+        }
+        if [ "$DOWNLOADER" = "wget" ]; then
+            gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
+                wget -q --user-agent="Mozilla/5.0 (Jetsonizer)" "$WHEEL_URL" -O "$WHEEL_PATH"
+        else
+            gum spin --spinner dot --title "Downloading wheel..." --spinner.foreground="82" -- \
+                curl -Ls "$WHEEL_URL" -o "$WHEEL_PATH"
+        fi
+    fi
 
-if command -v sha256sum &> /dev/null; then
-    gum style --foreground 82 --bold "Verifying checksum..."
-    DOWNLOADED_SHA=$(sha256sum "$WHEEL_PATH" | awk '{print $1}')
-    if [ "$DOWNLOADED_SHA" != "$WHEEL_SHA256" ]; then
-        gum style --foreground 196 --bold "❌ Checksum mismatch. Expected $WHEEL_SHA256 but got $DOWNLOADED_SHA."
+    if [ ! -f "$WHEEL_PATH" ]; then
+        gum style --foreground 196 --bold "❌ Download failed. Wheel file not found."
         exit 1
     fi
-    gum style --foreground 82 --bold "✅ Checksum verified."
-else
-    gum style --foreground 214 --bold "⚠️  sha256sum not available. Skipping checksum verification."
+
+    if command -v sha256sum &> /dev/null; then
+        gum style --foreground 82 --bold "Verifying checksum..."
+        DOWNLOADED_SHA=$(sha256sum "$WHEEL_PATH" | awk '{print $1}')
+        if [ "$DOWNLOADED_SHA" != "$WHEEL_SHA256" ]; then
+            gum style --foreground 196 --bold "❌ Checksum mismatch. Expected $WHEEL_SHA256 but got $DOWNLOADED_SHA."
+            exit 1
+        fi
+        gum style --foreground 82 --bold "✅ Checksum verified."
+    else
+        gum style --foreground 214 --bold "⚠️  sha256sum not available. Skipping checksum verification."
+    fi
 fi
 
 PIP_WHEEL_FLAGS=(--ignore-installed)
 
 gum style --foreground 82 --bold "Installing OpenCV wheel (logging to $PIP_LOG)..."
-if ! "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" "${PIP_WHEEL_FLAGS[@]}" --force-reinstall "$WHEEL_PATH" 2>&1 | tee "$PIP_LOG"; then
+if ! "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" "${PIP_WHEEL_FLAGS[@]}" "${JETSONIZER_BUNDLE_PIP_ARGS[@]}" --force-reinstall "$WHEEL_PATH" 2>&1 | tee "$PIP_LOG"; then
     gum style --foreground 196 --bold "❌ pip install failed. See $PIP_LOG for details."
     exit 1
 fi
@@ -216,7 +253,9 @@ fi
 
 if bash "$OPENCV_CUDA_TEST_SCRIPT" "$PYTHON_BIN"; then
     gum style --foreground 82 --bold "✅ OpenCV CUDA validation completed."
+    jetsonizer_manifest_record "$PYTHON_BIN" opencv ok --dists opencv-contrib-python-rolling --wheel-sha256 "$WHEEL_SHA256"
 else
     gum style --foreground 196 --bold "❌ OpenCV CUDA validation failed."
+    jetsonizer_manifest_record "$PYTHON_BIN" opencv failed --dists opencv-contrib-python-rolling --wheel-sha256 "$WHEEL_SHA256"
     exit 1
 fi
@@ -8,6 +8,10 @@ REPO_ROOT="$(cd "$SRC_ROOT/.." && pwd)"
 CHECK_PIP_SCRIPT="$SRC_ROOT/utils/check_pip.sh"
 TORCH_CUDA_TEST_SCRIPT="$SRC_ROOT/tests/test_torch_cuda.py"
 WHICH_PYTHON_SCRIPT="$SRC_ROOT/utils/which_python.sh"
+TORCH_INDEX_URL="https://download.pytorch.org/whl/cu130"
+ENV_FACTS_SCRIPT="$SRC_ROOT/utils/env_facts.sh"
+MANIFEST_SCRIPT="$SRC_ROOT/utils/install_manifest.sh"
+BUNDLE_SCRIPT="$SRC_ROOT/utils/bundle.sh"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
@@ -15,6 +19,12 @@ if [ -f "$LOGGER_SCRIPT" ]; then
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$ENV_FACTS_SCRIPT"
+# shellcheck source=/dev/null
+source "$MANIFEST_SCRIPT"
+# shellcheck source=/dev/null
+source "$BUNDLE_SCRIPT"
 
 if [ ! -x "$WHICH_PYTHON_SCRIPT" ]; then
     gum style --foreground 196 --bold "❌ Missing Python detector helper at $WHICH_PYTHON_SCRIPT."
@@ -59,7 +69,7 @@ if python_looks_like_env "$PYTHON_BIN"; then
     PIP_INSTALL_FLAGS=()
 else
     SUPPORTS_BREAK_FLAG=0
-    if "$PYTHON_BIN" -m pip install --help 2>/dev/null | grep -q -- '--break-system-packages'; then
+    if jetsonizer_pip_supports_break_flag "$PYTHON_BIN"; then
         SUPPORTS_BREAK_FLAG=1
     fi
 
@@ -73,19 +83,43 @@ else
     fi
 fi
 
+TORCH_SOURCE="$TORCH_INDEX_URL"
+TORCH_SOURCE_ARGS=(--index-url "$TORCH_INDEX_URL")
+if jetsonizer_bundle_active; then
+    TORCH_SOURCE="$JETSONIZER_BUNDLE_DIR"
+    TORCH_SOURCE_ARGS=("${JETSONIZER_BUNDLE_PIP_ARGS[@]}")
+fi
+
+if jetsonizer_manifest_should_skip "$PYTHON_BIN" torch --source "$TORCH_SOURCE"; then
+    gum style --foreground 82 --bold "✅ PyTorch already installed and validated for $PYTHON_BIN: $JETSONIZER_MANIFEST_REASON"
+    gum style --foreground 82 --bold "Skipping reinstall (pass --force to Jetsonizer or set JETSONIZER_FORCE_REINSTALL=1 to reinstall)."
+    exit 0
+fi
+
+if jetsonizer_bundle_active; then
+    gum style --foreground 82 --bold "Installing torch + torchvision from offline bundle $JETSONIZER_BUNDLE_DIR."
+fi
+
 gum spin --spinner dot --title "Installing torch + torchvision for $PYTHON_BIN..." --spinner.foreground="82" -- \
-    "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" torch torchvision --index-url https://download.pytorch.org/whl/cu130
+    "$PYTHON_BIN" -m pip install "${PIP_INSTALL_FLAGS[@]}" torch torchvision "${TORCH_SOURCE_ARGS[@]}"
 
 if [ -f "$TORCH_CUDA_TEST_SCRIPT" ]; then
     if TORCH_TEST_OUTPUT=$("$PYTHON_BIN" "$TORCH_CUDA_TEST_SCRIPT" --machine-readable); then
         TORCH_TEST_OUTPUT=$(echo "$TORCH_TEST_OUTPUT" | tr -d '\r')
         IFS='|' read -r TORCH_VERSION TORCH_CUDA_VERSION TORCH_CUDA_AVAILABLE <<<"$TORCH_TEST_OUTPUT"
         gum style --foreground 82 --bold "✅ PyTorch installed (version: $TORCH_VERSION, CUDA: $TORCH_CUDA_VERSION, CUDA available: $TORCH_CUDA_AVAILABLE)."
+        if [ "$TORCH_CUDA_AVAILABLE" = "yes" ]; then
+            jetsonizer_manifest_record "$PYTHON_BIN" torch ok --source "$TORCH_SOURCE"
+        else
+            jetsonizer_manifest_record "$PYTHON_BIN" torch failed --source "$TORCH_SOURCE"
+        fi
     else
         gum style --foreground 214 --bold "⚠️  Installation finished, but the Torch CUDA validation script failed. Please check the installation manually."
+        jetsonizer_manifest_record "$PYTHON_BIN" torch failed --source "$TORCH_SOURCE"
     fi
 else
     gum style --foreground 214 --bold "⚠️  Torch CUDA validation script missing at $TORCH_CUDA_TEST_SCRIPT. Skipping CUDA verification."
+    jetsonizer_manifest_record "$PYTHON_BIN" torch skipped --source "$TORCH_SOURCE"
 fi
 
 gum style --foreground 82 --bold "PyTorch installation process complete."
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Pick the best model, input size, batch and precision for each latency/FPS target.
+
+test_ultralytics_cuda.py --autotune measures every configuration of a weights x imgsz x
+batch x precision grid with its own export and inference code. This module holds
+everything else:
+- the grid, cheapest first;
+- the pruning rules;
+- the checkpoint that lets an interrupted sweep resume;
+- the deployment profile that later --deploy-profile runs load.
+
+Given a profile or checkpoint, this script prints it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from script_log import LOG_DIR, run_main
+
+
+AUTOTUNE_DIR = LOG_DIR / "autotune"
+DEFAULT_PROFILE = AUTOTUNE_DIR / "profile.json"
+PROFILE_VERSION = 1
+# Lower precision is assumed to cost accuracy; among configurations that meet a target
+# the larger model, then the larger input, then the higher precision wins.
+PRECISION_RANK = {"int8": 0, "fp16": 1, "fp32": 2}
+# Measured batches before a configuration may be pruned for being out of reach.
+MIN_SAMPLES_BEFORE_PRUNING = 3
+
+
+@dataclass(frozen=True)
+class TuneConfig:
+    """One point of the search grid."""
+
+    model: str
+    imgsz: int
+    batch: int
+    precision: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.model}|{self.imgsz}|{self.batch}|{self.precision}"
+
+    @property
+    def label(self) -> str:
+        return f"{self.model} imgsz {self.imgsz} batch {self.batch} {self.precision}"
+
+
+@dataclass(frozen=True)
+class Target:
+    """A budget a deployment must meet: p90 frame latency, throughput or both."""
+
+    name: str
+    max_latency_ms: float | None = None
+    min_fps: float | None = None
+
+    def met(self, metrics: Dict[str, float]) -> bool:
+        return not self.failed_on(metrics)
+
+    def failed_on(self, metrics: Dict[str, float]) -> List[str]:
+        """Which budgets ``metrics`` miss: 'latency', 'fps' or both."""
+        missed = []
+        if self.max_latency_ms is not None and metrics["p90_ms"] > self.max_latency_ms:
+            missed.append("latency")
+        if self.min_fps is not None and metrics["fps"] < self.min_fps:
+            missed.append("fps")
+        return missed
+
+    def unreachable(self, batch: int, fastest_ms: float) -> List[str]:
+        """Budgets that even the fastest batch so far misses: 'latency', 'fps' or both.
+
+        Every frame of a batch waits for the whole call, so the fastest call bounds the p90
+        latency from below and ``batch`` frames per fastest call bounds the throughput from above.
+        """
+        missed = []
+        if self.max_latency_ms is not None and fastest_ms > self.max_latency_ms:
+            missed.append("latency")
+        if self.min_fps is not None and batch * 1000.0 / fastest_ms < self.min_fps:
+            missed.append("fps")
+        return missed
+
+
+def parse_target(value: str) -> Target:
+    """``[name:]fps=30``, ``[name:]latency=50`` or ``[name:]fps=30,latency=50``."""
+    name, _, spec = value.rpartition(":")
+    limits: Dict[str, float] = {}
+    for item in spec.split(","):
+        key, _, number = item.partition("=")
+        key, number = key.strip().lower(), number.strip()
+        if key == "latency" and number.endswith("ms"):
+            number = number[:-2]
+        try:
+            limit = float(number)
+        except ValueError:
+            limit = -1.0
+        if key not in {"fps", "latency"} or limit <= 0:
+            raise argparse.ArgumentTypeError(
+                f"Expected fps=N, latency=MS or both separated by a comma, got {value!r}"
+            )
+        limits[key] = limit
+    return Target(name or spec.replace(" ", ""), limits.get("latency"), limits.get("fps"))
+
+
+def build_grid(
+    models: Sequence[str], imgszs: Sequence[int], batches: Sequence[int], precisions: Sequence[str]
+) -> List[TuneConfig]:
+    """Every combination, cheapest first within each model and precision.
+
+    Models keep the order given (smallest first is assumed); precisions run fastest first.
+    Small inputs and batches are measured before the ones they can rule out.
+    """
+    ordered_precisions = sorted(dict.fromkeys(precisions), key=lambda precision: PRECISION_RANK[precision])
+    return [
+        TuneConfig(model, imgsz, batch, precision)
+        for model in dict.fromkeys(models)
+        for precision in ordered_precisions
+        for imgsz in sorted(set(imgszs))
+        for batch in sorted(set(batches))
+    ]
+
+
+def ruled_out_by(config: TuneConfig, target: Target, results: Dict[str, Dict[str, Any]]) -> str | None:
+    """The measured configuration that proves ``config`` cannot meet ``target``, if any.
+
+    Same model and precision with a larger or equal input is never faster. A larger or
+    equal batch never has lower latency, but it may have higher throughput, so an FPS miss
+    only rules out larger inputs at the same batch.
+    """
+    for record in results.values():
+        missed = record.get("missed", {}).get(target.name)
+        if not missed:
+            continue
+        other = TuneConfig(**record["config"])
+        if (other.model, other.precision) != (config.model, config.precision) or config.imgsz < other.imgsz:
+            continue
+        if "latency" in missed and config.batch >= other.batch:
+            return other.key
+        if "fps" in missed and config.batch == other.batch:
+            return other.key
+    return None
+
+
+def score_key(config: TuneConfig, fps: float, models: Sequence[str]) -> tuple:
+    models = list(dict.fromkeys(models))
+    model_rank = models.index(config.model) if config.model in models else -1
+    return (model_rank, config.imgsz, PRECISION_RANK[config.precision], fps)
+
+
+def select_best(
+    results: Dict[str, Dict[str, Any]], targets: Sequence[Target], models: Sequence[str]
+) -> Dict[str, Dict[str, Any] | None]:
+    """Per target, the most accurate measured configuration that meets it (fastest on ties)."""
+    best: Dict[str, Dict[str, Any] | None] = {}
+    for target in targets:
+        candidates = [
+            record
+            for record in results.values()
+            if record["status"] == "measured" and target.met(record["metrics"])
+        ]
+        best[target.name] = max(
+            candidates,
+            key=lambda record: score_key(TuneConfig(**record["config"]), record["metrics"]["fps"], models),
+            default=None,
+        )
+    return best
+
+
+class TuneCheckpoint:
+    """Results so far, rewritten after every configuration so a sweep can resume.
+
+    The checkpoint only resumes a sweep with the same signature (grid, targets, device,
+    backend, input and measurement settings); anything else starts over.
+    """
+
+    def __init__(self, path: Path, signature: Dict[str, Any]) -> None:
+        self.path = path
+        self.signature = signature
+        self.results: Dict[str, Dict[str, Any]] = {}
+        try:
+            recorded = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(recorded, dict) and recorded.get("signature") == signature:
+            self.results = dict(recorded.get("results") or {})
+
+    @staticmethod
+    def path_for(signature: Dict[str, Any], directory: Path = AUTOTUNE_DIR) -> Path:
+        digest = hashlib.sha256(json.dumps(signature, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        return directory / f"checkpoint_{digest}.json"
+
+    def record(self, config: TuneConfig, result: Dict[str, Any]) -> None:
+        self.results[config.key] = {"config": asdict(config), **result}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        staging = self.path.with_suffix(".tmp")
+        with staging.open("w", encoding="utf-8") as handle:
+            json.dump({"signature": self.signature, "results": self.results}, handle, indent=2)
+            handle.write("\n")
+        # Replace in one step so an interrupted write never loses earlier results.
+        os.replace(staging, self.path)
+
+
+def build_profile(
+    best: Dict[str, Dict[str, Any] | None], targets: Sequence[Target], context: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "version": PROFILE_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        **context,
+        # The first target that has a configuration is what --deploy-profile loads by default.
+        "default": next((target.name for target in targets if best.get(target.name)), None),
+        "targets": {
+            target.name: {
+                "target": asdict(target),
+                "config": best[target.name]["config"] if best.get(target.name) else None,
+                "metrics": best[target.name]["metrics"] if best.get(target.name) else None,
+            }
+            for target in targets
+        },
+    }
+
+
+def write_profile(path: Path, profile: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_suffix(".tmp")
+    with staging.open("w", encoding="utf-8") as handle:
+        json.dump(profile, handle, indent=2)
+        handle.write("\n")
+    os.replace(staging, path)
+
+
+def load_profile_settings(path: Path, target: str | None = None) -> Dict[str, Any]:
+    """Validator defaults (model, imgsz, batch size, precision, backend) from a profile."""
+    try:
+        profile = json.loads(path.read_text(encoding="utf-8"))
+        entries = profile["targets"]
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise SystemExit(f"Cannot read a deployment profile from {path}: {exc}") from exc
+    name = target or profile.get("default")
+    entry = entries.get(name) if name else None
+    if not entry or not entry.get("config"):
+        available = ", ".join(key for key, value in entries.items() if value.get("config")) or "none"
+        raise SystemExit(f"Profile {path} has no configuration for target {name!r} (available: {available}).")
+    config = entry["config"]
+    return {
+        "model": config["model"],
+        "imgsz": int(config["imgsz"]),
+        "batch_size": int(config["batch"]),
+        "precision": [config["precision"]],
+        "backend": profile.get("backend", "torch"),
+    }
+
+
+def print_autotune_summary(
+    results: Dict[str, Dict[str, Any]], best: Dict[str, Dict[str, Any] | None], targets: Sequence[Target]
+) -> None:
+    counts: Dict[str, int] = {}
+    for record in results.values():
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    print(
+        "Autotune: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        + f" of {len(results)} configuration(s)"
+    )
+    print(f"  {'configuration':<44}{'p50 ms':>9}{'p90 ms':>9}{'FPS':>9}  status")
+    for record in results.values():
+        config = TuneConfig(**record["config"])
+        metrics = record.get("metrics") or {}
+        if metrics:
+            line = f"  {config.label:<44}{metrics['p50_ms']:>9.1f}{metrics['p90_ms']:>9.1f}{metrics['fps']:>9.1f}"
+        else:
+            line = f"  {config.label:<44}{'--':>9}{'--':>9}{'--':>9}"
+        reason = f" ({record['reason']})" if record.get("reason") else ""
+        print(f"{line}  {record['status']}{reason}")
+    for target in targets:
+        record = best.get(target.name)
+        if record is None:
+            print(f"Target {target.name}: nothing in the grid meets it.")
+            continue
+        metrics = record["metrics"]
+        print(
+            f"Target {target.name}: {TuneConfig(**record['config']).label} "
+            f"(p90 {metrics['p90_ms']:.1f} ms, {metrics['fps']:.1f} FPS)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "path",
+        type=Path,
+        nargs="?",
+        default=DEFAULT_PROFILE,
+        help="Profile or checkpoint written by --autotune (default: %(default)s).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the file's contents as JSON.")
+    args = parser.parse_args()
+    try:
+        recorded = json.loads(args.path.expanduser().read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Cannot read {args.path}: {exc}") from exc
+    if args.json:
+        print(json.dumps(recorded, sort_keys=True))
+        return
+    if "signature" in recorded:
+        signature = recorded["signature"]
+        targets = [Target(**target) for target in signature.get("targets", [])]
+        results = recorded.get("results") or {}
+        print_autotune_summary(results, select_best(results, targets, signature.get("models", [])), targets)
+        return
+    print(f"Deployment profile from {recorded.get('created')} on {recorded.get('host')} ({recorded.get('device')}):")
+    for name, entry in (recorded.get("targets") or {}).items():
+        default = " [default]" if name == recorded.get("default") else ""
+        if not entry.get("config"):
+            print(f"  {name}{default}: no configuration meets it")
+            continue
+        metrics = entry["metrics"]
+        print(
+            f"  {name}{default}: {TuneConfig(**entry['config']).label} "
+            f"(p90 {metrics['p90_ms']:.1f} ms, {metrics['fps']:.1f} FPS)"
+        )
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
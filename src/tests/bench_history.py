@@ -0,0 +1,831 @@
+#!/usr/bin/env python3
+"""Keep every validation and benchmark result in a local SQLite history.
+
+The validators create one :class:`BenchHistory` next to their startup profiler and
+store each result under the environment it ran in: board model, L4T release, CUDA,
+interpreter and the versions of torch, OpenCV, TensorRT and friends. Given the
+history, this script lists runs, compares two environments (or runs) and flags
+statistically significant regressions, and exports everything as CSV or JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime
+import hashlib
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+from array import array
+from contextlib import closing, contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, TextIO, Tuple
+
+from script_log import LOG_DIR, run_main
+
+
+HISTORY_DB = LOG_DIR / "history.sqlite3"
+SCHEMA_VERSION = 1
+# Per-frame timings of a long run are thinned out evenly beyond this many values.
+MAX_SAMPLES_PER_METRIC = 5000
+# Fewer values than this on either side is reported as a change, never as a regression.
+MIN_SAMPLES = 3
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_CHANGE = 0.05
+DEFAULT_RUNS_PER_GROUP = 10
+
+# Import name -> distributions that provide it; the first one installed wins.
+COMPONENT_PACKAGES: Dict[str, Tuple[str, ...]] = {
+    "torch": ("torch",),
+    "torchvision": ("torchvision",),
+    "cv2": (
+        "opencv-python",
+        "opencv-contrib-python",
+        "opencv-python-headless",
+        "opencv-contrib-python-headless",
+    ),
+    "tensorrt": ("tensorrt", "tensorrt-cu12", "tensorrt-cu13"),
+    "ultralytics": ("ultralytics",),
+    "numpy": ("numpy",),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS environments (
+    key TEXT PRIMARY KEY,
+    board TEXT NOT NULL,
+    l4t TEXT,
+    cuda TEXT,
+    python TEXT NOT NULL,
+    components TEXT NOT NULL,
+    first_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    env_key TEXT NOT NULL REFERENCES environments(key),
+    recorded_at TEXT NOT NULL,
+    host TEXT NOT NULL,
+    script TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    config TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    error TEXT,
+    details TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    higher_is_better INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    median REAL NOT NULL,
+    stdev REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    samples BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_env ON runs(env_key, script, kind, config);
+CREATE INDEX IF NOT EXISTS metrics_by_run ON metrics(run_id);
+"""
+
+
+@dataclass
+class Environment:
+    """What a result depends on besides the code: the board and the installed stack."""
+
+    board: str
+    l4t: str | None
+    cuda: str | None
+    python: str
+    components: Dict[str, str]
+
+    @property
+    def key(self) -> str:
+        payload = json.dumps(asdict(self), sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:12]
+
+
+@dataclass
+class Metric:
+    """One measured quantity; a single value or every per-frame/per-call sample."""
+
+    name: str
+    values: List[float]
+    unit: str
+    higher_is_better: bool = False
+
+
+@dataclass
+class Recording:
+    """A result about to be stored: what ran (``kind``, ``config``) and what it measured."""
+
+    kind: str
+    config: str
+    metrics: List[Metric] = field(default_factory=list)
+    details: Dict[str, Any] = field(default_factory=dict)
+    ok: bool = True
+    error: str | None = None
+
+    def add(self, name: str, values: Any, unit: str, higher_is_better: bool = False) -> None:
+        """Add a metric from one value or a sequence of them; missing values are skipped."""
+        if values is None:
+            return
+        if isinstance(values, (int, float)):
+            values = [values]
+        values = [float(value) for value in values if value is not None and math.isfinite(value)]
+        if values:
+            self.metrics.append(Metric(name, values, unit, higher_is_better))
+
+
+def _read_text(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+
+
+def board_model(root: Path = Path("/")) -> str:
+    """The device-tree model ("NVIDIA Jetson Orin Nano ...") or the machine type off Jetson."""
+    for relative in ("proc/device-tree/model", "sys/firmware/devicetree/base/model"):
+        text = _read_text(root / relative)
+        if text and text.strip("\x00\n "):
+            return text.strip("\x00\n ")
+    return f"{platform.system()} {platform.machine()}"
+
+
+def l4t_release(root: Path = Path("/")) -> str | None:
+    """``R36.4.3`` from ``# R36 (release), REVISION: 4.3, ...`` in /etc/nv_tegra_release."""
+    text = _read_text(root / "etc/nv_tegra_release")
+    if not text:
+        return None
+    header = text.splitlines()[0] if text.splitlines() else ""
+    release = header.lstrip("# ").split(" ", 1)[0]
+    revision = header.partition("REVISION:")[2].split(",", 1)[0].strip()
+    return f"{release}.{revision}" if release and revision else release or None
+
+
+def cuda_version(root: Path = Path("/")) -> str | None:
+    cuda_dir = root / "usr/local/cuda"
+    try:
+        return str(json.loads(_read_text(cuda_dir / "version.json") or "")["cuda"]["version"])
+    except (ValueError, KeyError, TypeError):
+        pass
+    # CUDA 10.2 (JetPack 4) only ships version.txt: "CUDA Version 10.2.300".
+    text = _read_text(cuda_dir / "version.txt")
+    return text.strip().rsplit(" ", 1)[-1] if text and text.strip() else None
+
+
+def component_versions() -> Dict[str, str]:
+    """Package versions, looked up without importing any of the packages.
+
+    Modules built from source (OpenCV with CUDA, usually) have no distribution metadata;
+    they are identified by their install time, so a rebuild still counts as a new
+    environment.
+    """
+    # Imported here: importlib.metadata alone would add tens of ms to every validator's startup.
+    import importlib.metadata
+    import importlib.util
+
+    versions: Dict[str, str] = {}
+    for module_name, dists in COMPONENT_PACKAGES.items():
+        for dist in dists:
+            try:
+                versions[module_name] = importlib.metadata.version(dist)
+                break
+            except importlib.metadata.PackageNotFoundError:
+                continue
+        if module_name in versions:
+            continue
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            spec = None
+        origin = getattr(spec, "origin", None) if spec else None
+        if origin and os.path.exists(origin):
+            built = datetime.datetime.fromtimestamp(os.stat(origin).st_mtime).isoformat(timespec="seconds")
+            versions[module_name] = f"unpackaged, installed {built}"
+    return versions
+
+
+@lru_cache(maxsize=None)
+def detect_environment() -> Environment:
+    return Environment(
+        board=board_model(),
+        l4t=l4t_release(),
+        cuda=cuda_version(),
+        python=f"{platform.python_implementation()} {platform.python_version()}",
+        components=component_versions(),
+    )
+
+
+def open_history(path: Path = HISTORY_DB) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # run_validators.py runs validators in parallel, so writers wait for each other.
+    connection = sqlite3.connect(str(path), timeout=30.0)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA foreign_keys = ON")
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        connection.close()
+        raise sqlite3.DatabaseError(f"{path} was written by a newer schema (version {version}).")
+    if version < SCHEMA_VERSION:
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.executescript(SCHEMA)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return connection
+
+
+def _thin(values: List[float], limit: int = MAX_SAMPLES_PER_METRIC) -> List[float]:
+    if len(values) <= limit:
+        return values
+    step = len(values) / limit
+    return [values[int(index * step)] for index in range(limit)]
+
+
+def store_recording(
+    connection: sqlite3.Connection, environment: Environment, host: str, script: str, recording: Recording
+) -> int:
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    with connection:
+        connection.execute(
+            "INSERT OR IGNORE INTO environments (key, board, l4t, cuda, python, components, first_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                environment.key,
+                environment.board,
+                environment.l4t,
+                environment.cuda,
+                environment.python,
+                json.dumps(environment.components, sort_keys=True),
+                now,
+            ),
+        )
+        cursor = connection.execute(
+            "INSERT INTO runs (env_key, recorded_at, host, script, kind, config, ok, error, details) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                environment.key,
+                now,
+                host,
+                script,
+                recording.kind,
+                recording.config,
+                int(recording.ok),
+                recording.error,
+                json.dumps(recording.details, sort_keys=True, default=str) if recording.details else None,
+            ),
+        )
+        run_id = int(cursor.lastrowid)
+        for metric in recording.metrics:
+            values = metric.values
+            # Summaries cover every value; only the stored samples are thinned out.
+            connection.execute(
+                "INSERT INTO metrics (run_id, name, unit, higher_is_better, count, mean, median, stdev, "
+                "min, max, samples) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    metric.name,
+                    metric.unit,
+                    int(metric.higher_is_better),
+                    len(values),
+                    statistics.fmean(values),
+                    statistics.median(values),
+                    statistics.stdev(values) if len(values) > 1 else 0.0,
+                    min(values),
+                    max(values),
+                    array("d", _thin(values)).tobytes(),
+                ),
+            )
+    return run_id
+
+
+class BenchHistory:
+    """Stores a validator's results; failing to write the history never fails the validator."""
+
+    def __init__(self, script: str, path: Path = HISTORY_DB) -> None:
+        self.script = script
+        self.path = path
+        self.enabled = False
+        self.run_ids: List[int] = []
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def recording(self, kind: str, config: str = "") -> Recording:
+        return Recording(kind, config)
+
+    def save(self, recording: Recording) -> int | None:
+        if not self.enabled:
+            return None
+        try:
+            with closing(open_history(self.path)) as connection:
+                environment = detect_environment()
+                run_id = store_recording(connection, environment, platform.node(), self.script, recording)
+        except (sqlite3.Error, OSError) as exc:
+            print(f"Unable to record results in {self.path}: {exc}", file=sys.stderr)
+            return None
+        self.run_ids.append(run_id)
+        return run_id
+
+    def failed(self, recording: Recording, exc: BaseException) -> None:
+        """Store ``recording`` as failed unless ``exc`` is a clean exit or an interrupt."""
+        if isinstance(exc, KeyboardInterrupt) or (isinstance(exc, SystemExit) and exc.code in (0, None)):
+            return
+        recording.ok = False
+        if recording.error is None:
+            if isinstance(exc, SystemExit):
+                recording.error = exc.code if isinstance(exc.code, str) else f"exit status {exc.code}"
+            else:
+                recording.error = f"{exc.__class__.__name__}: {exc}"
+        self.save(recording)
+
+    @contextmanager
+    def guard(self, recording: Recording) -> Iterator[Recording]:
+        """Store ``recording`` as failed if the block raises; the caller saves it on success."""
+        try:
+            yield recording
+        except BaseException as exc:
+            self.failed(recording, exc)
+            raise
+
+
+def add_history_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help=f"Do not record this run in the benchmark history ({HISTORY_DB}).",
+    )
+
+
+def _samples(row: sqlite3.Row) -> List[float]:
+    values = array("d")
+    values.frombytes(row["samples"])
+    return list(values)
+
+
+def _incomplete_beta(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b) by Lentz's continued fraction."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    if x > (a + 1.0) / (a + b + 2.0):
+        return 1.0 - _incomplete_beta(b, a, 1.0 - x)
+    tiny = 1e-300
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+    return front * result / a
+
+
+def welch_test(baseline: Sequence[float], candidate: Sequence[float]) -> float:
+    """Two-sided p-value of Welch's t-test that both samples share one mean."""
+    n1, n2 = len(baseline), len(candidate)
+    mean1, mean2 = statistics.mean(baseline), statistics.mean(candidate)
+    var1, var2 = statistics.variance(baseline), statistics.variance(candidate)
+    se2 = var1 / n1 + var2 / n2
+    if se2 <= 0.0:
+        return 1.0 if mean1 == mean2 else 0.0
+    t = (mean2 - mean1) / math.sqrt(se2)
+    df = se2**2 / ((var1 / n1) ** 2 / (n1 - 1) + (var2 / n2) ** 2 / (n2 - 1))
+    return _incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+
+
+@dataclass
+class Selection:
+    """Runs picked for one side of a comparison."""
+
+    label: str
+    env_key: str | None
+    run_ids: List[int]
+
+
+def _environment(connection: sqlite3.Connection, key: str) -> Dict[str, Any]:
+    row = connection.execute("SELECT * FROM environments WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return {}
+    return {**dict(row), "components": json.loads(row["components"])}
+
+
+def describe_environment(environment: Dict[str, Any]) -> str:
+    parts = [environment.get("board") or "unknown board"]
+    if environment.get("l4t"):
+        parts.append(f"L4T {environment['l4t']}")
+    if environment.get("cuda"):
+        parts.append(f"CUDA {environment['cuda']}")
+    parts.append(environment.get("python") or "unknown interpreter")
+    parts.extend(f"{name} {version}" for name, version in sorted(environment.get("components", {}).items()))
+    return ", ".join(parts)
+
+
+def environment_changes(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> List[str]:
+    """What differs between two environments, e.g. ``torch 2.5.0 -> 2.6.0``."""
+    changes = []
+    for name in ("board", "l4t", "cuda", "python"):
+        if baseline.get(name) != candidate.get(name):
+            changes.append(f"{name} {baseline.get(name) or '-'} -> {candidate.get(name) or '-'}")
+    before, after = baseline.get("components", {}), candidate.get("components", {})
+    for name in sorted(set(before) | set(after)):
+        if before.get(name) != after.get(name):
+            changes.append(f"{name} {before.get(name) or '-'} -> {after.get(name) or '-'}")
+    return changes
+
+
+def select_runs(
+    connection: sqlite3.Connection,
+    selector: str,
+    script: str | None = None,
+    exclude_env: str | None = None,
+    runs_per_group: int = DEFAULT_RUNS_PER_GROUP,
+) -> Selection:
+    """Resolve ``latest``, ``previous``, ``run:ID`` or an environment key prefix to runs.
+
+    ``latest`` is the environment of the newest run; ``previous`` the newest other
+    environment on the same board. Environments contribute their last ``runs_per_group``
+    passing runs of every script/kind/config.
+    """
+    if selector.startswith("run:") or selector.startswith("#"):
+        run_id = selector.split(":", 1)[-1].lstrip("#")
+        row = connection.execute("SELECT id, env_key FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise SystemExit(f"No run {run_id} in the history.")
+        return Selection(f"run {row['id']}", row["env_key"], [row["id"]])
+
+    script_filter = " AND script = ?" if script else ""
+    script_args: Tuple[Any, ...] = (script,) if script else ()
+    if selector in ("latest", "previous"):
+        # Environments ordered by their newest run.
+        envs = [
+            row["env_key"]
+            for row in connection.execute(
+                f"SELECT env_key, MAX(id) AS newest FROM runs WHERE ok = 1{script_filter} "
+                "GROUP BY env_key ORDER BY newest DESC",
+                script_args,
+            )
+        ]
+        if selector == "previous":
+            board = _environment(connection, exclude_env).get("board") if exclude_env else None
+            envs = [
+                key
+                for key in envs
+                if key != exclude_env and (board is None or _environment(connection, key).get("board") == board)
+            ]
+        if not envs:
+            raise SystemExit(
+                "The history has no earlier environment on this board to compare against; "
+                "pass --baseline run:ID or an environment key."
+            )
+        env_key = envs[0]
+    else:
+        rows = connection.execute("SELECT key FROM environments WHERE key LIKE ?", (f"{selector}%",))
+        matches = [row["key"] for row in rows]
+        if len(matches) != 1:
+            raise SystemExit(
+                f"{selector!r} matches {len(matches)} environment(s); "
+                "use latest, previous, run:ID or an environment key prefix."
+            )
+        env_key = matches[0]
+
+    run_ids: List[int] = []
+    per_group: Dict[Tuple[str, str, str], int] = {}
+    for row in connection.execute(
+        "SELECT id, script, kind, config FROM runs "
+        f"WHERE env_key = ? AND ok = 1{script_filter} ORDER BY id DESC",
+        (env_key, *script_args),
+    ):
+        group = (row["script"], row["kind"], row["config"])
+        if per_group.get(group, 0) < runs_per_group:
+            per_group[group] = per_group.get(group, 0) + 1
+            run_ids.append(row["id"])
+    return Selection(f"environment {env_key}", env_key, sorted(run_ids))
+
+
+def _pooled_samples(connection: sqlite3.Connection, run_ids: List[int]) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+    """Every sample per (script, kind, config, metric) across ``run_ids``."""
+    pooled: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+    if not run_ids:
+        return pooled
+    placeholders = ",".join("?" * len(run_ids))
+    for row in connection.execute(
+        "SELECT runs.script, runs.kind, runs.config, metrics.* FROM metrics "
+        f"JOIN runs ON runs.id = metrics.run_id WHERE runs.id IN ({placeholders}) ORDER BY metrics.id",
+        run_ids,
+    ):
+        key = (row["script"], row["kind"], row["config"], row["name"])
+        entry = pooled.setdefault(
+            key,
+            {"unit": row["unit"], "higher_is_better": bool(row["higher_is_better"]), "values": [], "runs": 0},
+        )
+        entry["values"].extend(_samples(row))
+        entry["runs"] += 1
+    return pooled
+
+
+def compare_selections(
+    connection: sqlite3.Connection,
+    baseline: Selection,
+    candidate: Selection,
+    alpha: float = DEFAULT_ALPHA,
+    min_change: float = DEFAULT_MIN_CHANGE,
+) -> Dict[str, Any]:
+    """Compare every metric both sides measured under the same script, kind and config.
+
+    A regression is a change in the worse direction that is both significant (Welch's
+    t-test, p < ``alpha``) and at least ``min_change`` of the baseline mean, so large
+    per-frame samples do not flag noise-sized shifts.
+    """
+    before = _pooled_samples(connection, baseline.run_ids)
+    after = _pooled_samples(connection, candidate.run_ids)
+    rows = []
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        mean_before, mean_after = statistics.mean(old["values"]), statistics.mean(new["values"])
+        change = (mean_after - mean_before) / abs(mean_before) if mean_before else None
+        enough = min(len(old["values"]), len(new["values"])) >= MIN_SAMPLES
+        p_value = welch_test(old["values"], new["values"]) if enough else None
+        if p_value is None:
+            status = "too few samples"
+        elif change is None or p_value >= alpha or abs(change) < min_change:
+            status = "unchanged"
+        else:
+            worse = change < 0 if new["higher_is_better"] else change > 0
+            status = "regression" if worse else "improvement"
+        rows.append(
+            {
+                "script": key[0],
+                "kind": key[1],
+                "config": key[2],
+                "metric": key[3],
+                "unit": new["unit"],
+                "higher_is_better": new["higher_is_better"],
+                "baseline": {"mean": mean_before, "count": len(old["values"]), "runs": old["runs"]},
+                "candidate": {"mean": mean_after, "count": len(new["values"]), "runs": new["runs"]},
+                "change": change,
+                "p_value": p_value,
+                "status": status,
+            }
+        )
+    environments = {
+        "baseline": _environment(connection, baseline.env_key) if baseline.env_key else {},
+        "candidate": _environment(connection, candidate.env_key) if candidate.env_key else {},
+    }
+    return {
+        "baseline": {**asdict(baseline), "environment": environments["baseline"]},
+        "candidate": {**asdict(candidate), "environment": environments["candidate"]},
+        "changes": environment_changes(environments["baseline"], environments["candidate"]),
+        "alpha": alpha,
+        "min_change": min_change,
+        "metrics": rows,
+        "regressions": sum(1 for row in rows if row["status"] == "regression"),
+    }
+
+
+def print_comparison(comparison: Dict[str, Any]) -> None:
+    for side in ("baseline", "candidate"):
+        selection = comparison[side]
+        print(f"{side.capitalize()}: {selection['label']}, {len(selection['run_ids'])} run(s)")
+        if selection["environment"]:
+            print(f"  {describe_environment(selection['environment'])}")
+    if comparison["changes"]:
+        print("Changed: " + "; ".join(comparison["changes"]))
+    if not comparison["metrics"]:
+        print("No metric was measured under the same script and configuration on both sides.")
+        return
+    group = None
+    for row in comparison["metrics"]:
+        if (row["script"], row["kind"], row["config"]) != group:
+            group = (row["script"], row["kind"], row["config"])
+            print(f"  {row['script']} {row['kind']}" + (f" ({row['config']})" if row["config"] else ""))
+        change = f"{row['change'] * 100:+7.1f}%" if row["change"] is not None else f"{'--':>8}"
+        p_value = f"p={row['p_value']:.2g}" if row["p_value"] is not None else ""
+        flag = row["status"].upper() if row["status"] in ("regression", "improvement") else row["status"]
+        print(
+            f"    {row['metric']:<36}{row['baseline']['mean']:>11.4g} -> {row['candidate']['mean']:<11.4g}"
+            f"{row['unit']:<7}{change} {p_value:<10} {flag}"
+        )
+    print(
+        f"{comparison['regressions']} regression(s) at p < {comparison['alpha']:g} and a change of at least "
+        f"{comparison['min_change'] * 100:g}%."
+    )
+
+
+def load_runs(
+    connection: sqlite3.Connection, script: str | None = None, since: str | None = None, limit: int | None = None
+) -> List[Dict[str, Any]]:
+    """Runs with their environment and metric summaries, oldest first."""
+    clauses, params = [], []
+    if script:
+        clauses.append("script = ?")
+        params.append(script)
+    if since:
+        clauses.append("recorded_at >= ?")
+        params.append(since)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = f"SELECT * FROM runs{where} ORDER BY id DESC" + (f" LIMIT {int(limit)}" if limit else "")
+    runs = [dict(row) for row in connection.execute(query, params)][::-1]
+    environments: Dict[str, Dict[str, Any]] = {}
+    for run in runs:
+        if run["env_key"] not in environments:
+            environments[run["env_key"]] = _environment(connection, run["env_key"])
+        run["environment"] = environments[run["env_key"]]
+        run["ok"] = bool(run["ok"])
+        run["details"] = json.loads(run["details"]) if run["details"] else None
+        run["metrics"] = {
+            row["name"]: {
+                "unit": row["unit"],
+                "higher_is_better": bool(row["higher_is_better"]),
+                "count": row["count"],
+                "mean": row["mean"],
+                "median": row["median"],
+                "stdev": row["stdev"],
+                "min": row["min"],
+                "max": row["max"],
+            }
+            for row in connection.execute("SELECT * FROM metrics WHERE run_id = ? ORDER BY id", (run["id"],))
+        }
+    return runs
+
+
+CSV_FIELDS = (
+    ["run_id", "recorded_at", "host", "script", "kind", "config", "ok", "error"]
+    + ["env_key", "board", "l4t", "cuda", "python", *COMPONENT_PACKAGES]
+    + ["metric", "unit", "higher_is_better", "count", "mean", "median", "stdev", "min", "max"]
+)
+
+
+def export_csv(runs: List[Dict[str, Any]], handle: TextIO) -> None:
+    """One row per run and metric; failed runs without metrics still get a row."""
+    writer = csv.DictWriter(handle, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for run in runs:
+        environment = run["environment"]
+        base = {
+            "run_id": run["id"],
+            "recorded_at": run["recorded_at"],
+            "host": run["host"],
+            "script": run["script"],
+            "kind": run["kind"],
+            "config": run["config"],
+            "ok": int(run["ok"]),
+            "error": run["error"] or "",
+            "env_key": run["env_key"],
+            "board": environment.get("board"),
+            "l4t": environment.get("l4t") or "",
+            "cuda": environment.get("cuda") or "",
+            "python": environment.get("python"),
+            **{name: environment.get("components", {}).get(name, "") for name in COMPONENT_PACKAGES},
+        }
+        if not run["metrics"]:
+            writer.writerow(base)
+        for name, summary in run["metrics"].items():
+            writer.writerow(
+                {**base, "metric": name, **summary, "higher_is_better": int(summary["higher_is_better"])}
+            )
+
+
+def write_export(runs: List[Dict[str, Any]], fmt: str, handle: TextIO) -> None:
+    if fmt == "csv":
+        export_csv(runs, handle)
+        return
+    exported = {"exported_at": datetime.datetime.now().isoformat(timespec="seconds"), "runs": runs}
+    json.dump(exported, handle, indent=2, sort_keys=True)
+    handle.write("\n")
+
+
+def print_runs(runs: List[Dict[str, Any]]) -> None:
+    if not runs:
+        print("The history is empty.")
+        return
+    for run in runs:
+        status = "OK" if run["ok"] else f"FAILED ({run['error']})"
+        config = f" ({run['config']})" if run["config"] else ""
+        print(
+            f"  #{run['id']:<5} {run['recorded_at']}  env {run['env_key']}  "
+            f"{run['script']} {run['kind']}{config}: {status}, {len(run['metrics'])} metric(s)"
+        )
+    for key in dict.fromkeys(run["env_key"] for run in runs):
+        environment = next(run["environment"] for run in runs if run["env_key"] == key)
+        print(f"  env {key}: {describe_environment(environment)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=HISTORY_DB,
+        help="History database (default: %(default)s).",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", help="Show the most recent runs and their environments.")
+    listing.add_argument("--script", help="Only runs of this validator, e.g. test_torch_cuda.")
+    listing.add_argument("--limit", type=int, default=20, help="Number of runs to show (default: %(default)s).")
+
+    compare = commands.add_parser(
+        "compare",
+        help="Flag significant regressions of the candidate runs against the baseline runs.",
+    )
+    compare.add_argument(
+        "--baseline",
+        default="previous",
+        help="latest, previous, run:ID or an environment key prefix (default: %(default)s).",
+    )
+    compare.add_argument(
+        "--candidate",
+        default="latest",
+        help="latest, previous, run:ID or an environment key prefix (default: %(default)s).",
+    )
+    compare.add_argument("--script", help="Only compare runs of this validator.")
+    compare.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS_PER_GROUP,
+        help="Latest passing runs per configuration pooled for an environment (default: %(default)s).",
+    )
+    compare.add_argument(
+        "--alpha",
+        type=float,
+        default=DEFAULT_ALPHA,
+        help="Significance level of the two-sided Welch t-test (default: %(default)s).",
+    )
+    compare.add_argument(
+        "--min-change",
+        type=float,
+        default=DEFAULT_MIN_CHANGE,
+        help="Smallest relative change of the mean that counts as a regression (default: %(default)s).",
+    )
+    compare.add_argument("--json", action="store_true", help="Print the comparison as JSON.")
+
+    export = commands.add_parser("export", help="Write runs and metric summaries as CSV or JSON.")
+    export.add_argument("--format", choices=("csv", "json"), default="csv", help="Default: %(default)s.")
+    export.add_argument("--output", type=Path, default=None, help="File to write (default: stdout).")
+    export.add_argument("--script", help="Only runs of this validator.")
+    export.add_argument("--since", help="Only runs recorded at or after this ISO date, e.g. 2026-01-31.")
+    args = parser.parse_args()
+
+    if not args.db.expanduser().exists():
+        raise SystemExit(f"No benchmark history at {args.db}; run a validator first.")
+    try:
+        connection = open_history(args.db.expanduser())
+    except sqlite3.Error as exc:
+        raise SystemExit(f"Cannot open the benchmark history {args.db}: {exc}") from exc
+    with closing(connection):
+        if args.command == "list":
+            print_runs(load_runs(connection, args.script, limit=args.limit))
+            return
+
+        if args.command == "compare":
+            if args.runs < 1 or not 0.0 < args.alpha < 1.0 or args.min_change < 0:
+                raise SystemExit(
+                    "--runs must be at least 1, --alpha within (0, 1) and --min-change non-negative."
+                )
+            candidate = select_runs(connection, args.candidate, args.script, runs_per_group=args.runs)
+            baseline = select_runs(
+                connection, args.baseline, args.script, exclude_env=candidate.env_key, runs_per_group=args.runs
+            )
+            comparison = compare_selections(connection, baseline, candidate, args.alpha, args.min_change)
+            if args.json:
+                print(json.dumps(comparison, sort_keys=True))
+            else:
+                print_comparison(comparison)
+            if comparison["regressions"]:
+                raise SystemExit(1)
+            return
+
+        runs = load_runs(connection, args.script, args.since)
+        if args.output is None:
+            write_export(runs, args.format, sys.stdout)
+            return
+        output = args.output.expanduser()
+        try:
+            with output.open("w", encoding="utf-8", newline="") as handle:
+                write_export(runs, args.format, handle)
+        except OSError as exc:
+            raise SystemExit(f"Failed to write {output}: {exc}") from exc
+        print(f"Exported {len(runs)} run(s) to {output}")
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
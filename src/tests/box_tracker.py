@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""Run the detector only every N frames and carry boxes across the gaps with a Kalman tracker.
+
+test_ultralytics_cuda.py --detect-every uses :class:`TrackedDetector` to decide per frame
+whether YOLO runs. In between, :class:`BoxTracker` moves the last detections forward with
+a constant-velocity Kalman filter over (cx, cy, w, h). All tracks are updated together
+as NumPy arrays. :func:`score_drift` compares the resulting boxes with a run that
+detected on every frame.
+
+Detections are ``(x1, y1, x2, y2, conf, cls)`` rows throughout. Given no video, this
+script simulates a scene of moving boxes with noisy detections. The tracker, scheduler
+and drift scoring can then be checked on a CPU-only machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from script_log import run_main
+
+
+try:
+    import numpy as np  # type: ignore import-not-found
+except Exception as exc:  # pylint: disable=broad-except
+    raise SystemExit("NumPy is required for the box tracker.") from exc
+
+
+ROW_FIELDS = 6  # x1, y1, x2, y2, conf, cls
+# Noise as a fraction of the box size, as in DeepSORT: position noise per frame and
+# velocity noise per frame, both scaled by the width (x, w) or height (y, h).
+POSITION_NOISE = 1 / 20
+VELOCITY_NOISE = 1 / 160
+# A positional standard deviation of this many box sizes costs a factor e of confidence.
+UNCERTAINTY_SCALE = 0.25
+
+_TRANSITION = np.eye(8)
+_TRANSITION[:4, 4:] = np.eye(4)
+_MEASUREMENT = np.eye(4, 8)
+
+
+def empty_rows() -> "np.ndarray":
+    return np.zeros((0, ROW_FIELDS), dtype=np.float64)
+
+
+def as_rows(rows: Any) -> "np.ndarray":
+    """Coerce a list of rows (or an array) into a float ``(N, 6)`` array."""
+    array = np.asarray(rows, dtype=np.float64)
+    return array.reshape(-1, ROW_FIELDS) if array.size else empty_rows()
+
+
+def rows_from_detections(detections: Sequence[Dict[str, Any]]) -> "np.ndarray":
+    """Rows from the ``{"box", "conf", "cls"}`` dicts that precision runs record."""
+    return as_rows([[*detection["box"], detection["conf"], detection["cls"]] for detection in detections])
+
+
+def iou_matrix(first: "np.ndarray", second: "np.ndarray") -> "np.ndarray":
+    """Pairwise IoU of two ``(N, >=4)`` and ``(M, >=4)`` arrays of xyxy boxes."""
+    top_left = np.maximum(first[:, None, :2], second[None, :, :2])
+    bottom_right = np.minimum(first[:, None, 2:4], second[None, :, 2:4])
+    inter = np.prod(np.clip(bottom_right - top_left, 0.0, None), axis=2)
+    area_first = np.prod(first[:, 2:4] - first[:, :2], axis=1)
+    area_second = np.prod(second[:, 2:4] - second[:, :2], axis=1)
+    union = area_first[:, None] + area_second[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def greedy_assign(scores: "np.ndarray", threshold: float) -> List[Tuple[int, int]]:
+    """One-to-one pairs in order of falling score, skipping pairs below ``threshold``."""
+    rows, cols = np.nonzero(scores >= threshold)
+    order = np.argsort(-scores[rows, cols], kind="stable")
+    used_rows: set = set()
+    used_cols: set = set()
+    pairs: List[Tuple[int, int]] = []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        pairs.append((row, col))
+    return pairs
+
+
+def _xyxy_to_state(rows: "np.ndarray") -> "np.ndarray":
+    size = rows[:, 2:4] - rows[:, :2]
+    return np.concatenate([rows[:, :2] + size / 2, size], axis=1)
+
+
+def _state_to_xyxy(state: "np.ndarray") -> "np.ndarray":
+    half = np.abs(state[:, 2:4]) / 2
+    return np.concatenate([state[:, :2] - half, state[:, :2] + half], axis=1)
+
+
+def _diagonal(variances: "np.ndarray") -> "np.ndarray":
+    """``(T, K)`` variances to ``(T, K, K)`` diagonal matrices."""
+    count, size = variances.shape
+    matrices = np.zeros((count, size, size))
+    matrices[:, np.arange(size), np.arange(size)] = variances
+    return matrices
+
+
+def _size_scale(state: "np.ndarray") -> "np.ndarray":
+    """Width for the x/w components and height for the y/h components, as ``(T, 4)``."""
+    size = np.maximum(np.abs(state[:, 2:4]), 1.0)
+    return np.concatenate([size, size], axis=1)
+
+
+class BoxTracker:
+    """Constant-velocity Kalman filter per track, with greedy IoU association by class."""
+
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 1) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.mean = np.zeros((0, 8))
+        self.cov = np.zeros((0, 8, 8))
+        self.conf = np.zeros(0)
+        self.cls = np.zeros(0)
+        self.ids = np.zeros(0, dtype=np.int64)
+        # Detector runs in a row that did not match the track; only tracks at 0 are shown.
+        self.misses = np.zeros(0, dtype=np.int64)
+        # IoU of the tracker's prediction with the detection at the last update.
+        self.fit = np.zeros(0)
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def predict(self) -> None:
+        """Advance every track by one frame."""
+        if not len(self):
+            return
+        scale = _size_scale(self.mean)
+        noise = _diagonal(np.concatenate([(POSITION_NOISE * scale) ** 2, (VELOCITY_NOISE * scale) ** 2], axis=1))
+        self.mean = self.mean @ _TRANSITION.T
+        self.cov = _TRANSITION @ self.cov @ _TRANSITION.T + noise
+
+    def update(self, detections: "np.ndarray") -> None:
+        """Fold one detector run into the tracks; call after :meth:`predict` for that frame."""
+        detections = as_rows(detections)
+        # Only boxes of the same class may continue a track.
+        same_class = self.cls[:, None] == detections[None, :, 5]
+        scores = np.where(same_class, iou_matrix(self.boxes(), detections), 0.0)
+        pairs = greedy_assign(scores, self.iou_threshold)
+        tracked = np.array([track for track, _ in pairs], dtype=np.int64)
+        matched = np.array([detection for _, detection in pairs], dtype=np.int64)
+
+        if len(pairs):
+            measured = _xyxy_to_state(detections[matched])
+            mean, cov = self.mean[tracked], self.cov[tracked]
+            noise = _diagonal((POSITION_NOISE * _size_scale(mean)) ** 2)
+            innovation_cov = _MEASUREMENT @ cov @ _MEASUREMENT.T + noise
+            # K = P H^T S^-1, solved rather than inverted; S and P are symmetric.
+            gain = np.linalg.solve(innovation_cov, _MEASUREMENT @ cov).transpose(0, 2, 1)
+            innovation = measured - mean @ _MEASUREMENT.T
+            self.mean[tracked] = mean + np.einsum("tij,tj->ti", gain, innovation)
+            self.cov[tracked] = cov - gain @ _MEASUREMENT @ cov
+            self.conf[tracked] = detections[matched, 4]
+            self.fit[tracked] = scores[tracked, matched]
+
+        unmatched_tracks = np.setdiff1d(np.arange(len(self)), tracked)
+        self.misses[tracked] = 0
+        self.misses[unmatched_tracks] += 1
+        keep = self.misses <= self.max_misses
+        self._select(keep)
+
+        fresh = detections[np.setdiff1d(np.arange(len(detections)), matched)]
+        if len(fresh):
+            self._start(fresh)
+
+    def _select(self, keep: "np.ndarray") -> None:
+        self.mean, self.cov, self.conf = self.mean[keep], self.cov[keep], self.conf[keep]
+        self.cls, self.ids, self.misses, self.fit = self.cls[keep], self.ids[keep], self.misses[keep], self.fit[keep]
+
+    def _start(self, detections: "np.ndarray") -> None:
+        count = len(detections)
+        state = _xyxy_to_state(detections)
+        scale = _size_scale(np.concatenate([state, np.zeros_like(state)], axis=1))
+        # Unknown velocity starts out very uncertain, so new tracks lose confidence quickly.
+        variances = np.concatenate([(2 * POSITION_NOISE * scale) ** 2, (10 * VELOCITY_NOISE * scale) ** 2], axis=1)
+        self.mean = np.concatenate([self.mean, np.concatenate([state, np.zeros_like(state)], axis=1)])
+        self.cov = np.concatenate([self.cov, _diagonal(variances)])
+        self.conf = np.concatenate([self.conf, detections[:, 4]])
+        self.cls = np.concatenate([self.cls, detections[:, 5]])
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + count)])
+        self.misses = np.concatenate([self.misses, np.zeros(count, dtype=np.int64)])
+        self.fit = np.concatenate([self.fit, np.ones(count)])
+        self._next_id += count
+
+    def boxes(self) -> "np.ndarray":
+        """Predicted xyxy boxes of every track, shown or not."""
+        return _state_to_xyxy(self.mean)
+
+    def rows(self) -> "np.ndarray":
+        """Shown tracks (matched at the last detector run) as detection rows."""
+        shown = self.misses == 0
+        return np.concatenate([self.boxes()[shown], self.conf[shown, None], self.cls[shown, None]], axis=1)
+
+    def track_confidence(self) -> "np.ndarray":
+        """Per shown track: how well it was predicted last time times how fresh it is now.
+
+        The positional standard deviation of the filter, measured in box sizes, grows with
+        every frame since the last detection; the fit is the IoU between the prediction
+        and the detection that last confirmed the track.
+        """
+        shown = self.misses == 0
+        cov = self.cov[shown]
+        spread = np.sqrt(cov[:, 0, 0] + cov[:, 1, 1])
+        size = np.sqrt(np.prod(np.maximum(np.abs(self.mean[shown, 2:4]), 1.0), axis=1))
+        return self.fit[shown] * np.exp(-spread / size / UNCERTAINTY_SCALE)
+
+    def confidence(self) -> float:
+        """The least confident shown track; 1.0 with nothing to track."""
+        confidence = self.track_confidence()
+        return float(confidence.min()) if len(confidence) else 1.0
+
+
+class TrackedDetector:
+    """Decides per frame whether the detector runs and tracks boxes through the other frames.
+
+    The detector runs on the first frame, whenever ``every`` frames have passed since its
+    last run and, with ``min_confidence``, as soon as the tracker's confidence falls below it.
+    """
+
+    def __init__(
+        self,
+        every: int,
+        min_confidence: float | None = None,
+        iou_threshold: float = 0.3,
+        record: bool = False,
+    ) -> None:
+        self.every = every
+        self.min_confidence = min_confidence
+        self.tracker = BoxTracker(iou_threshold)
+        self.frames = 0
+        self.detector_runs = 0
+        self.adaptive_runs = 0
+        self.track_ns = 0
+        self.since_detection = 0
+        # With record=True: the rows shown on every frame and the frames since the last detection.
+        self.outputs: List["np.ndarray"] | None = [] if record else None
+        self.gaps: List[int] = []
+
+    def needs_detection(self) -> bool:
+        if self.detector_runs == 0 or self.since_detection + 1 >= self.every:
+            return True
+        if self.min_confidence is not None and self.tracker.confidence() < self.min_confidence:
+            self.adaptive_runs += 1
+            return True
+        return False
+
+    def detected(self, detections: Any) -> "np.ndarray":
+        """Feed the detector's output for this frame; returns it as rows."""
+        rows = as_rows(detections)
+        start = time.perf_counter_ns()
+        self.tracker.predict()
+        self.tracker.update(rows)
+        self.track_ns += time.perf_counter_ns() - start
+        self.detector_runs += 1
+        self.since_detection = 0
+        return self._emit(rows)
+
+    def track(self) -> "np.ndarray":
+        """Carry the tracks one frame forward without the detector; returns the moved boxes."""
+        start = time.perf_counter_ns()
+        self.tracker.predict()
+        rows = self.tracker.rows()
+        self.track_ns += time.perf_counter_ns() - start
+        self.since_detection += 1
+        return self._emit(rows)
+
+    def _emit(self, rows: "np.ndarray") -> "np.ndarray":
+        self.frames += 1
+        if self.outputs is not None:
+            self.outputs.append(rows)
+            self.gaps.append(self.since_detection)
+        return rows
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "detect_every": self.every,
+            "min_confidence": self.min_confidence,
+            "frames": self.frames,
+            "detector_runs": self.detector_runs,
+            "adaptive_runs": self.adaptive_runs,
+            "detector_rate": self.detector_runs / self.frames if self.frames else 0.0,
+            "track_ms_per_frame": self.track_ns / self.frames / 1e6 if self.frames else 0.0,
+        }
+
+
+def score_drift(
+    reference_frames: Sequence["np.ndarray"],
+    tracked_frames: Sequence["np.ndarray"],
+    gaps: Sequence[int],
+    iou_threshold: float = 0.5,
+) -> Dict[str, Any]:
+    """How far the tracked boxes wander from a run that detected on every frame.
+
+    Boxes are matched one-to-one by IoU regardless of class. Center drift is measured in
+    pixels and as a fraction of the reference box diagonal. ``by_gap`` breaks the mean IoU
+    and drift down by frames since the last detector run (0 = the detector ran).
+    """
+    frames = min(len(reference_frames), len(tracked_frames), len(gaps))
+    reference_boxes = tracked_boxes = 0
+    ious: List[float] = []
+    drift_px: List[float] = []
+    drift_rel: List[float] = []
+    by_gap: Dict[int, Dict[str, Any]] = {}
+    for reference, tracked, gap in zip(reference_frames[:frames], tracked_frames[:frames], gaps[:frames]):
+        reference, tracked = as_rows(reference), as_rows(tracked)
+        reference_boxes += len(reference)
+        tracked_boxes += len(tracked)
+        bucket = by_gap.setdefault(int(gap), {"frames": 0, "reference": 0, "matched": 0, "iou": 0.0, "drift": 0.0})
+        bucket["frames"] += 1
+        bucket["reference"] += len(reference)
+        if not len(reference) or not len(tracked):
+            continue
+        scores = iou_matrix(reference, tracked)
+        for ref, cand in greedy_assign(scores, iou_threshold):
+            ref_box, cand_box = reference[ref, :4], tracked[cand, :4]
+            offset = float(np.hypot(*((ref_box[:2] + ref_box[2:]) / 2 - (cand_box[:2] + cand_box[2:]) / 2)))
+            diagonal = float(np.hypot(*(ref_box[2:] - ref_box[:2]))) or 1.0
+            ious.append(float(scores[ref, cand]))
+            drift_px.append(offset)
+            drift_rel.append(offset / diagonal)
+            bucket["matched"] += 1
+            bucket["iou"] += float(scores[ref, cand])
+            bucket["drift"] += offset / diagonal
+    matched = len(ious)
+    ordered = sorted(drift_px)
+    # Two runs that both see nothing agree perfectly.
+    empty = 1.0 if not reference_boxes and not tracked_boxes else 0.0
+    return {
+        "frames": frames,
+        "iou_threshold": iou_threshold,
+        "reference_boxes": reference_boxes,
+        "tracked_boxes": tracked_boxes,
+        "matched": matched,
+        "recall": matched / reference_boxes if reference_boxes else 1.0,
+        "precision": matched / tracked_boxes if tracked_boxes else 1.0,
+        "mean_iou": sum(ious) / matched if matched else empty,
+        "mean_drift_px": sum(drift_px) / matched if matched else 0.0,
+        "p90_drift_px": ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))] if ordered else 0.0,
+        "mean_drift_rel": sum(drift_rel) / matched if matched else 0.0,
+        "by_gap": {
+            str(gap): {
+                "frames": bucket["frames"],
+                "recall": bucket["matched"] / bucket["reference"] if bucket["reference"] else 1.0,
+                "mean_iou": bucket["iou"] / bucket["matched"] if bucket["matched"] else 0.0,
+                "mean_drift_rel": bucket["drift"] / bucket["matched"] if bucket["matched"] else 0.0,
+            }
+            for gap, bucket in sorted(by_gap.items())
+        },
+    }
+
+
+def print_tracking_summary(summary: Dict[str, Any], drift: Dict[str, Any] | None = None) -> None:
+    adaptive = f", {summary['adaptive_runs']} triggered by low confidence" if summary["min_confidence"] else ""
+    print(
+        f"Detect every {summary['detect_every']}: detector ran on {summary['detector_runs']} of "
+        f"{summary['frames']} frames ({summary['detector_rate'] * 100:.0f}%{adaptive}); "
+        f"tracking took {summary['track_ms_per_frame']:.3f} ms/frame"
+    )
+    if drift is None:
+        return
+    print(
+        f"  drift vs. detecting every frame ({drift['frames']} frames, IoU >= {drift['iou_threshold']:.2f}): "
+        f"recall {drift['recall'] * 100:.1f}% | precision {drift['precision'] * 100:.1f}% | "
+        f"mean IoU {drift['mean_iou']:.3f} | center drift mean {drift['mean_drift_px']:.1f} px, "
+        f"p90 {drift['p90_drift_px']:.1f} px ({drift['mean_drift_rel'] * 100:.1f}% of the box diagonal)"
+    )
+    print(f"  {'gap':>5}{'frames':>8}{'recall':>9}{'IoU':>8}{'drift':>8}")
+    for gap, bucket in drift["by_gap"].items():
+        print(
+            f"  {gap:>5}{bucket['frames']:>8}{bucket['recall'] * 100:>8.1f}%"
+            f"{bucket['mean_iou']:>8.3f}{bucket['mean_drift_rel'] * 100:>7.1f}%"
+        )
+
+
+@dataclass
+class SyntheticScene:
+    """Ground truth and noisy detections for a scene of boxes moving across a frame."""
+
+    truth: List["np.ndarray"]
+    detections: List["np.ndarray"]
+
+
+def synthetic_scene(
+    frames: int,
+    objects: int = 6,
+    size: Tuple[int, int] = (1280, 720),
+    speed: float = 4.0,
+    jitter: float = 1.5,
+    miss_rate: float = 0.02,
+    seed: int = 0,
+) -> SyntheticScene:
+    """Boxes that drift, turn slowly and bounce off the frame edges; detections add
+    ``jitter`` pixels of noise to every coordinate and drop ``miss_rate`` of the boxes."""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    box_size = rng.uniform(40, 160, size=(objects, 2))
+    center = rng.uniform(box_size / 2, np.array(size) - box_size / 2)
+    heading = rng.uniform(0, 2 * math.pi, size=objects)
+    classes = rng.integers(0, 3, size=objects).astype(np.float64)
+    truth: List["np.ndarray"] = []
+    detections: List["np.ndarray"] = []
+    for _ in range(frames):
+        heading += rng.normal(0, 0.05, size=objects)
+        center += speed * np.stack([np.cos(heading), np.sin(heading)], axis=1)
+        low, high = box_size / 2, np.array([width, height]) - box_size / 2
+        bounced_x = (center[:, 0] < low[:, 0]) | (center[:, 0] > high[:, 0])
+        bounced_y = (center[:, 1] < low[:, 1]) | (center[:, 1] > high[:, 1])
+        heading = np.where(bounced_x, math.pi - heading, heading)
+        heading = np.where(bounced_y, -heading, heading)
+        center = np.clip(center, low, high)
+        boxes = np.concatenate([center - box_size / 2, center + box_size / 2], axis=1)
+        truth.append(np.concatenate([boxes, np.ones((objects, 1)), classes[:, None]], axis=1))
+        noisy = boxes + rng.normal(0, jitter, size=boxes.shape)
+        seen = rng.random(objects) >= miss_rate
+        conf = rng.uniform(0.5, 0.95, size=(objects, 1))
+        detections.append(np.concatenate([noisy, conf, classes[:, None]], axis=1)[seen])
+    return SyntheticScene(truth, detections)
+
+
+def simulate(scene: SyntheticScene, every: int, min_confidence: float | None, iou_threshold: float) -> TrackedDetector:
+    """Drive a TrackedDetector over a scene, handing it the detections only when it asks."""
+    detector = TrackedDetector(every, min_confidence, iou_threshold, record=True)
+    for detections in scene.detections:
+        if detector.needs_detection():
+            detector.detected(detections)
+        else:
+            detector.track()
+    return detector
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=300, help="Frames to simulate (default: %(default)s).")
+    parser.add_argument("--objects", type=int, default=6, help="Moving boxes in the scene (default: %(default)s).")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=4.0,
+        help="Pixels each box moves per frame (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=1.5,
+        help="Standard deviation of the detector noise in pixels (default: %(default)s).",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: %(default)s).")
+    parser.add_argument(
+        "--detect-every",
+        type=int,
+        nargs="+",
+        default=[1, 2, 3, 5, 10],
+        help="Detector intervals to compare (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--detect-min-confidence",
+        type=float,
+        default=None,
+        help="Also run the detector as soon as the tracker confidence drops below this.",
+    )
+    parser.add_argument(
+        "--tracker-iou",
+        type=float,
+        default=0.3,
+        help="IoU a detection needs with a predicted box to continue its track (default: %(default)s).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+    if args.frames < 1 or args.objects < 0 or any(every < 1 for every in args.detect_every):
+        raise SystemExit("--frames and --detect-every must be at least 1 and --objects non-negative.")
+
+    scene = synthetic_scene(args.frames, args.objects, speed=args.speed, jitter=args.jitter, seed=args.seed)
+    results = []
+    for every in args.detect_every:
+        detector = simulate(scene, every, args.detect_min_confidence, args.tracker_iou)
+        summary = detector.summary()
+        drift = score_drift(scene.detections, detector.outputs or [], detector.gaps)
+        results.append({"tracking": summary, "drift": drift})
+        if not args.json:
+            print_tracking_summary(summary, drift)
+    if args.json:
+        print(json.dumps(results, sort_keys=True))
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""Keep one YOLO model warm and serve predict requests from local clients over a Unix socket.
+
+test_ultralytics_cuda.py --serve starts the daemon and --client streams through it, so
+repeated validation runs skip importing torch/Ultralytics, loading weights and warming up.
+
+Messages are a fixed binary header followed by packed structs. Frames travel by reference
+when they already sit in shared memory the client created, and inline otherwise. Requests
+from all clients go through one queue, and the inference thread drains it into
+micro-batches. This script itself only queries or stops a running daemon.
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import json
+import math
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from script_log import LOG_DIR, run_main
+
+
+try:
+    import numpy as np  # type: ignore import-not-found
+except Exception as exc:  # pylint: disable=broad-except
+    raise SystemExit("NumPy is required for the inference daemon.") from exc
+
+
+DEFAULT_SOCKET = LOG_DIR / "inference.sock"
+
+MAGIC = b"JZD1"
+HEADER = struct.Struct("<4sBxHI")  # magic, kind, frame count, payload bytes
+PREDICT_META = struct.Struct("<fB")  # confidence threshold, shared-memory segment names that follow
+FRAME_META = struct.Struct("<HHBBBxQ")  # height, width, channels, transport, segment, offset
+RESULT_META = struct.Struct("<ffH")  # queue wait ms, inference ms, frames in the server batch
+DETECTION_COUNT = struct.Struct("<H")
+# Each detection is six float32 values: x1, y1, x2, y2, confidence, class.
+DETECTION_FIELDS = 6
+
+KIND_PREDICT, KIND_RESULT, KIND_STATS, KIND_STATS_REPLY, KIND_ERROR, KIND_SHUTDOWN = range(1, 7)
+TRANSPORT_INLINE, TRANSPORT_SHM = 0, 1
+MAX_PAYLOAD = 1 << 30
+
+Detection = Tuple[float, float, float, float, float, float]
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("connection closed")
+        received += count
+    return buffer
+
+
+def send_message(sock: socket.socket, kind: int, count: int, parts: Sequence[Any] = ()) -> None:
+    """Send a header and ``parts`` with one gathered write per round, without joining them."""
+    views = [memoryview(part).cast("B") for part in parts]
+    pending = [memoryview(HEADER.pack(MAGIC, kind, count, sum(view.nbytes for view in views)))]
+    pending += [view for view in views if view.nbytes]
+    while pending:
+        sent = sock.sendmsg(pending)
+        while pending and sent >= pending[0].nbytes:
+            sent -= pending[0].nbytes
+            pending.pop(0)
+        if pending and sent:
+            pending[0] = pending[0][sent:]
+
+
+def recv_message(sock: socket.socket) -> Tuple[int, int, bytearray]:
+    magic, kind, count, size = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if magic != MAGIC or size > MAX_PAYLOAD:
+        raise ConnectionError("not an inference daemon message")
+    return kind, count, _recv_exact(sock, size) if size else bytearray()
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Open a client's segment without letting this process's resource tracker own it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name)
+        # Before Python 3.13 attaching registers the segment, and the tracker would unlink
+        # the client's memory when the daemon exits.
+        try:
+            resource_tracker.unregister(segment._name, "shared_memory")  # pylint: disable=protected-access
+        except Exception:  # pylint: disable=broad-except
+            pass
+        return segment
+
+
+def _close_segment(segment: shared_memory.SharedMemory) -> None:
+    try:
+        segment.close()
+    except BufferError:
+        # A frame view is still alive; the mapping goes away with it.
+        pass
+
+
+def decode_predict(
+    payload: bytearray, count: int, attach: Callable[[str], shared_memory.SharedMemory]
+) -> Tuple[float, List[Any]]:
+    """Turn a predict payload into frames that view the payload or shared memory in place."""
+    confidence, name_count = PREDICT_META.unpack_from(payload, 0)
+    offset = PREDICT_META.size
+    names: List[str] = []
+    for _ in range(name_count):
+        length = payload[offset]
+        names.append(bytes(payload[offset + 1 : offset + 1 + length]).decode("utf-8"))
+        offset += 1 + length
+    inline_start = offset + count * FRAME_META.size
+    frames = []
+    for index in range(count):
+        height, width, channels, transport, segment, data_offset = FRAME_META.unpack_from(
+            payload, offset + index * FRAME_META.size
+        )
+        if transport == TRANSPORT_SHM:
+            buffer: Any = attach(names[segment]).buf
+            start = data_offset
+        else:
+            buffer, start = payload, inline_start + data_offset
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        if start + height * width * channels > len(buffer):
+            raise ValueError("frame runs past the end of its buffer")
+        frames.append(np.ndarray(shape, dtype=np.uint8, buffer=buffer, offset=start))
+    return confidence, frames
+
+
+def encode_result(detections: List[List[Detection]], queue_ms: float, infer_ms: float, batch_frames: int) -> List[Any]:
+    parts: List[Any] = [RESULT_META.pack(queue_ms, infer_ms, min(batch_frames, 0xFFFF))]
+    for rows in detections:
+        array = np.asarray(rows, dtype=np.float32).reshape(-1, DETECTION_FIELDS)
+        parts += [DETECTION_COUNT.pack(len(array)), array]
+    return parts
+
+
+def decode_result(payload: bytearray, count: int) -> Tuple[List[Any], Dict[str, float]]:
+    """Per-frame ``(N, 6)`` float32 arrays viewing ``payload``, plus the server's timings."""
+    queue_ms, infer_ms, batch_frames = RESULT_META.unpack_from(payload, 0)
+    offset = RESULT_META.size
+    rows = []
+    for _ in range(count):
+        (detections,) = DETECTION_COUNT.unpack_from(payload, offset)
+        offset += DETECTION_COUNT.size
+        values = detections * DETECTION_FIELDS
+        rows.append(np.frombuffer(payload, dtype=np.float32, count=values, offset=offset).reshape(-1, DETECTION_FIELDS))
+        offset += values * 4
+    return rows, {"queue_ms": queue_ms, "infer_ms": infer_ms, "batch_frames": batch_frames}
+
+
+def _error_text(payload: bytearray) -> str:
+    return bytes(payload).decode("utf-8", "replace")
+
+
+@dataclass
+class _Pending:
+    frames: List[Any]
+    confidence: float
+    enqueued_ns: int
+    done: threading.Event = field(default_factory=threading.Event)
+    detections: List[List[Detection]] | None = None
+    error: str | None = None
+    queue_ms: float = 0.0
+    infer_ms: float = 0.0
+    batch_frames: int = 0
+
+
+class InferenceDaemon:
+    """Serve one warm model to local clients over a Unix domain socket.
+
+    A thread per connection parses requests and queues them. A single inference thread
+    drains the queue into micro-batches of up to ``max_batch`` frames, waiting at most
+    ``batch_window_ms`` after the first request, so frames from different clients share one
+    predict call. A batch never exceeds ``max_batch``: a request that does not fit waits for
+    the next batch, and one larger than ``max_batch`` is run in slices. ``predict_batch(frames,
+    confidence)`` returns per-frame detection rows.
+    """
+
+    def __init__(
+        self,
+        socket_path: Path,
+        predict_batch: Callable[[List[Any], float], List[List[Detection]]],
+        info: Dict[str, Any],
+        max_batch: int = 8,
+        batch_window_ms: float = 2.0,
+        queue_size: int = 64,
+        keep_warm_s: float = 30.0,
+        warmup: Callable[[], None] | None = None,
+    ) -> None:
+        self.socket_path = socket_path
+        self.predict_batch = predict_batch
+        self.info = info
+        self.max_batch = max_batch
+        self.batch_window_ms = batch_window_ms
+        self.keep_warm_s = keep_warm_s
+        self.warmup = warmup
+        self._queue: "queue.Queue[_Pending]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._server: socket.socket | None = None
+        self._started = time.monotonic()
+        self._latencies: "collections.deque[int]" = collections.deque(maxlen=4096)
+        self._counters = dict.fromkeys(
+            ("clients", "requests", "frames", "batches", "rejected", "errors", "warmups"), 0
+        )
+        self._totals = {"batch_frames": 0, "queue_ns": 0, "infer_ns": 0}
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    def _bind(self) -> socket.socket:
+        if self.socket_path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()  # Left behind by a daemon that did not shut down cleanly.
+            else:
+                raise SystemExit(f"An inference daemon is already listening on {self.socket_path}.")
+            finally:
+                probe.close()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        server.listen(16)
+        server.settimeout(0.5)
+        return server
+
+    def serve_forever(self) -> None:
+        self._server = self._bind()
+        worker = threading.Thread(target=self._inference_loop, name="inference", daemon=True)
+        worker.start()
+        self._ready.set()
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self._server.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                threading.Thread(target=self._serve_client, args=(conn,), name="daemon-client", daemon=True).start()
+        finally:
+            self._stop.set()
+            self._server.close()
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+            worker.join(timeout=5)
+
+    def _serve_client(self, conn: socket.socket) -> None:
+        segments: Dict[str, shared_memory.SharedMemory] = {}
+
+        def attach(name: str) -> shared_memory.SharedMemory:
+            if name not in segments:
+                segments[name] = attach_shared_memory(name)
+            return segments[name]
+
+        with self._lock:
+            self._counters["clients"] += 1
+        try:
+            while not self._stop.is_set():
+                try:
+                    kind, count, payload = recv_message(conn)
+                except (ConnectionError, OSError):
+                    break
+                if kind == KIND_PREDICT:
+                    self._handle_predict(conn, payload, count, attach)
+                elif kind == KIND_STATS:
+                    send_message(conn, KIND_STATS_REPLY, 0, [json.dumps(self.stats()).encode("utf-8")])
+                elif kind == KIND_SHUTDOWN:
+                    self.shutdown()
+                    send_message(conn, KIND_STATS_REPLY, 0, [json.dumps(self.stats()).encode("utf-8")])
+                    break
+                else:
+                    send_message(conn, KIND_ERROR, 0, [f"unknown message kind {kind}".encode("utf-8")])
+        except OSError:
+            pass
+        finally:
+            conn.close()
+            for segment in segments.values():
+                _close_segment(segment)
+            with self._lock:
+                self._counters["clients"] -= 1
+
+    def _handle_predict(
+        self, conn: socket.socket, payload: bytearray, count: int, attach: Callable[[str], Any]
+    ) -> None:
+        try:
+            confidence, frames = decode_predict(payload, count, attach)
+        except (ValueError, IndexError, OSError, struct.error) as exc:
+            send_message(conn, KIND_ERROR, 0, [f"bad predict request: {exc}".encode("utf-8")])
+            return
+        pending = _Pending(frames, confidence, time.perf_counter_ns())
+        del frames
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            with self._lock:
+                self._counters["rejected"] += 1
+            pending.frames = []
+            send_message(conn, KIND_ERROR, 0, [b"daemon queue is full; retry later"])
+            return
+        while not pending.done.wait(0.5):
+            if self._stop.is_set():
+                pending.error = "daemon is shutting down"
+                break
+        # Drop the frame views before the connection can close the segments they point into.
+        pending.frames = []
+        if pending.error or pending.detections is None:
+            send_message(conn, KIND_ERROR, 0, [(pending.error or "no result").encode("utf-8")])
+            return
+        send_message(
+            conn,
+            KIND_RESULT,
+            len(pending.detections),
+            encode_result(pending.detections, pending.queue_ms, pending.infer_ms, pending.batch_frames),
+        )
+
+    def _inference_loop(self) -> None:
+        last_activity = time.monotonic()
+        # Requests taken off the queue but not fully run yet, with the index of their next frame.
+        backlog: "collections.deque[Tuple[_Pending, int]]" = collections.deque()
+        while not self._stop.is_set():
+            if not backlog:
+                try:
+                    backlog.append((self._queue.get(timeout=0.5), 0))
+                except queue.Empty:
+                    if self.warmup and self.keep_warm_s and time.monotonic() - last_activity >= self.keep_warm_s:
+                        # Idle GPUs drop their clocks and caches; a dummy predict keeps the first real one fast.
+                        self.warmup()
+                        last_activity = time.monotonic()
+                        with self._lock:
+                            self._counters["warmups"] += 1
+                    continue
+            batch: List[Tuple[_Pending, int, int]] = []
+            frames = 0
+            deadline = time.perf_counter() + self.batch_window_ms / 1000
+            while frames < self.max_batch:
+                if not backlog:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        backlog.append((self._queue.get(timeout=remaining), 0))
+                    except queue.Empty:
+                        break
+                item, start = backlog[0]
+                if item.done.is_set():
+                    # An earlier slice of this request already failed.
+                    backlog.popleft()
+                    continue
+                left = len(item.frames) - start
+                if left > self.max_batch - frames:
+                    if batch:
+                        # Hold it back for the next batch instead of overflowing this one; static engines
+                        # are exported for exactly max_batch frames.
+                        break
+                    # Larger than a whole batch on its own: run it in max_batch slices.
+                    batch.append((item, start, start + self.max_batch))
+                    backlog[0] = (item, start + self.max_batch)
+                    break
+                backlog.popleft()
+                batch.append((item, start, start + left))
+                frames += left
+            if batch:
+                self._run_batch(batch)
+            last_activity = time.monotonic()
+
+    def _run_batch(self, batch: List[Tuple[_Pending, int, int]]) -> None:
+        frames = [frame for item, start, stop in batch for frame in item.frames[start:stop]]
+        batch_frames = len(frames)
+        started = time.perf_counter_ns()
+        try:
+            # One call at the lowest threshold; each request is filtered to its own below.
+            detections = self.predict_batch(frames, min(item.confidence for item, _, _ in batch))
+            error = None
+        except Exception as exc:  # pylint: disable=broad-except
+            detections, error = [], f"{type(exc).__name__}: {exc}"
+        finished = time.perf_counter_ns()
+        del frames
+        index = 0
+        with self._lock:
+            self._counters["batches"] += 1
+            self._totals["infer_ns"] += finished - started
+            for item, start, stop in batch:
+                count = stop - start
+                if start == 0:
+                    item.queue_ms = (started - item.enqueued_ns) / 1e6
+                    item.detections = []
+                item.infer_ms += (finished - started) / 1e6
+                item.batch_frames = max(item.batch_frames, batch_frames)
+                self._counters["frames"] += count
+                if error:
+                    item.error = error
+                    self._counters["errors"] += 1
+                elif item.detections is not None:
+                    item.detections += [
+                        [row for row in rows if row[4] >= item.confidence] for rows in detections[index : index + count]
+                    ]
+                index += count
+                if error or stop >= len(item.frames):
+                    # Only the last slice of a request completes it.
+                    self._counters["requests"] += 1
+                    self._totals["batch_frames"] += item.batch_frames
+                    self._totals["queue_ns"] += int(item.queue_ms * 1e6)
+                    self._latencies.append(finished - item.enqueued_ns)
+                    item.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Health and throughput counters, served to KIND_STATS requests."""
+        with self._lock:
+            counters = dict(self._counters)
+            totals = dict(self._totals)
+            latencies = sorted(self._latencies)
+        requests = counters["requests"]
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, max(0, math.ceil(fraction * len(latencies)) - 1))] / 1e6
+
+        return {
+            **self.info,
+            "status": "stopping" if self._stop.is_set() else "ok",
+            "pid": os.getpid(),
+            "socket": str(self.socket_path),
+            "uptime_s": time.monotonic() - self._started,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "max_batch": self.max_batch,
+            "batch_window_ms": self.batch_window_ms,
+            **counters,
+            "mean_batch_frames": totals["batch_frames"] / requests if requests else 0.0,
+            "mean_queue_ms": totals["queue_ns"] / requests / 1e6 if requests else 0.0,
+            "mean_infer_ms": totals["infer_ns"] / counters["batches"] / 1e6 if counters["batches"] else 0.0,
+            "latency_ms": {"p50": percentile(0.50), "p99": percentile(0.99)},
+        }
+
+
+class DaemonClient:
+    """Connection to an InferenceDaemon.
+
+    Frames that live in a segment from ``frame_buffers`` are sent by reference. Other frames
+    are copied into a reusable shared-memory scratch segment, or sent inline when shared
+    memory is unavailable.
+    """
+
+    def __init__(self, socket_path: Path = DEFAULT_SOCKET, timeout: float = 60.0, use_shared_memory: bool = True) -> None:
+        self.socket_path = socket_path
+        self.use_shared_memory = use_shared_memory
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(str(socket_path))
+        except OSError as exc:
+            self._sock.close()
+            raise SystemExit(
+                f"No inference daemon at {socket_path} ({exc}). Start one with test_ultralytics_cuda.py --serve."
+            ) from exc
+        # (segment, base address) for every segment this client created.
+        self._segments: List[Tuple[shared_memory.SharedMemory, int]] = []
+        self._scratch: shared_memory.SharedMemory | None = None
+        self.info = self.stats()
+        self.names = {int(key): value for key, value in self.info.get("names", {}).items()}
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    def _request(self, kind: int, count: int = 0, parts: Sequence[Any] = ()) -> Tuple[int, int, bytearray]:
+        send_message(self._sock, kind, count, parts)
+        reply_kind, reply_count, payload = recv_message(self._sock)
+        if reply_kind == KIND_ERROR:
+            raise RuntimeError(f"Inference daemon error: {_error_text(payload)}")
+        return reply_kind, reply_count, payload
+
+    def stats(self) -> Dict[str, Any]:
+        _, _, payload = self._request(KIND_STATS)
+        return json.loads(bytes(payload).decode("utf-8"))
+
+    def shutdown(self) -> Dict[str, Any]:
+        _, _, payload = self._request(KIND_SHUTDOWN)
+        return json.loads(bytes(payload).decode("utf-8"))
+
+    def _create_segment(self, size: int) -> shared_memory.SharedMemory:
+        segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        probe = np.frombuffer(segment.buf, dtype=np.uint8)
+        base = probe.ctypes.data
+        del probe
+        self._segments.append((segment, base))
+        return segment
+
+    def frame_buffers(self, shape: Tuple[int, ...], count: int) -> List[Any]:
+        """``count`` frames in one shared segment to decode into; predict() then sends them by reference."""
+        nbytes = int(np.prod(shape))
+        segment = self._create_segment(nbytes * count)
+        return [np.ndarray(shape, dtype=np.uint8, buffer=segment.buf, offset=index * nbytes) for index in range(count)]
+
+    def _locate(self, frame: Any) -> Tuple[shared_memory.SharedMemory, int] | None:
+        if frame.dtype != np.uint8 or not frame.flags.c_contiguous:
+            return None
+        address = frame.ctypes.data
+        for segment, base in self._segments:
+            if base <= address and address + frame.nbytes <= base + segment.size:
+                return segment, address - base
+        return None
+
+    def _scratch_views(self, frames: List[Any]) -> List[Any]:
+        needed = sum(frame.nbytes for frame in frames)
+        if self._scratch is None or self._scratch.size < needed:
+            if self._scratch is not None:
+                self._drop_segment(self._scratch)
+            self._scratch = self._create_segment(int(needed * 1.5))
+        views, offset = [], 0
+        for frame in frames:
+            view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._scratch.buf, offset=offset)
+            view[...] = frame
+            views.append(view)
+            offset += frame.nbytes
+        return views
+
+    def _drop_segment(self, segment: shared_memory.SharedMemory) -> None:
+        self._segments = [(other, base) for other, base in self._segments if other is not segment]
+        _close_segment(segment)
+        segment.unlink()
+
+    def predict(self, frames: List[Any], confidence: float) -> Tuple[List[Any], Dict[str, float]]:
+        """Per-frame ``(N, 6)`` detection arrays (x1, y1, x2, y2, conf, cls) plus server timings."""
+        frames = list(frames)
+        located = [self._locate(frame) for frame in frames]
+        if self.use_shared_memory:
+            missing = [index for index, where in enumerate(located) if where is None]
+            if missing:
+                try:
+                    views = self._scratch_views([frames[index] for index in missing])
+                except OSError:
+                    # No usable /dev/shm (e.g. a small container mount); fall back to inline frames.
+                    self.use_shared_memory = False
+                else:
+                    for index, view in zip(missing, views):
+                        located[index] = self._locate(view)
+        names: List[str] = []
+        metas: List[bytes] = []
+        inline: List[Any] = []
+        inline_offset = 0
+        for frame, where in zip(frames, located):
+            height, width = frame.shape[:2]
+            channels = frame.shape[2] if frame.ndim == 3 else 1
+            if where is not None:
+                segment, offset = where
+                if segment.name not in names:
+                    names.append(segment.name)
+                metas.append(FRAME_META.pack(height, width, channels, TRANSPORT_SHM, names.index(segment.name), offset))
+            else:
+                contiguous = np.ascontiguousarray(frame, dtype=np.uint8)
+                metas.append(FRAME_META.pack(height, width, channels, TRANSPORT_INLINE, 0, inline_offset))
+                inline.append(contiguous)
+                inline_offset += contiguous.nbytes
+        encoded_names = [name.encode("utf-8") for name in names]
+        parts: List[Any] = [PREDICT_META.pack(confidence, len(encoded_names))]
+        parts += [bytes([len(name)]) + name for name in encoded_names]
+        parts += metas + inline
+        _, count, payload = self._request(KIND_PREDICT, len(frames), parts)
+        return decode_result(payload, count)
+
+    def close(self) -> None:
+        self._sock.close()
+        for segment, _ in self._segments:
+            _close_segment(segment)
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        self._segments = []
+        self._scratch = None
+
+
+def print_daemon_stats(stats: Dict[str, Any]) -> None:
+    print(
+        f"Inference daemon {stats['status']} (pid {stats['pid']}, up {stats['uptime_s']:.0f}s) at {stats['socket']}: "
+        f"{stats.get('model')} on {stats.get('device')} ({stats.get('backend')}, {stats.get('precision')})"
+    )
+    print(
+        f"  {stats['requests']} requests / {stats['frames']} frames in {stats['batches']} batches "
+        f"(mean {stats['mean_batch_frames']:.1f} frames per batch, max {stats['max_batch']})"
+    )
+    print(
+        f"  queue {stats['queue_depth']}/{stats['queue_capacity']}, {stats['rejected']} rejected, "
+        f"{stats['errors']} errors, {stats['clients']} clients connected"
+    )
+    print(
+        f"  mean queue wait {stats['mean_queue_ms']:.2f} ms | mean batch inference {stats['mean_infer_ms']:.2f} ms | "
+        f"latency p50 {stats['latency_ms']['p50']:.2f} ms p99 {stats['latency_ms']['p99']:.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("stats", "stop"), help="Query or stop a running daemon.")
+    parser.add_argument("--socket", type=Path, default=DEFAULT_SOCKET, help="Daemon socket (default: %(default)s).")
+    parser.add_argument("--json", action="store_true", help="Print the stats as JSON.")
+    args = parser.parse_args()
+
+    with DaemonClient(args.socket.expanduser(), timeout=10.0) as client:
+        stats = client.shutdown() if args.command == "stop" else client.stats()
+    if args.json:
+        print(json.dumps(stats, indent=2, sort_keys=True))
+        return
+    print_daemon_stats(stats)
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
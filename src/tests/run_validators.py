@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Run the OpenCV, PyTorch and TensorRT validators together and cache the combined result."""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+from script_log import LOG_DIR, run_main
+
+
+TESTS_DIR = Path(__file__).resolve().parent
+CACHE_PATH = LOG_DIR / "validation_cache.json"
+CACHE_MAX_ENTRIES = 16
+
+# name -> (script, extra arguments)
+VALIDATORS: Dict[str, tuple] = {
+    "opencv": ("test_opencv_cuda.py", []),
+    "torch": ("test_torch_cuda.py", ["--machine-readable", "json"]),
+    "tensorrt": ("test_tensorrt.py", []),
+}
+
+# Distributions whose version changes invalidate cached results, per import name.
+FINGERPRINT_PACKAGES: Dict[str, List[str]] = {
+    "torch": ["torch"],
+    "cv2": [
+        "opencv-python",
+        "opencv-contrib-python",
+        "opencv-python-headless",
+        "opencv-contrib-python-headless",
+    ],
+    "tensorrt": ["tensorrt", "tensorrt-cu12", "tensorrt-cu13", "tensorrt_lean", "tensorrt_dispatch"],
+}
+
+
+@dataclass
+class ValidatorResult:
+    """Outcome of one validator subprocess."""
+
+    name: str
+    ok: bool
+    returncode: int | None
+    duration_s: float
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    cached: bool = False
+
+
+def environment_fingerprint(python_bin: str) -> Dict[str, Any]:
+    """Describe the interpreter and ML packages without importing any of them."""
+    packages: Dict[str, Any] = {}
+    for module_name, dists in FINGERPRINT_PACKAGES.items():
+        versions = {}
+        for dist in dists:
+            try:
+                versions[dist] = importlib.metadata.version(dist)
+            except importlib.metadata.PackageNotFoundError:
+                continue
+        # Modules linked in without dist-info (or rebuilt in place) still change the origin mtime.
+        spec = importlib.util.find_spec(module_name)
+        origin = getattr(spec, "origin", None) if spec else None
+        mtime = os.stat(origin).st_mtime if origin and os.path.exists(origin) else None
+        packages[module_name] = {"versions": versions, "origin": origin, "mtime": mtime}
+    return {
+        "python": os.path.realpath(python_bin),
+        "python_version": sys.version.split()[0],
+        "ld_library_path": os.environ.get("LD_LIBRARY_PATH", ""),
+        "packages": packages,
+    }
+
+
+def fingerprint_key(fingerprint: Dict[str, Any]) -> str:
+    payload = json.dumps(fingerprint, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def load_cache(path: Path) -> Dict[str, Any]:
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_cache(path: Path, cache: Dict[str, Any]) -> None:
+    # Keep the most recently stored environments only.
+    ordered = sorted(cache.items(), key=lambda item: item[1].get("stored_at", ""), reverse=True)
+    trimmed = dict(ordered[:CACHE_MAX_ENTRIES])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(trimmed, handle, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _as_text(output: Any) -> str:
+    # TimeoutExpired carries bytes even when the process was started in text mode.
+    if isinstance(output, bytes):
+        return output.decode("utf-8", "replace").strip()
+    return (output or "").strip()
+
+
+def run_validator(name: str, python_bin: str, timeout: float) -> ValidatorResult:
+    script, extra_args = VALIDATORS[name]
+    command = [python_bin, str(TESTS_DIR / script), *extra_args]
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+    except subprocess.TimeoutExpired as exc:
+        return ValidatorResult(
+            name=name,
+            ok=False,
+            returncode=None,
+            duration_s=time.perf_counter() - start,
+            stdout=_as_text(exc.stdout),
+            stderr=f"Timed out after {timeout:.0f}s",
+            timed_out=True,
+        )
+    return ValidatorResult(
+        name=name,
+        ok=completed.returncode == 0,
+        returncode=completed.returncode,
+        duration_s=time.perf_counter() - start,
+        stdout=completed.stdout.strip(),
+        stderr=completed.stderr.strip(),
+    )
+
+
+def run_validators(
+    names: List[str], python_bin: str, timeout: float, refresh: bool, cache_path: Path
+) -> Dict[str, Any]:
+    """Serve passing results from the cache and run everything else in parallel."""
+    fingerprint = environment_fingerprint(python_bin)
+    key = fingerprint_key(fingerprint)
+    cache = {} if refresh else load_cache(cache_path)
+    cached_results = cache.get(key, {}).get("results", {})
+
+    results: Dict[str, ValidatorResult] = {}
+    pending = []
+    for name in names:
+        entry = cached_results.get(name)
+        if entry and entry.get("ok"):
+            results[name] = ValidatorResult(**{**entry, "cached": True})
+        else:
+            pending.append(name)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            for result in pool.map(lambda name: run_validator(name, python_bin, timeout), pending):
+                results[result.name] = result
+
+        # Only passing results are cached, so a failure is retried on the next run.
+        cache = load_cache(cache_path) if refresh else cache
+        stored = cache.setdefault(key, {"fingerprint": fingerprint, "results": {}})
+        for name in pending:
+            if results[name].ok:
+                stored["results"][name] = {**asdict(results[name]), "cached": False}
+        stored["stored_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+        try:
+            save_cache(cache_path, cache)
+        except OSError as exc:
+            print(f"Unable to update validation cache at {cache_path}: {exc}", file=sys.stderr)
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "fingerprint": fingerprint,
+        "fingerprint_key": key,
+        "ok": all(results[name].ok for name in names),
+        "results": {name: asdict(results[name]) for name in names},
+    }
+
+
+def _write_report(report: Dict[str, Any]) -> Path | None:
+    try:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_path = LOG_DIR / f"validation_report_{timestamp}.json"
+        with report_path.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+        return report_path
+    except Exception:
+        return None
+
+
+def _parse_names(value: str) -> List[str]:
+    names = [item.strip().lower() for item in value.split(",") if item.strip()]
+    unknown = [name for name in names if name not in VALIDATORS]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(f"Choose from {', '.join(VALIDATORS)} (got {value!r}).")
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--only",
+        type=_parse_names,
+        default=list(VALIDATORS),
+        help=f"Comma-separated validators to run (default: {','.join(VALIDATORS)}).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=300.0,
+        help="Per-validator timeout in seconds (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached results and run every selected validator.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the combined report as JSON instead of a summary.",
+    )
+    args = parser.parse_args()
+
+    report = run_validators(args.only, sys.executable, args.timeout, args.refresh, CACHE_PATH)
+    report_path = _write_report(report)
+
+    if args.json:
+        print(json.dumps(report, sort_keys=True))
+    else:
+        for name, result in report["results"].items():
+            status = "OK" if result["ok"] else ("TIMEOUT" if result["timed_out"] else "FAILED")
+            origin = "cached" if result["cached"] else f"{result['duration_s']:.1f}s"
+            print(f"{name}: {status} ({origin})")
+            output = result["stdout"] if result["ok"] else (result["stderr"] or result["stdout"])
+            for line in output.splitlines():
+                print(f"    {line}")
+        if report_path:
+            print(f"Combined report written to {report_path}")
+
+    if not report["ok"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
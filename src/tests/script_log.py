@@ -0,0 +1,68 @@
+"""Log directory and failure reporting shared by the validator helper modules.
+
+Each helper used to carry its own copy of this block; they now import it from here and run
+their command line through :func:`run_main`.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import pwd
+import sys
+import traceback
+from pathlib import Path
+from typing import Callable
+
+
+def _default_log_dir() -> Path:
+    env_dir = os.environ.get("JETSONIZER_LOG_DIR")
+    if env_dir:
+        return Path(env_dir)
+    user = os.environ.get("SUDO_USER") or os.environ.get("USER")
+    if not user:
+        try:
+            user = pwd.getpwuid(os.getuid()).pw_name
+        except KeyError:
+            user = Path.home().name
+    return Path("/home") / user / ".cache" / "Jetsonizer"
+
+
+LOG_DIR = _default_log_dir()
+
+
+def write_log(script: str, exc: BaseException) -> Path | None:
+    try:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        log_path = LOG_DIR / f"{Path(script).stem}_{timestamp}.log"
+        with log_path.open("w", encoding="utf-8") as handle:
+            handle.write(f"Timestamp: {timestamp}\n")
+            handle.write(f"Script: {Path(script).name}\n")
+            handle.write("Traceback:\n")
+            handle.writelines(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        return log_path
+    except Exception:
+        return None
+
+
+def report_failure(script: str, exc: BaseException) -> None:
+    log_path = write_log(script, exc)
+    if log_path:
+        print(f"Full error and logs written to {log_path}", file=sys.stderr)
+    else:
+        print(f"Failed to write log file under {LOG_DIR}.", file=sys.stderr)
+
+
+def run_main(main: Callable[[], None], script: str) -> None:
+    """Run a script's ``main`` and log any failure under LOG_DIR, like the validators do."""
+    try:
+        main()
+    except SystemExit as exc:
+        code = exc.code
+        if (isinstance(code, int) and code != 0) or (not isinstance(code, int) and code is not None):
+            report_failure(script, exc)
+        raise
+    except Exception as exc:  # pylint: disable=broad-except
+        report_failure(script, exc)
+        raise SystemExit(1) from exc
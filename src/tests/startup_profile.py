@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""Break a validator's cold start into phases and write them out as a Chrome trace.
+
+The validators create one :class:`StartupProfiler` right after their standard-library
+imports and wrap each startup phase (imports, CUDA context, model load, ...) in
+``STARTUP.phase(...)``. Run them with ``--profile-startup`` to get a ranked breakdown
+on stdout and a trace under the log directory that chrome://tracing or Perfetto opens.
+Given a trace, this script prints the breakdown again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, TextIO, Tuple
+
+from script_log import LOG_DIR, run_main
+
+
+# 'phases' times the phases only; 'cprofile' also profiles the Python code run by the
+# import phases; 'importtime' also ranks the heavy modules' own imports with -X importtime
+# in a fresh interpreter once the run is over, so it cannot skew the phase timings.
+PROFILE_MODES = ("phases", "cprofile", "importtime")
+LAUNCH_PHASE = "interpreter launch"
+FIRST_RESULT_PHASE = "first result"
+
+
+@dataclass
+class ImportTiming:
+    """One ``-X importtime`` entry, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass
+class StartupPhase:
+    """One timed phase, in nanoseconds since the profiler was created."""
+
+    name: str
+    category: str
+    start_ns: int
+    end_ns: int
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+def parse_importtime(stderr: str) -> Tuple[List[ImportTiming], List[str]]:
+    """Split stderr into ``-X importtime`` entries and everything else."""
+    timings: List[ImportTiming] = []
+    other: List[str] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # the header row
+        timings.append(ImportTiming(fields[2].strip(), self_us, cumulative_us))
+    return timings, other
+
+
+def add_startup_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile-startup",
+        nargs="?",
+        const="phases",
+        choices=PROFILE_MODES,
+        help=(
+            "Time each startup phase (interpreter launch, imports, CUDA context, model load, "
+            "first result), print them ranked and write a Chrome trace under the log directory. "
+            "'cprofile' also profiles the imports; 'importtime' also ranks the heavy modules' "
+            "imports with -X importtime (default when given without a value: phases)."
+        ),
+    )
+
+
+def process_age_seconds(proc_root: Path = Path("/proc")) -> float | None:
+    """Seconds since this process was started, or None off Linux.
+
+    The kernel records the start time in clock ticks (10 ms on Jetson kernels), so this
+    is only as precise as one tick.
+    """
+    try:
+        stat = (proc_root / "self" / "stat").read_text(encoding="utf-8")
+        # Field 22 counts from after the parenthesised command name, which may contain spaces.
+        start_ticks = int(stat.rsplit(")", 1)[1].split()[19])
+        uptime = time.clock_gettime(time.CLOCK_BOOTTIME)
+        ticks_per_second = os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return max(uptime - start_ticks / ticks_per_second, 0.0)
+
+
+def import_tree(modules: Sequence[str], top: int = 15, timeout: float = 120.0) -> List[ImportTiming]:
+    """Import ``modules`` under ``-X importtime`` in a fresh interpreter; slowest first."""
+    if not modules:
+        return []
+    source = "\n".join(f"try:\n    import {name}\nexcept Exception:\n    pass" for name in modules)
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", source],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        return []
+    timings, _ = parse_importtime(completed.stderr)
+    return sorted(timings, key=lambda timing: timing.self_us, reverse=True)[:top]
+
+
+class StartupProfiler:
+    """Records startup phases against a monotonic clock and reports where the time went.
+
+    Phases are always recorded (two clock reads each) so time to first result can go into
+    the benchmark report; printing, the trace file and cProfile need :meth:`enable`.
+    """
+
+    def __init__(self, script: str, heavy_modules: Sequence[str] = ()) -> None:
+        self.script = script
+        self.heavy_modules = tuple(heavy_modules)
+        self.origin_ns = time.perf_counter_ns()
+        # Interpreter start-up plus the standard-library imports that ran before us.
+        self.launch_seconds = process_age_seconds()
+        self.mode: str | None = None
+        self.phases: List[StartupPhase] = []
+        self.first_result_ns: int | None = None
+        self._profile: Any = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def enable(self, mode: str = "phases") -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown startup profile mode {mode!r}")
+        self.mode = mode
+        if mode == "cprofile" and self._profile is None:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+
+    def _now_ns(self) -> int:
+        return time.perf_counter_ns() - self.origin_ns
+
+    @contextmanager
+    def phase(self, name: str, category: str = "startup") -> Iterator[None]:
+        """Time the enclosed block; import phases also run under cProfile when enabled."""
+        profile = self._profile if category == "import" else None
+        start_ns = self._now_ns()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.phases.append(StartupPhase(name, category, start_ns, self._now_ns()))
+
+    def first_result(self) -> None:
+        """Mark the first inference result; only the first call counts."""
+        if self.first_result_ns is not None:
+            return
+        self.first_result_ns = self._now_ns()
+        # Whatever ran between the last phase and the result (opening the video, decoding,
+        # the first predict call) is charged to its own phase.
+        start_ns = max((phase.end_ns for phase in self.phases), default=0)
+        self.phases.append(StartupPhase(FIRST_RESULT_PHASE, "inference", start_ns, self.first_result_ns))
+
+    @property
+    def time_to_first_result(self) -> float | None:
+        """Seconds from process start (when known) to the first result."""
+        if self.first_result_ns is None:
+            return None
+        return (self.launch_seconds or 0.0) + self.first_result_ns / 1e9
+
+    def summary(self) -> Dict[str, Any]:
+        launch = self.launch_seconds or 0.0
+        elapsed = launch + self._now_ns() / 1e9
+        rows: List[Dict[str, Any]] = []
+        if self.launch_seconds is not None:
+            rows.append({"name": LAUNCH_PHASE, "category": "startup", "start_s": 0.0, "seconds": launch})
+        rows.extend(
+            {
+                "name": phase.name,
+                "category": phase.category,
+                "start_s": launch + phase.start_ns / 1e9,
+                "seconds": phase.seconds,
+            }
+            for phase in self.phases
+        )
+        rows.sort(key=lambda row: row["seconds"], reverse=True)
+        # Shares are of the cold start, not of however long the run went on afterwards.
+        horizon = self.time_to_first_result or elapsed
+        for row in rows:
+            row["share"] = row["seconds"] / horizon if horizon > 0 else 0.0
+        return {
+            "script": self.script,
+            "mode": self.mode,
+            "interpreter_launch_s": self.launch_seconds,
+            "time_to_first_result_s": self.time_to_first_result,
+            "elapsed_s": elapsed,
+            "accounted_s": sum(row["seconds"] for row in rows),
+            "phases": rows,
+        }
+
+    def _top_functions(self, top: int) -> List[Dict[str, Any]]:
+        import pstats
+
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        entries = []
+        raw: Dict[Any, Any] = stats.stats  # type: ignore[attr-defined]
+        for (filename, line, function), (_, calls, total, cumulative, _) in raw.items():
+            # Built-ins have no source file; cProfile files them under "~".
+            location = "" if filename == "~" else f" ({Path(filename).name}:{line})"
+            entries.append(
+                {
+                    "function": f"{function}{location}",
+                    "calls": calls,
+                    "self_s": total,
+                    "cumulative_s": cumulative,
+                }
+            )
+        entries.sort(key=lambda entry: entry["self_s"], reverse=True)
+        return entries[:top]
+
+    def chrome_trace(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Complete ("X") events in microseconds, one row per category."""
+        pid = os.getpid()
+        categories: List[str] = []
+        events: List[Dict[str, Any]] = []
+        for row in sorted(summary["phases"], key=lambda row: row["start_s"]):
+            if row["category"] not in categories:
+                categories.append(row["category"])
+            events.append(
+                {
+                    "name": row["name"],
+                    "cat": row["category"],
+                    "ph": "X",
+                    "ts": row["start_s"] * 1e6,
+                    "dur": row["seconds"] * 1e6,
+                    "pid": pid,
+                    "tid": categories.index(row["category"]),
+                }
+            )
+        for tid, category in enumerate(categories):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": category}})
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.script}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": summary}
+
+    def finish(self, top: int = 15, file: TextIO | None = None) -> Path | None:
+        """Print the breakdown (to ``file``, default stdout) and write the trace when enabled."""
+        if not self.enabled:
+            return None
+        summary = self.summary()
+        if self._profile is not None:
+            summary["import_functions"] = self._top_functions(top)
+        if self.mode == "importtime":
+            summary["import_tree"] = [asdict(timing) for timing in import_tree(self.heavy_modules, top)]
+        print_startup_summary(summary, file)
+        try:
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            trace_path = LOG_DIR / f"{self.script}_startup_{timestamp}.json"
+            with trace_path.open("w", encoding="utf-8") as handle:
+                json.dump(self.chrome_trace(summary), handle, indent=2)
+                handle.write("\n")
+            if self._profile is not None:
+                self._profile.dump_stats(str(trace_path.with_suffix(".prof")))
+        except OSError:
+            print(f"Failed to write startup trace under {LOG_DIR}.", file=sys.stderr)
+            return None
+        print(
+            f"Startup trace written to {trace_path} (open in chrome://tracing or ui.perfetto.dev)",
+            file=file,
+        )
+        return trace_path
+
+
+def print_startup_summary(summary: Dict[str, Any], file: TextIO | None = None) -> None:
+    ttfr = summary.get("time_to_first_result_s")
+    if ttfr is None:
+        print(f"Startup profile of {summary['script']} (no result after {summary['elapsed_s']:.2f}s):", file=file)
+    else:
+        print(f"Startup profile of {summary['script']}:", file=file)
+    for row in summary["phases"]:
+        print(f"  {row['seconds'] * 1000:9.1f} ms {row['share'] * 100:5.1f}%  {row['name']}", file=file)
+    if ttfr is not None:
+        since = "process start" if summary.get("interpreter_launch_s") is not None else "the first import"
+        print(f"  Time to first result: {ttfr * 1000:.0f} ms since {since}", file=file)
+    if summary.get("import_functions"):
+        print("  Slowest Python functions during imports (self / cumulative ms):", file=file)
+        for entry in summary["import_functions"]:
+            print(
+                f"    {entry['self_s'] * 1000:8.1f} / {entry['cumulative_s'] * 1000:8.1f}  {entry['function']}",
+                file=file,
+            )
+    if summary.get("import_tree"):
+        print("  Slowest module imports in a fresh interpreter (self / cumulative ms):", file=file)
+        for entry in summary["import_tree"]:
+            print(
+                f"    {entry['self_us'] / 1000:8.1f} / {entry['cumulative_us'] / 1000:8.1f}  {entry['module']}",
+                file=file,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "trace",
+        type=Path,
+        help="Trace written by a validator's --profile-startup run.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the recorded summary as JSON.",
+    )
+    args = parser.parse_args()
+    try:
+        summary = json.loads(args.trace.expanduser().read_text(encoding="utf-8"))["otherData"]
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise SystemExit(f"Cannot read a startup trace from {args.trace}: {exc}") from exc
+    if args.json:
+        print(json.dumps(summary, sort_keys=True))
+    else:
+        print_startup_summary(summary)
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
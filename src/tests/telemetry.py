@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""Sample CPU, memory, thermal and clock telemetry in the background during validation runs.
+
+Readings come from /proc and /sys, plus jtop or tegrastats when either is available. Every
+sample is stamped with time.perf_counter_ns(), the clock the validators time frames with, so
+samples line up with per-frame timings. The /proc and /sys roots are configurable so fixture
+trees can stand in for a real Jetson.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import re
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from script_log import run_main
+
+
+# Where GPU load and rail power come from besides /proc and /sys.
+EXTRA_SOURCES = ("auto", "jtop", "tegrastats", "none")
+MEMINFO_KEYS = ("MemTotal", "MemAvailable", "SwapTotal", "SwapFree")
+TEGRASTATS_GPU = re.compile(r"GR3D_FREQ (\d+)%")
+TEGRASTATS_POWER = re.compile(r"(\w+) (\d+)mW/\d+mW")
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace").strip()
+    except OSError:
+        return ""
+
+
+def _read_int(path: Path) -> int | None:
+    value = _read(path)
+    return int(value) if value.lstrip("-").isdigit() else None
+
+
+def read_cpu_times(proc_root: Path) -> Dict[str, Tuple[int, int]]:
+    """Busy and total jiffies for the ``cpu`` and ``cpuN`` lines of /proc/stat."""
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in _read(proc_root / "stat").splitlines():
+        if not line.startswith("cpu"):
+            continue
+        name, *values = line.split()
+        numbers = [int(value) for value in values[:8]]
+        # idle + iowait; guest time is already counted in user and nice.
+        idle = sum(numbers[3:5])
+        total = sum(numbers)
+        times[name] = (total - idle, total)
+    return times
+
+
+def cpu_percent(previous: Dict[str, Tuple[int, int]], current: Dict[str, Tuple[int, int]]) -> Dict[str, float]:
+    usage: Dict[str, float] = {}
+    for name, (busy, total) in current.items():
+        if name not in previous:
+            continue
+        elapsed = total - previous[name][1]
+        usage[name] = 100.0 * (busy - previous[name][0]) / elapsed if elapsed > 0 else 0.0
+    return usage
+
+
+def read_meminfo(proc_root: Path) -> Dict[str, int]:
+    """The MEMINFO_KEYS fields of /proc/meminfo, in kB."""
+    info: Dict[str, int] = {}
+    for line in _read(proc_root / "meminfo").splitlines():
+        key, _, rest = line.partition(":")
+        if key in MEMINFO_KEYS and rest.split():
+            info[key] = int(rest.split()[0])
+    return info
+
+
+def read_thermal_zones(sys_root: Path) -> Dict[str, float]:
+    """Temperature in degrees Celsius per thermal zone, keyed by zone type."""
+    zones: Dict[str, float] = {}
+    for zone in sorted((sys_root / "class" / "thermal").glob("thermal_zone*")):
+        millidegrees = _read_int(zone / "temp")
+        if millidegrees is not None:
+            zones[_read(zone / "type") or zone.name] = millidegrees / 1000.0
+    return zones
+
+
+def read_cpufreq(sys_root: Path) -> Dict[str, Tuple[int, int]]:
+    """Current and maximum clock in kHz per CPU with a cpufreq policy."""
+    clocks: Dict[str, Tuple[int, int]] = {}
+    for policy in sorted((sys_root / "devices" / "system" / "cpu").glob("cpu[0-9]*/cpufreq")):
+        current = _read_int(policy / "scaling_cur_freq")
+        maximum = _read_int(policy / "cpuinfo_max_freq")
+        if current is not None and maximum:
+            clocks[policy.parent.name] = (current, maximum)
+    return clocks
+
+
+def read_devfreq(sys_root: Path) -> Dict[str, Tuple[int, int]]:
+    """Current and maximum clock in Hz per devfreq device (the GPU and EMC on Jetson)."""
+    clocks: Dict[str, Tuple[int, int]] = {}
+    for device in sorted((sys_root / "class" / "devfreq").glob("*")):
+        current = _read_int(device / "cur_freq")
+        maximum = _read_int(device / "max_freq")
+        if current is not None and maximum:
+            clocks[device.name] = (current, maximum)
+    return clocks
+
+
+def parse_tegrastats(line: str) -> Dict[str, Any]:
+    """GPU load and instantaneous rail power from one tegrastats line."""
+    parsed: Dict[str, Any] = {}
+    gpu = TEGRASTATS_GPU.search(line)
+    if gpu:
+        parsed["gpu_percent"] = float(gpu.group(1))
+    power = {rail: int(milliwatts) for rail, milliwatts in TEGRASTATS_POWER.findall(line)}
+    if power:
+        parsed["power_mw"] = power
+    return parsed
+
+
+def parse_jtop_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """GPU load and rail power from ``jtop().stats``; other keys duplicate /proc and /sys."""
+    parsed: Dict[str, Any] = {}
+    if isinstance(stats.get("GPU"), (int, float)):
+        parsed["gpu_percent"] = float(stats["GPU"])
+    power = {
+        key[len("Power ") :]: int(value)
+        for key, value in stats.items()
+        if key.startswith("Power ") and isinstance(value, (int, float))
+    }
+    if power:
+        parsed["power_mw"] = power
+    return parsed
+
+
+class TelemetrySampler:
+    """Background thread that takes one telemetry sample every ``interval`` seconds."""
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        proc_root: Path = Path("/proc"),
+        sys_root: Path = Path("/sys"),
+        extra: str = "auto",
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        if interval <= 0:
+            raise SystemExit("Telemetry interval must be positive.")
+        self.interval = interval
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.extra = extra
+        self.clock = clock
+        self.source = "none"
+        self.samples: List[Dict[str, Any]] = []
+        self._previous_cpu: Dict[str, Tuple[int, int]] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._jtop: Any = None
+        self._tegrastats: subprocess.Popen | None = None
+        self._tegrastats_line = ""
+        self._cost_ns = 0
+
+    def __enter__(self) -> "TelemetrySampler":
+        return self.start()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.stop()
+
+    def start(self) -> "TelemetrySampler":
+        self._previous_cpu = read_cpu_times(self.proc_root)
+        self._open_extra()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        # A last sample so runs shorter than one interval still have data.
+        self.samples.append(self.sample())
+        if self._jtop is not None:
+            self._jtop.close()
+            self._jtop = None
+        if self._tegrastats is not None:
+            self._tegrastats.terminate()
+            self._tegrastats.wait()
+            self._tegrastats = None
+
+    def _open_extra(self) -> None:
+        if self.extra in ("auto", "jtop"):
+            try:
+                from jtop import jtop  # type: ignore import-not-found
+
+                handle = jtop()
+                handle.start()
+                self._jtop, self.source = handle, "jtop"
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                if self.extra == "jtop":
+                    raise SystemExit(
+                        "jtop is not available; install it with router_jtop.sh and make sure jtop.service runs."
+                    ) from exc
+        if self.extra in ("auto", "tegrastats"):
+            binary = shutil.which("tegrastats")
+            if binary:
+                self._tegrastats = subprocess.Popen(
+                    [binary, "--interval", str(max(int(self.interval * 1000), 100))],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                )
+                threading.Thread(target=self._follow_tegrastats, name="tegrastats", daemon=True).start()
+                self.source = "tegrastats"
+            elif self.extra == "tegrastats":
+                raise SystemExit("tegrastats was requested but is not on PATH.")
+
+    def _follow_tegrastats(self) -> None:
+        process = self._tegrastats
+        if process is None or process.stdout is None:
+            return
+        for line in process.stdout:
+            self._tegrastats_line = line
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.samples.append(self.sample())
+
+    def sample(self) -> Dict[str, Any]:
+        """Read every source once; also usable without the background thread."""
+        started = time.perf_counter_ns()
+        cpu_times = read_cpu_times(self.proc_root)
+        usage = cpu_percent(self._previous_cpu, cpu_times)
+        self._previous_cpu = cpu_times
+        memory = read_meminfo(self.proc_root)
+        cpu_clocks = read_cpufreq(self.sys_root)
+        sample: Dict[str, Any] = {
+            "t_ns": self.clock(),
+            "cpu_percent": usage.get("cpu"),
+            "cpu_core_percent": [usage[name] for name in cpu_times if name != "cpu" and name in usage],
+            "mem_available_mb": memory["MemAvailable"] / 1024 if "MemAvailable" in memory else None,
+            "mem_used_percent": (
+                100.0 * (1 - memory["MemAvailable"] / memory["MemTotal"])
+                if memory.get("MemTotal") and "MemAvailable" in memory
+                else None
+            ),
+            "swap_used_mb": (
+                (memory["SwapTotal"] - memory.get("SwapFree", 0)) / 1024 if "SwapTotal" in memory else None
+            ),
+            "temps_c": read_thermal_zones(self.sys_root),
+            "cpu_mhz": {name: current / 1000 for name, (current, _) in cpu_clocks.items()},
+            # Below 1.0 means some core ran under its maximum clock (DVFS or throttling).
+            "cpu_clock_ratio": (
+                min(current / maximum for current, maximum in cpu_clocks.values()) if cpu_clocks else None
+            ),
+            "devfreq_mhz": {name: current / 1e6 for name, (current, _) in read_devfreq(self.sys_root).items()},
+        }
+        if self._jtop is not None:
+            sample.update(parse_jtop_stats(self._jtop.stats))
+        elif self._tegrastats_line:
+            sample.update(parse_tegrastats(self._tegrastats_line))
+        self._cost_ns += time.perf_counter_ns() - started
+        return sample
+
+    def summary(self) -> Dict[str, Any]:
+        samples = self.samples
+        return {
+            "samples": len(samples),
+            "interval_s": self.interval,
+            "source": self.source,
+            "sampler_cost_ms": self._cost_ns / len(samples) / 1e6 if samples else 0.0,
+            "cpu_percent": _mean_max(sample.get("cpu_percent") for sample in samples),
+            "gpu_percent": _mean_max(sample.get("gpu_percent") for sample in samples),
+            "mem_available_mb_min": _min(sample.get("mem_available_mb") for sample in samples),
+            "swap_used_mb_max": _max(sample.get("swap_used_mb") for sample in samples),
+            "cpu_clock_ratio_min": _min(sample.get("cpu_clock_ratio") for sample in samples),
+            "temps_c_max": {
+                zone: max(sample["temps_c"][zone] for sample in samples if zone in sample["temps_c"])
+                for zone in dict.fromkeys(zone for sample in samples for zone in sample["temps_c"])
+            },
+            "power_mw_mean": {
+                rail: sum(values) / len(values)
+                for rail in dict.fromkeys(rail for sample in samples for rail in sample.get("power_mw", {}))
+                if (values := [sample["power_mw"][rail] for sample in samples if rail in sample.get("power_mw", {})])
+            },
+        }
+
+
+def _numbers(values: Any) -> List[float]:
+    return [value for value in values if value is not None]
+
+
+def _min(values: Any) -> float | None:
+    numbers = _numbers(values)
+    return min(numbers) if numbers else None
+
+
+def _max(values: Any) -> float | None:
+    numbers = _numbers(values)
+    return max(numbers) if numbers else None
+
+
+def _mean_max(values: Any) -> Dict[str, float] | None:
+    numbers = _numbers(values)
+    return {"mean": sum(numbers) / len(numbers), "max": max(numbers)} if numbers else None
+
+
+def align_with_frames(
+    samples: List[Dict[str, Any]], frame_times_ns: List[int], origin_ns: int | None = None
+) -> List[Dict[str, Any]]:
+    """Add to each sample the frames finished since the previous sample and the resulting FPS.
+
+    ``frame_times_ns`` are perf_counter_ns() stamps taken when each frame finished, so a slow
+    stretch of frames can be read next to the CPU load, clocks and temperatures at that time.
+    """
+    frame_times = sorted(frame_times_ns)
+    origin = origin_ns if origin_ns is not None else (samples[0]["t_ns"] if samples else 0)
+    aligned: List[Dict[str, Any]] = []
+    previous_ns: int | None = None
+    for sample in samples:
+        now = sample["t_ns"]
+        lower = bisect.bisect_right(frame_times, previous_ns) if previous_ns is not None else 0
+        frames = bisect.bisect_right(frame_times, now) - lower
+        aligned.append(
+            {
+                **sample,
+                "t_s": (now - origin) / 1e9,
+                "frames": frames,
+                "fps": frames / ((now - previous_ns) / 1e9) if previous_ns is not None and now > previous_ns else None,
+            }
+        )
+        previous_ns = now
+    return aligned
+
+
+def print_telemetry_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"Telemetry ({summary['samples']} samples every {summary['interval_s']:.2f}s, "
+        f"extra source: {summary['source']}, {summary['sampler_cost_ms']:.2f} ms per sample):"
+    )
+    if summary["cpu_percent"]:
+        print(f"  CPU load      mean {summary['cpu_percent']['mean']:.0f}% | max {summary['cpu_percent']['max']:.0f}%")
+    if summary["gpu_percent"]:
+        print(f"  GPU load      mean {summary['gpu_percent']['mean']:.0f}% | max {summary['gpu_percent']['max']:.0f}%")
+    if summary["cpu_clock_ratio_min"] is not None:
+        print(f"  CPU clock     lowest {summary['cpu_clock_ratio_min'] * 100:.0f}% of maximum")
+    if summary["mem_available_mb_min"] is not None:
+        swap = summary["swap_used_mb_max"]
+        swap_text = f" | swap used max {swap:.0f} MB" if swap is not None else ""
+        print(f"  Memory        available min {summary['mem_available_mb_min']:.0f} MB{swap_text}")
+    if summary["temps_c_max"]:
+        zone, hottest = max(summary["temps_c_max"].items(), key=lambda item: item[1])
+        print(f"  Temperature   hottest {zone} {hottest:.1f} C")
+    if summary["power_mw_mean"]:
+        rails = ", ".join(f"{rail} {milliwatts / 1000:.1f} W" for rail, milliwatts in summary["power_mw_mean"].items())
+        print(f"  Power (mean)  {rails}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to sample (default: %(default)s).")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between samples (default: %(default)s).")
+    parser.add_argument("--proc-root", type=Path, default=Path("/proc"), help="procfs root (default: %(default)s).")
+    parser.add_argument("--sys-root", type=Path, default=Path("/sys"), help="sysfs root (default: %(default)s).")
+    parser.add_argument(
+        "--source",
+        choices=EXTRA_SOURCES,
+        default="auto",
+        help="Where GPU load and rail power come from (default: %(default)s).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the samples and summary as JSON.")
+    args = parser.parse_args()
+
+    sampler = TelemetrySampler(args.interval, args.proc_root, args.sys_root, args.source)
+    with sampler:
+        try:
+            time.sleep(args.duration)
+        except KeyboardInterrupt:
+            pass
+    if args.json:
+        print(json.dumps({"summary": sampler.summary(), "samples": align_with_frames(sampler.samples, [])}, indent=2))
+        return
+    print_telemetry_summary(sampler.summary())
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
@@ -2,51 +2,19 @@
 
 from __future__ import annotations
 
-import datetime
-import os
-import pwd
+import argparse
+import json
 import sys
-import traceback
+import time
 from pathlib import Path
-from typing import Any
-
-def _default_log_dir() -> Path:
-    env_dir = os.environ.get("JETSONIZER_LOG_DIR")
-    if env_dir:
-        return Path(env_dir)
-    user = os.environ.get("SUDO_USER") or os.environ.get("USER")
-    if not user:
-        try:
-            user = pwd.getpwuid(os.getuid()).pw_name
-        except KeyError:
-            user = Path.home().name
-    return Path("/home") / user / ".cache" / "Jetsonizer"
-
-
-LOG_DIR = _default_log_dir()
+from typing import Any, Callable, Dict, List, Tuple
 
+from bench_history import BenchHistory, Recording, add_history_argument
+from script_log import run_main
+from startup_profile import StartupProfiler, add_startup_argument
 
-def _write_log(exc: BaseException) -> Path | None:
-    try:
-        LOG_DIR.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_path = LOG_DIR / f"{Path(__file__).stem}_{timestamp}.log"
-        with log_path.open("w", encoding="utf-8") as handle:
-            handle.write(f"Timestamp: {timestamp}\n")
-            handle.write(f"Script: {Path(__file__).name}\n")
-            handle.write("Traceback:\n")
-            handle.writelines(traceback.format_exception(type(exc), exc, exc.__traceback__))
-        return log_path
-    except Exception:
-        return None
-
-
-def _report_failure(exc: BaseException) -> None:
-    log_path = _write_log(exc)
-    if log_path:
-        print(f"Full error and logs written to {log_path}", file=sys.stderr)
-    else:
-        print(f"Failed to write log file under {LOG_DIR}.", file=sys.stderr)
+STARTUP = StartupProfiler(Path(__file__).stem, heavy_modules=("cv2", "numpy"))
+HISTORY = BenchHistory(Path(__file__).stem)
 
 
 def _safe_call(device_info: Any, attr_name: str, default: Any) -> Any:
@@ -62,11 +30,258 @@ def _safe_call(device_info: Any, attr_name: str, default: Any) -> Any:
     return attr
 
 
-def main() -> None:
+BENCH_RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+BENCH_OPS = ("resize", "cvtColor", "GaussianBlur", "warpAffine", "remap")
+
+
+def _time_ms(func: Callable[[], Any], warmup: int, iters: int) -> float:
+    for _ in range(warmup):
+        func()
+    start = time.perf_counter()
+    for _ in range(iters):
+        func()
+    return (time.perf_counter() - start) * 1e3 / max(iters, 1)
+
+
+def _op_params(cv2: Any, np: Any, width: int, height: int) -> Dict[str, Any]:
+    """Inputs shared by the CPU and CUDA variants so both do identical work."""
+    grid_x, grid_y = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    return {
+        "dsize": (width // 2, height // 2),
+        "size": (width, height),
+        "affine": cv2.getRotationMatrix2D((width / 2, height / 2), 15.0, 1.0),
+        # A mild barrel-style wobble keeps remap from degenerating into a plain copy.
+        "map_x": (grid_x + 4.0 * np.sin(grid_y / 32.0)).astype(np.float32),
+        "map_y": (grid_y + 4.0 * np.cos(grid_x / 32.0)).astype(np.float32),
+    }
+
+
+def _cpu_op(cv2: Any, op: str, params: Dict[str, Any]) -> Callable[[Any], Any]:
+    if op == "resize":
+        return lambda frame: cv2.resize(frame, params["dsize"], interpolation=cv2.INTER_LINEAR)
+    if op == "cvtColor":
+        return lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if op == "GaussianBlur":
+        return lambda frame: cv2.GaussianBlur(frame, (5, 5), 1.5)
+    if op == "warpAffine":
+        return lambda frame: cv2.warpAffine(frame, params["affine"], params["size"])
+    if op == "remap":
+        return lambda frame: cv2.remap(frame, params["map_x"], params["map_y"], cv2.INTER_LINEAR)
+    raise ValueError(f"Unknown benchmark op: {op}")
+
+
+def _cuda_op(cv2: Any, op: str, params: Dict[str, Any], stream: Any) -> Callable[[Any, Any], Any]:
+    """Return fn(gpu_src, gpu_dst) that enqueues the op on stream, writing into gpu_dst."""
+    if op == "resize":
+        return lambda src, dst: cv2.cuda.resize(src, params["dsize"], dst=dst, stream=stream)
+    if op == "cvtColor":
+        return lambda src, dst: cv2.cuda.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=dst, stream=stream)
+    if op == "GaussianBlur":
+        # CUDA filters want four-channel input; the BGRA conversion is part of the op.
+        gauss = cv2.cuda.createGaussianFilter(cv2.CV_8UC4, cv2.CV_8UC4, (5, 5), 1.5)
+        bgra = cv2.cuda_GpuMat()
+
+        def _blur(src: Any, dst: Any) -> Any:
+            cv2.cuda.cvtColor(src, cv2.COLOR_BGR2BGRA, dst=bgra, stream=stream)
+            return gauss.apply(bgra, dst, stream)
+
+        return _blur
+    if op == "warpAffine":
+        return lambda src, dst: cv2.cuda.warpAffine(src, params["affine"], params["size"], dst=dst, stream=stream)
+    if op == "remap":
+        map_x = cv2.cuda_GpuMat()
+        map_y = cv2.cuda_GpuMat()
+        map_x.upload(params["map_x"])
+        map_y.upload(params["map_y"])
+        return lambda src, dst: cv2.cuda.remap(src, map_x, map_y, cv2.INTER_LINEAR, dst=dst, stream=stream)
+    raise ValueError(f"Unknown benchmark op: {op}")
+
+
+def _bench_cuda_op(cv2: Any, op: str, params: Dict[str, Any], frame: Any, warmup: int, iters: int) -> Dict[str, float]:
+    stream = cv2.cuda.Stream()
+    run = _cuda_op(cv2, op, params, stream)
+    gpu_src = cv2.cuda_GpuMat()
+    gpu_dst = cv2.cuda_GpuMat()
+    gpu_src.upload(frame, stream)
+    stream.waitForCompletion()
+
+    def _compute_only() -> None:
+        run(gpu_src, gpu_dst)
+        stream.waitForCompletion()
+
+    host_out: List[Any] = []
+
+    def _end_to_end() -> None:
+        gpu_src.upload(frame, stream)
+        run(gpu_src, gpu_dst)
+        if host_out:
+            gpu_dst.download(stream, host_out[0])
+        else:
+            host_out.append(gpu_dst.download(stream))
+        stream.waitForCompletion()
+
+    return {
+        "cuda_ms_compute": _time_ms(_compute_only, warmup, iters),
+        "cuda_ms_end_to_end": _time_ms(_end_to_end, warmup, iters),
+    }
+
+
+def _cuda_device_count(cv2: Any) -> int:
+    if not hasattr(cv2, "cuda"):
+        return 0
     try:
-        import cv2  # type: ignore import-not-found
-    except Exception as exc:  # pylint: disable=broad-except
-        raise SystemExit(f"Failed to import cv2: {exc}") from exc
+        return int(cv2.cuda.getCudaEnabledDeviceCount())
+    except cv2.error:  # type: ignore[attr-defined]
+        return 0
+
+
+def run_opencv_benchmarks(ops: List[str], resolutions: List[str], warmup: int, iters: int) -> Dict[str, Any]:
+    """Time each op on CPU and, when available, on cv2.cuda with reused GpuMats."""
+    with STARTUP.phase("import cv2", "import"):
+        try:
+            import cv2  # type: ignore import-not-found
+            import numpy as np  # type: ignore import-not-found
+        except Exception as exc:  # pylint: disable=broad-except
+            raise SystemExit(f"Failed to import cv2/numpy: {exc}") from exc
+
+    with STARTUP.phase("CUDA context"):
+        device_count = _cuda_device_count(cv2)
+        if device_count > 0:
+            cv2.cuda.setDevice(0)
+    rng = np.random.default_rng(0)
+    results: List[Dict[str, Any]] = []
+    for resolution in resolutions:
+        width, height = BENCH_RESOLUTIONS[resolution]
+        frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        params = _op_params(cv2, np, width, height)
+        for op in ops:
+            cpu_run = _cpu_op(cv2, op, params)
+            entry: Dict[str, Any] = {
+                "op": op,
+                "resolution": resolution,
+                "cpu_ms": _time_ms(lambda: cpu_run(frame), warmup, iters),
+                "cuda_ms_compute": None,
+                "cuda_ms_end_to_end": None,
+                "speedup_compute": None,
+                "speedup_end_to_end": None,
+                "cuda_error": None if device_count > 0 else "cv2.cuda unavailable",
+            }
+            if device_count > 0:
+                try:
+                    entry.update(_bench_cuda_op(cv2, op, params, frame, warmup, iters))
+                    entry["speedup_compute"] = entry["cpu_ms"] / entry["cuda_ms_compute"]
+                    entry["speedup_end_to_end"] = entry["cpu_ms"] / entry["cuda_ms_end_to_end"]
+                except cv2.error as exc:  # type: ignore[attr-defined]
+                    entry["cuda_error"] = str(exc).strip().splitlines()[-1]
+            results.append(entry)
+            STARTUP.first_result()
+
+    return {
+        "opencv_version": cv2.__version__,
+        "cuda_device_count": device_count,
+        "warmup": warmup,
+        "iters": iters,
+        "results": results,
+    }
+
+
+def print_benchmarks(report: Dict[str, Any]) -> None:
+    def _fmt(value: Any, suffix: str = "") -> str:
+        return f"{value:.2f}{suffix}" if isinstance(value, float) else "--"
+
+    print(
+        f"OpenCV {report['opencv_version']} CPU vs CUDA ({report['cuda_device_count']} CUDA device(s), "
+        f"{report['iters']} iterations):"
+    )
+    print(
+        f"  {'op':<13}{'res':<7}{'cpu ms':>9}{'cuda ms':>9}{'+xfer ms':>10}"
+        f"{'speedup':>9}{'+xfer':>8}"
+    )
+    for entry in report["results"]:
+        line = (
+            f"  {entry['op']:<13}{entry['resolution']:<7}{_fmt(entry['cpu_ms']):>9}"
+            f"{_fmt(entry['cuda_ms_compute']):>9}{_fmt(entry['cuda_ms_end_to_end']):>10}"
+            f"{_fmt(entry['speedup_compute'], 'x'):>9}{_fmt(entry['speedup_end_to_end'], 'x'):>8}"
+        )
+        if entry["cuda_error"]:
+            line += f"  ({entry['cuda_error']})"
+        print(line)
+
+
+def benchmark_metrics(report: Dict[str, Any], run: Recording) -> None:
+    """Add every timing of ``report`` to the history recording ``run``."""
+    for entry in report["results"]:
+        label = f"{entry['op']} {entry['resolution']}"
+        run.add(f"{label} cpu", entry["cpu_ms"], "ms")
+        run.add(f"{label} cuda", entry["cuda_ms_compute"], "ms")
+        run.add(f"{label} cuda+xfer", entry["cuda_ms_end_to_end"], "ms")
+
+
+def _parse_choices(allowed: Tuple[str, ...]) -> Callable[[str], List[str]]:
+    lookup = {item.lower(): item for item in allowed}
+
+    def _parse(value: str) -> List[str]:
+        picked = []
+        for item in value.split(","):
+            key = item.strip().lower()
+            if not key:
+                continue
+            if key not in lookup:
+                raise argparse.ArgumentTypeError(f"{item!r} is not one of {', '.join(allowed)}")
+            picked.append(lookup[key])
+        return picked
+
+    return _parse
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Compare CPU and cv2.cuda timings on synthetic frames instead of only validating CUDA.",
+    )
+    parser.add_argument(
+        "--bench-ops",
+        type=_parse_choices(BENCH_OPS),
+        default=list(BENCH_OPS),
+        help=f"Comma-separated ops to time (default: {','.join(BENCH_OPS)}).",
+    )
+    parser.add_argument(
+        "--bench-resolutions",
+        type=_parse_choices(tuple(BENCH_RESOLUTIONS)),
+        default=list(BENCH_RESOLUTIONS),
+        help=f"Comma-separated frame sizes (default: {','.join(BENCH_RESOLUTIONS)}).",
+    )
+    parser.add_argument(
+        "--bench-warmup",
+        type=int,
+        default=3,
+        help="Untimed iterations before each measurement (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--bench-iters",
+        type=int,
+        default=20,
+        help="Timed iterations per measurement (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the benchmark report as JSON.",
+    )
+    add_startup_argument(parser)
+    add_history_argument(parser)
+    with STARTUP.phase("parse arguments"):
+        return parser.parse_args()
+
+
+def validate_cuda() -> None:
+    with STARTUP.phase("import cv2", "import"):
+        try:
+            import cv2  # type: ignore import-not-found
+        except Exception as exc:  # pylint: disable=broad-except
+            raise SystemExit(f"Failed to import cv2: {exc}") from exc
 
     if not hasattr(cv2, "cuda"):
         raise SystemExit("This OpenCV build does not include CUDA bindings (cv2.cuda missing).")
@@ -79,11 +294,13 @@ def main() -> None:
     if device_count <= 0:
         raise SystemExit("OpenCV reports zero CUDA-enabled devices.")
 
-    try:
-        cv2.cuda.setDevice(0)
-        info = cv2.cuda.DeviceInfo(0)
-    except cv2.error as exc:  # type: ignore[attr-defined]
-        raise SystemExit(f"Unable to initialize CUDA device via OpenCV: {exc}") from exc
+    with STARTUP.phase("CUDA context"):
+        try:
+            cv2.cuda.setDevice(0)
+            info = cv2.cuda.DeviceInfo(0)
+        except cv2.error as exc:  # type: ignore[attr-defined]
+            raise SystemExit(f"Unable to initialize CUDA device via OpenCV: {exc}") from exc
+    STARTUP.first_result()
 
     device_name = _safe_call(info, "name", _safe_call(info, "deviceName", "Unknown"))
     cc_major = _safe_call(info, "majorVersion", _safe_call(info, "major", "N/A"))
@@ -103,14 +320,39 @@ def main() -> None:
     )
 
 
+def main() -> None:
+    args = parse_args()
+    if args.profile_startup:
+        STARTUP.enable(args.profile_startup)
+    HISTORY.enable(not args.no_history)
+    if not args.bench:
+        validation = HISTORY.recording("validation")
+        try:
+            with HISTORY.guard(validation):
+                validate_cuda()
+        finally:
+            STARTUP.finish()
+        validation.add("time to first result", STARTUP.time_to_first_result, "s")
+        HISTORY.save(validation)
+        return
+
+    if args.bench_warmup < 0 or args.bench_iters < 1:
+        raise SystemExit("--bench-warmup must be >= 0 and --bench-iters >= 1.")
+    if not args.bench_ops or not args.bench_resolutions:
+        raise SystemExit("Select at least one op and one resolution to benchmark.")
+
+    run = HISTORY.recording("benchmark", f"warmup {args.bench_warmup} iters {args.bench_iters}")
+    with HISTORY.guard(run):
+        report = run_opencv_benchmarks(args.bench_ops, args.bench_resolutions, args.bench_warmup, args.bench_iters)
+    STARTUP.finish(file=sys.stderr if args.json else None)
+    benchmark_metrics(report, run)
+    run.details.update(opencv_version=report["opencv_version"], cuda_device_count=report["cuda_device_count"])
+    HISTORY.save(run)
+    if args.json:
+        print(json.dumps(report, sort_keys=True))
+    else:
+        print_benchmarks(report)
+
+
 if __name__ == "__main__":
-    try:
-        main()
-    except SystemExit as exc:
-        code = exc.code
-        if (isinstance(code, int) and code != 0) or (not isinstance(code, int) and code is not None):
-            _report_failure(exc)
-        raise
-    except Exception as exc:  # pylint: disable=broad-except
-        _report_failure(exc)
-        raise SystemExit(1) from exc
+    run_main(main, __file__)
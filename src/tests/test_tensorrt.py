@@ -4,53 +4,66 @@
 from __future__ import annotations
 
 import argparse
-import datetime
-import importlib
-import os
-import pwd
+import json
+import signal
+import subprocess
 import sys
-import traceback
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List
-
-def _default_log_dir() -> Path:
-    env_dir = os.environ.get("JETSONIZER_LOG_DIR")
-    if env_dir:
-        return Path(env_dir)
-    user = os.environ.get("SUDO_USER") or os.environ.get("USER")
-    if not user:
-        try:
-            user = pwd.getpwuid(os.getuid()).pw_name
-        except KeyError:
-            user = Path.home().name
-    return Path("/home") / user / ".cache" / "Jetsonizer"
+from typing import Dict, List, Tuple
+
+from bench_history import BenchHistory, add_history_argument
+from script_log import run_main
+from startup_profile import ImportTiming, StartupProfiler, add_startup_argument, parse_importtime
+
+STARTUP = StartupProfiler(Path(__file__).stem)
+HISTORY = BenchHistory(Path(__file__).stem)
 
 
-LOG_DIR = _default_log_dir()
+# Written to stderr by the probe right before the import, so -X importtime entries for the
+# interpreter's own startup and the probe's imports can be told apart from the module's.
+PROBE_MARKER = "jetsonizer-probe: importing"
 
+# Runs inside the probe subprocess: import the module, then report version, wall time and
+# the shared libraries mapped by the import as a single JSON line on stdout.
+PROBE_SOURCE = r"""
+import importlib, json, sys, time
 
-def _write_log(exc: BaseException) -> Path | None:
+def _mapped_libraries():
+    libraries = set()
     try:
-        LOG_DIR.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_path = LOG_DIR / f"{Path(__file__).stem}_{timestamp}.log"
-        with log_path.open("w", encoding="utf-8") as handle:
-            handle.write(f"Timestamp: {timestamp}\n")
-            handle.write(f"Script: {Path(__file__).name}\n")
-            handle.write("Traceback:\n")
-            handle.writelines(traceback.format_exception(type(exc), exc, exc.__traceback__))
-        return log_path
-    except Exception:
-        return None
-
-
-def _report_failure(exc: BaseException) -> None:
-    log_path = _write_log(exc)
-    if log_path:
-        print(f"Full error and logs written to {log_path}", file=sys.stderr)
-    else:
-        print(f"Failed to write log file under {LOG_DIR}.", file=sys.stderr)
+        with open("/proc/self/maps", encoding="utf-8") as handle:
+            for line in handle:
+                parts = line.split(maxsplit=5)
+                if len(parts) == 6 and ".so" in parts[5]:
+                    libraries.add(parts[5].strip())
+    except OSError:
+        pass
+    return libraries
+
+def _resolve_version(module):
+    for attr in ("__version__", "version"):
+        value = getattr(module, attr, None)
+        if value:
+            return str(getattr(value, "__version__", value))
+    return "unknown"
+
+before = _mapped_libraries()
+print(sys.argv[2], file=sys.stderr, flush=True)
+start = time.perf_counter()
+try:
+    module = importlib.import_module(sys.argv[1])
+except Exception as exc:
+    result = {"ok": False, "error": f"{exc.__class__.__name__}: {exc}"}
+else:
+    result = {"ok": True, "version": _resolve_version(module)}
+result["import_seconds"] = time.perf_counter() - start
+result["libraries"] = sorted(_mapped_libraries() - before)
+sys.stdout.flush()
+print("\n" + json.dumps(result))
+"""
+
 
 @dataclass
 class ModuleStatus:
@@ -60,35 +73,113 @@ class ModuleStatus:
     ok: bool
     version: str
     error: str | None = None
+    import_seconds: float | None = None
+    slowest_imports: List[ImportTiming] = field(default_factory=list)
+    libraries: List[str] = field(default_factory=list)
+
+
+def _describe_exit(returncode: int) -> str:
+    if returncode < 0:
+        try:
+            return f"killed by {signal.Signals(-returncode).name}"
+        except ValueError:
+            return f"killed by signal {-returncode}"
+    return f"exited with status {returncode}"
 
 
-def inspect_module(module_name: str) -> ModuleStatus:
-    """Attempt to import a module and capture its version (if available)."""
+def _slowest_imports(stderr: str, top: int) -> Tuple[List[ImportTiming], List[str]]:
+    """Rank the -X importtime entries logged after PROBE_MARKER, i.e. those of the probed module."""
+    _, found, module_stderr = stderr.rpartition(PROBE_MARKER + "\n")
+    if not found:
+        # The probe never reached the import; keep stderr for the error message only.
+        return [], parse_importtime(stderr)[1]
+    timings, other = parse_importtime(module_stderr)
+    return sorted(timings, key=lambda timing: timing.self_us, reverse=True)[:top], other
 
-    def _resolve_version(module: object) -> str:
-        for attr in ("__version__", "version"):
-            value = getattr(module, attr, None)
-            if value:
-                return str(getattr(value, "__version__", value))
-        return "unknown"
 
+def inspect_module(module_name: str, timeout: float = 60.0, top: int = 10) -> ModuleStatus:
+    """Import a module in its own interpreter and capture version, timings and libraries."""
+    command = [sys.executable, "-X", "importtime", "-c", PROBE_SOURCE, module_name, PROBE_MARKER]
     try:
-        module = importlib.import_module(module_name)
-    except Exception as exc:  # pylint: disable=broad-except
+        completed = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+    except subprocess.TimeoutExpired as exc:
+        # The imports that did finish usually point at the one that hangs.
+        stderr = exc.stderr.decode("utf-8", "replace") if isinstance(exc.stderr, bytes) else exc.stderr or ""
         return ModuleStatus(
             name=module_name,
             ok=False,
             version="n/a",
-            error=f"{exc.__class__.__name__}: {exc}",
+            error=f"import did not finish within {timeout:.0f}s",
+            slowest_imports=_slowest_imports(stderr, top)[0],
         )
 
-    return ModuleStatus(name=module_name, ok=True, version=_resolve_version(module))
+    slowest, other_stderr = _slowest_imports(completed.stderr, top)
+    lines = completed.stdout.strip().splitlines()
+    try:
+        probe = json.loads(lines[-1]) if lines else None
+    except ValueError:
+        probe = None
 
+    if completed.returncode != 0 or not isinstance(probe, dict):
+        # The interpreter died mid-import (segfault, abort in a native library, ...).
+        tail = "; ".join(line for line in other_stderr[-3:] if line.strip())
+        error = f"probe {_describe_exit(completed.returncode)}"
+        return ModuleStatus(
+            name=module_name,
+            ok=False,
+            version="n/a",
+            error=f"{error} ({tail})" if tail else error,
+            slowest_imports=slowest,
+        )
+
+    return ModuleStatus(
+        name=module_name,
+        ok=bool(probe.get("ok")),
+        version=probe.get("version", "n/a"),
+        error=probe.get("error"),
+        import_seconds=probe.get("import_seconds"),
+        slowest_imports=slowest,
+        libraries=probe.get("libraries", []),
+    )
 
-def format_status(status: ModuleStatus) -> str:
+
+def inspect_modules(module_names: List[str], timeout: float, top: int) -> List[ModuleStatus]:
+    """Probe every module concurrently; each probe is an independent interpreter."""
+    if not module_names:
+        return []
+    with ThreadPoolExecutor(max_workers=len(module_names)) as pool:
+        return list(pool.map(lambda name: inspect_module(name, timeout, top), module_names))
+
+
+def format_status(status: ModuleStatus, verbose: bool = False) -> str:
     if status.ok:
-        return f"{status.name}: OK (version {status.version})"
-    return f"{status.name}: FAILED to import ({status.error})"
+        line = f"{status.name}: OK (version {status.version})"
+    else:
+        line = f"{status.name}: FAILED to import ({status.error})"
+    if not verbose:
+        return line
+
+    details: List[str] = [line]
+    if status.import_seconds is not None:
+        details.append(
+            f"    import wall time: {status.import_seconds * 1000:.1f} ms, "
+            f"{len(status.libraries)} shared libraries loaded"
+        )
+    if status.slowest_imports:
+        details.append("    slowest imports (self / cumulative ms):")
+        for timing in status.slowest_imports:
+            details.append(
+                f"      {timing.self_us / 1000:8.1f} / {timing.cumulative_us / 1000:8.1f}  {timing.module}"
+            )
+    for library in status.libraries:
+        details.append(f"    lib {library}")
+    return "\n".join(details)
 
 
 def main() -> None:
@@ -99,26 +190,70 @@ def main() -> None:
         default=["tensorrt"],
         help="List of module names to verify (default: %(default)s).",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Seconds to wait for each import probe (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of slowest submodule imports to report (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print import timings and loaded shared libraries for each module.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the module statuses as JSON.",
+    )
+    add_startup_argument(parser)
+    add_history_argument(parser)
+    with STARTUP.phase("parse arguments"):
+        args = parser.parse_args()
+    if args.profile_startup:
+        STARTUP.enable(args.profile_startup)
+    HISTORY.enable(not args.no_history)
+    if args.timeout <= 0:
+        raise SystemExit("--timeout must be positive.")
+    if args.top < 0:
+        raise SystemExit("--top must be zero or positive.")
 
-    statuses: List[ModuleStatus] = [inspect_module(name) for name in args.modules]
+    validation = HISTORY.recording("validation", " ".join(args.modules))
+    # The probes import each module in a child interpreter and already time it with -X importtime.
+    with STARTUP.phase("import probes", "import"), HISTORY.guard(validation):
+        statuses: List[ModuleStatus] = inspect_modules(args.modules, args.timeout, args.top)
+    STARTUP.first_result()
 
-    for status in statuses:
-        print(format_status(status))
+    if args.json:
+        payload: Dict[str, object] = {
+            "modules": [asdict(status) for status in statuses],
+            "total_import_seconds": sum(status.import_seconds or 0.0 for status in statuses),
+        }
+        print(json.dumps(payload, sort_keys=True))
+    else:
+        for status in statuses:
+            print(format_status(status, verbose=args.verbose))
+        if args.verbose:
+            total = sum(status.import_seconds or 0.0 for status in statuses)
+            print(f"Total import wall time: {total * 1000:.1f} ms across {len(statuses)} module(s)")
+    STARTUP.finish(file=sys.stderr if args.json else None)
 
     failed = [status for status in statuses if not status.ok]
+    for status in statuses:
+        validation.add(f"import {status.name}", status.import_seconds, "s")
+        validation.details[status.name] = status.version if status.ok else status.error
+    validation.ok = not failed
+    validation.error = "; ".join(f"{status.name}: {status.error}" for status in failed) or None
+    HISTORY.save(validation)
     if failed:
         raise SystemExit(1)
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except SystemExit as exc:
-        code = exc.code
-        if (isinstance(code, int) and code != 0) or (not isinstance(code, int) and code is not None):
-            _report_failure(exc)
-        raise
-    except Exception as exc:  # pylint: disable=broad-except
-        _report_failure(exc)
-        raise SystemExit(1) from exc
+    run_main(main, __file__)
@@ -3,51 +3,19 @@
 from __future__ import annotations
 
 import argparse
-import datetime
-import os
-import pwd
+import json
 import sys
-import traceback
+import time
 from pathlib import Path
-from typing import Any, Callable, Dict
-
-def _default_log_dir() -> Path:
-    env_dir = os.environ.get("JETSONIZER_LOG_DIR")
-    if env_dir:
-        return Path(env_dir)
-    user = os.environ.get("SUDO_USER") or os.environ.get("USER")
-    if not user:
-        try:
-            user = pwd.getpwuid(os.getuid()).pw_name
-        except KeyError:
-            user = Path.home().name
-    return Path("/home") / user / ".cache" / "Jetsonizer"
-
+from typing import Any, Callable, Dict, List
 
-LOG_DIR = _default_log_dir()
+from bench_history import BenchHistory, Recording, add_history_argument
+from script_log import run_main
+from startup_profile import StartupProfiler, add_startup_argument
 
+STARTUP = StartupProfiler(Path(__file__).stem, heavy_modules=("torch",))
+HISTORY = BenchHistory(Path(__file__).stem)
 
-def _write_log(exc: BaseException) -> Path | None:
-    try:
-        LOG_DIR.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_path = LOG_DIR / f"{Path(__file__).stem}_{timestamp}.log"
-        with log_path.open("w", encoding="utf-8") as handle:
-            handle.write(f"Timestamp: {timestamp}\n")
-            handle.write(f"Script: {Path(__file__).name}\n")
-            handle.write("Traceback:\n")
-            handle.writelines(traceback.format_exception(type(exc), exc, exc.__traceback__))
-        return log_path
-    except Exception:
-        return None
-
-
-def _report_failure(exc: BaseException) -> None:
-    log_path = _write_log(exc)
-    if log_path:
-        print(f"Full error and logs written to {log_path}", file=sys.stderr)
-    else:
-        print(f"Failed to write log file under {LOG_DIR}.", file=sys.stderr)
 
 def _safe_call(func: Callable[[], Any], default: Any) -> Any:
     """Call a zero-arg function and return a default if it raises."""
@@ -59,32 +27,34 @@ def _safe_call(func: Callable[[], Any], default: Any) -> Any:
 
 def gather_torch_cuda_info() -> Dict[str, Any]:
     """Collect PyTorch/CUDA metadata without failing on missing pieces."""
-    try:
-        import torch  # type: ignore import-not-found
-    except Exception as exc:  # pylint: disable=broad-except
-        raise RuntimeError(f"Failed to import torch: {exc}") from exc
+    with STARTUP.phase("import torch", "import"):
+        try:
+            import torch  # type: ignore import-not-found
+        except Exception as exc:  # pylint: disable=broad-except
+            raise RuntimeError(f"Failed to import torch: {exc}") from exc
 
-    cuda_module = getattr(torch, "cuda", None)
-    cuda_runtime = getattr(getattr(torch, "version", None), "cuda", None) or "n/a"
-    cuda_available = bool(getattr(cuda_module, "is_available", lambda: False)())
-
-    device_count = 0
-    device_name = "n/a"
-    device_capability = "n/a"
-    device_memory_mib: Any = "n/a"
-
-    if cuda_available and cuda_module is not None:
-        device_count = int(_safe_call(cuda_module.device_count, 0))
-        if device_count > 0:
-            device_name = _safe_call(lambda: cuda_module.get_device_name(0), "n/a")
-            capability = _safe_call(lambda: cuda_module.get_device_capability(0), None)
-            if isinstance(capability, (tuple, list)) and len(capability) == 2:
-                device_capability = f"{capability[0]}.{capability[1]}"
-
-            properties = _safe_call(lambda: cuda_module.get_device_properties(0), None)
-            total_mem = getattr(properties, "total_memory", None)
-            if isinstance(total_mem, (int, float)):
-                device_memory_mib = int(total_mem) // (1024 * 1024)
+    with STARTUP.phase("CUDA device query"):
+        cuda_module = getattr(torch, "cuda", None)
+        cuda_runtime = getattr(getattr(torch, "version", None), "cuda", None) or "n/a"
+        cuda_available = bool(getattr(cuda_module, "is_available", lambda: False)())
+
+        device_count = 0
+        device_name = "n/a"
+        device_capability = "n/a"
+        device_memory_mib: Any = "n/a"
+
+        if cuda_available and cuda_module is not None:
+            device_count = int(_safe_call(cuda_module.device_count, 0))
+            if device_count > 0:
+                device_name = _safe_call(lambda: cuda_module.get_device_name(0), "n/a")
+                capability = _safe_call(lambda: cuda_module.get_device_capability(0), None)
+                if isinstance(capability, (tuple, list)) and len(capability) == 2:
+                    device_capability = f"{capability[0]}.{capability[1]}"
+
+                properties = _safe_call(lambda: cuda_module.get_device_properties(0), None)
+                total_mem = getattr(properties, "total_memory", None)
+                if isinstance(total_mem, (int, float)):
+                    device_memory_mib = int(total_mem) // (1024 * 1024)
 
     return {
         "version": getattr(torch, "__version__", "unknown"),
@@ -97,24 +67,268 @@ def gather_torch_cuda_info() -> Dict[str, Any]:
     }
 
 
+def create_cuda_context() -> None:
+    """Put a tensor on the first GPU; the device query alone only initializes the driver."""
+    import torch  # type: ignore import-not-found
+
+    torch.zeros(1, device="cuda:0")
+    torch.cuda.synchronize()
+
+
+def _bench_device(torch: Any) -> Any:
+    cuda_module = getattr(torch, "cuda", None)
+    if cuda_module is not None and _safe_call(cuda_module.is_available, False):
+        return torch.device("cuda", 0)
+    return torch.device("cpu")
+
+
+def _time_per_iter(torch: Any, device: Any, func: Callable[[], Any], warmup: int, iters: int) -> float:
+    """Average seconds per call after warm-up, synchronizing the device around the timed loop."""
+
+    def _sync() -> None:
+        if device.type == "cuda":
+            torch.cuda.synchronize(device)
+
+    for _ in range(warmup):
+        func()
+    _sync()
+    start = time.perf_counter()
+    for _ in range(iters):
+        func()
+    _sync()
+    return (time.perf_counter() - start) / max(iters, 1)
+
+
+def bench_gemm(torch: Any, device: Any, sizes: List[int], warmup: int, iters: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for dtype_name in ("fp32", "fp16", "bf16"):
+        dtype = {"fp32": torch.float32, "fp16": torch.float16, "bf16": torch.bfloat16}[dtype_name]
+        for size in sizes:
+            entry: Dict[str, Any] = {"dtype": dtype_name, "size": size}
+            try:
+                lhs = torch.randn(size, size, device=device, dtype=dtype)
+                rhs = torch.randn(size, size, device=device, dtype=dtype)
+                seconds = _time_per_iter(torch, device, lambda: torch.matmul(lhs, rhs), warmup, iters)
+                entry["ms"] = seconds * 1e3
+                entry["tflops"] = 2.0 * size**3 / seconds / 1e12
+            except Exception as exc:  # pylint: disable=broad-except
+                entry["error"] = f"{exc.__class__.__name__}: {exc}"
+            results.append(entry)
+    return results
+
+
+def bench_conv2d(torch: Any, device: Any, warmup: int, iters: int) -> List[Dict[str, Any]]:
+    """ResNet-style 3x3 convolution, reported as images/s and TFLOPS."""
+    batch, channels, height, width, kernel = 8, 64, 56, 56, 3
+    dtypes = ("fp32", "fp16") if device.type == "cuda" else ("fp32",)
+    results: List[Dict[str, Any]] = []
+    for dtype_name in dtypes:
+        dtype = torch.float32 if dtype_name == "fp32" else torch.float16
+        entry: Dict[str, Any] = {
+            "dtype": dtype_name,
+            "shape": f"{batch}x{channels}x{height}x{width}, {kernel}x{kernel}",
+        }
+        try:
+            conv = torch.nn.Conv2d(channels, channels, kernel, padding=1).to(device=device, dtype=dtype)
+            inputs = torch.randn(batch, channels, height, width, device=device, dtype=dtype)
+            with torch.no_grad():
+                seconds = _time_per_iter(torch, device, lambda: conv(inputs), warmup, iters)
+            flops = 2.0 * batch * channels * channels * height * width * kernel * kernel
+            entry["ms"] = seconds * 1e3
+            entry["images_per_s"] = batch / seconds
+            entry["tflops"] = flops / seconds / 1e12
+        except Exception as exc:  # pylint: disable=broad-except
+            entry["error"] = f"{exc.__class__.__name__}: {exc}"
+        results.append(entry)
+    return results
+
+
+def bench_transfers(torch: Any, device: Any, warmup: int, iters: int, mib: int = 64) -> List[Dict[str, Any]]:
+    """Host/device copy bandwidth; on CPU-only hosts this degrades to a memcpy figure."""
+    numel = mib * 1024 * 1024 // 4
+    memory_kinds = ("pageable", "pinned") if device.type == "cuda" else ("pageable",)
+    results: List[Dict[str, Any]] = []
+    for memory in memory_kinds:
+        try:
+            host = torch.empty(numel, dtype=torch.float32, pin_memory=memory == "pinned")
+            target = torch.empty(numel, dtype=torch.float32, device=device)
+        except Exception as exc:  # pylint: disable=broad-except
+            results.append({"memory": memory, "error": f"{exc.__class__.__name__}: {exc}"})
+            continue
+        non_blocking = memory == "pinned"
+        for direction, func in (
+            ("h2d", lambda: target.copy_(host, non_blocking=non_blocking)),
+            ("d2h", lambda: host.copy_(target, non_blocking=non_blocking)),
+        ):
+            seconds = _time_per_iter(torch, device, func, warmup, iters)
+            results.append(
+                {
+                    "direction": direction,
+                    "memory": memory,
+                    "mib": mib,
+                    "gb_per_s": mib * 1024 * 1024 / seconds / 1e9,
+                }
+            )
+    return results
+
+
+def bench_launch_overhead(torch: Any, device: Any, launches: int = 2000) -> Dict[str, Any]:
+    """Microseconds per tiny kernel launch, i.e. the floor under any per-op cost."""
+    tiny = torch.zeros(1, device=device)
+    seconds = _time_per_iter(torch, device, lambda: tiny.add_(1.0), launches // 10, launches)
+    return {"launches": launches, "us_per_launch": seconds * 1e6}
+
+
+def run_torch_benchmarks(sizes: List[int], warmup: int, iters: int) -> Dict[str, Any]:
+    """Measure GEMM, conv2d, copy bandwidth and launch overhead on the best available device."""
+    try:
+        import torch  # type: ignore import-not-found
+    except Exception as exc:  # pylint: disable=broad-except
+        raise RuntimeError(f"Failed to import torch: {exc}") from exc
+
+    device = _bench_device(torch)
+    return {
+        "device": str(device),
+        "warmup": warmup,
+        "iters": iters,
+        "gemm": bench_gemm(torch, device, sizes, warmup, iters),
+        "conv2d": bench_conv2d(torch, device, warmup, iters),
+        "transfers": bench_transfers(torch, device, warmup, iters),
+        "launch_overhead": bench_launch_overhead(torch, device),
+    }
+
+
+def print_benchmarks(bench: Dict[str, Any]) -> None:
+    print(f"Benchmarks on {bench['device']} ({bench['warmup']} warm-up, {bench['iters']} timed iterations):")
+    for entry in bench["gemm"]:
+        label = f"  GEMM {entry['dtype']:<5} {entry['size']:>5}x{entry['size']:<5}"
+        if "error" in entry:
+            print(f"{label} unsupported ({entry['error']})")
+        else:
+            print(f"{label} {entry['tflops']:8.2f} TFLOPS ({entry['ms']:.2f} ms)")
+    for entry in bench["conv2d"]:
+        label = f"  Conv2d {entry['dtype']:<5} {entry['shape']}"
+        if "error" in entry:
+            print(f"{label} unsupported ({entry['error']})")
+        else:
+            print(f"{label}: {entry['images_per_s']:.0f} img/s, {entry['tflops']:.2f} TFLOPS")
+    host_only = " (host memcpy, no CUDA device)" if bench["device"] == "cpu" else ""
+    for entry in bench["transfers"]:
+        if "error" in entry:
+            print(f"  Copy {entry['memory']}: unavailable ({entry['error']})")
+        else:
+            print(
+                f"  Copy {entry['direction'].upper()} {entry['memory']:<8} "
+                f"{entry['gb_per_s']:8.2f} GB/s{host_only}"
+            )
+    overhead = bench["launch_overhead"]
+    print(f"  Kernel launch overhead: {overhead['us_per_launch']:.2f} us")
+
+
+def benchmark_metrics(bench: Dict[str, Any], run: Recording) -> None:
+    """Add every throughput and latency figure of ``bench`` to the history recording ``run``."""
+    for entry in bench["gemm"]:
+        run.add(f"gemm {entry['dtype']} {entry['size']}", entry.get("tflops"), "TFLOPS", higher_is_better=True)
+    for entry in bench["conv2d"]:
+        run.add(f"conv2d {entry['dtype']}", entry.get("images_per_s"), "img/s", higher_is_better=True)
+    for entry in bench["transfers"]:
+        if "error" not in entry:
+            name = f"copy {entry['direction']} {entry['memory']}"
+            run.add(name, entry["gb_per_s"], "GB/s", higher_is_better=True)
+    run.add("kernel launch", bench["launch_overhead"]["us_per_launch"], "us")
+
+
+def _parse_sizes(value: str) -> List[int]:
+    try:
+        sizes = [int(item) for item in value.split(",") if item.strip()]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Expected comma-separated integers, got {value!r}") from exc
+    if not sizes or any(size <= 0 for size in sizes):
+        raise argparse.ArgumentTypeError("Matrix sizes must be positive integers.")
+    return sizes
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
         "--machine-readable",
+        nargs="?",
+        const="pipe",
+        choices=("pipe", "json"),
+        help=(
+            "Emit a summary for shell scripts: 'pipe' (the default when given without a value) "
+            "prints version|cuda_runtime|yes/no, 'json' prints one JSON object including --bench results."
+        ),
+    )
+    parser.add_argument(
+        "--bench",
         action="store_true",
-        help="Emit compact pipe-delimited summary for shell scripts.",
+        help="Measure GEMM/conv2d throughput, copy bandwidth and kernel-launch overhead.",
+    )
+    parser.add_argument(
+        "--bench-sizes",
+        type=_parse_sizes,
+        default=None,
+        help="Comma-separated square GEMM sizes (default: 1024,2048,4096 on CUDA, 256,512,1024 on CPU).",
+    )
+    parser.add_argument(
+        "--bench-warmup",
+        type=int,
+        default=3,
+        help="Untimed iterations before each measurement (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--bench-iters",
+        type=int,
+        default=10,
+        help="Timed iterations per measurement (default: %(default)s).",
     )
-    args = parser.parse_args()
+    add_startup_argument(parser)
+    add_history_argument(parser)
+    with STARTUP.phase("parse arguments"):
+        args = parser.parse_args()
+    if args.profile_startup:
+        STARTUP.enable(args.profile_startup)
+    HISTORY.enable(not args.no_history)
 
-    try:
-        info = gather_torch_cuda_info()
-    except RuntimeError as exc:
-        raise SystemExit(str(exc)) from exc
+    if args.bench_warmup < 0 or args.bench_iters < 1:
+        raise SystemExit("--bench-warmup must be >= 0 and --bench-iters >= 1.")
+
+    validation = HISTORY.recording("validation")
+    with HISTORY.guard(validation):
+        try:
+            info = gather_torch_cuda_info()
+        except RuntimeError as exc:
+            raise SystemExit(str(exc)) from exc
+        if STARTUP.enabled and info["device_count"] > 0:
+            with STARTUP.phase("CUDA context"):
+                create_cuda_context()
+        STARTUP.first_result()
+    STARTUP.finish(file=sys.stderr if args.machine_readable else None)
+    validation.details.update(info)
+    validation.add("time to first result", STARTUP.time_to_first_result, "s")
+    HISTORY.save(validation)
+
+    bench: Dict[str, Any] | None = None
+    if args.bench:
+        sizes = args.bench_sizes or ([1024, 2048, 4096] if info["cuda_available"] else [256, 512, 1024])
+        run = HISTORY.recording("benchmark", f"warmup {args.bench_warmup} iters {args.bench_iters}")
+        with HISTORY.guard(run):
+            try:
+                bench = run_torch_benchmarks(sizes, args.bench_warmup, args.bench_iters)
+            except RuntimeError as exc:
+                raise SystemExit(str(exc)) from exc
+        run.config = f"{bench['device']} {run.config}"
+        benchmark_metrics(bench, run)
+        HISTORY.save(run)
 
     cuda_flag = "yes" if info["cuda_available"] else "no"
-    if args.machine_readable:
+    if args.machine_readable == "pipe":
         print(f"{info['version']}|{info['cuda_runtime']}|{cuda_flag}")
         return
+    if args.machine_readable == "json":
+        print(json.dumps({**info, "bench": bench}, sort_keys=True))
+        return
 
     print(f"PyTorch version: {info['version']}")
     print(f"CUDA runtime reported by torch: {info['cuda_runtime']}")
@@ -129,16 +343,9 @@ def main() -> None:
                     mem=info["device_memory_mib"],
                 )
             )
+    if bench is not None:
+        print_benchmarks(bench)
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except SystemExit as exc:
-        code = exc.code
-        if (isinstance(code, int) and code != 0) or (not isinstance(code, int) and code is not None):
-            _report_failure(exc)
-        raise
-    except Exception as exc:  # pylint: disable=broad-except
-        _report_failure(exc)
-        raise SystemExit(1) from exc
+    run_main(main, __file__)
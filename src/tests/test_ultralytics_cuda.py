@@ -4,55 +4,72 @@ from __future__ import annotations
 
 import argparse
 import datetime
+import hashlib
+import json
+import math
 import os
-import pwd
+import platform
+import queue
+import shutil
+import signal
+import subprocess
 import sys
+import tempfile
+import threading
 import time
-import traceback
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple
-
-def _default_log_dir() -> Path:
-    env_dir = os.environ.get("JETSONIZER_LOG_DIR")
-    if env_dir:
-        return Path(env_dir)
-    user = os.environ.get("SUDO_USER") or os.environ.get("USER")
-    if not user:
-        try:
-            user = pwd.getpwuid(os.getuid()).pw_name
-        except KeyError:
-            user = Path.home().name
-    return Path("/home") / user / ".cache" / "Jetsonizer"
+from typing import Any, Callable, Dict, List, Tuple, Union
 
+from autotune import (
+    DEFAULT_PROFILE,
+    MIN_SAMPLES_BEFORE_PRUNING,
+    TuneCheckpoint,
+    TuneConfig,
+    Target,
+    build_grid,
+    build_profile,
+    load_profile_settings,
+    parse_target,
+    print_autotune_summary,
+    ruled_out_by,
+    select_best,
+    write_profile,
+)
+from bench_history import BenchHistory, add_history_argument
+from script_log import LOG_DIR, run_main
+from startup_profile import StartupProfiler, add_startup_argument
+from telemetry import EXTRA_SOURCES, TelemetrySampler, align_with_frames, print_telemetry_summary
 
-LOG_DIR = _default_log_dir()
+STARTUP = StartupProfiler(Path(__file__).stem, heavy_modules=("cv2", "torch", "ultralytics"))
+HISTORY = BenchHistory(Path(__file__).stem)
 
 
-def _write_log(exc: BaseException) -> Path | None:
-    try:
-        LOG_DIR.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_path = LOG_DIR / f"{Path(__file__).stem}_{timestamp}.log"
-        with log_path.open("w", encoding="utf-8") as handle:
-            handle.write(f"Timestamp: {timestamp}\n")
-            handle.write(f"Script: {Path(__file__).name}\n")
-            handle.write("Traceback:\n")
-            handle.writelines(traceback.format_exception(type(exc), exc, exc.__traceback__))
-        return log_path
-    except Exception:
-        return None
+# Imported by load_opencv() once the arguments are parsed, so --help and argument errors
+# return without loading OpenCV (and NumPy with it).
+cv2: Any = None
 
 
-def _report_failure(exc: BaseException) -> None:
-    log_path = _write_log(exc)
-    if log_path:
-        print(f"Full error and logs written to {log_path}", file=sys.stderr)
-    else:
-        print(f"Failed to write log file under {LOG_DIR}.", file=sys.stderr)
-try:
-    import cv2  # type: ignore import-not-found
-except Exception as exc:  # pylint: disable=broad-except
-    raise SystemExit("OpenCV (cv2) is required to display video output.") from exc
+def load_opencv() -> Any:
+    global cv2  # pylint: disable=global-statement
+    if cv2 is None:
+        try:
+            import cv2 as opencv  # type: ignore import-not-found
+        except Exception as exc:  # pylint: disable=broad-except
+            raise SystemExit("OpenCV (cv2) is required to display video output.") from exc
+        cv2 = opencv
+    return cv2
+
+
+VideoSource = Union[Path, int, str]
+
+LIVE_URL_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+DECODER_CHOICES = ("auto", "cpu", "gstreamer")
+# Jetson hardware decode (NVDEC) and the VIC-backed converter out of NVMM memory.
+JETSON_DECODE_ELEMENTS = ("nvv4l2decoder", "nvvidconv")
+# inference_daemon.DEFAULT_SOCKET; that module is only imported for --serve/--client.
+DAEMON_SOCKET = LOG_DIR / "inference.sock"
 
 
 def _default_video_path() -> Path:
@@ -60,8 +77,29 @@ def _default_video_path() -> Path:
     return Path(__file__).resolve().parents[1] / "video.mp4"
 
 
-def should_draw_overlay(mode: str, video_path: Path) -> bool:
+def parse_video_source(value: str) -> VideoSource:
+    """Interpret --video as a webcam index, GStreamer pipeline, stream URL or file path."""
+    stripped = value.strip()
+    if stripped.isdigit():
+        return int(stripped)
+    if "!" in stripped or stripped.lower().startswith(LIVE_URL_SCHEMES):
+        return stripped
+    return Path(stripped).expanduser().resolve()
+
+
+def is_gstreamer_pipeline(source: VideoSource) -> bool:
+    return isinstance(source, str) and "!" in source
+
+
+def is_live_source(source: VideoSource) -> bool:
+    """Cameras, GStreamer pipelines and network streams produce frames on their own clock."""
+    return not isinstance(source, Path)
+
+
+def should_draw_overlay(mode: str, video_path: VideoSource) -> bool:
     """Decide whether to draw new annotations based on the CLI mode and input video."""
+    if not isinstance(video_path, Path):
+        return mode != "never"
     resolved = video_path.resolve()
     default_video = _default_video_path().resolve()
     if mode == "always":
@@ -96,15 +134,78 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--video",
-        type=Path,
-        default=_default_video_path(),
-        help="Video file to read (default: %(default)s).",
+        nargs="+",
+        default=[str(_default_video_path())],
+        help=(
+            "One or more video files, webcam indices (e.g. 0), stream URLs (rtsp://...) or "
+            "GStreamer pipelines ending in appsink. Several sources share one model "
+            "(default: %(default)s)."
+        ),
     )
     parser.add_argument(
         "--model",
         default="yolo11x.pt",
         help="YOLOv11 weights to use (default: %(default)s).",
     )
+    parser.add_argument(
+        "--backend",
+        choices=("torch", "onnx", "engine"),
+        default="torch",
+        help=(
+            "Inference backend. 'onnx' and 'engine' export the weights once and reuse the "
+            "cached artifact on later runs (default: %(default)s)."
+        ),
+    )
+    parser.add_argument(
+        "--imgsz",
+        type=int,
+        default=640,
+        help="Inference (and export) input size in pixels (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--precision",
+        nargs="+",
+        choices=PRECISION_CHOICES,
+        default=["fp32"],
+        help=(
+            "Inference precision; fp16 and int8 need CUDA and int8 needs --backend engine, "
+            "calibrated on frames sampled from --video. Give several (e.g. fp32 fp16 int8) to "
+            "run each over the same frames at batch size 1 and report throughput, latency and "
+            "detection agreement against fp32 (default: %(default)s)."
+        ),
+    )
+    parser.add_argument(
+        "--calibration-frames",
+        type=int,
+        default=128,
+        help="Frames sampled from the video for INT8 calibration (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--agreement-iou",
+        type=float,
+        default=0.5,
+        help="IoU at which a detection matches the fp32 reference (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--precision-report",
+        type=Path,
+        help=(
+            "Rebuild the precision comparison from a recorded *_precision_*.json file and exit. "
+            "Needs neither a GPU nor the model."
+        ),
+    )
+    parser.add_argument(
+        "--engine-cache-dir",
+        type=Path,
+        default=LOG_DIR / "engines",
+        help="Directory holding exported ONNX/TensorRT artifacts (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--engine-cache-max-gb",
+        type=float,
+        default=10.0,
+        help="Evict least-recently-used exports beyond this size (default: %(default)s).",
+    )
     parser.add_argument(
         "--device",
         default="auto",
@@ -127,6 +228,276 @@ def parse_args() -> argparse.Namespace:
         default="Ultralytics YOLO11m",
         help="Window title for the annotated video display.",
     )
+    parser.add_argument(
+        "--pipeline",
+        choices=("serial", "threaded"),
+        default="serial",
+        help=(
+            "'serial' decodes, infers and displays one step at a time; 'threaded' runs "
+            "capture, inference and display as separate stages (default: %(default)s)."
+        ),
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=4,
+        help="Depth of the bounded queues between threaded pipeline stages (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help=(
+            "Always infer on the newest frame and drop stale ones so latency stays bounded "
+            "on cameras and RTSP streams."
+        ),
+    )
+    parser.add_argument(
+        "--scheduler",
+        choices=("round-robin", "batch"),
+        default="round-robin",
+        help=(
+            "How several --video sources share the model: one ready stream per predict "
+            "call in turn, or one frame from every ready stream batched together "
+            "(default: %(default)s)."
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help=(
+            "Number of decoded frames grouped into one predict call. Larger batches raise "
+            "throughput at the cost of per-frame latency (default: %(default)s)."
+        ),
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Do not open a window; frames are processed but never displayed.",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help=(
+            "Time decode, preprocess, predict, postprocess and sink per frame and write "
+            "p50/p90/p99/max latencies plus throughput as JSON under the log directory."
+        ),
+    )
+    parser.add_argument(
+        "--warmup-frames",
+        type=int,
+        default=10,
+        help="Frames excluded from --benchmark statistics (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help=(
+            "Load the model once, keep it warm and serve predict requests from --client runs "
+            "over --daemon-socket until stopped."
+        ),
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help=(
+            "Send frames to a running --serve daemon instead of loading the model; skips the "
+            "torch/Ultralytics import, weight loading and warm-up."
+        ),
+    )
+    parser.add_argument(
+        "--daemon-socket",
+        type=Path,
+        default=DAEMON_SOCKET,
+        help="Unix socket of the inference daemon (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--daemon-max-batch",
+        type=int,
+        default=8,
+        help="Most frames the daemon batches into one predict call across clients (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--daemon-batch-window-ms",
+        type=float,
+        default=2.0,
+        help="How long the daemon waits for more requests to batch with the first (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--daemon-queue",
+        type=int,
+        default=64,
+        help="Pending requests the daemon accepts before rejecting new ones (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--telemetry",
+        action="store_true",
+        help=(
+            "Sample CPU load, memory, temperatures and clocks (plus GPU load and power from "
+            "jtop/tegrastats) in the background and add them, lined up with the per-frame "
+            "timings, to the --benchmark report (implies --benchmark)."
+        ),
+    )
+    parser.add_argument(
+        "--telemetry-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between telemetry samples (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--telemetry-source",
+        choices=EXTRA_SOURCES,
+        default="auto",
+        help="Where GPU load and rail power come from (default: %(default)s).",
+    )
+    add_startup_argument(parser)
+    add_history_argument(parser)
+    parser.add_argument(
+        "--decoder",
+        choices=DECODER_CHOICES,
+        default="auto",
+        help=(
+            "Video decode backend: 'gstreamer' decodes files and RTSP streams on the Jetson "
+            "hardware decoder, 'cpu' uses OpenCV's software path, 'auto' (default) uses the "
+            "hardware path when available and falls back to the CPU otherwise."
+        ),
+    )
+    parser.add_argument(
+        "--fast-preprocess",
+        action="store_true",
+        help=(
+            "Decode into reused frames and letterbox/normalize into preallocated, pinned "
+            "buffers on the inference device instead of Ultralytics' per-frame copies. "
+            "Reports allocations and bytes copied per frame (serial pipeline only)."
+        ),
+    )
+    parser.add_argument(
+        "--detect-every",
+        type=int,
+        default=1,
+        help=(
+            "Run the detector on every Nth frame only and move the boxes in between with a "
+            "Kalman/IoU tracker (default: %(default)s, detect on every frame; serial pipeline only)."
+        ),
+    )
+    parser.add_argument(
+        "--detect-min-confidence",
+        type=float,
+        default=None,
+        help=(
+            "With --detect-every, also run the detector as soon as the tracker's confidence "
+            "(how well its last prediction matched and how stale it is) drops below this."
+        ),
+    )
+    parser.add_argument(
+        "--tracker-iou",
+        type=float,
+        default=0.3,
+        help="IoU a detection needs with a tracked box to continue its track (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--drift-reference",
+        action="store_true",
+        help=(
+            "With --detect-every, first detect on every frame of the video file and report how far "
+            "the tracked boxes drift from those detections."
+        ),
+    )
+    parser.add_argument(
+        "--autotune",
+        action="store_true",
+        help=(
+            "Sweep --autotune-models x --autotune-imgsz x --autotune-batch x --autotune-precision "
+            "on frames from --video and write the best configuration per --autotune-target to "
+            "--autotune-profile. Interrupted sweeps resume from their checkpoint."
+        ),
+    )
+    parser.add_argument(
+        "--autotune-models",
+        nargs="+",
+        default=None,
+        help="Weights to try, smallest first (default: --model).",
+    )
+    parser.add_argument(
+        "--autotune-imgsz",
+        type=int,
+        nargs="+",
+        default=[320, 480, 640],
+        help="Input sizes to try (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--autotune-batch",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="Batch sizes to try (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--autotune-precision",
+        nargs="+",
+        choices=PRECISION_CHOICES,
+        default=None,
+        help="Precisions to try (default: every one the device and --backend support).",
+    )
+    parser.add_argument(
+        "--autotune-target",
+        type=parse_target,
+        action="append",
+        default=None,
+        help=(
+            "Budget to pick a configuration for, as [name:]fps=N, [name:]latency=MS (p90 per frame) "
+            "or both, comma-separated; repeat for several targets (default: fps=30)."
+        ),
+    )
+    parser.add_argument(
+        "--autotune-warmup",
+        type=int,
+        default=5,
+        help="Untimed predict calls per configuration (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--autotune-iters",
+        type=int,
+        default=30,
+        help=(
+            "Timed predict calls per configuration; a configuration that cannot meet any target "
+            "stops early (default: %(default)s)."
+        ),
+    )
+    parser.add_argument(
+        "--autotune-checkpoint",
+        type=Path,
+        default=None,
+        help="Checkpoint file (default: one per sweep under the log directory's autotune/ folder).",
+    )
+    parser.add_argument(
+        "--autotune-restart",
+        action="store_true",
+        help="Discard the sweep's checkpoint and measure every configuration again.",
+    )
+    parser.add_argument(
+        "--autotune-profile",
+        type=Path,
+        default=DEFAULT_PROFILE,
+        help="Where --autotune writes the deployment profile (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--deploy-profile",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_PROFILE,
+        default=None,
+        help=(
+            "Take --model, --imgsz, --batch-size, --precision and --backend from a profile written "
+            "by --autotune; flags given explicitly still win (default when given without a path: "
+            f"{DEFAULT_PROFILE})."
+        ),
+    )
+    parser.add_argument(
+        "--deploy-target",
+        default=None,
+        help="Profile target to load (default: the profile's first target with a configuration).",
+    )
     parser.add_argument(
         "--overlay-mode",
         choices=("auto", "always", "never"),
@@ -136,20 +507,34 @@ def parse_args() -> argparse.Namespace:
             "'auto' skips drawing when the bundled, pre-annotated sample video is used."
         ),
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.deploy_target and not args.deploy_profile:
+        parser.error("--deploy-target needs --deploy-profile.")
+    if args.deploy_profile:
+        # Profile values become defaults, so anything given on the command line overrides them.
+        settings = load_profile_settings(args.deploy_profile.expanduser(), args.deploy_target)
+        parser.set_defaults(**settings)
+        args = parser.parse_args()
+        print(
+            f"Deployment profile {args.deploy_profile}: {args.model} imgsz {args.imgsz} "
+            f"batch {args.batch_size} {' '.join(args.precision)} ({args.backend} backend)."
+        )
+    return args
 
 
 def resolve_device(requested: str) -> Tuple[str, bool]:
     """Resolve device string, preferring CUDA when available."""
-    try:
-        import torch  # type: ignore import-not-found
-    except Exception as exc:  # pylint: disable=broad-except
-        raise SystemExit("PyTorch is required for YOLO inference.") from exc
+    with STARTUP.phase("import torch", "import"):
+        try:
+            import torch  # type: ignore import-not-found
+        except Exception as exc:  # pylint: disable=broad-except
+            raise SystemExit("PyTorch is required for YOLO inference.") from exc
 
     def _has_cuda() -> bool:
         cuda_mod = getattr(torch, "cuda", None)
         is_available = getattr(cuda_mod, "is_available", lambda: False)
-        return bool(is_available())
+        with STARTUP.phase("CUDA device query"):
+            return bool(is_available())
 
     normalized = requested.strip().lower()
     if normalized in {"auto", ""}:
@@ -164,139 +549,2572 @@ def resolve_device(requested: str) -> Tuple[str, bool]:
     return requested, normalized.startswith("cuda")
 
 
-def load_model(weights: str, device: str) -> "YOLO":  # type: ignore[name-defined]
-    """Load YOLO weights and move them to the selected device."""
+@dataclass(frozen=True)
+class ExportSpec:
+    """Everything that changes the bytes of an exported ONNX model or TensorRT engine."""
+
+    weights: Path
+    backend: str
+    imgsz: int
+    batch: int
+    precision: str
+    device: str
+    # INT8 only: content key of the calibration set and where its images live.
+    calibration: str = ""
+    calibration_dir: Path | None = None
+
+
+@dataclass
+class CacheOutcome:
+    artifact: Path
+    key: str
+    hit: bool
+    export_seconds: float = 0.0
+    evicted: List[str] = field(default_factory=list)
+
+
+ARTIFACT_SUFFIXES = {"onnx": ".onnx", "engine": ".engine"}
+PRECISION_CHOICES = ("fp32", "fp16", "int8")
+CALIBRATION_DIR = LOG_DIR / "calibration"
+# Frames per precision when comparing and --max-frames is not set.
+PRECISION_COMPARE_FRAMES = 300
+
+
+def _tensorrt_version() -> str:
+    try:
+        import tensorrt  # type: ignore import-not-found
+    except Exception:  # pylint: disable=broad-except
+        return "none"
+    return str(getattr(tensorrt, "__version__", "unknown"))
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+
+
+def ultralytics_exporter(spec: ExportSpec, workdir: Path) -> Path:
+    """Export weights with Ultralytics inside workdir and return the artifact path."""
     try:
         from ultralytics import YOLO  # type: ignore import-not-found
     except Exception as exc:  # pylint: disable=broad-except
         raise SystemExit("Ultralytics package is required (pip install ultralytics).") from exc
 
-    model = YOLO(weights)
-    # YOLO.to is a no-op on CPU but keeps the API consistent.
-    model.to(device)
-    return model
+    # Export from a private copy so the artifact never lands next to the user's weights.
+    local_weights = workdir / spec.weights.name
+    shutil.copy2(spec.weights, local_weights)
+    model = YOLO(str(local_weights))
+    export_args: Dict[str, Any] = dict(
+        format=spec.backend,
+        imgsz=spec.imgsz,
+        batch=spec.batch,
+        half=spec.precision == "fp16",
+        dynamic=spec.batch > 1,
+        device=spec.device,
+    )
+    calibration_cache = local_cache = None
+    if spec.precision == "int8":
+        if spec.calibration_dir is None:
+            raise SystemExit("INT8 export needs a calibration set.")
+        export_args.update(int8=True, data=str(write_calibration_data(spec.calibration_dir, model.names, workdir)))
+        # The TensorRT calibrator reads and writes its cache next to the weights being exported.
+        calibration_cache = spec.calibration_dir / calibration_cache_name(spec)
+        local_cache = local_weights.with_suffix(".cache")
+        if calibration_cache.is_file():
+            shutil.copy2(calibration_cache, local_cache)
+    exported = model.export(**export_args)
+    if calibration_cache is not None and local_cache is not None and local_cache.is_file():
+        shutil.copy2(local_cache, calibration_cache)
+    return Path(exported)
 
 
-def ensure_window(title: str) -> None:
-    """Create the OpenCV window once so we can report display issues early."""
-    try:
-        cv2.namedWindow(title, cv2.WINDOW_NORMAL)
-    except cv2.error as exc:
-        raise SystemExit(
-            "Failed to open a GUI window. Ensure you have a display (e.g. set DISPLAY)."
-        ) from exc
+def calibration_cache_name(spec: ExportSpec) -> str:
+    """Calibration scales depend on the network, input size and TensorRT, not on batch."""
+    return f"{_file_sha256(spec.weights)[:16]}-{spec.imgsz}-trt{_tensorrt_version()}.cache"
 
 
-def stream_video(
-    video_path: Path,
-    model: "YOLO",  # type: ignore[name-defined]
-    model_label: str,
-    device: str,
-    confidence: float,
-    max_frames: int,
-    window_title: str,
-    draw_annotations: bool,
-) -> None:
-    """Read frames, run YOLO, and display annotated video."""
-    cap = cv2.VideoCapture(str(video_path))
-    if not cap.isOpened():
-        raise SystemExit(f"Failed to open video file: {video_path}")
+def write_calibration_data(calibration_dir: Path, names: Dict[int, str], workdir: Path) -> Path:
+    """Write the dataset file Ultralytics' INT8 export reads its calibration images from."""
+    # JSON is valid YAML, so no YAML writer is needed.
+    data = {"path": str(calibration_dir), "train": "images", "val": "images", "names": dict(names)}
+    data_path = workdir / "calibration.yaml"
+    data_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    return data_path
 
-    print(f"Streaming {video_path} with {model_label} on {device}. Press 'q' or ESC to stop.")
 
-    ensure_window(window_title)
+def calibration_indices(total: int, frames: int) -> List[int]:
+    """Indices of ``frames`` evenly spaced frames out of ``total`` (the first ``frames`` if unknown)."""
+    step = max(total // frames, 1) if total > 0 else 1
+    return list(range(0, step * frames, step))
 
-    frame_count = 0
-    prev_time = time.perf_counter()
-    fps_value = 0.0
-    try:
-        while True:
-            ok, frame = cap.read()
-            if not ok or frame is None:
-                break
 
-            frame_count += 1
-            results = model.predict(
-                frame,
-                device=device,
-                conf=confidence,
-                verbose=False,
-            )
+def prepare_calibration_set(video_path: Path, frames: int, root: Path = CALIBRATION_DIR) -> Tuple[str, Path]:
+    """Sample ``frames`` evenly spaced frames from the video once and reuse them on later runs.
 
-            if not results:
-                annotated = frame
-            elif draw_annotations:
-                # Annotate in-place to avoid stacking on top of pre-annotated footage.
-                annotated = results[0].plot()  # Ultralytics already copies the frame.
-            else:
-                annotated = frame
-
-            now = time.perf_counter()
-            elapsed = now - prev_time
-            prev_time = now
-            if elapsed > 0:
-                instant_fps = 1.0 / elapsed
-                fps_value = instant_fps if fps_value == 0.0 else (0.85 * fps_value + 0.15 * instant_fps)
-            overlay_fps_text(annotated, fps_value)
-
-            cv2.imshow(window_title, annotated)
-            key = cv2.waitKey(1) & 0xFF
-            if key in (ord("q"), 27):  # ESC or q
-                break
+    The set is keyed by the video's identity, so the TensorRT calibration cache stored next
+    to it stays valid for as long as the video does.
+    """
+    stat = video_path.stat()
+    identity = {
+        "video": str(video_path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "frames": frames,
+    }
+    key = hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    entry = root / key
+    if (entry / "frames.json").is_file():
+        print(f"INT8 calibration set reused: {entry}")
+        return key, entry
 
-            if max_frames and frame_count >= max_frames:
-                break
-    except KeyboardInterrupt:
-        print("\nInterrupted by user.")
+    root.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=root))
+    try:
+        (staging / "images").mkdir()
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            raise SystemExit(f"Failed to open video file for calibration: {video_path}")
+        wanted = set(calibration_indices(int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0), frames))
+        written: List[int] = []
+        index = 0
+        try:
+            while len(written) < frames and cap.grab():
+                # grab() still decodes every frame, but only kept frames pay for retrieve()'s
+                # colour conversion and the JPEG write. Seeking would not help: on long-GOP video it
+                # decodes from the previous keyframe and lands on inexact positions.
+                if index in wanted:
+                    ok, frame = cap.retrieve()
+                    if ok and frame is not None:
+                        cv2.imwrite(str(staging / "images" / f"{index:08d}.jpg"), frame)
+                        written.append(index)
+                index += 1
+        finally:
+            cap.release()
+        if not written:
+            raise SystemExit(f"No frames could be decoded from {video_path} for INT8 calibration.")
+        (staging / "frames.json").write_text(
+            json.dumps({**identity, "indices": written}, indent=2) + "\n", encoding="utf-8"
+        )
+        if entry.exists():
+            shutil.rmtree(entry)
+        os.replace(staging, entry)
     finally:
-        cap.release()
-        cv2.destroyAllWindows()
+        shutil.rmtree(staging, ignore_errors=True)
+    print(f"INT8 calibration set: {len(written)} frames from {video_path} in {entry}")
+    return key, entry
 
 
-def main() -> None:
-    args = parse_args()
-    video_path = args.video.expanduser().resolve()
-    if not video_path.exists():
-        raise SystemExit(f"Video file not found: {video_path}")
+class EngineCache:
+    """On-disk cache of exported models keyed by weights hash and export settings.
 
-    if not 0.0 < args.confidence <= 1.0:
-        raise SystemExit("Confidence must be within (0, 1].")
+    Each entry is a directory named after its key holding the artifact and a
+    ``meta.json``; the meta file's mtime doubles as the LRU timestamp.
+    """
 
-    device, using_cuda = resolve_device(args.device)
-    model = load_model(args.model, device)
-    draw_annotations = should_draw_overlay(args.overlay_mode, video_path)
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int,
+        exporter: Callable[[ExportSpec, Path], Path] = ultralytics_exporter,
+        trt_version: Callable[[], str] = _tensorrt_version,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.exporter = exporter
+        self._trt_version = trt_version
 
-    if using_cuda:
-        print("Using CUDA for inference.")
-    else:
-        print("Running on CPU. Set --device cuda:0 if a GPU becomes available.")
+    def key_fields(self, spec: ExportSpec) -> Dict[str, Any]:
+        return {
+            "weights_sha256": _file_sha256(spec.weights),
+            "backend": spec.backend,
+            "imgsz": spec.imgsz,
+            "batch": spec.batch,
+            "precision": spec.precision,
+            "device": spec.device,
+            # ONNX files are portable across TensorRT releases; engines are not.
+            "tensorrt": self._trt_version() if spec.backend == "engine" else "n/a",
+            # Only INT8 engines depend on the calibration frames.
+            **({"calibration": spec.calibration} if spec.calibration else {}),
+        }
 
-    if args.overlay_mode == "auto" and not draw_annotations:
-        print(
-            "Sample video already includes bounding boxes; skipping additional overlays. "
-            "Use --overlay-mode always to draw them anyway."
+    @staticmethod
+    def _key(fields: Dict[str, Any]) -> str:
+        payload = json.dumps(fields, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:24]
+
+    def key_for(self, spec: ExportSpec) -> str:
+        return self._key(self.key_fields(spec))
+
+    def fetch(self, spec: ExportSpec) -> CacheOutcome:
+        """Return the cached artifact for spec, exporting it on a miss."""
+        fields = self.key_fields(spec)
+        # Derive the key from the fields so the weights are hashed only once.
+        key = self._key(fields)
+        entry = self.root / key
+        artifact = entry / f"model{ARTIFACT_SUFFIXES[spec.backend]}"
+        meta_path = entry / "meta.json"
+        if artifact.is_file() and meta_path.is_file():
+            meta_path.touch()
+            return CacheOutcome(artifact=artifact, key=key, hit=True)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.root))
+        try:
+            start = time.perf_counter()
+            exported = self.exporter(spec, staging)
+            export_seconds = time.perf_counter() - start
+            if not exported.is_file():
+                raise SystemExit(f"Export did not produce an artifact for {spec.weights}.")
+            if entry.exists():
+                shutil.rmtree(entry)
+            entry.mkdir()
+            shutil.move(str(exported), artifact)
+            meta = {**fields, "source": str(spec.weights), "export_seconds": export_seconds}
+            meta_path.write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        evicted = self.evict(keep=key)
+        return CacheOutcome(
+            artifact=artifact, key=key, hit=False, export_seconds=export_seconds, evicted=evicted
         )
 
-    stream_video(
-        video_path=video_path,
-        model=model,
-        model_label=args.model,
-        device=device,
-        confidence=args.confidence,
-        max_frames=args.max_frames,
-        window_title=args.window_title,
-        draw_annotations=draw_annotations,
-    )
+    def evict(self, keep: str | None = None) -> List[str]:
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        if not self.root.is_dir():
+            return []
+        entries = []
+        for entry in self.root.iterdir():
+            meta_path = entry / "meta.json"
+            if not entry.is_dir() or entry.name.startswith(".") or not meta_path.is_file():
+                continue
+            entries.append((meta_path.stat().st_mtime, entry, _dir_size(entry)))
+        total = sum(size for _, _, size in entries)
+        evicted: List[str] = []
+        for _, entry, size in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            evicted.append(entry.name)
+        return evicted
 
 
-if __name__ == "__main__":
+def resolve_weights_path(weights: str) -> Path:
+    """Return a local path for weights, letting Ultralytics download known names."""
+    candidate = Path(weights).expanduser()
+    if candidate.is_file():
+        return candidate.resolve()
     try:
-        main()
-    except SystemExit as exc:
-        code = exc.code
-        if (isinstance(code, int) and code != 0) or (not isinstance(code, int) and code is not None):
-            _report_failure(exc)
-        raise
+        from ultralytics.utils.downloads import attempt_download_asset  # type: ignore import-not-found
     except Exception as exc:  # pylint: disable=broad-except
-        _report_failure(exc)
-        raise SystemExit(1) from exc
+        raise SystemExit("Ultralytics package is required (pip install ultralytics).") from exc
+    downloaded = Path(attempt_download_asset(weights))
+    if not downloaded.is_file():
+        raise SystemExit(f"Model weights not found: {weights}")
+    return downloaded.resolve()
+
+
+def prepare_model_artifact(
+    weights: str,
+    backend: str,
+    imgsz: int,
+    batch: int,
+    precision: str,
+    device: str,
+    cache_dir: Path,
+    cache_max_bytes: int,
+    calibration: Tuple[str, Path] | None = None,
+) -> Tuple[str, CacheOutcome | None]:
+    """Map the requested backend to a loadable model path, exporting through the cache."""
+    if backend == "torch":
+        return weights, None
+    spec = ExportSpec(
+        weights=resolve_weights_path(weights),
+        backend=backend,
+        imgsz=imgsz,
+        batch=batch,
+        precision=precision,
+        device=device,
+        calibration=calibration[0] if calibration else "",
+        calibration_dir=calibration[1] if calibration else None,
+    )
+    outcome = EngineCache(cache_dir, cache_max_bytes).fetch(spec)
+    if outcome.hit:
+        print(f"{backend} cache hit ({outcome.key}): {outcome.artifact}")
+    else:
+        print(
+            f"{backend} cache miss ({outcome.key}): exported in {outcome.export_seconds:.1f}s "
+            f"to {outcome.artifact}"
+        )
+    for evicted in outcome.evicted:
+        print(f"Evicted cached {evicted} to stay under the cache size limit.")
+    return str(outcome.artifact), outcome
+
+
+def load_model(
+    weights: str, device: str, imgsz: int | None = None, half: bool = False
+) -> "YOLO":  # type: ignore[name-defined]
+    """Load YOLO weights (or an exported ONNX/engine file) for the selected device."""
+    with STARTUP.phase("import ultralytics", "import"):
+        try:
+            from ultralytics import YOLO  # type: ignore import-not-found
+        except Exception as exc:  # pylint: disable=broad-except
+            raise SystemExit("Ultralytics package is required (pip install ultralytics).") from exc
+
+    with STARTUP.phase("load model"):
+        if Path(weights).suffix in ARTIFACT_SUFFIXES.values():
+            # Exported models are bound to their device already and reject .to().
+            model = YOLO(weights, task="detect")
+        else:
+            model = YOLO(weights)
+            # YOLO.to is a no-op on CPU but keeps the API consistent.
+            model.to(device)
+    if imgsz:
+        model.overrides["imgsz"] = imgsz
+    if half:
+        # Exported FP16/INT8 models carry their precision; this only affects .pt weights.
+        model.overrides["half"] = True
+    return model
+
+
+def create_cuda_context(device: str) -> None:
+    """Put a tensor on ``device``; resolve_device only initializes the driver."""
+    import torch  # type: ignore import-not-found
+
+    torch.zeros(1, device=device)
+    torch.cuda.synchronize(device)
+
+
+def ensure_window(title: str) -> None:
+    """Create the OpenCV window once so we can report display issues early."""
+    try:
+        cv2.namedWindow(title, cv2.WINDOW_NORMAL)
+    except cv2.error as exc:
+        raise SystemExit(
+            "Failed to open a GUI window. Ensure you have a display (e.g. set DISPLAY)."
+        ) from exc
+
+
+@dataclass
+class StageStats:
+    """Accumulates frame counts and busy time for one pipeline stage."""
+
+    name: str
+    frames: int = 0
+    busy_ns: int = 0
+
+    def record(self, elapsed_ns: int, frames: int = 1) -> None:
+        self.frames += frames
+        self.busy_ns += elapsed_ns
+
+    @property
+    def busy_seconds(self) -> float:
+        return self.busy_ns / 1e9
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.busy_seconds if self.busy_ns > 0 else 0.0
+
+
+class FpsMeter:
+    """Exponential moving average of the display rate, as drawn on the frame."""
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._prev_time = time.perf_counter()
+
+    def tick(self) -> float:
+        now = time.perf_counter()
+        elapsed = now - self._prev_time
+        self._prev_time = now
+        if elapsed > 0:
+            instant_fps = 1.0 / elapsed
+            self.value = instant_fps if self.value == 0.0 else (0.85 * self.value + 0.15 * instant_fps)
+        return self.value
+
+
+def annotate_frame(frame, results, draw_annotations: bool, in_place: bool = False):
+    """Return the frame to display for a single prediction result list."""
+    if not results:
+        return frame
+    if draw_annotations and in_place:
+        return draw_detections(frame, results)
+    if draw_annotations:
+        # Annotate in-place to avoid stacking on top of pre-annotated footage.
+        return results[0].plot()  # Ultralytics already copies the frame.
+    return frame
+
+
+def predict_frames(
+    model: "YOLO",  # type: ignore[name-defined]
+    frames: List[Any],
+    device: str,
+    confidence: float,
+) -> List[List[Any]]:
+    """Run one predict call over a batch and split the results back per frame."""
+    # A single frame keeps the original call shape so batch size 1 behaves as before.
+    source = frames[0] if len(frames) == 1 else list(frames)
+    results = model.predict(
+        source,
+        device=device,
+        conf=confidence,
+        verbose=False,
+    )
+    STARTUP.first_result()
+    if len(frames) == 1:
+        return [results]
+    results = list(results or [])
+    return [[results[idx]] if idx < len(results) else [] for idx in range(len(frames))]
+
+
+def split_predict_ns(results: List[Any], call_ns: int, frames: int) -> Tuple[int, int, int]:
+    """Split one predict call into per-frame preprocess / predict / postprocess nanoseconds.
+
+    Ultralytics reports per-image milliseconds in ``Results.speed``; whatever the call
+    took beyond preprocess and postprocess is charged to predict.
+    """
+    per_frame_ns = call_ns // max(frames, 1)
+    speed = getattr(results[0], "speed", None) if results else None
+    if not isinstance(speed, dict):
+        return 0, per_frame_ns, 0
+    pre_ns = min(per_frame_ns, int(float(speed.get("preprocess") or 0.0) * 1e6))
+    post_ns = min(per_frame_ns - pre_ns, int(float(speed.get("postprocess") or 0.0) * 1e6))
+    return pre_ns, per_frame_ns - pre_ns - post_ns, post_ns
+
+
+LETTERBOX_FILL = 114  # Ultralytics pads letterboxed frames with this grey.
+# Ultralytics' default class palette (BGR) for boxes drawn without Results.plot().
+DETECTION_COLORS = (
+    (56, 56, 255), (151, 157, 255), (31, 112, 255), (29, 178, 255), (49, 210, 207),
+    (10, 249, 72), (23, 204, 146), (134, 219, 61), (52, 147, 26), (187, 212, 0),
+    (168, 153, 44), (255, 194, 0), (147, 69, 52), (255, 115, 100), (236, 24, 0),
+    (255, 56, 132), (133, 0, 82), (255, 56, 203), (200, 149, 255), (199, 55, 255),
+)
+
+
+@dataclass(frozen=True)
+class LetterboxGeometry:
+    """Where a frame lands inside the model input."""
+
+    resized: Tuple[int, int]  # (height, width) of the scaled frame
+    offset: Tuple[int, int]  # (top, left) padding
+    shape: Tuple[int, int]  # (height, width) of the model input
+
+
+def letterbox_geometry(
+    frame_shape: Tuple[int, ...], imgsz: Tuple[int, int], stride: int, rect: bool
+) -> LetterboxGeometry:
+    """Mirror Ultralytics' LetterBox so its scale_boxes maps detections back exactly."""
+    height, width = frame_shape[:2]
+    ratio = min(imgsz[0] / height, imgsz[1] / width)
+    new_h, new_w = int(round(height * ratio)), int(round(width * ratio))
+    pad_h, pad_w = imgsz[0] - new_h, imgsz[1] - new_w
+    if rect:
+        # PyTorch weights take any stride multiple, so only pad up to the next one.
+        pad_h, pad_w = pad_h % stride, pad_w % stride
+    top, left = int(round(pad_h / 2 - 0.1)), int(round(pad_w / 2 - 0.1))
+    return LetterboxGeometry((new_h, new_w), (top, left), (new_h + pad_h, new_w + pad_w))
+
+
+class FramePreprocessor:
+    """Decode into reused frames and build the model input in preallocated buffers.
+
+    Buffers are sized from the first batch. After that each frame is resized straight into
+    a pinned host canvas. Only that imgsz canvas is uploaded, and the BGR->RGB swap, the
+    HWC->CHW layout change and the [0, 1] scaling run in place on the inference device.
+    Every buffer allocation and every host/device copy is counted, so the report shows
+    whether the steady-state loop allocates anything.
+    """
+
+    def __init__(self, batch_size: int, device: str) -> None:
+        try:
+            import torch  # type: ignore import-not-found
+        except Exception as exc:  # pylint: disable=broad-except
+            raise SystemExit("PyTorch is required for --fast-preprocess.") from exc
+        self._torch = torch
+        self.batch_size = batch_size
+        self.device = torch.device(device)
+        self.on_cuda = self.device.type == "cuda"
+        self.frames: List[Any] = [None] * batch_size
+        self.geometry: LetterboxGeometry | None = None
+        self.bound = False
+        self._imgsz: Tuple[int, int] = (0, 0)
+        self._stride = 32
+        self._rect = False
+        self._dtype = torch.float32
+        self._frame_shape: Tuple[int, ...] = ()
+        self._canvas = self._canvas_view = self._staging = self._input = None
+        self._steady = False
+        self.allocations = self.allocated_bytes = self.copied_bytes = 0
+        self.steady_allocations = self.steady_copied_bytes = self.steady_frames = 0
+
+    def bind(self, predictor: Any) -> None:
+        """Take input size, stride and precision from a set-up Ultralytics predictor."""
+        backend = predictor.model
+        imgsz = predictor.imgsz
+        self._imgsz = (imgsz, imgsz) if isinstance(imgsz, int) else (int(imgsz[0]), int(imgsz[-1]))
+        stride = getattr(backend, "stride", 32)
+        self._stride = int(stride.max()) if hasattr(stride, "max") else int(stride)
+        # Exported ONNX/TensorRT models have a fixed input shape; only .pt weights take rect inputs.
+        self._rect = bool(getattr(backend, "pt", False))
+        half = bool(getattr(backend, "fp16", False)) and self.on_cuda
+        self._dtype = self._torch.float16 if half else self._torch.float32
+        self.bound = True
+
+    def _count_allocation(self, nbytes: int) -> None:
+        self.allocations += 1
+        self.allocated_bytes += nbytes
+        if self._steady:
+            self.steady_allocations += 1
+
+    def _count_copy(self, nbytes: int) -> None:
+        self.copied_bytes += nbytes
+        if self._steady:
+            self.steady_copied_bytes += nbytes
+
+    def _allocate(self, frame_shape: Tuple[int, ...]) -> None:
+        torch = self._torch
+        self._frame_shape = tuple(frame_shape)
+        self.geometry = letterbox_geometry(frame_shape, self._imgsz, self._stride, self._rect)
+        height, width = self.geometry.shape
+        # The padding is written once here; prepare() only ever touches the resized region.
+        self._canvas = torch.full(
+            (self.batch_size, height, width, 3), LETTERBOX_FILL, dtype=torch.uint8, pin_memory=self.on_cuda
+        )
+        self._canvas_view = self._canvas.numpy()
+        self._count_allocation(self._canvas.nelement())
+        if self.on_cuda:
+            self._staging = torch.empty(self._canvas.shape, dtype=torch.uint8, device=self.device)
+            self._count_allocation(self._staging.nelement())
+        self._input = torch.empty((self.batch_size, 3, height, width), dtype=self._dtype, device=self.device)
+        self._count_allocation(self._input.nelement() * self._input.element_size())
+
+    def read(self, cap, slot: int):
+        """Decode the next frame into ``slot``'s buffer; returns None at end of stream."""
+        buffer = self.frames[slot]
+        ok, frame = cap.read(buffer)
+        if not ok or frame is None:
+            return None
+        if frame is not buffer:
+            # First frame, or the source changed resolution and OpenCV had to allocate.
+            self._count_allocation(frame.nbytes)
+            self.frames[slot] = frame
+        return frame
+
+    def prepare(self, frames: List[Any]):
+        """Letterbox and normalize ``frames`` into the model input and return a view of it."""
+        count = len(frames)
+        if self._input is None or frames[0].shape != self._frame_shape:
+            self._allocate(frames[0].shape)
+        (new_h, new_w), (top, left) = self.geometry.resized, self.geometry.offset
+        for index, frame in enumerate(frames):
+            if frame.shape != self._frame_shape:
+                raise SystemExit("The video changed resolution mid-batch; rerun with --batch-size 1.")
+            target = self._canvas_view[index, top : top + new_h, left : left + new_w]
+            if frame.shape[:2] == (new_h, new_w):
+                target[...] = frame
+                self._count_copy(frame.nbytes)
+            else:
+                cv2.resize(frame, (new_w, new_h), dst=target, interpolation=cv2.INTER_LINEAR)
+        source = self._canvas[:count]
+        if self.on_cuda:
+            # Pinned memory keeps the upload asynchronous. The model call synchronizes before
+            # the next batch overwrites the canvas.
+            self._staging[:count].copy_(source, non_blocking=True)
+            self._count_copy(source.nelement())
+            source = self._staging[:count]
+        model_input = self._input[:count]
+        for channel in range(3):
+            # BGR->RGB and HWC->CHW happen in the same pass as the dtype conversion.
+            model_input[:, channel].copy_(source[..., 2 - channel])
+        model_input.div_(255)
+        if self._steady:
+            self.steady_frames += count
+        self._steady = True
+        return model_input
+
+    def summary(self) -> Dict[str, Any]:
+        frames = max(self.steady_frames, 1)
+        return {
+            "device": str(self.device),
+            "input_shape": list(self._input.shape) if self._input is not None else None,
+            "setup_allocations": self.allocations - self.steady_allocations,
+            "setup_bytes": self.allocated_bytes,
+            "steady_state_frames": self.steady_frames,
+            "steady_state_allocations": self.steady_allocations,
+            "allocations_per_frame": self.steady_allocations / frames,
+            "copied_bytes_per_frame": self.steady_copied_bytes / frames,
+        }
+
+
+def print_preprocess_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"Fast preprocess on {summary['device']} (input {summary['input_shape']}): "
+        f"{summary['setup_allocations']} buffers ({summary['setup_bytes'] / 1e6:.1f} MB) allocated during setup, "
+        f"{summary['steady_state_allocations']} allocations over {summary['steady_state_frames']} "
+        f"steady-state frames, {summary['copied_bytes_per_frame'] / 1e6:.2f} MB copied per frame"
+    )
+
+
+def predict_preprocessed(
+    model: "YOLO",  # type: ignore[name-defined]
+    preprocessor: FramePreprocessor,
+    frames: List[Any],
+    device: str,
+    confidence: float,
+) -> List[List[Any]]:
+    """Run a batch through the model using the preprocessor's buffers.
+
+    ``model.predict`` would letterbox, normalize and upload every frame again and copy
+    the result image. Only inference and postprocessing (NMS and box rescaling onto the
+    original frames) are taken from Ultralytics here.
+    """
+    if getattr(model, "predictor", None) is None or not preprocessor.bound:
+        # One regular call sets up the predictor (device, conf, warm-up) that is reused below.
+        model.predict(frames[0], device=device, conf=confidence, verbose=False)
+        preprocessor.bind(model.predictor)
+    predictor = model.predictor
+    with preprocessor._torch.inference_mode():  # pylint: disable=protected-access
+        t0 = time.perf_counter_ns()
+        model_input = preprocessor.prepare(frames)
+        t1 = time.perf_counter_ns()
+        preds = predictor.inference(model_input)
+        t2 = time.perf_counter_ns()
+        # Postprocess reads source paths from the current batch, as stream_inference sets it.
+        predictor.batch = ([""] * len(frames), frames, [""] * len(frames))
+        results = predictor.postprocess(preds, model_input, list(frames))
+        t3 = time.perf_counter_ns()
+    count = len(frames)
+    for result in results:
+        result.speed = {
+            "preprocess": (t1 - t0) / 1e6 / count,
+            "inference": (t2 - t1) / 1e6 / count,
+            "postprocess": (t3 - t2) / 1e6 / count,
+        }
+    STARTUP.first_result()
+    return [[result] for result in results]
+
+
+def draw_detections(frame, results):
+    """Draw boxes straight onto ``frame``; Results.plot() would copy it first."""
+    boxes = getattr(results[0], "boxes", None) if results else None
+    if boxes is None or not len(boxes):
+        return frame
+    names = results[0].names
+    for box, cls, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist()):
+        (x1, y1, x2, y2), cls = (int(value) for value in box), int(cls)
+        color = DETECTION_COLORS[cls % len(DETECTION_COLORS)]
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2, cv2.LINE_AA)
+        cv2.putText(
+            frame,
+            f"{names.get(cls, cls)} {conf:.2f}",
+            (x1, max(y1 - 6, 12)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            color,
+            1,
+            cv2.LINE_AA,
+        )
+    return frame
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> int:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class BenchmarkRecorder:
+    """Collects per-frame stage timings and drops the warm-up window."""
+
+    STAGES = ("decode", "preprocess", "predict", "postprocess", "sink")
+
+    def __init__(self, warmup_frames: int) -> None:
+        self.warmup_frames = warmup_frames
+        self.samples: Dict[str, List[int]] = {stage: [] for stage in self.STAGES}
+        self.measured_frames = 0
+        self.decoder: DecoderChoice | None = None
+        self.preprocess: Dict[str, Any] | None = None
+        # Completion stamp of every frame, warm-up included, for lining up telemetry samples.
+        self.frame_times_ns: List[int] = []
+        self._window_start_ns = time.perf_counter_ns()
+        self._window_end_ns = self._window_start_ns
+
+    def record(self, frame_index: int, stage: str, elapsed_ns: int) -> None:
+        if frame_index > self.warmup_frames:
+            self.samples[stage].append(elapsed_ns)
+
+    def frame_done(self, frame_index: int) -> None:
+        now = time.perf_counter_ns()
+        self.frame_times_ns.append(now)
+        if frame_index == self.warmup_frames:
+            self._window_start_ns = now
+        elif frame_index > self.warmup_frames:
+            self.measured_frames += 1
+            self._window_end_ns = now
+
+    def summary(self) -> Dict[str, Any]:
+        stages: Dict[str, Dict[str, float]] = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            stages[stage] = {
+                "count": len(ordered),
+                "mean_ms": (sum(ordered) / len(ordered) / 1e6) if ordered else 0.0,
+                "p50_ms": _percentile(ordered, 0.50) / 1e6,
+                "p90_ms": _percentile(ordered, 0.90) / 1e6,
+                "p99_ms": _percentile(ordered, 0.99) / 1e6,
+                "max_ms": (ordered[-1] / 1e6) if ordered else 0.0,
+            }
+        window_s = (self._window_end_ns - self._window_start_ns) / 1e9
+        return {
+            "warmup_frames": self.warmup_frames,
+            "measured_frames": self.measured_frames,
+            "measured_seconds": window_s,
+            "throughput_fps": self.measured_frames / window_s if window_s > 0 else 0.0,
+            "decoder": (
+                {**asdict(self.decoder), "source": str(self.decoder.source)} if self.decoder else None
+            ),
+            "preprocess": self.preprocess,
+            "stages": stages,
+        }
+
+
+def _write_benchmark_report(report: Dict[str, Any], kind: str = "benchmark") -> Path | None:
+    try:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_path = LOG_DIR / f"{Path(__file__).stem}_{kind}_{timestamp}.json"
+        with report_path.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+        return report_path
+    except Exception:
+        return None
+
+
+def print_benchmark_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"Benchmark ({summary['measured_frames']} frames after {summary['warmup_frames']} warm-up): "
+        f"{summary['throughput_fps']:.1f} frames/s"
+    )
+    if summary.get("decoder"):
+        print(f"  decoder: {summary['decoder']['backend']} ({summary['decoder']['reason']})")
+    if summary.get("preprocess"):
+        preprocess = summary["preprocess"]
+        print(
+            f"  preprocess: {preprocess['allocations_per_frame']:.2f} allocations and "
+            f"{preprocess['copied_bytes_per_frame'] / 1e6:.2f} MB copied per steady-state frame"
+        )
+    print(f"  {'stage':<12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, stats in summary["stages"].items():
+        print(
+            f"  {stage:<12}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+            f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+        )
+
+
+def detections_from_results(results: List[Any]) -> List[Dict[str, Any]]:
+    """Plain-data detections for one frame, so precision runs can be recorded and compared."""
+    boxes = getattr(results[0], "boxes", None) if results else None
+    if boxes is None or not len(boxes):
+        return []
+    return [
+        {"cls": int(cls), "conf": round(conf, 4), "box": [round(value, 1) for value in box]}
+        for box, cls, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist())
+    ]
+
+
+def detection_rows(results: List[Any]) -> List[Tuple[float, ...]]:
+    """The same detections as ``(x1, y1, x2, y2, conf, cls)`` rows."""
+    return [
+        (*detection["box"], detection["conf"], float(detection["cls"])) for detection in detections_from_results(results)
+    ]
+
+
+def box_iou(first: List[float], second: List[float]) -> float:
+    """IoU of two ``[x1, y1, x2, y2]`` boxes."""
+    inter_w = min(first[2], second[2]) - max(first[0], second[0])
+    inter_h = min(first[3], second[3]) - max(first[1], second[1])
+    inter = max(inter_w, 0.0) * max(inter_h, 0.0)
+    union = (
+        (first[2] - first[0]) * (first[3] - first[1]) + (second[2] - second[0]) * (second[3] - second[1]) - inter
+    )
+    return inter / union if union > 0 else 0.0
+
+
+def match_detections(
+    reference: List[Dict[str, Any]], candidate: List[Dict[str, Any]], iou_threshold: float
+) -> List[Tuple[int, int, float]]:
+    """Greedy one-to-one matching by IoU, ignoring class so class flips stay visible."""
+    pairs = sorted(
+        (
+            (box_iou(ref["box"], cand["box"]), ref_index, cand_index)
+            for ref_index, ref in enumerate(reference)
+            for cand_index, cand in enumerate(candidate)
+        ),
+        reverse=True,
+    )
+    used_ref: set = set()
+    used_cand: set = set()
+    matches: List[Tuple[int, int, float]] = []
+    for iou, ref_index, cand_index in pairs:
+        if iou < iou_threshold:
+            break
+        if ref_index in used_ref or cand_index in used_cand:
+            continue
+        used_ref.add(ref_index)
+        used_cand.add(cand_index)
+        matches.append((ref_index, cand_index, iou))
+    return matches
+
+
+def score_agreement(
+    reference_frames: List[List[Dict[str, Any]]],
+    candidate_frames: List[List[Dict[str, Any]]],
+    iou_threshold: float = 0.5,
+) -> Dict[str, Any]:
+    """How closely a candidate run reproduces the reference detections on the same frames."""
+    frames = min(len(reference_frames), len(candidate_frames))
+    reference_boxes = candidate_boxes = matched = same_class = 0
+    iou_total = 0.0
+    for reference, candidate in zip(reference_frames[:frames], candidate_frames[:frames]):
+        matches = match_detections(reference, candidate, iou_threshold)
+        reference_boxes += len(reference)
+        candidate_boxes += len(candidate)
+        matched += len(matches)
+        same_class += sum(1 for ref, cand, _ in matches if reference[ref]["cls"] == candidate[cand]["cls"])
+        iou_total += sum(iou for _, _, iou in matches)
+    # Two runs that both detect nothing agree perfectly.
+    empty = 1.0 if not reference_boxes and not candidate_boxes else 0.0
+    return {
+        "frames": frames,
+        "iou_threshold": iou_threshold,
+        "reference_boxes": reference_boxes,
+        "candidate_boxes": candidate_boxes,
+        "matched": matched,
+        "recall": matched / reference_boxes if reference_boxes else 1.0,
+        "precision": matched / candidate_boxes if candidate_boxes else 1.0,
+        "class_match": same_class / matched if matched else empty,
+        "mean_iou": iou_total / matched if matched else empty,
+    }
+
+
+def _latency_stats(latencies_ns: List[int]) -> Dict[str, float]:
+    ordered = sorted(latencies_ns)
+    return {
+        "mean_ms": (sum(ordered) / len(ordered) / 1e6) if ordered else 0.0,
+        "p50_ms": _percentile(ordered, 0.50) / 1e6,
+        "p90_ms": _percentile(ordered, 0.90) / 1e6,
+        "p99_ms": _percentile(ordered, 0.99) / 1e6,
+    }
+
+
+def build_precision_report(runs: List[Dict[str, Any]], iou_threshold: float = 0.5) -> Dict[str, Any]:
+    """Throughput, latency and agreement with the fp32 run for every recorded precision run.
+
+    Each run holds ``precision``, ``warmup_frames``, per-frame ``latencies_ns`` and
+    per-frame ``detections``; nothing here needs a GPU.
+    """
+    reference = next((run for run in runs if run["precision"] == "fp32"), None)
+    if reference is None:
+        raise SystemExit("The recorded runs have no fp32 reference to compare against.")
+    rows = []
+    reference_fps = 0.0
+    for run in runs:
+        measured = run["latencies_ns"][run.get("warmup_frames", 0) :]
+        fps = len(measured) / (sum(measured) / 1e9) if measured and sum(measured) > 0 else 0.0
+        if run is reference:
+            reference_fps = fps
+        rows.append(
+            {
+                "precision": run["precision"],
+                "frames": len(run["detections"]),
+                "throughput_fps": fps,
+                "latency": _latency_stats(measured),
+                "agreement": (
+                    None
+                    if run is reference
+                    else score_agreement(reference["detections"], run["detections"], iou_threshold)
+                ),
+            }
+        )
+    for row in rows:
+        row["speedup"] = row["throughput_fps"] / reference_fps if reference_fps > 0 else 0.0
+    return {"reference": "fp32", "iou_threshold": iou_threshold, "precisions": rows}
+
+
+def print_precision_report(report: Dict[str, Any]) -> None:
+    print(f"Precision comparison (reference {report['reference']}, IoU >= {report['iou_threshold']:.2f}):")
+    print(
+        f"  {'precision':<10}{'frames':>8}{'fps':>9}{'p50 ms':>9}{'p99 ms':>9}{'speedup':>9}"
+        f"{'recall':>9}{'extra':>7}{'class':>8}{'IoU':>7}"
+    )
+    for row in report["precisions"]:
+        line = (
+            f"  {row['precision']:<10}{row['frames']:>8}{row['throughput_fps']:>9.1f}"
+            f"{row['latency']['p50_ms']:>9.2f}{row['latency']['p99_ms']:>9.2f}{row['speedup']:>8.2f}x"
+        )
+        agreement = row["agreement"]
+        if agreement:
+            extra = agreement["candidate_boxes"] - agreement["matched"]
+            line += (
+                f"{agreement['recall'] * 100:>8.1f}%{extra:>7}"
+                f"{agreement['class_match'] * 100:>7.1f}%{agreement['mean_iou']:>7.3f}"
+            )
+        else:
+            line += f"{'-':>9}{'-':>7}{'-':>8}{'-':>7}"
+        print(line)
+
+
+def report_stage_stats(
+    stages: List[StageStats],
+    frames: int,
+    wall_ns: int,
+    latencies: List[int] | None = None,
+    batch_size: int = 1,
+    decoder: DecoderChoice | None = None,
+) -> None:
+    """Print per-stage and end-to-end throughput once streaming stops."""
+    print("Pipeline throughput:")
+    for stage in stages:
+        print(f"  {stage.name:<10} {stage.fps:8.1f} FPS ({stage.frames} frames, {stage.busy_seconds:.2f}s busy)")
+    decode = next((stage for stage in stages if stage.name == "decode"), None)
+    if decoder is not None and decode is not None and decode.frames:
+        print(
+            f"Decoder: {decoder.backend} ({decoder.reason}), "
+            f"{decode.busy_ns / decode.frames / 1e6:.2f} ms/frame, {decode.busy_seconds:.2f}s total"
+        )
+    wall_seconds = wall_ns / 1e9
+    end_to_end = frames / wall_seconds if wall_seconds > 0 else 0.0
+    print(f"  {'end-to-end':<10} {end_to_end:8.1f} FPS ({frames} frames in {wall_seconds:.2f}s)")
+    if latencies:
+        # Batching raises throughput but makes each frame wait for its batch-mates.
+        ordered = sorted(latencies)
+        mean_ms = sum(ordered) / len(ordered) / 1e6
+        print(
+            f"Per-frame latency (decode to display, batch size {batch_size}): "
+            f"mean {mean_ms:.1f} ms | p50 {_percentile(ordered, 0.5) / 1e6:.1f} ms | "
+            f"max {ordered[-1] / 1e6:.1f} ms"
+        )
+
+
+@dataclass(frozen=True)
+class DecoderChoice:
+    """Which capture backend decodes a source, and why."""
+
+    backend: str  # "cpu" or "gstreamer"
+    source: VideoSource  # what is handed to cv2.VideoCapture
+    reason: str
+
+
+def opencv_has_gstreamer(build_info: str) -> bool:
+    """Read the ``GStreamer: YES/NO`` line of ``cv2.getBuildInformation()``."""
+    for line in build_info.splitlines():
+        name, _, value = line.strip().partition(":")
+        if name.strip() == "GStreamer":
+            return value.strip().upper().startswith("YES")
+    return False
+
+
+def _gst_quote(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def build_decode_pipeline(source: VideoSource) -> str | None:
+    """GStreamer pipeline decoding ``source`` on NVDEC into BGR frames, or None if unsupported.
+
+    parsebin picks the demuxer and parser for the container and codec (H.264, H.265, ...),
+    nvv4l2decoder decodes into NVMM memory and nvvidconv copies out as BGRx; only the final
+    BGRx -> BGR repack runs on the CPU.
+    """
+    if isinstance(source, Path):
+        head = f"filesrc location={_gst_quote(str(source))}"
+    elif isinstance(source, str) and source.lower().startswith(("rtsp://", "rtsps://")):
+        head = f"rtspsrc location={_gst_quote(source)} latency=200"
+    else:
+        return None
+    return (
+        f"{head} ! parsebin ! nvv4l2decoder ! nvvidconv ! video/x-raw,format=BGRx ! "
+        "videoconvert ! video/x-raw,format=BGR ! appsink sync=false"
+    )
+
+
+def plan_decoder(
+    requested: str,
+    source: VideoSource,
+    build_info: str,
+    has_element: Callable[[str], bool],
+) -> DecoderChoice:
+    """Pick the capture backend for ``source`` without opening anything.
+
+    ``auto`` falls back to the CPU with the reason recorded; ``gstreamer`` refuses instead.
+    """
+    if is_gstreamer_pipeline(source):
+        return DecoderChoice("gstreamer", source, "source is a GStreamer pipeline")
+    if requested == "cpu":
+        return DecoderChoice("cpu", source, "requested with --decoder cpu")
+
+    pipeline = build_decode_pipeline(source)
+    if pipeline is None:
+        problem = "hardware decode applies to video files and RTSP streams only"
+    elif not opencv_has_gstreamer(build_info):
+        problem = "this OpenCV build has no GStreamer support"
+    else:
+        missing = [name for name in JETSON_DECODE_ELEMENTS if not has_element(name)]
+        problem = f"GStreamer element(s) {', '.join(missing)} not installed" if missing else ""
+    if not problem:
+        return DecoderChoice("gstreamer", pipeline, "nvv4l2decoder hardware decode")
+    if requested == "gstreamer":
+        raise SystemExit(f"--decoder gstreamer is unavailable for {source}: {problem}.")
+    return DecoderChoice("cpu", source, f"CPU fallback: {problem}")
+
+
+def open_with_fallback(
+    choice: DecoderChoice,
+    requested: str,
+    original: VideoSource,
+    opener: Callable[[VideoSource, str], Any],
+) -> Tuple[Any, DecoderChoice]:
+    """Open ``choice``; an ``auto`` hardware pipeline that will not open falls back to the CPU."""
+    cap = opener(choice.source, choice.backend)
+    if cap.isOpened() or choice.backend == "cpu" or requested == "gstreamer" or choice.source == original:
+        return cap, choice
+    cap.release()
+    fallback = DecoderChoice("cpu", original, "CPU fallback: the hardware decode pipeline failed to open")
+    return opener(original, "cpu"), fallback
+
+
+@lru_cache(maxsize=None)
+def gst_element_available(name: str) -> bool:
+    inspect = shutil.which("gst-inspect-1.0")
+    if inspect is None:
+        return False
+    try:
+        completed = subprocess.run(
+            [inspect, name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10, check=False
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return completed.returncode == 0
+
+
+def _cv2_opener(source: VideoSource, backend: str):
+    if backend == "gstreamer":
+        return cv2.VideoCapture(source, cv2.CAP_GSTREAMER)
+    if isinstance(source, int):
+        return cv2.VideoCapture(source)
+    return cv2.VideoCapture(str(source))
+
+
+def open_capture(video_path: VideoSource, decoder: str = "auto") -> Tuple[Any, DecoderChoice]:
+    choice = plan_decoder(decoder, video_path, cv2.getBuildInformation(), gst_element_available)
+    cap, choice = open_with_fallback(choice, decoder, video_path, _cv2_opener)
+    if not cap.isOpened():
+        if isinstance(video_path, Path):
+            raise SystemExit(f"Failed to open video file: {video_path}")
+        raise SystemExit(f"Failed to open video source: {video_path}")
+    print(f"Decoder for {video_path}: {choice.backend} ({choice.reason})")
+    return cap, choice
+
+
+class RowBoxes:
+    """The part of Ultralytics' Boxes API the drawing and scoring helpers use."""
+
+    def __init__(self, rows) -> None:
+        self.xyxy, self.conf, self.cls = rows[:, :4], rows[:, 4], rows[:, 5]
+        self._count = len(rows)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class RowResult:
+    """One frame's ``(x1, y1, x2, y2, conf, cls)`` rows from the inference daemon or the
+    tracker, shaped like Ultralytics' Results."""
+
+    def __init__(self, frame, rows, names: Dict[int, str], speed: Dict[str, float]) -> None:
+        self.orig_img = frame
+        self.boxes = RowBoxes(rows)
+        self.names = names
+        self.speed = speed
+
+    def plot(self):
+        return draw_detections(self.orig_img.copy(), [self])
+
+
+class DaemonModel:
+    """Stands in for YOLO in the stream loops and forwards predict() to a --serve daemon."""
+
+    def __init__(self, client: "DaemonClient", slots: int = 1) -> None:  # type: ignore[name-defined]
+        self.client = client
+        self.slots = slots
+        self._ring: List[Any] = []
+
+    def predict(self, source, device: str | None = None, conf: float = 0.25, verbose: bool = False):
+        frames = source if isinstance(source, list) else [source]
+        rows, timing = self.client.predict(frames, conf)
+        # The daemon's queue wait and batch inference both count as predict time here.
+        speed = {"queue": timing["queue_ms"], "inference": timing["infer_ms"]}
+        return [RowResult(frame, detections, self.client.names, speed) for frame, detections in zip(frames, rows)]
+
+    def read_frame(self, cap, slot: int):
+        """Decode straight into shared memory so predict() sends the frame by reference."""
+        buffer = self._ring[slot] if self._ring else None
+        ok, frame = cap.read(buffer)
+        if not ok or frame is None:
+            return None
+        if frame is not buffer:
+            # First frame or a resolution change: decode into a fresh shared ring from now on.
+            self._ring = self.client.frame_buffers(frame.shape, self.slots)
+            self._ring[slot][...] = frame
+            return self._ring[slot]
+        return frame
+
+
+def serve_model(
+    args: argparse.Namespace,
+    model: "YOLO",  # type: ignore[name-defined]
+    device: str,
+    precision: str,
+) -> None:
+    """Keep ``model`` loaded and warm and answer predict requests from --client runs."""
+    with STARTUP.phase("import inference_daemon", "import"):
+        try:
+            import numpy as np  # type: ignore import-not-found
+        except Exception as exc:  # pylint: disable=broad-except
+            raise SystemExit("NumPy is required for --serve.") from exc
+        from inference_daemon import InferenceDaemon, print_daemon_stats
+
+    def predict_batch(frames: List[Any], confidence: float) -> List[List[Tuple[float, ...]]]:
+        results = model.predict(list(frames), device=device, conf=confidence, verbose=False)
+        return [detection_rows([result]) for result in results]
+
+    blank = np.zeros((args.imgsz, args.imgsz, 3), dtype=np.uint8)
+
+    def warmup() -> None:
+        model.predict(blank, device=device, conf=args.confidence, verbose=False)
+
+    started = time.perf_counter()
+    with STARTUP.phase("warm-up"):
+        for _ in range(3):
+            # The first calls pay for CUDA context setup, cuDNN autotuning and engine deserialization.
+            warmup()
+    print(f"Model warm after {time.perf_counter() - started:.1f}s.")
+    # A warm daemon is what --client runs start from; the profile ends here.
+    STARTUP.first_result()
+    STARTUP.finish()
+
+    daemon = InferenceDaemon(
+        args.daemon_socket.expanduser(),
+        predict_batch,
+        info={
+            "model": args.model,
+            "backend": args.backend,
+            "device": device,
+            "precision": precision,
+            "imgsz": args.imgsz,
+            "names": {str(key): value for key, value in model.names.items()},
+        },
+        max_batch=args.daemon_max_batch,
+        batch_window_ms=args.daemon_batch_window_ms,
+        queue_size=args.daemon_queue,
+        warmup=warmup,
+    )
+    signal.signal(signal.SIGTERM, lambda *_: daemon.shutdown())
+    print(
+        f"Serving {args.model} on {device} at {daemon.socket_path} (micro-batches of up to "
+        f"{args.daemon_max_batch} frames). Stop with Ctrl+C or inference_daemon.py stop."
+    )
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    print_daemon_stats(daemon.stats())
+
+
+def display_frame(window_title: str, frame) -> bool:
+    """Show a frame and return True when the user asked to quit."""
+    cv2.imshow(window_title, frame)
+    key = cv2.waitKey(1) & 0xFF
+    return key in (ord("q"), 27)  # ESC or q
+
+
+def stream_video(
+    video_path: VideoSource,
+    model: "YOLO",  # type: ignore[name-defined]
+    model_label: str,
+    device: str,
+    confidence: float,
+    max_frames: int,
+    window_title: str,
+    draw_annotations: bool,
+    batch_size: int = 1,
+    headless: bool = False,
+    recorder: BenchmarkRecorder | None = None,
+    decoder: str = "auto",
+    fast_preprocess: bool = False,
+    tracking: "TrackedDetector | None" = None,  # type: ignore[name-defined]
+) -> None:
+    """Read frames, run YOLO (or, with ``tracking``, only when it asks), and display annotated video."""
+    cap, decoder_choice = open_capture(video_path, decoder)
+    if recorder:
+        recorder.decoder = decoder_choice
+    # Frames are decoded into the preprocessor's buffers (or, with --client, into the daemon's
+    # shared memory) and drawn on in place; a batch is always displayed before the next one
+    # overwrites them.
+    preprocessor = FramePreprocessor(batch_size, device) if fast_preprocess else None
+    read_frame = preprocessor.read if preprocessor else getattr(model, "read_frame", None)
+
+    if headless:
+        print(f"Streaming {video_path} with {model_label} on {device} (headless). Press Ctrl+C to stop.")
+    else:
+        print(f"Streaming {video_path} with {model_label} on {device}. Press 'q' or ESC to stop.")
+        ensure_window(window_title)
+
+    stages = [StageStats("decode"), StageStats("inference"), StageStats("render")]
+    decode_stats, infer_stats, render_stats = stages
+    track_stats = StageStats("track")
+    if tracking is not None:
+        stages.insert(2, track_stats)
+    names: Dict[int, str] = {}
+    fps_meter = FpsMeter()
+    latencies: List[int] = []
+    frame_count = 0
+    exhausted = False
+    start_ns = time.perf_counter_ns()
+    try:
+        while not exhausted:
+            batch: List[Any] = []
+            decoded_at: List[int] = []
+            while len(batch) < batch_size:
+                if max_frames and frame_count >= max_frames:
+                    exhausted = True
+                    break
+                t0 = time.perf_counter_ns()
+                if read_frame:
+                    frame = read_frame(cap, len(batch))
+                else:
+                    ok, frame = cap.read()
+                    frame = frame if ok else None
+                if frame is None:
+                    exhausted = True
+                    break
+                t1 = time.perf_counter_ns()
+                frame_count += 1
+                decode_stats.record(t1 - t0)
+                if recorder:
+                    recorder.record(frame_count, "decode", t1 - t0)
+                batch.append(frame)
+                decoded_at.append(t1)
+            if not batch:
+                break
+
+            first_index = frame_count - len(batch) + 1
+            t1 = time.perf_counter_ns()
+            if tracking is not None and not tracking.needs_detection():
+                # Tracking runs one frame at a time; --detect-every requires a batch size of 1.
+                per_frame_results = [[RowResult(batch[0], tracking.track(), names, {})]]
+                call_ns = time.perf_counter_ns() - t1
+                track_stats.record(call_ns)
+            else:
+                if preprocessor:
+                    per_frame_results = predict_preprocessed(model, preprocessor, batch, device, confidence)
+                else:
+                    per_frame_results = predict_frames(model, batch, device, confidence)
+                if tracking is not None:
+                    tracking.detected(detection_rows(per_frame_results[0]))
+                    names = getattr(per_frame_results[0][0], "names", names) if per_frame_results[0] else names
+                call_ns = time.perf_counter_ns() - t1
+                infer_stats.record(call_ns, frames=len(batch))
+
+            quit_requested = False
+            for offset, (frame, results) in enumerate(zip(batch, per_frame_results)):
+                index = first_index + offset
+                t2 = time.perf_counter_ns()
+                annotated = annotate_frame(frame, results, draw_annotations, in_place=read_frame is not None)
+                if not headless:
+                    overlay_fps_text(annotated, fps_meter.tick())
+                t3 = time.perf_counter_ns()
+                if not headless:
+                    quit_requested = display_frame(window_title, annotated)
+                now = time.perf_counter_ns()
+                render_stats.record(now - t2)
+                latencies.append(now - decoded_at[offset])
+                if recorder:
+                    pre_ns, predict_ns, post_ns = split_predict_ns(results, call_ns, len(batch))
+                    recorder.record(index, "preprocess", pre_ns)
+                    recorder.record(index, "predict", predict_ns)
+                    recorder.record(index, "postprocess", post_ns + (t3 - t2))
+                    recorder.record(index, "sink", now - t3)
+                    recorder.frame_done(index)
+                if quit_requested:
+                    break
+            if quit_requested:
+                break
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    finally:
+        cap.release()
+        if not headless:
+            cv2.destroyAllWindows()
+    report_stage_stats(
+        stages, len(latencies), time.perf_counter_ns() - start_ns, latencies, batch_size, decoder_choice
+    )
+    if preprocessor and preprocessor.bound:
+        print_preprocess_summary(preprocessor.summary())
+        if recorder:
+            recorder.preprocess = preprocessor.summary()
+
+
+_END_OF_STREAM = object()
+
+
+def _put_until_stopped(target: "queue.Queue[Any]", item: Any, stop_event: threading.Event) -> bool:
+    """Block on a bounded queue (backpressure) but give up once shutdown starts."""
+    while not stop_event.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get_until_stopped(source: "queue.Queue[Any]", stop_event: threading.Event) -> Any:
+    while not stop_event.is_set():
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END_OF_STREAM
+
+
+def stream_video_threaded(
+    video_path: VideoSource,
+    model: "YOLO",  # type: ignore[name-defined]
+    model_label: str,
+    device: str,
+    confidence: float,
+    max_frames: int,
+    window_title: str,
+    draw_annotations: bool,
+    queue_size: int,
+    batch_size: int = 1,
+    headless: bool = False,
+    recorder: BenchmarkRecorder | None = None,
+    decoder: str = "auto",
+) -> None:
+    """Run capture, inference and display as three stages joined by bounded queues.
+
+    Capture and inference run on worker threads; display stays on the main thread
+    because HighGUI is not thread-safe on every backend.
+    """
+    cap, decoder_choice = open_capture(video_path, decoder)
+    if recorder:
+        recorder.decoder = decoder_choice
+
+    quit_hint = "Press Ctrl+C to stop." if headless else "Press 'q' or ESC to stop."
+    print(
+        f"Streaming {video_path} with {model_label} on {device} (threaded pipeline, "
+        f"queue size {queue_size}{', headless' if headless else ''}). {quit_hint}"
+    )
+
+    if not headless:
+        ensure_window(window_title)
+
+    frame_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    result_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    worker_errors: List[BaseException] = []
+    stages = [StageStats("decode"), StageStats("inference"), StageStats("render")]
+    decode_stats, infer_stats, render_stats = stages
+
+    def capture_worker() -> None:
+        try:
+            captured = 0
+            while not stop_event.is_set():
+                t0 = time.perf_counter_ns()
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    break
+                t1 = time.perf_counter_ns()
+                captured += 1
+                decode_stats.record(t1 - t0)
+                if recorder:
+                    recorder.record(captured, "decode", t1 - t0)
+                if not _put_until_stopped(frame_queue, (captured, frame, t1), stop_event):
+                    return
+                if max_frames and captured >= max_frames:
+                    break
+        except BaseException as exc:  # pylint: disable=broad-except
+            worker_errors.append(exc)
+            stop_event.set()
+        finally:
+            _put_until_stopped(frame_queue, _END_OF_STREAM, stop_event)
+
+    def inference_worker() -> None:
+        try:
+            end_of_stream = False
+            while not end_of_stream:
+                batch: List[Tuple[int, Any, int]] = []
+                while len(batch) < batch_size:
+                    item = _get_until_stopped(frame_queue, stop_event)
+                    if item is _END_OF_STREAM:
+                        end_of_stream = True
+                        break
+                    batch.append(item)
+                if not batch:
+                    break
+                frames = [frame for _, frame, _ in batch]
+                t0 = time.perf_counter_ns()
+                per_frame_results = predict_frames(model, frames, device, confidence)
+                call_ns = time.perf_counter_ns() - t0
+                infer_stats.record(call_ns, frames=len(frames))
+                for (index, frame, decoded_at), results in zip(batch, per_frame_results):
+                    post_ns = 0
+                    if recorder:
+                        pre_ns, predict_ns, post_ns = split_predict_ns(results, call_ns, len(frames))
+                        recorder.record(index, "preprocess", pre_ns)
+                        recorder.record(index, "predict", predict_ns)
+                    item = (index, frame, results, decoded_at, post_ns)
+                    if not _put_until_stopped(result_queue, item, stop_event):
+                        return
+        except BaseException as exc:  # pylint: disable=broad-except
+            worker_errors.append(exc)
+            stop_event.set()
+        finally:
+            _put_until_stopped(result_queue, _END_OF_STREAM, stop_event)
+
+    workers = [
+        threading.Thread(target=capture_worker, name="jetsonizer-capture", daemon=True),
+        threading.Thread(target=inference_worker, name="jetsonizer-inference", daemon=True),
+    ]
+    fps_meter = FpsMeter()
+    latencies: List[int] = []
+    frame_count = 0
+    start_ns = time.perf_counter_ns()
+    for worker in workers:
+        worker.start()
+    try:
+        while True:
+            item = _get_until_stopped(result_queue, stop_event)
+            if item is _END_OF_STREAM:
+                break
+            index, frame, results, decoded_at, post_ns = item
+            t0 = time.perf_counter_ns()
+            frame_count += 1
+            annotated = annotate_frame(frame, results, draw_annotations)
+            quit_requested = False
+            if not headless:
+                overlay_fps_text(annotated, fps_meter.tick())
+            t1 = time.perf_counter_ns()
+            if not headless:
+                quit_requested = display_frame(window_title, annotated)
+            now = time.perf_counter_ns()
+            render_stats.record(now - t0)
+            latencies.append(now - decoded_at)
+            if recorder:
+                recorder.record(index, "postprocess", post_ns + (t1 - t0))
+                recorder.record(index, "sink", now - t1)
+                recorder.frame_done(index)
+            if quit_requested:
+                break
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    finally:
+        wall_ns = time.perf_counter_ns() - start_ns
+        stop_event.set()
+        for worker in workers:
+            worker.join(timeout=5.0)
+        cap.release()
+        if not headless:
+            cv2.destroyAllWindows()
+
+    report_stage_stats(stages, frame_count, wall_ns, latencies, batch_size, decoder_choice)
+    if worker_errors:
+        raise worker_errors[0]
+
+
+class LatestFrameSlot:
+    """Single-frame mailbox: a newer frame replaces one that was never consumed.
+
+    Items are ``(frame, captured_ns, *extra)`` tuples; per-frame measurements travel in
+    ``extra`` so they are always handed over together with their frame.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._item: Tuple[Any, ...] | None = None
+        self._closed = False
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, frame: Any, captured_ns: int, *extra: Any) -> None:
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self.published += 1
+            self._item = (frame, captured_ns, *extra)
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        with self._cond:
+            return self._closed and self._item is None
+
+    def poll(self) -> Tuple[Any, ...] | None:
+        with self._cond:
+            item, self._item = self._item, None
+            return item
+
+    def take(self) -> Tuple[Any, ...] | None:
+        """Wait for the freshest frame; None once the source is closed and drained."""
+        with self._cond:
+            while self._item is None and not self._closed:
+                # Short waits keep Ctrl+C responsive on the main thread.
+                self._cond.wait(0.1)
+            item, self._item = self._item, None
+            return item
+
+
+def stream_video_realtime(
+    video_path: VideoSource,
+    model: "YOLO",  # type: ignore[name-defined]
+    model_label: str,
+    device: str,
+    confidence: float,
+    max_frames: int,
+    window_title: str,
+    draw_annotations: bool,
+    headless: bool = False,
+    recorder: BenchmarkRecorder | None = None,
+    decoder: str = "auto",
+) -> None:
+    """Always infer on the newest frame, dropping whatever arrived in between.
+
+    A grabber thread keeps reading so the capture buffer never backs up; file
+    sources are paced at their nominal frame rate to behave like a camera.
+    """
+    cap, decoder_choice = open_capture(video_path, decoder)
+    if recorder:
+        recorder.decoder = decoder_choice
+    live = is_live_source(video_path)
+    source_fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+    frame_interval_ns = int(1e9 / source_fps) if not live and source_fps > 0 else 0
+
+    quit_hint = "Press Ctrl+C to stop." if headless else "Press 'q' or ESC to stop."
+    print(
+        f"Streaming {video_path} with {model_label} on {device} (realtime, stale frames dropped"
+        f"{', headless' if headless else ''}). {quit_hint}"
+    )
+
+    if not headless:
+        ensure_window(window_title)
+
+    slot = LatestFrameSlot()
+    stop_event = threading.Event()
+    worker_errors: List[BaseException] = []
+    stages = [StageStats("decode"), StageStats("inference"), StageStats("render")]
+    decode_stats, infer_stats, render_stats = stages
+
+    def grabber() -> None:
+        try:
+            next_due = time.perf_counter_ns()
+            while not stop_event.is_set():
+                t0 = time.perf_counter_ns()
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    break
+                t1 = time.perf_counter_ns()
+                decode_stats.record(t1 - t0)
+                slot.publish(frame, t1, t1 - t0)
+                if frame_interval_ns:
+                    next_due += frame_interval_ns
+                    delay = next_due - time.perf_counter_ns()
+                    if delay > 0:
+                        stop_event.wait(delay / 1e9)
+        except BaseException as exc:  # pylint: disable=broad-except
+            worker_errors.append(exc)
+        finally:
+            slot.close()
+
+    worker = threading.Thread(target=grabber, name="jetsonizer-grabber", daemon=True)
+    fps_meter = FpsMeter()
+    ages: List[int] = []
+    processed = 0
+    start_ns = time.perf_counter_ns()
+    worker.start()
+    try:
+        while not (max_frames and processed >= max_frames):
+            item = slot.take()
+            if item is None:
+                break
+            frame, captured_ns, decode_ns = item
+            processed += 1
+
+            t0 = time.perf_counter_ns()
+            results = predict_frames(model, [frame], device, confidence)[0]
+            call_ns = time.perf_counter_ns() - t0
+            infer_stats.record(call_ns)
+
+            t1 = time.perf_counter_ns()
+            annotated = annotate_frame(frame, results, draw_annotations)
+            quit_requested = False
+            if not headless:
+                overlay_fps_text(annotated, fps_meter.tick())
+            t2 = time.perf_counter_ns()
+            if not headless:
+                quit_requested = display_frame(window_title, annotated)
+            now = time.perf_counter_ns()
+            render_stats.record(now - t1)
+            ages.append(now - captured_ns)
+            if recorder:
+                pre_ns, predict_ns, post_ns = split_predict_ns(results, call_ns, 1)
+                recorder.record(processed, "decode", decode_ns)
+                recorder.record(processed, "preprocess", pre_ns)
+                recorder.record(processed, "predict", predict_ns)
+                recorder.record(processed, "postprocess", post_ns + (t2 - t1))
+                recorder.record(processed, "sink", now - t2)
+                recorder.frame_done(processed)
+            if quit_requested:
+                break
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    finally:
+        wall_ns = time.perf_counter_ns() - start_ns
+        stop_event.set()
+        worker.join(timeout=5.0)
+        cap.release()
+        if not headless:
+            cv2.destroyAllWindows()
+
+    report_stage_stats(stages, processed, wall_ns, decoder=decoder_choice)
+    print(
+        f"Realtime: {slot.published} frames captured, {processed} processed, "
+        f"{slot.dropped} dropped as stale."
+    )
+    if ages:
+        ordered = sorted(ages)
+        print(
+            "Frame age at display (capture to screen): "
+            f"p50 {_percentile(ordered, 0.5) / 1e6:.1f} ms | p90 {_percentile(ordered, 0.9) / 1e6:.1f} ms | "
+            f"max {ordered[-1] / 1e6:.1f} ms"
+        )
+    if worker_errors:
+        raise worker_errors[0]
+
+
+@dataclass
+class StreamState:
+    """Per-source bookkeeping for the multi-stream scheduler."""
+
+    index: int
+    source: VideoSource
+    draw_annotations: bool
+    frames: Any
+    served: int = 0
+    exhausted: bool = False
+    last_served_ns: int = 0
+    max_wait_ns: int = 0
+    last_frame: Any = None
+    fps_meter: FpsMeter = field(default_factory=FpsMeter)
+
+    def mark_served(self, now_ns: int, start_ns: int) -> None:
+        waited = now_ns - (self.last_served_ns or start_ns)
+        self.max_wait_ns = max(self.max_wait_ns, waited)
+        self.last_served_ns = now_ns
+        self.served += 1
+
+
+def _poll_stream(state: StreamState) -> Tuple[Any, int] | None:
+    """Take a ready frame from a stream without blocking."""
+    if state.exhausted:
+        return None
+    if isinstance(state.frames, LatestFrameSlot):
+        item = state.frames.poll()
+        if item is None and state.frames.closed:
+            state.exhausted = True
+        return item
+    try:
+        item = state.frames.get_nowait()
+    except queue.Empty:
+        return None
+    if item is _END_OF_STREAM:
+        state.exhausted = True
+        return None
+    return item
+
+
+def tile_frames(frames: List[Any], tile_size: Tuple[int, int] = (640, 360)):
+    """Lay frames out on a near-square grid; streams without a frame yet stay black."""
+    import numpy as np  # type: ignore import-not-found
+
+    width, height = tile_size
+    cols = math.ceil(math.sqrt(len(frames)))
+    rows = math.ceil(len(frames) / cols)
+    blank = np.zeros((height, width, 3), dtype=np.uint8)
+    tiles = [cv2.resize(frame, tile_size) if frame is not None else blank for frame in frames]
+    tiles += [blank] * (rows * cols - len(tiles))
+    return np.vstack([np.hstack(tiles[row * cols : (row + 1) * cols]) for row in range(rows)])
+
+
+def stream_multi(
+    video_paths: List[VideoSource],
+    model: "YOLO",  # type: ignore[name-defined]
+    model_label: str,
+    device: str,
+    confidence: float,
+    max_frames: int,
+    window_title: str,
+    draw_annotations: List[bool],
+    scheduler: str,
+    queue_size: int,
+    realtime: bool = False,
+    headless: bool = False,
+    decoder: str = "auto",
+    recorder: BenchmarkRecorder | None = None,
+) -> Dict[str, Any]:
+    """Serve several sources from one model and report per-stream fairness.
+
+    Every source gets its own capture thread. The scheduler either serves one ready
+    stream at a time in round-robin order or batches one frame from every ready
+    stream into a single predict call. ``recorder`` only collects frame completion
+    times here, for lining up telemetry samples.
+    """
+    opened = [open_capture(path, decoder) for path in video_paths]
+    caps = [cap for cap, _ in opened]
+
+    quit_hint = "Press Ctrl+C to stop." if headless else "Press 'q' or ESC to stop."
+    print(
+        f"Streaming {len(video_paths)} sources with {model_label} on {device} "
+        f"({scheduler} scheduler{', realtime' if realtime else ''}"
+        f"{', headless' if headless else ''}). {quit_hint}"
+    )
+
+    if not headless:
+        ensure_window(window_title)
+
+    streams = [
+        StreamState(
+            index=idx,
+            source=path,
+            draw_annotations=draw,
+            frames=LatestFrameSlot() if realtime else queue.Queue(maxsize=queue_size),
+        )
+        for idx, (path, draw) in enumerate(zip(video_paths, draw_annotations))
+    ]
+    stop_event = threading.Event()
+    frames_ready = threading.Event()
+    worker_errors: List[BaseException] = []
+
+    def capture_worker(state: StreamState, cap: Any) -> None:
+        try:
+            captured = 0
+            # Realtime file sources are paced like cameras, as in stream_video_realtime.
+            source_fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+            pace_ns = int(1e9 / source_fps) if realtime and source_fps > 0 and not is_live_source(state.source) else 0
+            next_due = time.perf_counter_ns()
+            while not stop_event.is_set():
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    break
+                captured += 1
+                item = (frame, time.perf_counter_ns())
+                if isinstance(state.frames, LatestFrameSlot):
+                    state.frames.publish(*item)
+                elif not _put_until_stopped(state.frames, item, stop_event):
+                    return
+                frames_ready.set()
+                if max_frames and captured >= max_frames:
+                    break
+                if pace_ns:
+                    next_due += pace_ns
+                    delay = next_due - time.perf_counter_ns()
+                    if delay > 0:
+                        stop_event.wait(delay / 1e9)
+        except BaseException as exc:  # pylint: disable=broad-except
+            worker_errors.append(exc)
+            stop_event.set()
+        finally:
+            if isinstance(state.frames, LatestFrameSlot):
+                state.frames.close()
+            else:
+                _put_until_stopped(state.frames, _END_OF_STREAM, stop_event)
+            frames_ready.set()
+
+    workers = [
+        threading.Thread(
+            target=capture_worker, args=(state, cap), name=f"jetsonizer-capture-{state.index}", daemon=True
+        )
+        for state, cap in zip(streams, caps)
+    ]
+    infer_stats = StageStats("inference")
+    predict_calls = 0
+    served = 0
+    cursor = 0
+    start_ns = time.perf_counter_ns()
+    for worker in workers:
+        worker.start()
+    try:
+        while not stop_event.is_set():
+            frames_ready.clear()
+            if all(state.exhausted for state in streams):
+                break
+            picks: List[Tuple[StreamState, Tuple[Any, int]]] = []
+            if scheduler == "round-robin":
+                for offset in range(len(streams)):
+                    state = streams[(cursor + offset) % len(streams)]
+                    item = _poll_stream(state)
+                    if item is not None:
+                        picks.append((state, item))
+                        cursor = (state.index + 1) % len(streams)
+                        break
+            else:
+                for state in streams:
+                    item = _poll_stream(state)
+                    if item is not None:
+                        picks.append((state, item))
+            if not picks:
+                frames_ready.wait(0.05)
+                continue
+
+            frames = [frame for _, (frame, _) in picks]
+            t0 = time.perf_counter_ns()
+            per_frame_results = predict_frames(model, frames, device, confidence)
+            now = time.perf_counter_ns()
+            infer_stats.record(now - t0, frames=len(frames))
+            predict_calls += 1
+            for (state, (frame, _)), results in zip(picks, per_frame_results):
+                state.mark_served(now, start_ns)
+                served += 1
+                if recorder:
+                    recorder.frame_done(served)
+                if not headless:
+                    annotated = annotate_frame(frame, results, state.draw_annotations)
+                    overlay_fps_text(annotated, state.fps_meter.tick())
+                    state.last_frame = annotated
+
+            if not headless:
+                if display_frame(window_title, tile_frames([state.last_frame for state in streams])):
+                    break
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+    finally:
+        wall_ns = time.perf_counter_ns() - start_ns
+        stop_event.set()
+        for worker in workers:
+            worker.join(timeout=5.0)
+        for cap in caps:
+            cap.release()
+        if not headless:
+            cv2.destroyAllWindows()
+
+    summary = summarize_streams(streams, wall_ns, scheduler, predict_calls)
+    for entry, (_, choice) in zip(summary["streams"], opened):
+        entry["decoder"] = choice.backend
+    print_stream_summary(summary)
+    if worker_errors:
+        raise worker_errors[0]
+    return summary
+
+
+def summarize_streams(
+    streams: List[StreamState], wall_ns: int, scheduler: str, predict_calls: int
+) -> Dict[str, Any]:
+    wall_seconds = wall_ns / 1e9
+    per_stream = []
+    for state in streams:
+        dropped = state.frames.dropped if isinstance(state.frames, LatestFrameSlot) else 0
+        per_stream.append(
+            {
+                "index": state.index,
+                "source": str(state.source),
+                "frames": state.served,
+                "fps": state.served / wall_seconds if wall_seconds > 0 else 0.0,
+                "dropped": dropped,
+                "max_starvation_ms": state.max_wait_ns / 1e6,
+            }
+        )
+    total = sum(entry["frames"] for entry in per_stream)
+    worst = max(per_stream, key=lambda entry: entry["max_starvation_ms"])
+    return {
+        "scheduler": scheduler,
+        "wall_seconds": wall_seconds,
+        "predict_calls": predict_calls,
+        "aggregate_fps": total / wall_seconds if wall_seconds > 0 else 0.0,
+        "max_starvation_ms": worst["max_starvation_ms"],
+        "most_starved_stream": worst["index"],
+        "streams": per_stream,
+    }
+
+
+def print_stream_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"Multi-stream summary ({summary['scheduler']}, {len(summary['streams'])} streams, "
+        f"{summary['predict_calls']} predict calls in {summary['wall_seconds']:.2f}s):"
+    )
+    for entry in summary["streams"]:
+        print(
+            f"  [{entry['index']}] {entry['fps']:7.1f} FPS | {entry['frames']} frames | "
+            f"{entry['dropped']} dropped | max wait {entry['max_starvation_ms']:.1f} ms | "
+            f"{entry.get('decoder', 'cpu')} decode | {entry['source']}"
+        )
+    print(
+        f"  aggregate {summary['aggregate_fps']:.1f} FPS | worst starvation "
+        f"{summary['max_starvation_ms']:.1f} ms (stream {summary['most_starved_stream']})"
+    )
+
+
+def run_precision_pass(
+    model: "YOLO",  # type: ignore[name-defined]
+    video_path: Path,
+    frames: int,
+    device: str,
+    confidence: float,
+    decoder: str,
+) -> Dict[str, Any]:
+    """Predict the first ``frames`` frames one at a time, recording latency and detections."""
+    cap, _ = open_capture(video_path, decoder)
+    latencies: List[int] = []
+    detections: List[List[Dict[str, Any]]] = []
+    try:
+        while len(detections) < frames:
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                break
+            t0 = time.perf_counter_ns()
+            results = model.predict(frame, device=device, conf=confidence, verbose=False)
+            latencies.append(time.perf_counter_ns() - t0)
+            detections.append(detections_from_results(results))
+    finally:
+        cap.release()
+    return {"latencies_ns": latencies, "detections": detections}
+
+
+def _release_cuda_memory() -> None:
+    try:
+        import torch  # type: ignore import-not-found
+
+        torch.cuda.empty_cache()
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+def compare_precisions(args: argparse.Namespace, video_path: Path, device: str, precisions: List[str]) -> None:
+    """Run each precision over the same frames of one video file and report against fp32."""
+    frames = args.max_frames or PRECISION_COMPARE_FRAMES
+    calibration = prepare_calibration_set(video_path, args.calibration_frames) if "int8" in precisions else None
+    runs: List[Dict[str, Any]] = []
+    for precision in ["fp32", *[value for value in precisions if value != "fp32"]]:
+        model_path, cache_outcome = prepare_model_artifact(
+            weights=args.model,
+            backend=args.backend,
+            imgsz=args.imgsz,
+            batch=1,
+            precision=precision,
+            device=device,
+            cache_dir=args.engine_cache_dir.expanduser(),
+            cache_max_bytes=int(args.engine_cache_max_gb * 1024**3),
+            calibration=calibration if precision == "int8" else None,
+        )
+        model = load_model(model_path, device, args.imgsz, half=precision == "fp16")
+        print(f"Running {precision} over up to {frames} frames of {video_path}...")
+        run = run_precision_pass(model, video_path, frames, device, args.confidence, args.decoder)
+        run.update(
+            precision=precision,
+            warmup_frames=min(args.warmup_frames, len(run["detections"]) // 2),
+            artifact=model_path,
+            cache_key=cache_outcome.key if cache_outcome else None,
+        )
+        runs.append(run)
+        # Free the previous model before the next one loads; Jetson GPU memory is shared with the CPU.
+        del model
+        _release_cuda_memory()
+
+    report = build_precision_report(runs, args.agreement_iou)
+    print_precision_report(report)
+    for run, row in zip(runs, report["precisions"]):
+        entry = HISTORY.recording(
+            "precision", f"{args.model} {args.backend} {run['precision']} imgsz {args.imgsz} {video_path.name}"
+        )
+        entry.add("predict", [value / 1e6 for value in run["latencies_ns"][run["warmup_frames"] :]], "ms")
+        entry.add("throughput", row["throughput_fps"], "fps", higher_is_better=True)
+        if row["agreement"]:
+            entry.add("recall vs fp32", row["agreement"]["recall"], "ratio", higher_is_better=True)
+            entry.add("precision vs fp32", row["agreement"]["precision"], "ratio", higher_is_better=True)
+        HISTORY.save(entry)
+    record = {
+        "script": Path(__file__).name,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "video": str(video_path),
+        "model": args.model,
+        "device": device,
+        "backend": args.backend,
+        "imgsz": args.imgsz,
+        "confidence": args.confidence,
+        "calibration": {"key": calibration[0], "dir": str(calibration[1])} if calibration else None,
+        "report": report,
+        "runs": runs,
+    }
+    record_path = _write_benchmark_report(record, kind="precision")
+    if record_path:
+        print(f"Precision runs and report written to {record_path}")
+        print(f"Rebuild the report on any machine with --precision-report {record_path}")
+    else:
+        print(f"Failed to write precision report under {LOG_DIR}.", file=sys.stderr)
+
+
+AUTOTUNE_SAMPLE_FRAMES = 64
+
+
+def read_sample_frames(video_path: Path, count: int, decoder: str) -> List[Any]:
+    """Decode the first ``count`` frames once so every configuration sees the same input."""
+    cap, _ = open_capture(video_path, decoder)
+    frames: List[Any] = []
+    try:
+        while len(frames) < count:
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                break
+            frames.append(frame)
+    finally:
+        cap.release()
+    if not frames:
+        raise SystemExit(f"Could not decode any frames from {video_path}.")
+    return frames
+
+
+def measure_config(
+    args: argparse.Namespace,
+    config: TuneConfig,
+    device: str,
+    frames: List[Any],
+    targets: List[Target],
+    calibration: Tuple[str, Path] | None,
+) -> Dict[str, Any]:
+    """Export and load one configuration and time batched predict calls over ``frames``.
+
+    Stops as soon as even the fastest call so far rules out every target.
+    """
+    model_path, _ = prepare_model_artifact(
+        weights=config.model,
+        backend=args.backend,
+        imgsz=config.imgsz,
+        batch=config.batch,
+        precision=config.precision,
+        device=device,
+        cache_dir=args.engine_cache_dir.expanduser(),
+        cache_max_bytes=int(args.engine_cache_max_gb * 1024**3),
+        calibration=calibration if config.precision == "int8" else None,
+    )
+    model = load_model(model_path, device, config.imgsz, half=config.precision == "fp16")
+    position = 0
+
+    def next_batch() -> List[Any]:
+        nonlocal position
+        batch = [frames[(position + offset) % len(frames)] for offset in range(config.batch)]
+        position += config.batch
+        return batch
+
+    try:
+        for _ in range(args.autotune_warmup):
+            predict_frames(model, next_batch(), device, args.confidence)
+        latencies: List[int] = []
+        for _ in range(args.autotune_iters):
+            batch = next_batch()
+            t0 = time.perf_counter_ns()
+            predict_frames(model, batch, device, args.confidence)
+            latencies.append(time.perf_counter_ns() - t0)
+            if len(latencies) < MIN_SAMPLES_BEFORE_PRUNING:
+                continue
+            fastest_ms = min(latencies) / 1e6
+            missed = {target.name: target.unreachable(config.batch, fastest_ms) for target in targets}
+            if all(missed.values()):
+                return {
+                    "status": "pruned",
+                    "reason": f"fastest of {len(latencies)} calls {fastest_ms:.1f} ms misses every target",
+                    "missed": missed,
+                    "metrics": None,
+                }
+    finally:
+        del model
+        _release_cuda_memory()
+    stats = _latency_stats(latencies)
+    # Every frame of a batch waits for the whole call, so the call time is the frame latency.
+    metrics = {
+        "calls": len(latencies),
+        "mean_ms": stats["mean_ms"],
+        "p50_ms": stats["p50_ms"],
+        "p90_ms": stats["p90_ms"],
+        "fps": config.batch * len(latencies) / (sum(latencies) / 1e9),
+    }
+    entry = HISTORY.recording("autotune", f"{config.label} {args.backend}")
+    entry.add("predict call", [value / 1e6 for value in latencies], "ms")
+    entry.add("throughput", metrics["fps"], "fps", higher_is_better=True)
+    HISTORY.save(entry)
+    return {
+        "status": "measured",
+        "metrics": metrics,
+        "missed": {target.name: target.failed_on(metrics) for target in targets},
+    }
+
+
+def run_autotune(args: argparse.Namespace, video_path: Path, device: str, using_cuda: bool) -> None:
+    """Measure the grid (resuming from its checkpoint) and write the deployment profile."""
+    models = args.autotune_models or [args.model]
+    if args.autotune_precision:
+        precisions = args.autotune_precision
+    elif not using_cuda:
+        precisions = ["fp32"]
+    else:
+        precisions = ["fp32", "fp16", "int8"] if args.backend == "engine" else ["fp32", "fp16"]
+    targets = args.autotune_target or [parse_target("fps=30")]
+    grid = build_grid(models, args.autotune_imgsz, args.autotune_batch, precisions)
+    frames = read_sample_frames(video_path, max(AUTOTUNE_SAMPLE_FRAMES, *args.autotune_batch), args.decoder)
+    signature = {
+        "host": platform.node(),
+        "device": device,
+        "backend": args.backend,
+        "video": str(video_path),
+        "frames": len(frames),
+        "models": models,
+        "imgsz": sorted(set(args.autotune_imgsz)),
+        "batch": sorted(set(args.autotune_batch)),
+        "precision": sorted(set(precisions)),
+        "targets": [asdict(target) for target in targets],
+        "warmup": args.autotune_warmup,
+        "iters": args.autotune_iters,
+        "confidence": args.confidence,
+    }
+    checkpoint_path = (args.autotune_checkpoint or TuneCheckpoint.path_for(signature)).expanduser()
+    if args.autotune_restart:
+        checkpoint_path.unlink(missing_ok=True)
+    checkpoint = TuneCheckpoint(checkpoint_path, signature)
+    done = sum(1 for config in grid if config.key in checkpoint.results)
+    if done:
+        print(f"Resuming from {checkpoint_path}: {done} of {len(grid)} configurations already measured.")
+    calibration = prepare_calibration_set(video_path, args.calibration_frames) if "int8" in precisions else None
+
+    try:
+        for position, config in enumerate(grid, 1):
+            if config.key in checkpoint.results:
+                continue
+            prefix = f"[{position}/{len(grid)}] {config.label}"
+            blockers = [ruled_out_by(config, target, checkpoint.results) for target in targets]
+            if all(blockers):
+                blocker = TuneConfig(**checkpoint.results[blockers[0]]["config"])
+                reason = f"ruled out by {blocker.label}" if len(set(blockers)) == 1 else "ruled out for every target"
+                checkpoint.record(config, {"status": "skipped", "reason": reason, "missed": {}, "metrics": None})
+                print(f"{prefix}: skipped, {reason}")
+                continue
+            print(f"{prefix}: measuring...")
+            try:
+                result = measure_config(args, config, device, frames, targets, calibration)
+            except (Exception, SystemExit) as exc:  # pylint: disable=broad-except
+                # One configuration failing to export or load (e.g. out of memory) should not end the sweep.
+                # Missing weights and failed exports are reported as SystemExit.
+                lines = str(exc).strip().splitlines()
+                reason = lines[-1][:200] if lines else type(exc).__name__
+                result = {"status": "failed", "reason": reason, "missed": {}, "metrics": None}
+            checkpoint.record(config, result)
+            metrics = result["metrics"]
+            detail = (
+                f"p90 {metrics['p90_ms']:.1f} ms, {metrics['fps']:.1f} FPS" if metrics else result.get("reason", "")
+            )
+            print(f"{prefix}: {result['status']} ({detail})")
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; progress is saved in {checkpoint_path}. Run the same command again to resume.")
+        return
+
+    best = select_best(checkpoint.results, targets, models)
+    print_autotune_summary(checkpoint.results, best, targets)
+    profile = build_profile(
+        best,
+        targets,
+        {
+            "host": platform.node(),
+            "device": device,
+            "backend": args.backend,
+            "video": str(video_path),
+            "checkpoint": str(checkpoint_path),
+        },
+    )
+    profile_path = args.autotune_profile.expanduser()
+    try:
+        write_profile(profile_path, profile)
+    except OSError as exc:
+        raise SystemExit(f"Failed to write the deployment profile to {profile_path}: {exc}") from exc
+    print(f"Deployment profile written to {profile_path}; load it with --deploy-profile {profile_path}")
+
+
+def main() -> None:
+    with STARTUP.phase("parse arguments"):
+        args = parse_args()
+    if args.profile_startup:
+        STARTUP.enable(args.profile_startup)
+    if not 0.0 < args.agreement_iou <= 1.0:
+        raise SystemExit("Agreement IoU must be within (0, 1].")
+    if args.precision_report:
+        try:
+            recorded = json.loads(args.precision_report.expanduser().read_text(encoding="utf-8"))
+            runs = recorded["runs"]
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            raise SystemExit(f"Cannot read precision runs from {args.precision_report}: {exc}") from exc
+        print_precision_report(build_precision_report(runs, args.agreement_iou))
+        return
+    HISTORY.enable(not args.no_history)
+
+    video_paths = [parse_video_source(value) for value in args.video]
+    for path in video_paths:
+        # --serve only needs --video for INT8 calibration.
+        if isinstance(path, Path) and not path.exists() and not (args.serve and "int8" not in args.precision):
+            raise SystemExit(f"Video file not found: {path}")
+    video_path = video_paths[0]
+    multi_stream = len(video_paths) > 1
+
+    if not 0.0 < args.confidence <= 1.0:
+        raise SystemExit("Confidence must be within (0, 1].")
+
+    if args.queue_size < 1:
+        raise SystemExit("Queue size must be at least 1.")
+
+    if args.batch_size < 1:
+        raise SystemExit("Batch size must be at least 1.")
+
+    if args.warmup_frames < 0:
+        raise SystemExit("Warm-up frames cannot be negative.")
+
+    if args.telemetry_interval <= 0:
+        raise SystemExit("Telemetry interval must be positive.")
+
+    if args.realtime and (args.batch_size > 1 or args.pipeline == "threaded"):
+        raise SystemExit("--realtime processes one fresh frame at a time; drop --batch-size/--pipeline.")
+
+    if multi_stream and (args.batch_size > 1 or args.pipeline == "threaded"):
+        raise SystemExit(
+            "Multiple --video sources already run one capture thread each; use --scheduler batch "
+            "instead of --batch-size/--pipeline."
+        )
+
+    if args.fast_preprocess and (multi_stream or args.realtime or args.pipeline == "threaded"):
+        raise SystemExit("--fast-preprocess drives the serial single-stream pipeline; drop --realtime/--pipeline.")
+
+    if args.imgsz < 32 or args.imgsz % 32:
+        raise SystemExit("Image size must be a positive multiple of 32.")
+
+    if args.detect_every < 1:
+        raise SystemExit("--detect-every must be at least 1.")
+    if args.detect_min_confidence is not None and not 0.0 < args.detect_min_confidence <= 1.0:
+        raise SystemExit("--detect-min-confidence must be within (0, 1].")
+    if not 0.0 < args.tracker_iou <= 1.0:
+        raise SystemExit("Tracker IoU must be within (0, 1].")
+    tracking_mode = args.detect_every > 1 or args.detect_min_confidence is not None
+    if tracking_mode and (
+        multi_stream or args.realtime or args.pipeline == "threaded" or args.batch_size > 1 or args.serve
+    ):
+        raise SystemExit(
+            "--detect-every tracks one frame at a time in the serial single-stream pipeline; "
+            "drop --realtime/--pipeline/--batch-size/--serve."
+        )
+    if args.drift_reference and not (tracking_mode and isinstance(video_path, Path)):
+        raise SystemExit("--drift-reference needs --detect-every and a video file to replay.")
+
+    precisions = list(dict.fromkeys(args.precision))
+    compare_mode = len(precisions) > 1
+    if compare_mode and (multi_stream or not isinstance(video_path, Path)):
+        raise SystemExit("Comparing precisions needs a single video file so every precision sees the same frames.")
+    if "int8" in precisions and not isinstance(video_path, Path):
+        raise SystemExit("INT8 calibrates on frames from --video; pass a video file.")
+    if "int8" in precisions and args.backend != "engine":
+        raise SystemExit("INT8 needs --backend engine; calibration happens while the TensorRT engine is built.")
+    if args.calibration_frames < 1:
+        raise SystemExit("Calibration frames must be at least 1.")
+
+    if args.serve and args.client:
+        raise SystemExit("Use --serve and --client in separate processes.")
+    if (args.serve or args.client) and compare_mode:
+        raise SystemExit("Precision comparisons load each model themselves; drop --serve/--client.")
+    if args.client and args.fast_preprocess:
+        raise SystemExit("--fast-preprocess feeds a local model; the daemon does its own preprocessing.")
+    if args.daemon_max_batch < 1 or args.daemon_queue < 1 or args.daemon_batch_window_ms < 0:
+        raise SystemExit("Daemon batch size and queue must be at least 1 and the batch window non-negative.")
+
+    if args.autotune:
+        if args.serve or args.client or multi_stream or args.realtime or tracking_mode or compare_mode:
+            raise SystemExit(
+                "--autotune measures the grid itself; drop --serve/--client/--realtime/--detect-every, "
+                "extra --video sources and extra --precision values."
+            )
+        if not isinstance(video_path, Path):
+            raise SystemExit("--autotune needs a video file so every configuration sees the same frames.")
+        if args.autotune_iters < MIN_SAMPLES_BEFORE_PRUNING or args.autotune_warmup < 0:
+            raise SystemExit(
+                f"--autotune-iters must be at least {MIN_SAMPLES_BEFORE_PRUNING} and --autotune-warmup non-negative."
+            )
+        if any(size < 32 or size % 32 for size in args.autotune_imgsz) or min(args.autotune_batch) < 1:
+            raise SystemExit("Autotune image sizes must be positive multiples of 32 and batch sizes at least 1.")
+        if "int8" in (args.autotune_precision or []) and args.backend != "engine":
+            raise SystemExit("INT8 needs --backend engine; calibration happens while the TensorRT engine is built.")
+
+    with STARTUP.phase("import cv2", "import"):
+        load_opencv()
+    if args.client:
+        # Everything model-related lives in the daemon; this process never imports torch.
+        with STARTUP.phase("connect to daemon"):
+            from inference_daemon import DaemonClient
+
+            client = DaemonClient(args.daemon_socket.expanduser())
+        model: Any = DaemonModel(client, slots=args.batch_size)
+        device = str(client.info.get("device", "daemon"))
+        using_cuda = device.startswith("cuda")
+        precision = str(client.info.get("precision", "fp32"))
+        model_label = str(client.info.get("model", args.model))
+        cache_outcome = None
+        print(f"Using the inference daemon at {client.socket_path} ({client.info.get('model')}, {precision}).")
+    else:
+        device, using_cuda = resolve_device(args.device)
+        if args.backend == "engine" and not using_cuda:
+            raise SystemExit("The TensorRT engine backend requires a CUDA device.")
+        if not using_cuda and precisions != ["fp32"]:
+            raise SystemExit("fp16 and int8 precision require a CUDA device.")
+        if STARTUP.enabled and using_cuda:
+            with STARTUP.phase("CUDA context"):
+                create_cuda_context(device)
+        if args.autotune:
+            if not using_cuda and set(args.autotune_precision or ["fp32"]) != {"fp32"}:
+                raise SystemExit("fp16 and int8 precision require a CUDA device.")
+            run_autotune(args, video_path, device, using_cuda)
+            return
+        if compare_mode:
+            compare_precisions(args, video_path, device, precisions)
+            return
+
+        precision = precisions[0]
+        model_label = args.model
+        if args.serve:
+            # Engines must accept the daemon's largest micro-batch.
+            export_batch = args.daemon_max_batch
+        elif multi_stream and args.scheduler == "batch":
+            export_batch = len(video_paths)
+        else:
+            export_batch = args.batch_size
+        with STARTUP.phase("export or engine cache"):
+            model_path, cache_outcome = prepare_model_artifact(
+                weights=args.model,
+                backend=args.backend,
+                imgsz=args.imgsz,
+                batch=export_batch,
+                precision=precision,
+                device=device,
+                cache_dir=args.engine_cache_dir.expanduser(),
+                cache_max_bytes=int(args.engine_cache_max_gb * 1024**3),
+                calibration=(
+                    prepare_calibration_set(video_path, args.calibration_frames) if precision == "int8" else None
+                ),
+            )
+        model = load_model(model_path, device, args.imgsz, half=precision == "fp16")
+        if args.serve:
+            serve_model(args, model, device, precision)
+            return
+    draw_per_stream = [should_draw_overlay(args.overlay_mode, path) for path in video_paths]
+    draw_annotations = draw_per_stream[0]
+
+    if not args.client:
+        if using_cuda:
+            print("Using CUDA for inference.")
+        else:
+            print("Running on CPU. Set --device cuda:0 if a GPU becomes available.")
+
+    if args.overlay_mode == "auto" and not all(draw_per_stream):
+        print(
+            "Sample video already includes bounding boxes; skipping additional overlays. "
+            "Use --overlay-mode always to draw them anyway."
+        )
+
+    stream_kwargs = dict(
+        video_path=video_path,
+        model=model,
+        model_label=model_label,
+        device=device,
+        confidence=args.confidence,
+        max_frames=args.max_frames,
+        window_title=args.window_title,
+        draw_annotations=draw_annotations,
+        batch_size=args.batch_size,
+        headless=args.headless,
+        recorder=BenchmarkRecorder(args.warmup_frames) if args.benchmark or args.telemetry else None,
+        decoder=args.decoder,
+    )
+    if args.fast_preprocess:
+        stream_kwargs["fast_preprocess"] = True
+    reference: Dict[str, Any] | None = None
+    if tracking_mode:
+        from box_tracker import TrackedDetector, print_tracking_summary, rows_from_detections, score_drift
+
+        if args.drift_reference:
+            frames = args.max_frames or PRECISION_COMPARE_FRAMES
+            print(f"Detecting on every one of up to {frames} frames of {video_path} for the drift reference...")
+            reference = run_precision_pass(model, video_path, frames, device, args.confidence, args.decoder)
+            # The streamed run must cover the same frames as the reference.
+            stream_kwargs["max_frames"] = len(reference["detections"])
+        stream_kwargs["tracking"] = TrackedDetector(
+            args.detect_every, args.detect_min_confidence, args.tracker_iou, record=args.drift_reference
+        )
+    backend = str(model.client.info.get("backend")) if args.client else args.backend
+    pipeline = f"multi-{args.scheduler}" if multi_stream else "realtime" if args.realtime else args.pipeline
+    history_config = [model_label, backend, precision, f"imgsz {args.imgsz}", f"batch {args.batch_size}", pipeline]
+    history_config.append(f"decoder {args.decoder}")
+    history_config.extend(path.name if isinstance(path, Path) else str(path) for path in video_paths)
+    if args.fast_preprocess:
+        history_config.append("fast-preprocess")
+    if tracking_mode:
+        history_config.append(f"detect-every {args.detect_every}")
+    history_run = HISTORY.recording(
+        "benchmark" if stream_kwargs["recorder"] is not None else "validation", " ".join(history_config)
+    )
+    multi_summary: Dict[str, Any] | None = None
+    sampler = TelemetrySampler(args.telemetry_interval, extra=args.telemetry_source) if args.telemetry else None
+    if sampler:
+        sampler.start()
+    telemetry_origin_ns = time.perf_counter_ns()
+    try:
+        if multi_stream:
+            multi_summary = stream_multi(
+                video_paths=video_paths,
+                model=model,
+                model_label=model_label,
+                device=device,
+                confidence=args.confidence,
+                max_frames=args.max_frames,
+                window_title=args.window_title,
+                draw_annotations=draw_per_stream,
+                scheduler=args.scheduler,
+                queue_size=args.queue_size,
+                realtime=args.realtime,
+                headless=args.headless,
+                decoder=args.decoder,
+                recorder=stream_kwargs["recorder"],
+            )
+        elif args.realtime:
+            stream_kwargs.pop("batch_size")
+            stream_video_realtime(**stream_kwargs)
+        elif args.pipeline == "threaded":
+            stream_video_threaded(queue_size=args.queue_size, **stream_kwargs)
+        else:
+            stream_video(**stream_kwargs)
+    except BaseException as exc:
+        HISTORY.failed(history_run, exc)
+        raise
+    finally:
+        if sampler:
+            sampler.stop()
+        if isinstance(model, DaemonModel):
+            model.client.close()
+    STARTUP.finish()
+
+    tracking_report: Dict[str, Any] | None = None
+    tracking = stream_kwargs.get("tracking")
+    if tracking is not None:
+        tracking_report = tracking.summary()
+        drift = None
+        if reference is not None:
+            drift = score_drift(
+                [rows_from_detections(detections) for detections in reference["detections"]],
+                tracking.outputs,
+                tracking.gaps,
+            )
+            tracking_report["drift"] = drift
+            tracking_report["reference"] = _latency_stats(reference["latencies_ns"])
+        print_tracking_summary(tracking_report, drift)
+        if reference is not None:
+            # p50 so the reference's warm-up predicts do not count against it.
+            p50_ms = tracking_report["reference"]["p50_ms"]
+            print(
+                f"  reference: detecting every frame took p50 {p50_ms:.1f} ms per frame "
+                f"(~{1000 / p50_ms if p50_ms else 0.0:.1f} frames/s of predict alone)"
+            )
+
+    recorder = stream_kwargs["recorder"]
+    if recorder is not None:
+        if multi_summary is not None:
+            summary = {"multi_stream": multi_summary}
+        else:
+            summary = recorder.summary()
+            print_benchmark_summary(summary)
+        if sampler:
+            telemetry_summary = sampler.summary()
+            print_telemetry_summary(telemetry_summary)
+            summary["telemetry"] = {
+                "summary": telemetry_summary,
+                # t_s counts from the start of streaming; frames/fps are per sample interval.
+                "samples": align_with_frames(sampler.samples, recorder.frame_times_ns, telemetry_origin_ns),
+            }
+        report = {
+            "script": Path(__file__).name,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "host": platform.node(),
+            "video": [str(path) for path in video_paths] if multi_stream else str(video_path),
+            "model": model_label,
+            "device": device,
+            "backend": backend,
+            "precision": precision,
+            "daemon": str(args.daemon_socket) if args.client else None,
+            "imgsz": args.imgsz,
+            "engine_cache": (
+                {
+                    "key": cache_outcome.key,
+                    "hit": cache_outcome.hit,
+                    "export_seconds": cache_outcome.export_seconds,
+                    "artifact": str(cache_outcome.artifact),
+                }
+                if cache_outcome
+                else None
+            ),
+            "pipeline": pipeline,
+            "batch_size": args.batch_size,
+            "headless": args.headless,
+            "decoder_requested": args.decoder,
+            "fast_preprocess": args.fast_preprocess,
+            "tracking": tracking_report,
+            "time_to_first_result_s": STARTUP.time_to_first_result,
+            "startup": STARTUP.summary() if STARTUP.enabled else None,
+            **summary,
+        }
+        report_path = _write_benchmark_report(report)
+        if report_path:
+            print(f"Benchmark report written to {report_path}")
+        else:
+            print(f"Failed to write benchmark report under {LOG_DIR}.", file=sys.stderr)
+        if multi_summary is not None:
+            history_run.add("aggregate throughput", multi_summary["aggregate_fps"], "fps", higher_is_better=True)
+            history_run.add("max starvation", multi_summary["max_starvation_ms"], "ms")
+        else:
+            history_run.add("throughput", summary["throughput_fps"], "fps", higher_is_better=True)
+            for stage, samples in recorder.samples.items():
+                history_run.add(stage, [value / 1e6 for value in samples], "ms")
+        history_run.details["report"] = str(report_path) if report_path else None
+    history_run.add("time to first result", STARTUP.time_to_first_result, "s")
+    HISTORY.save(history_run)
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
@@ -0,0 +1,78 @@
+import numpy as np
+
+from box_tracker import BoxTracker, TrackedDetector, greedy_assign, iou_matrix
+
+
+def _box(x, y, size=20.0, conf=0.9, cls=0.0):
+    return [x, y, x + size, y + size, conf, cls]
+
+
+def test_iou_matrix():
+    first = np.array([[0, 0, 10, 10], [100, 100, 110, 110]], dtype=float)
+    second = np.array([[0, 0, 10, 10], [5, 0, 15, 10]], dtype=float)
+    scores = iou_matrix(first, second)
+    assert np.allclose(scores, [[1.0, 50 / 150], [0.0, 0.0]])
+
+
+def test_greedy_assign_takes_best_pairs_once():
+    scores = np.array([[0.9, 0.8], [0.85, 0.1]])
+    assert greedy_assign(scores, 0.3) == [(0, 0)]
+    assert greedy_assign(np.array([[0.9, 0.8], [0.85, 0.5]]), 0.3) == [(0, 0), (1, 1)]
+
+
+def test_track_keeps_its_id_and_follows_a_moving_box():
+    tracker = BoxTracker()
+    for step in range(6):
+        tracker.predict()
+        tracker.update(np.array([_box(10.0 + 5 * step, 50.0)]))
+    assert tracker.ids.tolist() == [0]
+    # The filter has learned the velocity, so a frame without a detection keeps moving the box.
+    tracker.predict()
+    assert abs(tracker.boxes()[0, 0] - 40.0) < 2.0
+
+
+def test_other_classes_do_not_continue_a_track():
+    tracker = BoxTracker()
+    tracker.predict()
+    tracker.update(np.array([_box(10.0, 10.0, cls=0.0)]))
+    tracker.predict()
+    tracker.update(np.array([_box(10.0, 10.0, cls=1.0)]))
+    # The class-0 track missed once and is hidden; the class-1 box starts a new track.
+    assert sorted(tracker.ids.tolist()) == [0, 1]
+    assert tracker.rows()[:, 5].tolist() == [1.0]
+
+
+def test_unmatched_tracks_are_dropped_after_max_misses():
+    tracker = BoxTracker(max_misses=1)
+    tracker.predict()
+    tracker.update(np.array([_box(10.0, 10.0)]))
+    for _ in range(2):
+        tracker.predict()
+        tracker.update(np.zeros((0, 6)))
+    assert len(tracker) == 0
+    assert tracker.confidence() == 1.0
+
+
+def test_confidence_decays_between_detections():
+    tracker = BoxTracker()
+    for step in range(3):
+        tracker.predict()
+        tracker.update(np.array([_box(10.0 + 2 * step, 10.0)]))
+    fresh = tracker.confidence()
+    for _ in range(5):
+        tracker.predict()
+    assert 0.0 < tracker.confidence() < fresh <= 1.0
+
+
+def test_detector_runs_every_n_frames():
+    detector = TrackedDetector(every=3, record=True)
+    runs = []
+    for frame in range(7):
+        if detector.needs_detection():
+            runs.append(frame)
+            detector.detected([_box(10.0 + frame, 10.0)])
+        else:
+            detector.track()
+    assert runs == [0, 3, 6]
+    assert detector.gaps == [0, 1, 2, 0, 1, 2, 0]
+    assert detector.summary()["detector_runs"] == 3
@@ -0,0 +1,20 @@
+from test_ultralytics_cuda import calibration_indices
+
+
+def test_frames_are_spread_evenly_over_the_video():
+    assert calibration_indices(1000, 4) == [0, 250, 500, 750]
+
+
+def test_short_video_takes_consecutive_frames():
+    assert calibration_indices(3, 5) == [0, 1, 2, 3, 4]
+
+
+def test_unknown_frame_count_takes_the_first_frames():
+    assert calibration_indices(0, 3) == [0, 1, 2]
+
+
+def test_indices_stay_inside_the_video():
+    for total in (8, 64, 999, 1001):
+        indices = calibration_indices(total, 8)
+        assert len(indices) == 8
+        assert indices[-1] < total
@@ -0,0 +1,96 @@
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from inference_daemon import InferenceDaemon, _Pending
+
+
+class StubPredictor:
+    """Records batch sizes and returns one detection per frame carrying the frame's id."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, frames, confidence):
+        self.batches.append(len(frames))
+        if self.fail:
+            raise RuntimeError("engine exploded")
+        return [[(0.0, 0.0, 1.0, 1.0, 0.9, float(frame[0, 0])), (0.0, 0.0, 1.0, 1.0, 0.2, 0.0)] for frame in frames]
+
+
+def _frames(first_id: int, count: int):
+    return [np.full((2, 2), first_id + index, dtype=np.uint8) for index in range(count)]
+
+
+@pytest.fixture
+def run_daemon(tmp_path: Path):
+    started = []
+
+    def start(predictor, max_batch=4, batch_window_ms=50.0):
+        daemon = InferenceDaemon(tmp_path / "d.sock", predictor, {}, max_batch=max_batch, batch_window_ms=batch_window_ms)
+        worker = threading.Thread(target=daemon._inference_loop, daemon=True)
+        worker.start()
+        started.append((daemon, worker))
+        return daemon
+
+    yield start
+    for daemon, worker in started:
+        daemon.shutdown()
+        worker.join(timeout=5)
+
+
+def _submit(daemon, sizes, confidence=0.5):
+    pending, next_id = [], 0
+    for size in sizes:
+        pending.append(_Pending(_frames(next_id, size), confidence, time.perf_counter_ns()))
+        next_id += size
+    for item in pending:
+        daemon._queue.put_nowait(item)
+    for item in pending:
+        assert item.done.wait(5)
+    return pending
+
+
+def test_batches_never_exceed_max_batch(run_daemon):
+    predictor = StubPredictor()
+    daemon = run_daemon(predictor, max_batch=4)
+    pending = _submit(daemon, [3, 3, 1, 3, 2])
+    assert max(predictor.batches) <= 4
+    assert sum(predictor.batches) == 12
+    assert all(item.error is None and len(item.detections) == len(item.frames) for item in pending)
+
+
+def test_oversize_request_is_split_and_keeps_frame_order(run_daemon):
+    predictor = StubPredictor()
+    daemon = run_daemon(predictor, max_batch=4)
+    (item,) = _submit(daemon, [10])
+    assert predictor.batches == [4, 4, 2]
+    assert [rows[0][5] for rows in item.detections] == list(range(10))
+    assert item.batch_frames == 4
+    assert daemon.stats()["requests"] == 1
+    assert daemon.stats()["frames"] == 10
+
+
+def test_detections_are_filtered_to_each_request_threshold(run_daemon):
+    daemon = run_daemon(StubPredictor(), max_batch=8)
+    low, high = (_Pending(_frames(0, 1), 0.1, time.perf_counter_ns()), _Pending(_frames(1, 1), 0.5, time.perf_counter_ns()))
+    daemon._queue.put_nowait(low)
+    daemon._queue.put_nowait(high)
+    assert low.done.wait(5) and high.done.wait(5)
+    assert len(low.detections[0]) == 2
+    assert len(high.detections[0]) == 1
+
+
+def test_predictor_failure_is_reported_once_per_request(run_daemon):
+    predictor = StubPredictor(fail=True)
+    daemon = run_daemon(predictor, max_batch=4)
+    (item,) = _submit(daemon, [9])
+    assert item.error == "RuntimeError: engine exploded"
+    # The remaining slices of a failed request are dropped rather than run.
+    time.sleep(0.1)
+    assert predictor.batches == [4]
+    assert daemon.stats()["errors"] == 1
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from test_ultralytics_cuda import build_decode_pipeline, opencv_has_gstreamer, plan_decoder
+
+WITH_GSTREAMER = "  Video I/O:\n    FFMPEG:                      YES\n    GStreamer:                   YES (1.20.3)\n"
+WITHOUT_GSTREAMER = "  Video I/O:\n    FFMPEG:                      YES\n    GStreamer:                   NO\n"
+
+
+def _all_elements(_name):
+    return True
+
+
+def test_build_info_gstreamer_line_is_parsed():
+    assert opencv_has_gstreamer(WITH_GSTREAMER)
+    assert not opencv_has_gstreamer(WITHOUT_GSTREAMER)
+    assert not opencv_has_gstreamer("")
+
+
+def test_file_uses_hardware_pipeline_when_available():
+    choice = plan_decoder("auto", Path("/data/clip.mp4"), WITH_GSTREAMER, _all_elements)
+    assert choice.backend == "gstreamer"
+    assert choice.source == build_decode_pipeline(Path("/data/clip.mp4"))
+    assert 'filesrc location="/data/clip.mp4"' in choice.source
+    assert "nvv4l2decoder" in choice.source
+
+
+def test_rtsp_stream_uses_rtspsrc():
+    choice = plan_decoder("auto", "rtsp://camera/stream", WITH_GSTREAMER, _all_elements)
+    assert choice.backend == "gstreamer"
+    assert choice.source.startswith('rtspsrc location="rtsp://camera/stream"')
+
+
+def test_explicit_cpu_request_wins():
+    choice = plan_decoder("cpu", Path("/data/clip.mp4"), WITH_GSTREAMER, _all_elements)
+    assert (choice.backend, choice.source) == ("cpu", Path("/data/clip.mp4"))
+
+
+def test_user_pipeline_is_used_as_given():
+    pipeline = "videotestsrc ! videoconvert ! appsink"
+    choice = plan_decoder("cpu", pipeline, WITHOUT_GSTREAMER, _all_elements)
+    assert (choice.backend, choice.source) == ("gstreamer", pipeline)
+
+
+@pytest.mark.parametrize(
+    "source, build_info, has_element, reason",
+    [
+        (Path("/data/clip.mp4"), WITHOUT_GSTREAMER, _all_elements, "no GStreamer support"),
+        (Path("/data/clip.mp4"), WITH_GSTREAMER, lambda name: name != "nvv4l2decoder", "nvv4l2decoder not installed"),
+        (0, WITH_GSTREAMER, _all_elements, "video files and RTSP streams only"),
+    ],
+)
+def test_auto_falls_back_to_cpu_with_reason(source, build_info, has_element, reason):
+    choice = plan_decoder("auto", source, build_info, has_element)
+    assert (choice.backend, choice.source) == ("cpu", source)
+    assert reason in choice.reason
+
+
+def test_forced_gstreamer_refuses_instead_of_falling_back():
+    with pytest.raises(SystemExit, match="no GStreamer support"):
+        plan_decoder("gstreamer", Path("/data/clip.mp4"), WITHOUT_GSTREAMER, _all_elements)
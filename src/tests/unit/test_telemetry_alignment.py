@@ -0,0 +1,31 @@
+import pytest
+
+from telemetry import align_with_frames
+
+SECOND = 1_000_000_000
+
+
+def _samples(*seconds):
+    return [{"t_ns": int(value * SECOND), "cpu_percent": 50.0} for value in seconds]
+
+
+def test_frames_are_counted_per_sample_interval():
+    frame_times = [int(value * SECOND) for value in (0.5, 1.2, 1.4, 1.9, 2.0, 2.5)]
+    aligned = align_with_frames(_samples(1, 2, 3), frame_times, origin_ns=0)
+    assert [sample["frames"] for sample in aligned] == [1, 4, 1]
+    assert aligned[0]["fps"] is None
+    assert aligned[1]["fps"] == pytest.approx(4.0)
+    assert aligned[2]["fps"] == pytest.approx(1.0)
+    assert [sample["t_s"] for sample in aligned] == [1.0, 2.0, 3.0]
+    assert aligned[1]["cpu_percent"] == 50.0
+
+
+def test_unsorted_frame_times_and_default_origin():
+    aligned = align_with_frames(_samples(10, 11), [int(10.7 * SECOND), int(10.2 * SECOND)])
+    assert [sample["t_s"] for sample in aligned] == [0.0, 1.0]
+    assert [sample["frames"] for sample in aligned] == [0, 2]
+
+
+def test_no_frames_or_samples():
+    assert align_with_frames([], [SECOND]) == []
+    assert [sample["frames"] for sample in align_with_frames(_samples(1, 2), [])] == [0, 0]
@@ -0,0 +1,38 @@
+import math
+
+import pytest
+
+from bench_history import _incomplete_beta, welch_test
+
+
+@pytest.mark.parametrize("x", [0.1, 0.5, 0.9])
+def test_incomplete_beta_closed_forms(x):
+    assert _incomplete_beta(1.0, 1.0, x) == pytest.approx(x)
+    assert _incomplete_beta(3.0, 1.0, x) == pytest.approx(x**3)
+    assert _incomplete_beta(1.0, 2.5, x) == pytest.approx(1.0 - (1.0 - x) ** 2.5)
+
+
+@pytest.mark.parametrize("df, t", [(1.0, 12.7062), (10.0, 2.228139), (30.0, 2.042272)])
+def test_two_sided_t_critical_values(df, t):
+    # The two-sided p-value welch_test returns for a t statistic with df degrees of freedom.
+    assert _incomplete_beta(df / 2.0, 0.5, df / (df + t * t)) == pytest.approx(0.05, abs=1e-5)
+
+
+def test_cauchy_tail():
+    t = 3.0
+    assert _incomplete_beta(0.5, 0.5, 1.0 / (1.0 + t * t)) == pytest.approx(1.0 - 2.0 / math.pi * math.atan(t))
+
+
+def test_clear_shift_is_significant():
+    p = welch_test([10.0, 11.0, 12.0, 10.5], [13.0, 14.0, 12.5, 13.5])
+    assert p == pytest.approx(0.0052, abs=2e-4)
+    assert p == pytest.approx(welch_test([13.0, 14.0, 12.5, 13.5], [10.0, 11.0, 12.0, 10.5]))
+
+
+def test_overlapping_samples_are_not_significant():
+    assert welch_test([10.0, 12.0, 11.0, 13.0], [11.0, 13.0, 10.0, 12.5]) > 0.5
+
+
+def test_constant_samples():
+    assert welch_test([5.0, 5.0, 5.0], [5.0, 5.0]) == 1.0
+    assert welch_test([5.0, 5.0, 5.0], [6.0, 6.0]) == 0.0
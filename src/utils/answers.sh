@@ -0,0 +1,64 @@
+#!/bin/bash
+# Up-front answers to the installer modules' questions (see install_scheduler.py).
+# The scheduler first runs such a module with JETSONIZER_ASK_ONLY=1 on the terminal: it asks its
+# questions, the answers are appended to $JETSONIZER_ANSWERS_FILE and the module exits before
+# installing anything. The real run then reads the recorded answers and needs no terminal.
+
+# Usage: jetsonizer_recorded_answer <key>
+# Prints the recorded answer, or fails when the question has not been answered yet.
+jetsonizer_recorded_answer() {
+    local line
+    if [ -z "${JETSONIZER_ANSWERS_FILE:-}" ] || [ ! -f "$JETSONIZER_ANSWERS_FILE" ]; then
+        return 1
+    fi
+    line="$(grep -E "^$1=" "$JETSONIZER_ANSWERS_FILE" | tail -n 1)" || true
+    if [ -z "$line" ]; then
+        return 1
+    fi
+    echo "${line#*=}"
+}
+
+jetsonizer_record_answer() {
+    if [ -n "${JETSONIZER_ANSWERS_FILE:-}" ]; then
+        echo "$1=$2" >> "$JETSONIZER_ANSWERS_FILE"
+    fi
+}
+
+# Usage: jetsonizer_ask_confirm <key> <gum confirm arguments...>
+# Succeeds when the answer is yes.
+jetsonizer_ask_confirm() {
+    local key="$1"
+    local answer
+    shift
+    if ! answer="$(jetsonizer_recorded_answer "$key")"; then
+        answer="no"
+        if gum confirm "$@"; then
+            answer="yes"
+        fi
+        jetsonizer_record_answer "$key" "$answer"
+    fi
+    [ "$answer" = "yes" ]
+}
+
+# Usage: jetsonizer_ask_choose <key> <gum choose arguments...>
+# Prints the choice, or fails when the question was cancelled.
+jetsonizer_ask_choose() {
+    local key="$1"
+    local answer
+    shift
+    if ! answer="$(jetsonizer_recorded_answer "$key")"; then
+        answer="$(gum choose "$@")" || answer=""
+        jetsonizer_record_answer "$key" "$answer"
+    fi
+    if [ -z "$answer" ]; then
+        return 1
+    fi
+    echo "$answer"
+}
+
+# Call once a module's questions are behind it: in the ask-only pass the module stops here.
+jetsonizer_ask_done() {
+    if [ "${JETSONIZER_ASK_ONLY:-0}" = "1" ]; then
+        exit 0
+    fi
+}
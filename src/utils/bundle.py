@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Export and import offline Jetsonizer bundles for provisioning identical boards.
+
+``export`` runs on a provisioned board with the interpreter the components were installed into.
+It collects the wheels (with their dependencies), the CUDA library .debs and optionally the
+Miniconda installer the modules would download into one versioned directory or tarball. The
+bundle carries a lock manifest (bundle.json) and a SHA256SUMS file.
+
+``import`` verifies a bundle against its checksums and the current board and prints the
+directory to point ``JETSONIZER_BUNDLE_DIR`` at. The modules then install strictly from it
+(pip ``--no-index --find-links``, local .deb files) instead of reaching upstream mirrors.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from download_cache import DEFAULT_CACHE_DIR, DownloadCache, place, sha256_file
+from env_facts import collect_facts
+from install_manifest import load_manifest
+from script_log import LOG_DIR, run_main
+
+
+SRC_ROOT = Path(__file__).resolve().parent.parent
+IMPORT_ROOT = LOG_DIR / "bundles"
+BUNDLE_FORMAT = 1
+LOCK_NAME = "bundle.json"
+SUMS_NAME = "SHA256SUMS"
+TARBALL_SUFFIXES = (".tar", ".tar.gz", ".tgz")
+EXPORTABLE = ("opencv", "torch", "tensorrt", "cuda-libs", "miniconda")
+
+# Board profile -> module scripts the artifact URLs are read from, mirroring the routers.
+BOARD_PROFILES = {
+    "NVIDIA Jetson AGX Orin Developer Kit": "agx-orin",
+    "NVIDIA Jetson Orin Nano Engineering Reference Developer Kit Super": "agx-orin",
+    "NVIDIA Jetson AGX Thor Developer Kit": "thor",
+}
+PROFILE_SCRIPTS = {
+    "agx-orin": {
+        "opencv": "modules/agx-orin/install_opencv_agx_orin.sh",
+        "torch": "modules/agx-orin/install_torch_agx_orin.sh",
+        "cuda-libs": "utils/ensure_cuda_npp_agx_orin.sh",
+    },
+    "thor": {
+        "opencv": "modules/thor/install_opencv_thor.sh",
+        "torch": "modules/thor/install_torch_thor.sh",
+        "cuda-libs": "utils/ensure_cuda_npp.sh",
+    },
+}
+# The AGX Orin OpenCV module pins numpy below 2 after installing the wheel.
+EXTRA_REQUIREMENTS = {("agx-orin", "opencv"): ["numpy<2"]}
+# Platform facts an imported bundle must agree on.
+PLATFORM_KEYS = ("system_arch", "jetson_model", "python_cp_tag")
+
+ASSIGNMENT_RE = re.compile(r'^([A-Z_][A-Z0-9_]*)="([^"$]*)"\s*$')
+ARRAY_ENTRY_RE = re.compile(r'^\s*\[([A-Za-z0-9_.+-]+)\]="([^"$]*)"\s*$')
+
+
+def module_assignments(script: Path) -> Dict[str, str]:
+    """Literal ``NAME="value"`` and ``[key]="value"`` lines of a module, so URLs live in one place."""
+    values: Dict[str, str] = {}
+    for line in script.read_text(encoding="utf-8").splitlines():
+        match = ASSIGNMENT_RE.match(line) or ARRAY_ENTRY_RE.match(line)
+        if match:
+            values[match.group(1)] = match.group(2)
+    return values
+
+
+def board_profile(facts: Dict[str, Any]) -> str:
+    profile = BOARD_PROFILES.get(facts.get("jetson_model", ""))
+    if profile is None:
+        raise SystemExit(
+            f"Unsupported board {facts.get('jetson_model') or 'unknown'!r}; "
+            f"bundles can be exported on: {', '.join(BOARD_PROFILES)}."
+        )
+    return profile
+
+
+# Runs under the --python interpreter: manifest keys and installed versions belong to that environment.
+TARGET_QUERY = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from install_manifest import COMPONENT_DISTS, entry_key, installed_dist
+state = {}
+for component, names in COMPONENT_DISTS.items():
+    dists = {name: installed_dist(name) for name in names}
+    state[component] = {"key": entry_key(component), "dists": {k: v for k, v in dists.items() if v is not None}}
+print(json.dumps(state))
+"""
+
+
+def _target_state(python_bin: str) -> Dict[str, Dict[str, Any]]:
+    """Manifest key and installed distributions of each component, as seen by ``python_bin``."""
+    command = [python_bin, "-c", TARGET_QUERY, str(Path(__file__).resolve().parent)]
+    completed = subprocess.run(command, capture_output=True, text=True, check=False)
+    if completed.returncode != 0:
+        raise SystemExit(f"Could not query installed components with {python_bin}:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout)
+
+
+def _pinned(python_bin: str, component: str) -> List[str]:
+    """Requirement strings for a component, pinned to what the install manifest recorded."""
+    state = _target_state(python_bin)[component]
+    entry = load_manifest().get(state["key"]) or {}
+    dists = entry.get("dists") or state["dists"]
+    return [f"{name}=={info['version']}" for name, info in dists.items()]
+
+
+def _default_components(python_bin: str) -> List[str]:
+    """Everything Jetsonizer installed and validated for this interpreter, plus the CUDA libraries."""
+    manifest = load_manifest()
+    recorded = [
+        component
+        for component, state in _target_state(python_bin).items()
+        if (manifest.get(state["key"]) or {}).get("validator") == "ok"
+    ]
+    if not recorded:
+        raise SystemExit(f"No validated installs are recorded for {python_bin}; pass the components explicitly.")
+    return [*recorded, "cuda-libs"]
+
+
+class BundleBuilder:
+    """Stages artifacts under a bundle directory and records each one for the lock manifest."""
+
+    def __init__(self, root: Path, cache: DownloadCache) -> None:
+        self.root = root
+        self.cache = cache
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.components: Dict[str, Dict[str, Any]] = {}
+
+    def add_file(self, source: Path, kind: str, origin: str = "") -> Path:
+        target = self.root / kind / source.name
+        if source.resolve() != target.resolve():
+            place(source, target)
+        self._register(target, kind, origin)
+        return target
+
+    def add_url(self, url: str, kind: str, sha256: str | None = None, name: str | None = None) -> Path:
+        outcome = self.cache.fetch(url, sha256)
+        target = self.root / kind / (name or url.rsplit("/", 1)[-1])
+        place(outcome.blob, target)
+        self._register(target, kind, url)
+        return target
+
+    def pip_download(self, python_bin: str, requirements: List[str], pip_args: List[str]) -> None:
+        """Let pip resolve the full dependency closure into the wheelhouse."""
+        wheel_dir = self.root / "wheels"
+        wheel_dir.mkdir(parents=True, exist_ok=True)
+        before = set(wheel_dir.iterdir())
+        command = [python_bin, "-m", "pip", "download", "--dest", str(wheel_dir), *pip_args, *requirements]
+        completed = subprocess.run(command, capture_output=True, text=True, check=False)
+        if completed.returncode != 0:
+            tail = "\n".join(completed.stderr.strip().splitlines()[-5:])
+            raise SystemExit(f"pip download failed for {' '.join(requirements)}:\n{tail}")
+        for path in sorted(set(wheel_dir.iterdir()) - before):
+            self._register(path, "wheels", "pip download")
+
+    def _register(self, path: Path, kind: str, origin: str) -> None:
+        relative = path.relative_to(self.root).as_posix()
+        self.files[relative] = {
+            "kind": kind,
+            "origin": origin,
+            "sha256": sha256_file(path),
+            "size": path.stat().st_size,
+        }
+
+
+def export_opencv(builder: BundleBuilder, python_bin: str, profile: str) -> None:
+    script = SRC_ROOT / PROFILE_SCRIPTS[profile]["opencv"]
+    values = module_assignments(script)
+    wheel = builder.add_url(values["WHEEL_URL"], "wheels", values["WHEEL_SHA256"], values["WHEEL_FILENAME"])
+    # Resolve the wheel's own dependencies into the wheelhouse as well.
+    builder.pip_download(python_bin, [str(wheel), *EXTRA_REQUIREMENTS.get((profile, "opencv"), [])], [])
+    builder.components["opencv"] = {"source": values["WHEEL_URL"], "wheel": wheel.name}
+
+
+def export_torch(builder: BundleBuilder, python_bin: str, profile: str) -> None:
+    script = SRC_ROOT / PROFILE_SCRIPTS[profile]["torch"]
+    index_url = module_assignments(script)["TORCH_INDEX_URL"]
+    requirements = _pinned(python_bin, "torch") or ["torch", "torchvision"]
+    builder.pip_download(python_bin, requirements, ["--index-url", index_url])
+    builder.components["torch"] = {"source": index_url, "requirements": requirements}
+
+
+def export_tensorrt(builder: BundleBuilder, tensorrt_dir: Path, cp_tag: str) -> None:
+    wheels = sorted(
+        path
+        for pattern in ("python/*.whl", "*/python/*.whl")
+        for path in tensorrt_dir.glob(pattern)
+        if f"-{cp_tag}-" in path.name
+    )
+    if not wheels:
+        raise SystemExit(f"No {cp_tag} TensorRT wheels found under {tensorrt_dir}/*/python.")
+    for wheel in wheels:
+        builder.add_file(wheel, "wheels", str(wheel))
+    builder.components["tensorrt"] = {"source": str(tensorrt_dir), "wheels": [wheel.name for wheel in wheels]}
+
+
+def export_cuda_libs(builder: BundleBuilder, profile: str) -> None:
+    script = SRC_ROOT / PROFILE_SCRIPTS[profile]["cuda-libs"]
+    urls = [value for value in module_assignments(script).values() if value.endswith(".deb")]
+    for url in urls:
+        builder.add_url(url, "debs")
+    builder.components["cuda-libs"] = {"source": str(script.relative_to(SRC_ROOT)), "debs": urls}
+
+
+def export_miniconda(builder: BundleBuilder, version: str) -> None:
+    variants = (SRC_ROOT / "resources" / "conda_variants.txt").read_text(encoding="utf-8").split()
+    # Same filename patterns install_miniconda.sh uses to map a version to an installer.
+    pattern = "Miniconda3-latest-" if version == "latest" else f"py{version.replace('.', '')}_"
+    matches = [variant for variant in variants if pattern in variant]
+    if not matches:
+        raise SystemExit(f"No Miniconda installer listed for version {version}.")
+    url = f"https://repo.anaconda.com/miniconda/{matches[0]}"
+    builder.add_url(url, "installers")
+    builder.components["miniconda"] = {"source": url, "installer": matches[0]}
+
+
+def _write_lock(root: Path, lock: Dict[str, Any]) -> None:
+    (root / LOCK_NAME).write_text(json.dumps(lock, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    sums = [f"{entry['sha256']}  {path}" for path, entry in sorted(lock["files"].items())]
+    (root / SUMS_NAME).write_text("\n".join(sums) + "\n", encoding="utf-8")
+
+
+def export_bundle(
+    python_bin: str,
+    components: List[str],
+    output: Path,
+    tensorrt_dir: Path,
+    miniconda_version: str,
+    cache: DownloadCache,
+) -> Path:
+    facts = collect_facts(python_bin)
+    profile = board_profile(facts)
+    created = datetime.datetime.now()
+    name = f"jetsonizer-{profile}-{facts['python_cp_tag']}-{created.strftime('%Y%m%d_%H%M%S')}"
+
+    is_tarball = output.name.endswith(TARBALL_SUFFIXES)
+    staging = output.parent / f".{name}.staging" if is_tarball else output
+    if staging.exists() and any(staging.iterdir()):
+        raise SystemExit(f"{staging} already exists and is not empty.")
+    staging.mkdir(parents=True, exist_ok=True)
+
+    builder = BundleBuilder(staging, cache)
+    try:
+        for component in components:
+            print(f"Collecting {component}...", file=sys.stderr)
+            if component == "opencv":
+                export_opencv(builder, python_bin, profile)
+            elif component == "torch":
+                export_torch(builder, python_bin, profile)
+            elif component == "tensorrt":
+                export_tensorrt(builder, tensorrt_dir, facts["python_cp_tag"])
+            elif component == "cuda-libs":
+                export_cuda_libs(builder, profile)
+            else:
+                export_miniconda(builder, miniconda_version)
+    except BaseException:
+        # Never leave a half-built bundle behind that could later be imported.
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    lock = {
+        "format": BUNDLE_FORMAT,
+        "name": name,
+        "created_at": created.isoformat(timespec="seconds"),
+        "profile": profile,
+        "platform": {key: facts[key] for key in (*PLATFORM_KEYS, "python_version", "l4t_release", "cuda_version")},
+        "components": builder.components,
+        "files": builder.files,
+    }
+    _write_lock(staging, lock)
+
+    if not is_tarball:
+        return staging
+    mode = "w:gz" if output.name.endswith((".tar.gz", ".tgz")) else "w"
+    with tarfile.open(output, mode) as tar:
+        # Already-compressed wheels barely shrink, so plain .tar is the fast default.
+        tar.add(staging, arcname=name)
+    shutil.rmtree(staging)
+    return output
+
+
+def _safe_extract(tarball: Path, dest: Path) -> Path:
+    with tarfile.open(tarball, "r:*") as tar:
+        members = tar.getmembers()
+        tops = {Path(member.name).parts[0] for member in members if member.name}
+        for member in members:
+            target = (dest / member.name).resolve()
+            if not (member.isfile() or member.isdir()) or not str(target).startswith(str(dest.resolve()) + os.sep):
+                raise SystemExit(f"Refusing to extract {member.name!r} from {tarball}.")
+        if len(tops) != 1:
+            raise SystemExit(f"{tarball} is not a Jetsonizer bundle (expected a single top-level directory).")
+        root = dest / tops.pop()
+        if root.exists():
+            shutil.rmtree(root)
+        tar.extractall(dest, members=members)  # nosec: members validated above
+    return root
+
+
+def _tarball_root(tarball: Path, dest: Path) -> Path:
+    """Where ``tarball`` extracts to under ``dest``."""
+    with tarfile.open(tarball, "r:*") as tar:
+        first = tar.next()
+    if first is None:
+        raise SystemExit(f"{tarball} is empty.")
+    return dest / Path(first.name).parts[0]
+
+
+def verify_bundle(root: Path) -> Dict[str, Any]:
+    """Check every file listed in the lock manifest against its size and checksum."""
+    try:
+        lock = json.loads((root / LOCK_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"{root} has no readable {LOCK_NAME}: {exc}") from exc
+    if lock.get("format") != BUNDLE_FORMAT:
+        raise SystemExit(f"Unsupported bundle format {lock.get('format')!r} (expected {BUNDLE_FORMAT}).")
+    problems: List[str] = []
+    for relative, entry in sorted(lock.get("files", {}).items()):
+        path = root / relative
+        if not path.is_file():
+            problems.append(f"missing {relative}")
+        elif path.stat().st_size != entry["size"] or sha256_file(path) != entry["sha256"]:
+            problems.append(f"checksum mismatch for {relative}")
+    if problems:
+        raise SystemExit(f"Bundle {root} failed verification: " + "; ".join(problems))
+    return lock
+
+
+def platform_mismatches(lock: Dict[str, Any], facts: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    recorded = lock.get("platform", {})
+    return [(key, str(recorded.get(key)), str(facts.get(key))) for key in PLATFORM_KEYS if recorded.get(key) != facts.get(key)]
+
+
+def import_bundle(source: Path, python_bin: str, dest: Path, ignore_platform: bool) -> Path:
+    if source.is_dir():
+        root = source
+        lock = verify_bundle(root)
+    elif source.is_file():
+        dest.mkdir(parents=True, exist_ok=True)
+        root = _tarball_root(source, dest)
+        try:
+            lock = verify_bundle(root)  # reuse an earlier extraction while it still verifies
+        except SystemExit:
+            root = _safe_extract(source, dest)
+            lock = verify_bundle(root)
+    else:
+        raise SystemExit(f"Bundle {source} does not exist.")
+
+    mismatches = platform_mismatches(lock, collect_facts(python_bin))
+    if mismatches and not ignore_platform:
+        details = ", ".join(f"{key}: bundle {bundle!r}, board {board!r}" for key, bundle, board in mismatches)
+        raise SystemExit(f"Bundle {lock['name']} was exported for a different platform ({details}).")
+    return root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Collect this board's installs into a bundle.")
+    export.add_argument(
+        "components",
+        nargs="*",
+        help=f"Components to bundle, from {', '.join(EXPORTABLE)} (default: validated installs plus cuda-libs).",
+    )
+    export.add_argument("-o", "--output", type=Path, required=True, help="Bundle directory, or a .tar/.tar.gz path.")
+    export.add_argument("--python", default=sys.executable, help="Interpreter the bundle targets (default: %(default)s).")
+    export.add_argument(
+        "--tensorrt-dir",
+        type=Path,
+        default=Path.home() / "tensorrt",
+        help="TensorRT install root holding the extracted tarball (default: %(default)s).",
+    )
+    export.add_argument("--miniconda-version", default="latest", help="Miniconda installer to bundle (default: %(default)s).")
+    export.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help="Download cache to fetch artifacts through (default: %(default)s).",
+    )
+
+    imp = commands.add_parser("import", help="Verify a bundle and print the directory to install from.")
+    imp.add_argument("bundle", type=Path, help="Bundle directory or tarball.")
+    imp.add_argument("--python", default=sys.executable, help="Interpreter the modules will install into.")
+    imp.add_argument("--dest", type=Path, default=IMPORT_ROOT, help="Where tarballs are extracted (default: %(default)s).")
+    imp.add_argument("--ignore-platform", action="store_true", help="Accept a bundle exported for another platform.")
+
+    ver = commands.add_parser("verify", help="Check a bundle directory against its checksums.")
+    ver.add_argument("bundle", type=Path, help="Bundle directory.")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        unknown = [component for component in args.components if component not in EXPORTABLE]
+        if unknown:
+            raise SystemExit(f"Unknown component(s): {', '.join(unknown)}. Choose from: {', '.join(EXPORTABLE)}.")
+        components = list(dict.fromkeys(args.components)) or _default_components(args.python)
+        cache = DownloadCache(args.cache_dir, max_bytes=20 << 30)
+        path = export_bundle(args.python, components, args.output, args.tensorrt_dir, args.miniconda_version, cache)
+        print(f"Bundled {', '.join(components)} into {path}", file=sys.stderr)
+        print(path)
+    elif args.command == "import":
+        root = import_bundle(args.bundle, args.python, args.dest, args.ignore_platform)
+        print(root.resolve())
+    else:
+        lock = verify_bundle(args.bundle)
+        print(f"{lock['name']}: {len(lock['files'])} file(s) verified", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
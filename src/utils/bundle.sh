@@ -0,0 +1,25 @@
+#!/bin/bash
+# Offline bundle helpers shared by the installer modules (see bundle.py).
+# When JETSONIZER_BUNDLE_DIR points at an imported bundle, modules install strictly from it.
+
+# Expanded by the sourcing modules as their pip source arguments.
+# shellcheck disable=SC2034
+JETSONIZER_BUNDLE_PIP_ARGS=()
+if [ -n "${JETSONIZER_BUNDLE_DIR:-}" ]; then
+    JETSONIZER_BUNDLE_PIP_ARGS=(--no-index --find-links "$JETSONIZER_BUNDLE_DIR/wheels")
+fi
+
+jetsonizer_bundle_active() {
+    [ -n "${JETSONIZER_BUNDLE_DIR:-}" ]
+}
+
+# Usage: jetsonizer_bundle_file <wheels|debs|installers> <filename>
+# Prints the bundled path, or fails when the bundle does not carry the file.
+jetsonizer_bundle_file() {
+    local path="$JETSONIZER_BUNDLE_DIR/$1/$2"
+    if [ ! -f "$path" ]; then
+        gum style --foreground 196 --bold "❌ Offline bundle $JETSONIZER_BUNDLE_DIR does not contain $1/$2."
+        return 1
+    fi
+    echo "$path"
+}
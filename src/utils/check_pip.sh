@@ -3,6 +3,7 @@
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ENV_FACTS_SCRIPT="$SCRIPT_DIR/env_facts.sh"
 LOGGER_SCRIPT="$SCRIPT_DIR/logger.sh"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
@@ -10,6 +11,8 @@ if [ -f "$LOGGER_SCRIPT" ]; then
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$ENV_FACTS_SCRIPT"
 
 PYTHON_BIN="${1:-python3}"
 PIP_BREAK_CONFIGURED=0
@@ -17,6 +20,10 @@ PIP_BREAK_CONFIGURED=0
 gum style --foreground 82 --bold "Ensuring pip is available for ${PYTHON_BIN}..."
 
 has_pip() {
+    # Fresh cached facts already prove pip is importable; otherwise ask pip itself.
+    if [ -n "${JETSONIZER_FACT_PIP_VERSION:-}" ]; then
+        return 0
+    fi
     "$PYTHON_BIN" -m pip --version > /dev/null 2>&1
 }
 
@@ -29,6 +36,11 @@ configure_break_system_packages() {
         return
     fi
 
+    if [ "${JETSONIZER_FACT_PIP_BREAK_CONFIGURED:-0}" = "1" ]; then
+        PIP_BREAK_CONFIGURED=1
+        return
+    fi
+
     local config_value normalized
     if config_value=$("$PYTHON_BIN" -m pip config get global.break-system-packages 2>/dev/null); then
         normalized=$(printf '%s' "$config_value" | tr '[:upper:]' '[:lower:]' | tr -d '[:space:]')
@@ -47,6 +59,8 @@ configure_break_system_packages() {
     fi
 }
 
+jetsonizer_facts_load "$PYTHON_BIN" || true
+
 if has_pip; then
     configure_break_system_packages
     gum style --foreground 82 --bold "✅ pip already available for ${PYTHON_BIN}."
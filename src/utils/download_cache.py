@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""Resumable, parallel downloader backed by a content-addressed cache of installer artifacts."""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from script_log import LOG_DIR, run_main
+
+
+DEFAULT_CACHE_DIR = LOG_DIR / "downloads"
+USER_AGENT = "Mozilla/5.0 (Jetsonizer)"
+READ_BLOCK = 1 << 20
+CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+@dataclass(frozen=True)
+class RemoteInfo:
+    """What a one-byte range probe tells us about a URL."""
+
+    url: str
+    size: int | None
+    accepts_ranges: bool
+    etag: str | None
+    last_modified: str | None
+
+
+@dataclass
+class FetchOutcome:
+    """Result of ``DownloadCache.fetch``."""
+
+    blob: Path
+    sha256: str
+    size: int
+    hit: bool
+    resumed_bytes: int = 0
+    downloaded_bytes: int = 0
+    seconds: float = 0.0
+    connections: int = 1
+
+
+def _request(url: str, headers: Dict[str, str] | None = None, method: str = "GET") -> urllib.request.Request:
+    merged = {"User-Agent": USER_AGENT, "Accept-Encoding": "identity"}
+    merged.update(headers or {})
+    return urllib.request.Request(url, headers=merged, method=method)
+
+
+def probe_remote(url: str, timeout: float) -> RemoteInfo:
+    """Ask for the first byte only; a 206 reply reveals the size and range support.
+
+    A GET is used instead of HEAD because urllib turns a redirected HEAD into a GET anyway.
+    """
+    with urllib.request.urlopen(_request(url, {"Range": "bytes=0-0"}), timeout=timeout) as response:
+        final_url = response.geturl()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status == 206:
+            match = CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            size = int(match.group(3)) if match and match.group(3) != "*" else None
+            return RemoteInfo(final_url, size, size is not None, etag, last_modified)
+        length = response.headers.get("Content-Length")
+        return RemoteInfo(final_url, int(length) if length else None, False, etag, last_modified)
+
+
+@contextlib.contextmanager
+def _locked(lock_path: Path) -> Iterator[None]:
+    """Hold an exclusive flock on ``lock_path`` so concurrent installers take turns."""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _write_json(path: Path, data: Any, **dump_args: Any) -> None:
+    """Replace ``path`` atomically through a temporary file unique to this writer."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, **dump_args)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DownloadCache:
+    """Blobs are stored as ``blobs/sha256/<digest>``; in-flight downloads live under ``partial/``.
+
+    ``index.json`` maps URLs to the digest and validators (ETag, Last-Modified, size) seen when
+    they were fetched, so artifacts without a published checksum can still be reused.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int,
+        connections: int = 4,
+        chunk_bytes: int = 8 << 20,
+        timeout: float = 30.0,
+        retries: int = 3,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.connections = max(1, connections)
+        self.chunk_bytes = max(READ_BLOCK, chunk_bytes)
+        self.timeout = timeout
+        self.retries = max(1, retries)
+        self.blob_dir = root / "blobs" / "sha256"
+        self.partial_dir = root / "partial"
+        self.index_path = root / "index.json"
+        self.index_lock = root / "index.lock"
+
+    # ----- index -------------------------------------------------------------------------
+
+    def load_index(self) -> Dict[str, Any]:
+        try:
+            with self.index_path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _update_index(self, change: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+        """Read, change and rewrite the index under its lock, so parallel fetches keep each other's entries."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with _locked(self.index_lock):
+            _write_json(self.index_path, change(self.load_index()), indent=2, sort_keys=True)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest
+
+    # ----- lookup ------------------------------------------------------------------------
+
+    def lookup(self, url: str, expected_sha256: str | None) -> Path | None:
+        """Return a cached blob for this request without downloading, or None."""
+        if expected_sha256:
+            blob = self.blob_path(expected_sha256)
+            return blob if blob.is_file() else None
+
+        entry = self.load_index().get(url)
+        if not entry:
+            return None
+        blob = self.blob_path(entry["sha256"])
+        if not blob.is_file():
+            return None
+        # No published checksum: make sure the URL still serves the same bytes. When the
+        # server is unreachable the cached copy is the best we have.
+        try:
+            remote = probe_remote(url, self.timeout)
+        except (urllib.error.URLError, OSError):
+            return blob
+        if remote.size is not None and remote.size != entry.get("size"):
+            return None
+        if remote.etag and entry.get("etag") and remote.etag != entry["etag"]:
+            return None
+        if remote.last_modified and entry.get("last_modified") and remote.last_modified != entry["last_modified"]:
+            return None
+        return blob
+
+    # ----- download ----------------------------------------------------------------------
+
+    def _partial_paths(self, url: str) -> Tuple[Path, Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        base = self.partial_dir / key
+        return base.with_suffix(".part"), base.with_suffix(".json"), base.with_suffix(".lock")
+
+    def _load_state(self, state_path: Path, remote: RemoteInfo, chunk_bytes: int) -> Dict[str, Any]:
+        fresh = {
+            "size": remote.size,
+            "etag": remote.etag,
+            "last_modified": remote.last_modified,
+            "chunk_bytes": chunk_bytes,
+            "done": [],
+        }
+        try:
+            with state_path.open("r", encoding="utf-8") as handle:
+                state = json.load(handle)
+        except (OSError, ValueError):
+            return fresh
+        # A partial file is only reusable if the remote object has not changed underneath it.
+        for key in ("size", "etag", "last_modified", "chunk_bytes"):
+            if state.get(key) != fresh[key]:
+                return fresh
+        return state
+
+    @staticmethod
+    def _save_state(state_path: Path, state: Dict[str, Any]) -> None:
+        _write_json(state_path, state)
+
+    def _with_retries(self, action, label: str):
+        for attempt in range(1, self.retries + 1):
+            try:
+                return action()
+            except (urllib.error.URLError, OSError, ValueError) as exc:
+                if attempt == self.retries:
+                    raise SystemExit(f"Download of {label} failed after {attempt} attempts: {exc}") from exc
+                time.sleep(min(2 ** attempt, 10))
+        return None
+
+    def _fetch_ranges(self, remote: RemoteInfo, part_path: Path, state_path: Path) -> Tuple[int, int, int]:
+        """Download missing chunks in parallel; returns (resumed, downloaded, connections)."""
+        size = int(remote.size or 0)
+        chunk_bytes = self.chunk_bytes
+        state = self._load_state(state_path, remote, chunk_bytes)
+        done = set(state["done"])
+        if not done or not part_path.exists():
+            done = set()
+            state["done"] = []
+            with part_path.open("wb") as handle:
+                handle.truncate(size)
+
+        chunks = [(start, min(start + chunk_bytes, size) - 1) for start in range(0, size, chunk_bytes)]
+        pending = [index for index in range(len(chunks)) if index not in done]
+        resumed = sum(chunks[index][1] - chunks[index][0] + 1 for index in done)
+        lock = threading.Lock()
+        fd = os.open(part_path, os.O_WRONLY)
+
+        def fetch_chunk(index: int) -> int:
+            start, end = chunks[index]
+
+            def attempt() -> int:
+                headers = {"Range": f"bytes={start}-{end}"}
+                if remote.etag:
+                    headers["If-Range"] = remote.etag
+                with urllib.request.urlopen(_request(remote.url, headers), timeout=self.timeout) as response:
+                    if response.status != 206:
+                        raise ValueError(f"server ignored the range request (HTTP {response.status})")
+                    offset = start
+                    while offset <= end:
+                        block = response.read(min(READ_BLOCK, end - offset + 1))
+                        if not block:
+                            raise ValueError(f"connection closed at byte {offset} of chunk {start}-{end}")
+                        os.pwrite(fd, block, offset)
+                        offset += len(block)
+                return end - start + 1
+
+            written = self._with_retries(attempt, f"{remote.url} bytes {start}-{end}")
+            with lock:
+                state["done"].append(index)
+                self._save_state(state_path, state)
+            return written
+
+        connections = min(self.connections, max(1, len(pending)))
+        try:
+            with ThreadPoolExecutor(max_workers=connections) as pool:
+                downloaded = sum(pool.map(fetch_chunk, pending))
+        finally:
+            os.close(fd)
+        return resumed, downloaded, connections
+
+    def _fetch_stream(self, remote: RemoteInfo, part_path: Path) -> Tuple[int, int, int]:
+        """Single-connection fallback for servers without range support."""
+
+        def attempt() -> int:
+            written = 0
+            with urllib.request.urlopen(_request(remote.url), timeout=self.timeout) as response:
+                with part_path.open("wb") as handle:
+                    for block in iter(lambda: response.read(READ_BLOCK), b""):
+                        handle.write(block)
+                        written += len(block)
+            if remote.size is not None and written != remote.size:
+                raise ValueError(f"expected {remote.size} bytes but received {written}")
+            return written
+
+        return 0, self._with_retries(attempt, remote.url), 1
+
+    def fetch(self, url: str, expected_sha256: str | None = None) -> FetchOutcome:
+        expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+        cached = self.lookup(url, expected_sha256)
+        if cached is not None:
+            os.utime(cached)  # mtime doubles as the LRU timestamp
+            return FetchOutcome(cached, cached.name, cached.stat().st_size, hit=True)
+
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        part_path, state_path, lock_path = self._partial_paths(url)
+        # Another installer fetching the same URL owns the partial file until it is done with it.
+        with _locked(lock_path):
+            cached = self.lookup(url, expected_sha256)
+            if cached is not None:
+                os.utime(cached)
+                return FetchOutcome(cached, cached.name, cached.stat().st_size, hit=True)
+            return self._download(url, expected_sha256, part_path, state_path)
+
+    def _download(self, url: str, expected_sha256: str | None, part_path: Path, state_path: Path) -> FetchOutcome:
+        start = time.perf_counter()
+        remote = self._with_retries(lambda: probe_remote(url, self.timeout), url)
+        if remote.accepts_ranges and remote.size:
+            resumed, downloaded, connections = self._fetch_ranges(remote, part_path, state_path)
+        else:
+            resumed, downloaded, connections = self._fetch_stream(remote, part_path)
+        elapsed = time.perf_counter() - start
+
+        digest = sha256_file(part_path)
+        if expected_sha256 and digest != expected_sha256:
+            part_path.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise SystemExit(f"Checksum mismatch for {url}: expected {expected_sha256} but got {digest}.")
+
+        blob = self.blob_path(digest)
+        os.replace(part_path, blob)
+        state_path.unlink(missing_ok=True)
+
+        entry = {
+            "sha256": digest,
+            "size": blob.stat().st_size,
+            "etag": remote.etag,
+            "last_modified": remote.last_modified,
+            "fetched_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        self._update_index(lambda index: {**index, url: entry})
+        return FetchOutcome(
+            blob,
+            digest,
+            blob.stat().st_size,
+            hit=False,
+            resumed_bytes=resumed,
+            downloaded_bytes=downloaded,
+            seconds=elapsed,
+            connections=connections,
+        )
+
+    # ----- eviction ----------------------------------------------------------------------
+
+    def evict(self, keep: Optional[Path] = None) -> List[Path]:
+        """Drop least recently used blobs until the cache fits within ``max_bytes``."""
+        if not self.blob_dir.is_dir():
+            return []
+        blobs = sorted(
+            (path for path in self.blob_dir.iterdir() if path.is_file()),
+            key=lambda path: path.stat().st_mtime,
+        )
+        total = sum(path.stat().st_size for path in blobs)
+        evicted: List[Path] = []
+        for path in blobs:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            total -= path.stat().st_size
+            path.unlink()
+            evicted.append(path)
+
+        if evicted:
+            names = {path.name for path in evicted}
+            self._update_index(
+                lambda index: {url: entry for url, entry in index.items() if entry.get("sha256") not in names}
+            )
+        return evicted
+
+
+def place(blob: Path, output: Path) -> None:
+    """Expose a cached blob at ``output``, hard-linking when both live on the same filesystem."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.exists() and os.path.samefile(output, blob):
+        return
+    if output.exists() or output.is_symlink():
+        output.unlink()
+    try:
+        os.link(blob, output)
+    except OSError:
+        fd, tmp_name = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(blob, tmp_name)
+            os.replace(tmp_name, output)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+
+
+def _mib(value: int) -> str:
+    return f"{value / (1 << 20):.1f} MiB"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("url", nargs="?", help="URL of the artifact to fetch.")
+    parser.add_argument("-o", "--output", type=Path, help="Where to place the downloaded file.")
+    parser.add_argument("--sha256", help="Expected SHA-256 digest of the artifact.")
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help="Content-addressed download cache (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--cache-max-gb",
+        type=float,
+        default=20.0,
+        help="Evict least recently used blobs beyond this size (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=4,
+        help="Parallel range requests per download (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--chunk-mb",
+        type=float,
+        default=8.0,
+        help="Size of each range request in MiB (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Socket timeout in seconds for each request (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Attempts per request before giving up (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Only apply the size cap to the cache, without downloading anything.",
+    )
+    args = parser.parse_args()
+
+    if args.cache_max_gb <= 0:
+        raise SystemExit("--cache-max-gb must be positive.")
+    if args.connections < 1:
+        raise SystemExit("--connections must be at least 1.")
+    if args.chunk_mb <= 0:
+        raise SystemExit("--chunk-mb must be positive.")
+    if args.sha256 and not re.fullmatch(r"[0-9a-fA-F]{64}", args.sha256):
+        raise SystemExit("--sha256 must be a 64-character hex digest.")
+
+    cache = DownloadCache(
+        args.cache_dir,
+        max_bytes=int(args.cache_max_gb * (1 << 30)),
+        connections=args.connections,
+        chunk_bytes=int(args.chunk_mb * (1 << 20)),
+        timeout=args.timeout,
+        retries=args.retries,
+    )
+
+    if args.prune:
+        for path in cache.evict():
+            print(f"Evicted {path.name}", file=sys.stderr)
+        return
+    if not args.url or not args.output:
+        parser.error("a URL and --output are required unless --prune is given.")
+
+    outcome = cache.fetch(args.url, args.sha256)
+    place(outcome.blob, args.output)
+    if outcome.hit:
+        print(f"Cache hit for {args.url} ({_mib(outcome.size)}, sha256 {outcome.sha256[:12]})", file=sys.stderr)
+    else:
+        rate = outcome.downloaded_bytes / outcome.seconds if outcome.seconds > 0 else 0.0
+        resumed = f", resumed {_mib(outcome.resumed_bytes)}" if outcome.resumed_bytes else ""
+        print(
+            f"Downloaded {_mib(outcome.downloaded_bytes)} in {outcome.seconds:.1f}s "
+            f"({_mib(int(rate))}/s over {outcome.connections} connection(s){resumed})",
+            file=sys.stderr,
+        )
+    for path in cache.evict(keep=outcome.blob):
+        print(f"Evicted {path.name} from the download cache", file=sys.stderr)
+    print(args.output)
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
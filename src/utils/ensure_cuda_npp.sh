@@ -5,12 +5,16 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 SRC_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 LOGGER_SCRIPT="$SRC_ROOT/utils/logger.sh"
+BUNDLE_SCRIPT="$SRC_ROOT/utils/bundle.sh"
+DOWNLOAD_HELPER="$SRC_ROOT/utils/download_cache.py"
 if [ -f "$LOGGER_SCRIPT" ]; then
     # shellcheck source=/dev/null
     source "$LOGGER_SCRIPT"
     jetsonizer_enable_err_trap
     jetsonizer_enable_exit_trap
 fi
+# shellcheck source=/dev/null
+source "$BUNDLE_SCRIPT"
 
 SYMLINK_COMPONENTS=(
     nppc
@@ -150,6 +154,14 @@ download_with_tool() {
     local url="$1"
     local dest="$2"
 
+    if [ -f "$DOWNLOAD_HELPER" ] && command -v python3 > /dev/null 2>&1; then
+        if python3 "$DOWNLOAD_HELPER" "$url" -o "$dest" > /dev/null; then
+            return 0
+        fi
+        gum style --foreground 214 --bold "⚠️  Download helper failed for $url. Retrying with wget/curl..."
+        rm -f "$dest"
+    fi
+
     if command -v wget > /dev/null 2>&1; then
         wget -q "$url" -O "$dest"
         return $?
@@ -172,16 +184,23 @@ install_custom_package() {
         exit 1
     fi
 
-    gum style --foreground 214 --bold "Downloading $pkg from NVIDIA CUDA repository..."
-
     local tmp_dir
     tmp_dir=$(mktemp -d 2>/dev/null || mktemp -d -t nvpl-pkg)
     local deb_path="$tmp_dir/${pkg}.deb"
 
-    if ! download_with_tool "$url" "$deb_path"; then
-        rm -rf "$tmp_dir"
-        gum style --foreground 196 --bold "❌ Failed to download $pkg from $url."
-        exit 1
+    if jetsonizer_bundle_active; then
+        gum style --foreground 214 --bold "Using $pkg from offline bundle $JETSONIZER_BUNDLE_DIR..."
+        if ! deb_path="$(jetsonizer_bundle_file debs "${url##*/}")"; then
+            rm -rf "$tmp_dir"
+            exit 1
+        fi
+    else
+        gum style --foreground 214 --bold "Downloading $pkg from NVIDIA CUDA repository..."
+        if ! download_with_tool "$url" "$deb_path"; then
+            rm -rf "$tmp_dir"
+            gum style --foreground 196 --bold "❌ Failed to download $pkg from $url."
+            exit 1
+        fi
     fi
 
     gum style --foreground 82 --bold "Installing $pkg..."
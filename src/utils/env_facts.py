@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Collect interpreter and platform facts once and cache them for the installer modules.
+
+Run this with the interpreter being described. The cache is stored as JSON under the
+Jetsonizer cache directory. Each interpreter also gets a ``KEY=value`` snapshot that
+env_facts.sh reads without starting Python. Both are invalidated as soon as a watched
+path changes: the interpreter, pip, the pip config or the dpkg database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import configparser
+import contextlib
+import datetime
+import fcntl
+import importlib.util
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from script_log import LOG_DIR, run_main
+
+
+CACHE_PATH = LOG_DIR / "env_facts.json"
+CACHE_LOCK = LOG_DIR / "env_facts.lock"
+SNAPSHOT_DIR = LOG_DIR / "facts"
+DPKG_STATUS = Path("/var/lib/dpkg/status")
+MODEL_FILE = Path("/proc/device-tree/model")
+COMPATIBLE_FILE = Path("/proc/device-tree/compatible")
+TEGRA_RELEASE = Path("/etc/nv_tegra_release")
+CUDA_ROOT = Path("/usr/local/cuda")
+
+# SoC compatible string -> CUDA compute capability.
+TEGRA_CUDA_ARCH = {
+    "nvidia,tegra264": "11.0",  # Thor
+    "nvidia,tegra234": "8.7",  # Orin
+    "nvidia,tegra194": "7.2",  # Xavier
+    "nvidia,tegra186": "6.2",  # TX2
+    "nvidia,tegra210": "5.3",  # Nano / TX1
+}
+# --break-system-packages first shipped in pip 23.0.1.
+PIP_BREAK_FLAG_VERSION = (23, 0, 1)
+
+
+def snapshot_path(python_bin: str) -> Path:
+    """Mirror of ``jetsonizer_facts_path`` in env_facts.sh."""
+    # Keyed by effective uid too: root (under sudo) and the user see different pip configs.
+    return SNAPSHOT_DIR / f"{python_bin.replace('/', '_')}.{os.geteuid()}.env"
+
+
+def _read_text(path: Path) -> str:
+    try:
+        return path.read_bytes().replace(b"\0", b"\n").decode("utf-8", "replace").strip()
+    except OSError:
+        return ""
+
+
+def _version_tuple(version: str) -> tuple:
+    return tuple(int(part) for part in re.findall(r"\d+", version)[:3])
+
+
+def _pip_info() -> Dict[str, Any]:
+    """Locate pip and read its version without importing it."""
+    spec = importlib.util.find_spec("pip")
+    if spec is None or not spec.origin:
+        return {"version": "", "dir": None}
+    init_text = _read_text(Path(spec.origin))
+    match = re.search(r"__version__\s*=\s*['\"]([^'\"]+)['\"]", init_text)
+    return {"version": match.group(1) if match else "", "dir": str(Path(spec.origin).parent)}
+
+
+def _pip_config_files() -> List[Path]:
+    files = [Path("/etc/pip.conf"), Path("/etc/xdg/pip/pip.conf")]
+    xdg_config = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config"))
+    files += [xdg_config / "pip" / "pip.conf", Path.home() / ".pip" / "pip.conf", Path(sys.prefix) / "pip.conf"]
+    if os.environ.get("PIP_CONFIG_FILE"):
+        files.append(Path(os.environ["PIP_CONFIG_FILE"]))
+    return files
+
+
+def _pip_break_configured() -> bool:
+    if os.environ.get("PIP_BREAK_SYSTEM_PACKAGES", "").lower() in ("1", "true", "yes", "on"):
+        return True
+    parser = configparser.ConfigParser()
+    try:
+        parser.read([str(path) for path in _pip_config_files() if path.is_file()])
+    except configparser.Error:
+        return False
+    return parser.get("global", "break-system-packages", fallback="").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _cuda_version() -> str:
+    try:
+        data = json.loads(_read_text(CUDA_ROOT / "version.json"))
+        return str(data.get("cuda", {}).get("version", ""))
+    except ValueError:
+        pass
+    match = re.search(r"(\d+\.\d+(?:\.\d+)?)", _read_text(CUDA_ROOT / "version.txt"))
+    return match.group(1) if match else ""
+
+
+def _cuda_arch() -> str:
+    compatible = _read_text(COMPATIBLE_FILE).splitlines()
+    for entry in compatible:
+        if entry in TEGRA_CUDA_ARCH:
+            return TEGRA_CUDA_ARCH[entry]
+    return ""
+
+
+def watched_paths(python_bin: str, pip_dir: str | None) -> List[str]:
+    """Paths whose modification time decides whether cached facts are still valid."""
+    paths = [os.path.realpath(python_bin), str(DPKG_STATUS)]
+    if pip_dir:
+        paths.append(pip_dir)
+    too_broad = {Path("/"), Path.home()}
+    for config in _pip_config_files():
+        # A config file that does not exist yet shows up as a change to its nearest parent.
+        candidate = config
+        while not candidate.exists() and candidate.parent != candidate:
+            candidate = candidate.parent
+        if candidate not in too_broad:
+            paths.append(str(candidate))
+    return [path for path in dict.fromkeys(paths) if os.path.exists(path)]
+
+
+def collect_facts(python_bin: str) -> Dict[str, Any]:
+    pip = _pip_info()
+    watch = watched_paths(python_bin, pip["dir"])
+    return {
+        "collected_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python_bin": python_bin,
+        "python_realpath": os.path.realpath(python_bin),
+        "python_version": platform.python_version(),
+        "python_cp_tag": f"cp{sys.version_info[0]}{sys.version_info[1]}",
+        "pip_version": pip["version"],
+        "pip_break_system_packages": bool(pip["version"])
+        and _version_tuple(pip["version"]) >= PIP_BREAK_FLAG_VERSION,
+        "pip_break_configured": _pip_break_configured(),
+        "system_arch": platform.machine(),
+        "jetson_model": _read_text(MODEL_FILE),
+        "l4t_release": _read_text(TEGRA_RELEASE).splitlines()[0] if _read_text(TEGRA_RELEASE) else "",
+        "cuda_arch": _cuda_arch(),
+        "cuda_version": _cuda_version(),
+        "watch_paths": watch,
+        "watch_mtimes": [int(os.stat(path).st_mtime) for path in watch],
+    }
+
+
+def is_fresh(facts: Dict[str, Any]) -> bool:
+    paths = facts.get("watch_paths") or []
+    try:
+        return [int(os.stat(path).st_mtime) for path in paths] == facts.get("watch_mtimes")
+    except OSError:
+        return False
+
+
+def _shell_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, list):
+        return "\t".join(str(item) for item in value)
+    return str(value).replace("\n", " ")
+
+
+@contextlib.contextmanager
+def _locked(lock_path: Path) -> Iterator[None]:
+    """Hold an exclusive flock on ``lock_path`` so concurrent modules take turns."""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    # Read-only is enough for flock, and still works when the lock file was created by root.
+    fd = os.open(lock_path, os.O_RDONLY | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _write_text(path: Path, text: str) -> None:
+    """Replace ``path`` atomically through a temporary file unique to this writer."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # Keep the files readable by the user when sudo modules write them.
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def write_snapshot(facts: Dict[str, Any]) -> Path:
+    """Write ``KEY=value`` lines; env_facts.sh parses them without eval."""
+    path = snapshot_path(facts["python_bin"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = [f"JETSONIZER_FACT_{key.upper()}={_shell_value(value)}" for key, value in facts.items()]
+    _write_text(path, "\n".join(lines) + "\n")
+    return path
+
+
+def load_cache() -> Dict[str, Any]:
+    try:
+        with CACHE_PATH.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_cache(cache: Dict[str, Any]) -> None:
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    _write_text(CACHE_PATH, json.dumps(cache, indent=2, sort_keys=True))
+
+
+def get_facts(python_bin: str, refresh: bool = False) -> Dict[str, Any]:
+    """Return cached facts for ``python_bin``, re-collecting them when stale."""
+    key = f"{python_bin}:{os.geteuid()}"
+    # Modules run concurrently; re-read under the lock so no one drops another module's entry.
+    with _locked(CACHE_LOCK):
+        cache = load_cache()
+        facts = cache.get(key)
+        if refresh or not isinstance(facts, dict) or not is_fresh(facts) or not snapshot_path(python_bin).is_file():
+            facts = collect_facts(python_bin)
+            cache[key] = facts
+            save_cache(cache)
+            write_snapshot(facts)
+    return facts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--python",
+        default=sys.executable,
+        help="Path the facts are recorded under; run this script with that interpreter (default: %(default)s).",
+    )
+    parser.add_argument("--refresh", action="store_true", help="Re-collect facts even if the cache is fresh.")
+    parser.add_argument("--get", metavar="KEY", help="Print a single fact instead of the whole record.")
+    args = parser.parse_args()
+
+    facts = get_facts(args.python, refresh=args.refresh)
+    if args.get:
+        if args.get not in facts:
+            raise SystemExit(f"Unknown fact {args.get!r}. Known facts: {', '.join(sorted(facts))}.")
+        print(_shell_value(facts[args.get]))
+        return
+    print(json.dumps(facts, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
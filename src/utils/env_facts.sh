@@ -0,0 +1,102 @@
+#!/bin/bash
+# Cached environment facts shared by the installer modules.
+# Snapshots are written by env_facts.py and read here without starting Python, so a module
+# only pays for an interpreter launch when the interpreter, pip or the dpkg database changed.
+
+JETSONIZER_FACTS_COLLECTOR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/env_facts.py"
+JETSONIZER_FACTS_LOADED_FOR=""
+
+jetsonizer_facts_path() {
+    local python_bin="$1"
+    JETSONIZER_FACTS_DIR="${JETSONIZER_LOG_DIR:-/home/${SUDO_USER:-${USER:-$(id -un 2>/dev/null || echo root)}}/.cache/Jetsonizer}"
+    JETSONIZER_FACTS_FILE="$JETSONIZER_FACTS_DIR/facts/${python_bin//\//_}.${EUID}.env"
+}
+
+jetsonizer_facts_read() {
+    local file="$1"
+    local key value
+    while IFS='=' read -r key value; do
+        if [[ "$key" =~ ^JETSONIZER_FACT_[A-Z0-9_]+$ ]]; then
+            printf -v "$key" '%s' "$value"
+        fi
+    done < "$file"
+}
+
+jetsonizer_facts_fresh() {
+    local paths=()
+    local mtimes=()
+    local joined=""
+    IFS=$'\t' read -r -a paths <<< "${JETSONIZER_FACT_WATCH_PATHS:-}"
+    if [ "${#paths[@]}" -eq 0 ]; then
+        return 1
+    fi
+    mapfile -t mtimes < <(stat -L -c %Y "${paths[@]}" 2>/dev/null)
+    if [ "${#mtimes[@]}" -ne "${#paths[@]}" ]; then
+        return 1
+    fi
+    printf -v joined '%s\t' "${mtimes[@]}"
+    [ "${joined%$'\t'}" = "${JETSONIZER_FACT_WATCH_MTIMES:-}" ]
+}
+
+# Load facts for an interpreter (default: the active one) into JETSONIZER_FACT_* variables.
+jetsonizer_facts_load() {
+    local python_bin="${1:-${JETSONIZER_ACTIVE_PYTHON_BIN:-}}"
+    if [ -z "$python_bin" ]; then
+        python_bin="$(command -v python3 2>/dev/null || true)"
+    fi
+    if [ -z "$python_bin" ] || [ ! -x "$python_bin" ]; then
+        return 1
+    fi
+    if [ "$JETSONIZER_FACTS_LOADED_FOR" = "$python_bin" ]; then
+        return 0
+    fi
+
+    jetsonizer_facts_path "$python_bin"
+    if [ -f "$JETSONIZER_FACTS_FILE" ]; then
+        jetsonizer_facts_read "$JETSONIZER_FACTS_FILE"
+        if [ "${JETSONIZER_FACT_PYTHON_BIN:-}" = "$python_bin" ] && jetsonizer_facts_fresh; then
+            JETSONIZER_FACTS_LOADED_FOR="$python_bin"
+            return 0
+        fi
+    fi
+
+    if ! JETSONIZER_LOG_DIR="$JETSONIZER_FACTS_DIR" "$python_bin" "$JETSONIZER_FACTS_COLLECTOR" --python "$python_bin" > /dev/null 2>&1; then
+        return 1
+    fi
+    if [ ! -f "$JETSONIZER_FACTS_FILE" ]; then
+        return 1
+    fi
+    jetsonizer_facts_read "$JETSONIZER_FACTS_FILE"
+    JETSONIZER_FACTS_LOADED_FOR="$python_bin"
+}
+
+jetsonizer_pip_supports_break_flag() {
+    local python_bin="$1"
+    if jetsonizer_facts_load "$python_bin"; then
+        [ "${JETSONIZER_FACT_PIP_BREAK_SYSTEM_PACKAGES:-0}" = "1" ]
+        return
+    fi
+    "$python_bin" -m pip install --help 2>/dev/null | grep -q -- '--break-system-packages'
+}
+
+jetsonizer_python_cp_tag() {
+    local python_bin="$1"
+    if jetsonizer_facts_load "$python_bin" && [ -n "${JETSONIZER_FACT_PYTHON_CP_TAG:-}" ]; then
+        printf '%s\n' "$JETSONIZER_FACT_PYTHON_CP_TAG"
+        return 0
+    fi
+    "$python_bin" -c 'import sys; print(f"cp{sys.version_info[0]}{sys.version_info[1]}")' 2>/dev/null
+}
+
+# Prints the board model from the facts, falling back to the device tree; fails when neither has it.
+jetsonizer_jetson_model() {
+    if jetsonizer_facts_load && [ -n "${JETSONIZER_FACT_JETSON_MODEL:-}" ]; then
+        printf '%s\n' "$JETSONIZER_FACT_JETSON_MODEL"
+        return 0
+    fi
+    if [ -f /proc/device-tree/model ]; then
+        tr -d '\0' < /proc/device-tree/model
+        return 0
+    fi
+    return 1
+}
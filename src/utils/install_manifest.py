@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Record what Jetsonizer installed and decide whether a component can be skipped on re-runs.
+
+Run this with the interpreter the component is installed into. The manifest lives under the
+Jetsonizer cache directory and holds one entry per component and Python environment. Each entry
+records the distribution versions, a hash of each distribution's RECORD file, the wheel
+checksums and the validator result. A component is skipped only while all of these still
+match what is installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import fcntl
+import hashlib
+import importlib.metadata
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from script_log import LOG_DIR, run_main
+
+
+MANIFEST_PATH = LOG_DIR / "install_manifest.json"
+MANIFEST_LOCK = LOG_DIR / "install_manifest.lock"
+
+# Distributions that make up each component; only the installed ones are recorded.
+COMPONENT_DISTS: Dict[str, Tuple[str, ...]] = {
+    "opencv": (
+        "opencv-contrib-python",
+        "opencv-contrib-python-rolling",
+        "opencv-python",
+        "opencv-python-headless",
+    ),
+    "torch": ("torch", "torchvision"),
+    "tensorrt": ("tensorrt", "tensorrt_dispatch", "tensorrt_lean"),
+}
+VALIDATOR_RESULTS = ("ok", "failed", "skipped")
+
+
+def entry_key(component: str) -> str:
+    # sys.prefix tells apart venvs that share one base interpreter.
+    return f"{component}@{sys.prefix}"
+
+
+def installed_dist(name: str) -> Dict[str, str] | None:
+    """Version and RECORD hash of an installed distribution, without importing it."""
+    try:
+        dist = importlib.metadata.distribution(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+    record = dist.read_text("RECORD") or ""
+    return {
+        "version": dist.version,
+        "record_sha256": hashlib.sha256(record.encode("utf-8")).hexdigest(),
+    }
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest() -> Dict[str, Any]:
+    try:
+        with MANIFEST_PATH.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+@contextlib.contextmanager
+def _locked(lock_path: Path) -> Iterator[None]:
+    """Hold an exclusive flock on ``lock_path`` so concurrent installs take turns."""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    # Read-only is enough for flock, and still works when the lock file was created by root.
+    fd = os.open(lock_path, os.O_RDONLY | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def save_manifest(manifest: Dict[str, Any]) -> None:
+    """Replace the manifest atomically through a temporary file unique to this writer."""
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=MANIFEST_PATH.parent, prefix=f".{MANIFEST_PATH.name}.", suffix=".tmp")
+    try:
+        # Keep the manifest readable by the user when sudo modules write it.
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2, sort_keys=True)
+        os.replace(tmp_name, MANIFEST_PATH)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def record(
+    component: str,
+    validator: str,
+    dists: List[str] | None = None,
+    wheel_sha256: List[str] | None = None,
+    source: str = "",
+) -> Dict[str, Any]:
+    names = dists or list(COMPONENT_DISTS[component])
+    snapshot = {name: info for name in names if (info := installed_dist(name)) is not None}
+    if not snapshot:
+        raise SystemExit(f"None of {', '.join(names)} is installed for {sys.executable}; nothing to record.")
+    entry = {
+        "component": component,
+        "python": sys.executable,
+        "prefix": sys.prefix,
+        "dists": snapshot,
+        "wheel_sha256": sorted(wheel_sha256 or []),
+        "source": source,
+        "validator": validator,
+        "recorded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    # The scheduler installs components in parallel; re-read under the lock so no entry is lost.
+    with _locked(MANIFEST_LOCK):
+        manifest = load_manifest()
+        manifest[entry_key(component)] = entry
+        save_manifest(manifest)
+    return entry
+
+
+def decide(
+    component: str,
+    dists: List[str] | None = None,
+    wheel_sha256: List[str] | None = None,
+    source: str = "",
+    force: bool = False,
+) -> Tuple[str, str]:
+    """Return ``(action, reason)`` where action is skip, install or upgrade."""
+    present = {name: info for name in COMPONENT_DISTS[component] if (info := installed_dist(name)) is not None}
+    entry = load_manifest().get(entry_key(component))
+
+    if force:
+        return ("upgrade" if present else "install"), "forced"
+    if not entry:
+        if not present:
+            return "install", "not installed"
+        return "upgrade", "installed, but not by Jetsonizer"
+    if entry.get("validator") != "ok":
+        return "upgrade", f"last validation result was {entry.get('validator')}"
+
+    missing = [name for name in dists or [] if name not in entry.get("dists", {})]
+    if missing:
+        return "install", f"{', '.join(missing)} not installed by Jetsonizer yet"
+    for name, recorded in entry.get("dists", {}).items():
+        current = installed_dist(name)
+        if current is None:
+            return "install", f"{name} was removed"
+        if current["version"] != recorded["version"]:
+            return "upgrade", f"{name} changed ({recorded['version']} -> {current['version']})"
+        if current["record_sha256"] != recorded["record_sha256"]:
+            return "upgrade", f"{name} {current['version']} was modified since it was recorded"
+
+    if wheel_sha256 and sorted(wheel_sha256) != entry.get("wheel_sha256"):
+        return "upgrade", "a different wheel is requested"
+    if source and source != entry.get("source"):
+        return "upgrade", f"source changed to {source}"
+
+    versions = ", ".join(f"{name} {info['version']}" for name, info in entry["dists"].items())
+    return "skip", f"{versions} (recorded {entry.get('recorded_at')}, validation ok)"
+
+
+def _force_requested(flag: bool) -> bool:
+    return flag or os.environ.get("JETSONIZER_FORCE_REINSTALL", "") in ("1", "true", "yes")
+
+
+def _split(values: List[str] | None) -> List[str]:
+    return [item.strip() for value in values or [] for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    status = commands.add_parser("status", help="Print skip, install or upgrade and the reason for one component.")
+    status.add_argument("component", choices=sorted(COMPONENT_DISTS))
+    status.add_argument("--dists", action="append", help="Comma-separated distributions the install would provide.")
+    status.add_argument("--wheel-sha256", action="append", help="Checksum of the wheel that would be installed.")
+    status.add_argument("--wheel", action="append", type=Path, help="Wheel file that would be installed.")
+    status.add_argument("--source", default="", help="Index URL or other origin the install would use.")
+    status.add_argument("--force", action="store_true", help="Never skip (also $JETSONIZER_FORCE_REINSTALL=1).")
+
+    rec = commands.add_parser("record", help="Record the installed state of a component.")
+    rec.add_argument("component", choices=sorted(COMPONENT_DISTS))
+    rec.add_argument("--validator", choices=VALIDATOR_RESULTS, required=True, help="Result of the module's validation.")
+    rec.add_argument("--dists", action="append", help="Comma-separated distributions to record (default: the component's).")
+    rec.add_argument("--wheel-sha256", action="append", help="Checksum of the installed wheel.")
+    rec.add_argument("--wheel", action="append", type=Path, help="Installed wheel file, hashed on the fly.")
+    rec.add_argument("--source", default="", help="Index URL or other origin the install used.")
+
+    plan = commands.add_parser("plan", help="Print the action for each component.")
+    plan.add_argument("components", nargs="*", help=f"Components to plan (default: {' '.join(sorted(COMPONENT_DISTS))}).")
+    plan.add_argument("--force", action="store_true", help="Never skip (also $JETSONIZER_FORCE_REINSTALL=1).")
+    plan.add_argument("--json", action="store_true", help="Print the plan as JSON.")
+
+    args = parser.parse_args()
+
+    if args.command in ("status", "record"):
+        wheel_sha256 = [value.lower() for value in _split(args.wheel_sha256)]
+        wheel_sha256 += [_file_sha256(path) for path in args.wheel or []]
+
+    if args.command == "status":
+        action, reason = decide(
+            args.component, _split(args.dists), wheel_sha256, args.source, _force_requested(args.force)
+        )
+        # One tab-separated line so the shell side can `read -r action reason`.
+        print(f"{action}\t{reason}")
+    elif args.command == "record":
+        entry = record(args.component, args.validator, _split(args.dists), wheel_sha256, args.source)
+        print(f"Recorded {args.component}: " + ", ".join(f"{name} {info['version']}" for name, info in entry["dists"].items()))
+    else:
+        unknown = [component for component in args.components if component not in COMPONENT_DISTS]
+        if unknown:
+            raise SystemExit(f"Unknown component(s): {', '.join(unknown)}. Choose from: {', '.join(sorted(COMPONENT_DISTS))}.")
+        force = _force_requested(args.force)
+        components = args.components or sorted(COMPONENT_DISTS)
+        rows = [(component, *decide(component, force=force)) for component in dict.fromkeys(components)]
+        if args.json:
+            payload = {
+                "python": sys.executable,
+                "prefix": sys.prefix,
+                "plan": [{"component": c, "action": a, "reason": r} for c, a, r in rows],
+            }
+            print(json.dumps(payload, sort_keys=True))
+            return
+        print(f"Install plan for {sys.executable}:")
+        width = max(len(component) for component, _, _ in rows)
+        for component, action, reason in rows:
+            print(f"  {component.ljust(width)}  {action:<7}  {reason}")
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
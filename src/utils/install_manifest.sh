@@ -0,0 +1,35 @@
+#!/bin/bash
+# Installed-state manifest helpers shared by the installer modules (see install_manifest.py).
+
+JETSONIZER_MANIFEST_TOOL="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/install_manifest.py"
+JETSONIZER_MANIFEST_ACTION=""
+JETSONIZER_MANIFEST_REASON=""
+
+# Usage: jetsonizer_manifest_should_skip <python> <component> [status options...]
+# Succeeds when the recorded install still matches and no reinstall was forced.
+jetsonizer_manifest_should_skip() {
+    local python_bin="$1"
+    local component="$2"
+    shift 2
+    local result
+    JETSONIZER_MANIFEST_ACTION="install"
+    JETSONIZER_MANIFEST_REASON=""
+    if ! result="$("$python_bin" "$JETSONIZER_MANIFEST_TOOL" status "$component" "$@" 2>/dev/null)"; then
+        return 1
+    fi
+    # The reason is read by the sourcing module when it reports a skip.
+    # shellcheck disable=SC2034
+    IFS=$'\t' read -r JETSONIZER_MANIFEST_ACTION JETSONIZER_MANIFEST_REASON <<< "$result"
+    [ "$JETSONIZER_MANIFEST_ACTION" = "skip" ]
+}
+
+# Usage: jetsonizer_manifest_record <python> <component> <ok|failed|skipped> [record options...]
+jetsonizer_manifest_record() {
+    local python_bin="$1"
+    local component="$2"
+    local validator="$3"
+    shift 3
+    if ! "$python_bin" "$JETSONIZER_MANIFEST_TOOL" record "$component" --validator "$validator" "$@" >/dev/null 2>&1; then
+        gum style --foreground 214 --bold "⚠️  Unable to record $component in the install manifest; it will be reinstalled next time."
+    fi
+}
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""Run the selected Jetsonizer installers concurrently while respecting their dependencies."""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import pty
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Tuple
+
+from script_log import LOG_DIR, run_main
+
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+PYTHON_TOOLING = ("MiniConda", "uv")
+# Placeholder in resource names for the interpreter the ML stack is installed into.
+ACTIVE_PYTHON = "{python}"
+# Settings from main.sh flags (and the up-front answers) that sudo jobs must still see.
+FORWARDED_ENV = ("JETSONIZER_FORCE_REINSTALL", "JETSONIZER_BUNDLE_DIR", "JETSONIZER_ANSWERS_FILE")
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """How one menu item is installed.
+
+    ``resources`` are exclusive locks: two jobs sharing one never run at the same time.
+    ``after`` lists menu items that must finish first when they are part of the selection.
+    ``asks`` jobs answer their questions on the terminal before the schedule starts (see
+    utils/answers.sh) and then run in the background like any other job. Interactive jobs can
+    prompt at any point, so they run on the terminal, one at a time, next to the background jobs.
+    """
+
+    script: str
+    sudo: bool = False
+    runner: str = "bash"
+    args: Tuple[str, ...] = ()
+    resources: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    asks: bool = False
+    interactive: bool = False
+
+
+JOB_SPECS: Dict[str, JobSpec] = {
+    # Every module that can end up in apt-get (check_pip.sh and the CUDA/NPP helpers included) holds "apt".
+    # A gum prompt with stdin closed reads EOF and silently takes the "No" branch, so no module may reach
+    # one in the background: the "reinstall?"-style questions are asked up front (asks=True), and modules
+    # that can prompt anywhere during the install are interactive.
+    "OpenCV with CUDA enabled": JobSpec(
+        "modules/router_opencv.sh",
+        sudo=True,
+        resources=("apt", f"pip:{ACTIVE_PYTHON}"),
+        interactive=True,
+    ),
+    "PyTorch with CUDA acceleration": JobSpec(
+        "modules/router_torch.sh",
+        sudo=True,
+        resources=("apt", f"pip:{ACTIVE_PYTHON}"),
+    ),
+    "TensorRT": JobSpec(
+        "modules/link_tensorrt.sh",
+        sudo=True,
+        resources=("apt", f"pip:{ACTIVE_PYTHON}"),
+        after=PYTHON_TOOLING,
+        interactive=True,
+    ),
+    "MiniConda": JobSpec("modules/install_miniconda.sh", asks=True),
+    "uv": JobSpec("modules/install_uv.sh", sudo=True, asks=True),
+    "VS Code": JobSpec("modules/install_vscode.sh", sudo=True, resources=("apt",), asks=True),
+    "jtop": JobSpec("modules/router_jtop.sh", sudo=True, resources=("apt", "pip:/usr/bin/python3")),
+    "Brave Browser": JobSpec("modules/install_brave_browser.sh", sudo=True, resources=("apt",), asks=True),
+    # The validator items are merged into a single run_validators.py job (see plan_jobs).
+    "Run OpenCV CUDA test": JobSpec(
+        "tests/run_validators.py",
+        runner="python",
+        args=("opencv",),
+        after=("OpenCV with CUDA enabled",),
+    ),
+    "Run PyTorch CUDA test": JobSpec(
+        "tests/run_validators.py",
+        runner="python",
+        args=("torch",),
+        after=("PyTorch with CUDA acceleration",),
+    ),
+    "Run TensorRT test": JobSpec(
+        "tests/run_validators.py",
+        runner="python",
+        args=("tensorrt",),
+        after=("TensorRT",),
+    ),
+}
+VALIDATOR_ITEMS = ("Run OpenCV CUDA test", "Run PyTorch CUDA test", "Run TensorRT test")
+VALIDATOR_JOB = "Run CUDA validators"
+
+
+@dataclass
+class Job:
+    """A selected item and its progress through the schedule."""
+
+    item: str
+    spec: JobSpec
+    command: List[str]
+    resources: FrozenSet[str]
+    deps: List[str]
+    log_path: Path
+    # Run on the terminal before the schedule starts, so the job can answer its questions up front.
+    ask_command: List[str] = field(default_factory=list)
+    # Items that only have to finish first; unlike ``deps`` their failure does not skip this job.
+    waits: List[str] = field(default_factory=list)
+    status: str = "pending"
+    returncode: int | None = None
+    start: float | None = None
+    end: float | None = None
+    note: str = ""
+
+    @property
+    def duration(self) -> float:
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+
+@dataclass
+class ScheduleOptions:
+    active_python: str
+    run_python: str
+    max_parallel: int = 4
+    dry_run: bool = False
+    stub_dir: Path | None = None
+    stub_seconds: float = 1.0
+
+
+def _slug(item: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", item.lower()).strip("_")
+
+
+def build_command(spec: JobSpec, item: str, options: ScheduleOptions, ask_only: bool = False) -> List[str]:
+    script = SRC_ROOT / spec.script
+    ask_env = ["JETSONIZER_ASK_ONLY=1"] if ask_only else []
+    if options.dry_run:
+        prefix = ["env", *ask_env] if ask_only else []
+        stub = options.stub_dir / script.name if options.stub_dir else None
+        if stub is not None and stub.is_file():
+            return [*prefix, "bash", str(stub), *spec.args]
+        return [
+            *prefix,
+            "bash",
+            "-c",
+            '[ "${JETSONIZER_ASK_ONLY:-0}" = 1 ] && exit 0; echo "[dry-run] $1"; sleep "$2"',
+            "stub",
+            f"{item} ({spec.script})",
+            f"{options.stub_seconds:g}",
+        ]
+
+    runner = [options.run_python] if spec.runner == "python" else ["bash"]
+    command = [*runner, str(script), *spec.args]
+    if spec.sudo:
+        forwarded = [f"JETSONIZER_ACTIVE_PYTHON_BIN={options.active_python}", *ask_env]
+        # sudo drops the caller's environment; --force, --bundle and the up-front answers have to survive it.
+        for name in FORWARDED_ENV:
+            if os.environ.get(name):
+                forwarded.append(f"{name}={os.environ[name]}")
+        return ["sudo", "env", *forwarded, *command]
+    return ["env", *ask_env, *command] if ask_only else command
+
+
+def _resource_key(resource: str, active_python: str) -> str:
+    """Name a lock so that every spelling of the same interpreter maps to the same pip lock."""
+    resource = resource.replace(ACTIVE_PYTHON, active_python or "default")
+    kind, _, target = resource.partition(":")
+    if kind == "pip" and target.startswith("/"):
+        return f"pip:{os.path.realpath(target)}"
+    return resource
+
+
+def plan_jobs(items: List[str], options: ScheduleOptions, log_dir: Path) -> List[Job]:
+    unknown = [item for item in items if item not in JOB_SPECS]
+    if unknown:
+        raise SystemExit(f"Unknown install item(s): {', '.join(unknown)}. Choose from: {', '.join(JOB_SPECS)}.")
+
+    selected = list(dict.fromkeys(items))
+    installs = [item for item in selected if item not in VALIDATOR_ITEMS]
+    validators = [item for item in selected if item in VALIDATOR_ITEMS]
+    jobs: List[Job] = []
+    for item in installs:
+        spec = JOB_SPECS[item]
+        jobs.append(
+            Job(
+                item=item,
+                spec=spec,
+                command=build_command(spec, item, options),
+                resources=frozenset(_resource_key(resource, options.active_python) for resource in spec.resources),
+                deps=[dep for dep in spec.after if dep in selected and dep != item],
+                log_path=log_dir / f"{_slug(item)}.log",
+                ask_command=build_command(spec, item, options, ask_only=True) if spec.asks else [],
+            )
+        )
+
+    if validators:
+        # One run_validators.py call keeps the validators running in parallel with each other. It starts
+        # once every install has finished, so no lock is needed: nothing is writing to site-packages anymore.
+        names = ",".join(arg for item in validators for arg in JOB_SPECS[item].args)
+        spec = JobSpec("tests/run_validators.py", runner="python", args=("--only", names))
+        deps = [dep for item in validators for dep in JOB_SPECS[item].after if dep in selected]
+        jobs.append(
+            Job(
+                item=VALIDATOR_JOB,
+                spec=spec,
+                command=build_command(spec, VALIDATOR_JOB, options),
+                resources=frozenset(),
+                deps=list(dict.fromkeys(deps)),
+                log_path=log_dir / f"{_slug(VALIDATOR_JOB)}.log",
+                waits=[item for item in installs if item not in deps],
+            )
+        )
+    return jobs
+
+
+class Scheduler:
+    """Starts every job whose dependencies succeeded and whose locks are free."""
+
+    def __init__(self, jobs: List[Job], options: ScheduleOptions) -> None:
+        self.jobs = jobs
+        self.by_item = {job.item: job for job in jobs}
+        self.options = options
+        self.cond = threading.Condition()
+        self.held: set = set()
+        self.running: Dict[str, Job] = {}
+        self.deferred: List[str] = []
+        self.origin = 0.0
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def _say(self, message: str) -> None:
+        # Status lines would land in the middle of a prompt; hold them while a job owns the terminal.
+        if any(job.spec.interactive for job in self.running.values()):
+            self.deferred.append(message)
+        else:
+            print(message, flush=True)
+
+    def _on_terminal(self, command: List[str], log_path: Path) -> int:
+        """Run ``command`` on the terminal through a pty and copy everything it prints into ``log_path``."""
+        with log_path.open("ab") as log:
+            log.write(f"$ {shlex.join(command)}\n".encode())
+            log.flush()
+
+            def read(fd: int) -> bytes:
+                data = os.read(fd, 4096)
+                log.write(data)
+                log.flush()
+                return data
+
+            status = pty.spawn(command, read)
+        return os.WEXITSTATUS(status) if os.WIFEXITED(status) else 128 + os.WTERMSIG(status)
+
+    def ask_up_front(self) -> None:
+        """Let every ``asks`` job put its questions to the user before anything runs in the background."""
+        for job in self.jobs:
+            if not job.ask_command:
+                continue
+            print(f"❓ {job.item}", flush=True)
+            try:
+                returncode = self._on_terminal(job.ask_command, job.log_path)
+            except OSError as exc:
+                returncode = 127
+                job.note = str(exc)
+            if returncode != 0:
+                job.status = "failed"
+                job.returncode = returncode
+                job.note = job.note or "failed while asking its questions"
+                print(f"❌ {job.item} failed (exit {returncode}); see {job.log_path}", flush=True)
+
+    def _execute(self, job: Job) -> None:
+        try:
+            if job.spec.interactive:
+                returncode = self._on_terminal(job.command, job.log_path)
+            else:
+                with job.log_path.open("a", encoding="utf-8") as log:
+                    log.write(f"$ {shlex.join(job.command)}\n")
+                    log.flush()
+                    returncode = subprocess.run(
+                        job.command,
+                        stdin=subprocess.DEVNULL,
+                        stdout=log,
+                        stderr=subprocess.STDOUT,
+                        check=False,
+                    ).returncode
+        except OSError as exc:
+            returncode = 127
+            job.note = str(exc)
+
+        with self.cond:
+            job.end = self._elapsed()
+            job.returncode = returncode
+            job.status = "ok" if returncode == 0 else "failed"
+            self.held -= job.resources
+            del self.running[job.item]
+            if job.spec.interactive:
+                for message in self.deferred:
+                    print(message, flush=True)
+                self.deferred.clear()
+            if job.status == "ok":
+                self._say(f"✅ {job.item} finished in {job.duration:.1f}s")
+            else:
+                self._say(f"❌ {job.item} failed (exit {returncode}); see {job.log_path}")
+            self.cond.notify_all()
+
+    def _start(self, job: Job) -> None:
+        if job.spec.interactive:
+            self._say(f"▶ Starting {job.item} on the terminal (log: {job.log_path})")
+        else:
+            self._say(f"▶ Starting {job.item} (log: {job.log_path})")
+        job.status = "running"
+        job.start = self._elapsed()
+        self.held |= job.resources
+        self.running[job.item] = job
+        threading.Thread(target=self._execute, args=(job,), daemon=True).start()
+
+    def _skip_blocked(self) -> None:
+        changed = True
+        while changed:
+            changed = False
+            for job in self.jobs:
+                if job.status != "pending":
+                    continue
+                broken = [dep for dep in job.deps if self.by_item[dep].status in ("failed", "skipped")]
+                if broken:
+                    job.status = "skipped"
+                    job.note = f"dependency failed: {', '.join(broken)}"
+                    self._say(f"⏭  Skipping {job.item} ({job.note})")
+                    changed = True
+
+    def _ready(self, job: Job) -> bool:
+        return (
+            job.status == "pending"
+            and all(self.by_item[dep].status == "ok" for dep in job.deps)
+            and all(self.by_item[item].status not in ("pending", "running") for item in job.waits)
+            and not (job.resources & self.held)
+        )
+
+    def run(self) -> List[Job]:
+        self.origin = time.perf_counter()
+        with self.cond:
+            while True:
+                self._skip_blocked()
+                pending = [job for job in self.jobs if job.status == "pending"]
+                if not pending and not self.running:
+                    break
+
+                # Background jobs write to their log files only, so they keep running while an
+                # interactive job has the terminal; only a second interactive job has to wait.
+                terminal_busy = any(job.spec.interactive for job in self.running.values())
+                for job in pending:
+                    if len(self.running) >= self.options.max_parallel:
+                        break
+                    if job.spec.interactive and terminal_busy:
+                        continue
+                    if self._ready(job):
+                        self._start(job)
+                        terminal_busy = terminal_busy or job.spec.interactive
+
+                if not self.running and not any(self._ready(job) for job in pending):
+                    # Nothing can make progress; should not happen with a valid dependency graph.
+                    for job in pending:
+                        job.status = "skipped"
+                        job.note = "unsatisfiable dependencies"
+                    continue
+                self.cond.wait()
+        return self.jobs
+
+
+def render_timeline(jobs: List[Job], wall: float, width: int = 40) -> List[str]:
+    serial = sum(job.duration for job in jobs)
+    speedup = f", {serial / wall:.1f}x" if wall > 0 and serial > 0 else ""
+    lines = [f"Timeline: wall {wall:.1f}s, sum of jobs {serial:.1f}s{speedup}"]
+    label_width = max((len(job.item) for job in jobs), default=0)
+    scale = width / wall if wall > 0 else 0.0
+    for job in jobs:
+        if job.start is None:
+            bar = " " * width
+            span = "not run".rjust(17)
+        else:
+            begin = min(width - 1, int(job.start * scale))
+            length = max(1, int(round(job.duration * scale)))
+            bar = (" " * begin + "#" * length).ljust(width)[:width]
+            span = f"{job.start:6.1f}s → {job.end:6.1f}s"
+        note = f" ({job.note})" if job.note else ""
+        lines.append(f"  {job.item.ljust(label_width)}  |{bar}|  {span}  {job.status}{note}")
+    return lines
+
+
+def _write_timeline(jobs: List[Job], wall: float, run_dir: Path, dry_run: bool) -> Path | None:
+    try:
+        report_path = run_dir / "timeline.json"
+        payload = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "dry_run": dry_run,
+            "wall_seconds": wall,
+            "jobs": [
+                {
+                    "item": job.item,
+                    "status": job.status,
+                    "returncode": job.returncode,
+                    "start_s": job.start,
+                    "end_s": job.end,
+                    "duration_s": job.duration,
+                    "deps": job.deps,
+                    "waits": job.waits,
+                    "resources": sorted(job.resources),
+                    "asks": job.spec.asks,
+                    "interactive": job.spec.interactive,
+                    "command": job.command,
+                    "log": str(job.log_path),
+                    "note": job.note,
+                }
+                for job in jobs
+            ],
+        }
+        with report_path.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+            handle.write("\n")
+        return report_path
+    except Exception:
+        return None
+
+
+def _keep_sudo_alive(stop: threading.Event) -> None:
+    # Long builds outlive sudo's credential cache; refresh it without prompting.
+    while not stop.wait(60):
+        subprocess.run(["sudo", "-n", "-v"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("items", nargs="+", help="Menu items to install, as shown in the Jetsonizer menu.")
+    parser.add_argument(
+        "--python",
+        default=os.environ.get("JETSONIZER_ACTIVE_PYTHON_BIN", ""),
+        help="Interpreter the ML stack is installed into (default: $JETSONIZER_ACTIVE_PYTHON_BIN).",
+    )
+    parser.add_argument(
+        "--run-python",
+        default=sys.executable,
+        help="Interpreter used to run the validators (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=4,
+        help="Maximum number of jobs running at once (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Replace every module with a stub so the schedule can be exercised off-device.",
+    )
+    parser.add_argument(
+        "--stub-dir",
+        type=Path,
+        help="In --dry-run, run <stub-dir>/<module name> instead of the default sleeping stub when it exists.",
+    )
+    parser.add_argument(
+        "--stub-seconds",
+        type=float,
+        default=1.0,
+        help="How long the default dry-run stub sleeps (default: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    if args.max_parallel < 1:
+        raise SystemExit("--max-parallel must be at least 1.")
+    if args.stub_seconds < 0:
+        raise SystemExit("--stub-seconds must be zero or positive.")
+    if args.stub_dir and not args.dry_run:
+        raise SystemExit("--stub-dir only applies together with --dry-run.")
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_dir = LOG_DIR / f"install_{timestamp}"
+    run_dir.mkdir(parents=True, exist_ok=True)
+    # Every job reads these, including the interactive ones started through a pty.
+    os.environ["JETSONIZER_ACTIVE_PYTHON_BIN"] = args.python
+    answers_path = run_dir / "answers.env"
+    # Created here so that sudo and non-sudo modules can both append to it.
+    answers_path.touch()
+    os.environ["JETSONIZER_ANSWERS_FILE"] = str(answers_path)
+
+    options = ScheduleOptions(
+        active_python=args.python,
+        run_python=args.run_python,
+        max_parallel=args.max_parallel,
+        dry_run=args.dry_run,
+        stub_dir=args.stub_dir,
+        stub_seconds=args.stub_seconds,
+    )
+    jobs = plan_jobs(args.items, options, run_dir)
+
+    stop_keepalive = threading.Event()
+    if not args.dry_run and any(job.spec.sudo for job in jobs):
+        threading.Thread(target=_keep_sudo_alive, args=(stop_keepalive,), daemon=True).start()
+
+    print(f"Per-job logs: {run_dir}", flush=True)
+    scheduler = Scheduler(jobs, options)
+    try:
+        scheduler.ask_up_front()
+        scheduler.run()
+    finally:
+        stop_keepalive.set()
+    wall = max((job.end or 0.0 for job in jobs), default=0.0)
+
+    print()
+    for line in render_timeline(jobs, wall):
+        print(line)
+    report_path = _write_timeline(jobs, wall, run_dir, args.dry_run)
+    if report_path:
+        print(f"Timeline written to {report_path}")
+
+    if any(job.status != "ok" for job in jobs):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run_main(main, __file__)
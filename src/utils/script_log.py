@@ -0,0 +1 @@
+../tests/script_log.py
\ No newline at end of file